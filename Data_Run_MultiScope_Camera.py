@@ -200,7 +200,7 @@ def run_acquisition_with_WDropper(hdf5_path):
             # Initialize tungsten dropper
             print("Initializing tungsten dropper...")
             dropper = TungstenDropper(motor_ip=MOTOR_IP, timeout=15)
-            trigger_client = TriggerClient(PI_HOST, PI_PORT)
+            trigger_client = TriggerClient(PI_HOST, PI_PORT, persistent=True)
             trigger_client.get_status()  # Test connection
             print("✓ Trigger client initialized")
 
@@ -274,6 +274,10 @@ def run_acquisition_with_WDropper(hdf5_path):
     finally:
         # Cleanup all resources
         print("\n=== Cleaning up resources ===")
+
+        if trigger_client:
+            print(trigger_client.latency_report())
+            trigger_client.close()
         
         # Cleanup camera
         if camera_recorder:
@@ -392,10 +392,14 @@ class _SpoolShotSink:
     The probe is already at position when this runs; per the parallel design
     the order per shot is arm -> acquire -> read positions -> write bin+done.
     A separate offload process turns the spool into the HDF5 file.
+
+    With a ``trigger_matcher`` (acquisition.trigger_timestamps.ShotTriggerMatcher)
+    each shot also carries the Pi's timestamp of the trigger edge it was taken
+    on, matched within its arm -> read window.
     """
 
     def __init__(self, msa, active_scopes, spool_dir, run_manager,
-                 pause_seconds=None, max_retries=None):
+                 pause_seconds=None, max_retries=None, trigger_matcher=None):
         from spooling import spool_format
 
         self.msa = msa
@@ -406,13 +410,16 @@ class _SpoolShotSink:
                               if pause_seconds is None else pause_seconds)
         self.max_retries = (spool_format.DISK_FULL_MAX_RETRIES
                             if max_retries is None else max_retries)
+        self.trigger_matcher = trigger_matcher
 
     def take_shot(self, shot_num, record_keys):
         from spooling import spool_format
         from . import spool_adapter
 
         self.msa.arm_scopes_for_trigger(self.active_scopes, verbose=False)
+        armed = time.perf_counter()
         all_data = self.msa.acquire_shot_dispatch(self.active_scopes, shot_num, verbose=False)
+        acquired = time.perf_counter()
         missing = self.msa.last_missing_scopes
         if not all_data:
             # Every scope failed to arm/read -> a fully-missing shot. Raise so the
@@ -422,8 +429,11 @@ class _SpoolShotSink:
                 _format_missing_reason(missing)
                 or f"No valid data acquired at shot {shot_num}")
         coords = read_bmotion_positions(self.run_manager, record_keys)
+        trigger = None
+        if self.trigger_matcher is not None:
+            trigger = self.trigger_matcher.match(armed, acquired, warn=tqdm.write)
         payload = spool_adapter.all_data_to_payload(
-            all_data, shot_num, coords, missing_scopes=missing)
+            all_data, shot_num, coords, missing_scopes=missing, trigger=trigger)
         spool_format.write_shot_with_disk_full_retry(
             self.spool_dir, payload, parallel=self.msa.parallel_spool_write,
             pause_seconds=self.pause_seconds, max_retries=self.max_retries,
@@ -930,9 +940,14 @@ def run_acquisition_bmotion_spooled(spool_dir, hdf5_path, toml_path, config_path
     Resume is not supported: every call is a fresh run from shot 1 (the entry
     script restarts an existing run by deleting its HDF5 and rotating its spool
     aside first).
+
+    With ``[raspberry_pi] timestamp_shots = true`` each shot also carries the
+    Pi trigger server's timestamp of the edge it was taken on (see
+    :mod:`acquisition.trigger_timestamps`).
     """
     from spooling import spool_format
     from . import spool_adapter
+    from .trigger_timestamps import matcher_from_config
 
     print('Starting spooled acquisition at', time.ctime())
 
@@ -956,6 +971,7 @@ def run_acquisition_bmotion_spooled(spool_dir, hdf5_path, toml_path, config_path
         "consecutive_skips": 0,
         "max_consecutive_skips": get_max_consecutive_skips(config),
     }
+    trigger_matcher = None
     with MultiScopeAcquisition(hdf5_path, config, raw_config_text,
                                description_path=description_path) as msa:
         try:
@@ -986,14 +1002,20 @@ def run_acquisition_bmotion_spooled(spool_dir, hdf5_path, toml_path, config_path
                 "config_scope_names": list(active_scopes.keys()),
                 "description_path": description_path,
                 "total_shots": total_shots,
+                "trace_chunk_samples": msa.trace_chunk_samples,
+                "preview_levels": msa.preview_levels,
+                "position_stats": msa.position_stats,
+                "live_tap": msa.live_tap,
             })
             print(f"Wrote run metadata to spool: {spool_dir}")
 
             from .config import get_disk_full_pause_opts, get_motion_recovery_opts
             pause_seconds, max_retries = get_disk_full_pause_opts(config)
+            trigger_matcher = matcher_from_config(config)
             sink = _SpoolShotSink(msa, active_scopes, spool_dir, run_manager,
                                   pause_seconds=pause_seconds,
-                                  max_retries=max_retries)
+                                  max_retries=max_retries,
+                                  trigger_matcher=trigger_matcher)
             move_opts = get_motion_recovery_opts(config)
 
             if execution_order == "sequential":
@@ -1024,6 +1046,8 @@ def run_acquisition_bmotion_spooled(spool_dir, hdf5_path, toml_path, config_path
             raise RuntimeError() from err
         finally:
             run_manager.terminate()
+            if trigger_matcher is not None:
+                trigger_matcher.close()
             # `_run_*` return the next (unused) shot number, so the count
             # actually emitted is last_shot_num - 1. If the run aborted during
             # setup (before any shot), last_shot_num is still 0 -> report 0.
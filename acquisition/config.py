@@ -359,6 +359,88 @@ def get_disk_full_pause_opts(config):
     return pause, retries
 
 
+def get_trace_chunk_samples(config):
+    """Return the time-axis chunk length (samples) for trace datasets, or None.
+
+    Optional ``[storage] trace_chunk_samples``. None (absent) keeps the
+    writer's default of one chunk per record (up to 8 Mi samples); a smaller
+    value such as 65536 splits long traces into time chunks so analyses that
+    read a short time window only decompress the chunks it overlaps. Written
+    into the spool run metadata so the offload writes with the same setting.
+    """
+    if 'storage' not in config:
+        return None
+    value = config.getint('storage', 'trace_chunk_samples', fallback=None)
+    if value is not None and value <= 0:
+        raise ValueError(
+            f"[storage] trace_chunk_samples must be a positive integer, got {value}")
+    return value
+
+
+def get_preview_levels(config):
+    """Return the min/max preview decimation factors, or None (no previews).
+
+    Optional ``[storage] preview_levels``: comma-separated factors, e.g.
+    ``16, 256``. Each 1-D trace then gets a ``<CH>_preview_<k>`` min/max level
+    per factor, which the trace plots draw instead of the full record. Written
+    into the spool run metadata so the offload writes the same levels.
+    """
+    if 'storage' not in config:
+        return None
+    raw = config.get('storage', 'preview_levels', fallback='').strip()
+    if not raw:
+        return None
+    try:
+        levels = tuple(sorted({int(v) for v in raw.replace(',', ' ').split()}))
+    except ValueError:
+        raise ValueError(
+            f"[storage] preview_levels must be integers, e.g. '16, 256'; got {raw!r}")
+    if any(k < 2 for k in levels):
+        raise ValueError(f"[storage] preview_levels must all be >= 2, got {raw!r}")
+    return levels
+
+
+def get_position_stats_enabled(config):
+    """Return whether the offload accumulates per-position mean/std.
+
+    Optional ``[storage] position_stats`` boolean (default ``True``). When on,
+    the offload keeps a running mean/std of the repeat shots at each planned
+    position and writes ``/analysis/position_mean`` + ``/analysis/position_std``
+    at finalize (see :mod:`scope_io.position_stats`), which the XY-map and line
+    plots read instead of the traces. Written into the spool run metadata.
+    """
+    if 'storage' not in config:
+        return True
+    return config.getboolean('storage', 'position_stats', fallback=True)
+
+
+def get_live_tap_opts(config):
+    """Return the live analysis tap settings, or None (tap off).
+
+    Optional ``[live_tap]`` section: ``port`` (required to enable it), ``host``
+    (default ``127.0.0.1``; use ``0.0.0.0`` to let another machine watch) and
+    ``max_points`` (min/max bins per trace, default 4096). With it, the offload
+    announces every committed shot on that port for
+    ``read_and_analyze/live_monitor.py`` (see :mod:`scope_io.live`). Returned
+    as :class:`scope_io.LiveTapPublisher` keyword args and written into the
+    spool run metadata.
+    """
+    section = 'live_tap'
+    if section not in config or not config.has_option(section, 'port'):
+        return None
+    port = config.getint(section, 'port')
+    if not 0 < port < 65536:
+        raise ValueError(f"[live_tap] port must be in 1..65535, got {port}")
+    max_points = config.getint(section, 'max_points', fallback=4096)
+    if max_points < 1:
+        raise ValueError(f"[live_tap] max_points must be >= 1, got {max_points}")
+    return {
+        "host": config.get(section, 'host', fallback='127.0.0.1').strip(),
+        "port": port,
+        "max_points": max_points,
+    }
+
+
 #: Default consecutive fully-skipped shots before the run aborts. A fully-skipped
 #: shot is one where NO scope produced data (master failed to arm, or every scope
 #: failed). A persistent run of these means the trigger/master is dead, so the run
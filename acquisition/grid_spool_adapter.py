@@ -19,6 +19,7 @@ The offload runner dispatches here on the ``"grid"`` writer tag.
 """
 
 import h5py
+import numpy as np
 
 from . import hdf5_writer
 from . import spool_adapter
@@ -49,8 +50,13 @@ def write_shot(hdf5_path, payload, meta):
     all_data = spool_adapter._payload_to_all_data(payload)
     with h5py.File(hdf5_path, "a", **hdf5_writer.SHOT_WRITE_OPEN_KWARGS) as f:
         hdf5_writer._write_shot_data_into(f, all_data, payload.shot_num,
-                                          acquisition_time=payload.acquisition_time)
+                                          acquisition_time=payload.acquisition_time,
+                                          trigger=payload.trigger,
+                                          chunk_samples=meta.get("trace_chunk_samples"),
+                                          preview_levels=meta.get("preview_levels"))
         _write_positions(f, payload, meta)
+        spool_adapter.accumulate_position_stats(
+            f, hdf5_path, payload, meta, lambda f: _grid_plan(f, meta))
 
     # Per-scope partial: scopes that failed for this shot get a skipped group so
     # every config scope always has a shot_N group (data or skip marker).
@@ -62,7 +68,8 @@ def finalize(hdf5_path, meta, final_shot_num):
 
     Delegates to :func:`acquisition.spool_adapter.finalize`, which also re-reads
     ``description.txt`` (via ``meta["description_path"]``) now that all shots are
-    written, so the description edited before/during the run is captured.
+    written, so the description edited before/during the run is captured, and
+    stores the run's per-position statistics.
     """
     spool_adapter.finalize(hdf5_path, meta, final_shot_num)
 
@@ -74,6 +81,32 @@ def mark_shot_failed(hdf5_path, meta, shot_num, reason):
     )
 
 
+def _grid_plan(f, meta):
+    """Planned ``(x, y[, z])`` of the grid, for the per-position statistics.
+
+    ``positions_setup_array`` has one row per shot (every duplicate and run
+    repeat), so each position is taken once, in the order it is first visited.
+    """
+    ds_path = "/Control/Positions/positions_setup_array"
+    if ds_path not in f:
+        return None
+    setup = f[ds_path][()]
+    axes = ("x", "y") if meta.get("nz") is None else ("x", "y", "z")
+    if any(a not in (setup.dtype.names or ()) for a in axes):
+        return None
+    planned = np.column_stack([setup[a] for a in axes]).astype(float)
+    _, first = np.unique(planned, axis=0, return_index=True)
+    planned = planned[np.sort(first)]
+    scan_order = f[ds_path].attrs.get("scan_order", "raster")
+    if isinstance(scan_order, bytes):
+        scan_order = scan_order.decode()
+    if scan_order != "raster":
+        # Reordered scan (motion/scan_order.py): lay the statistics out in raster
+        # order anyway, so an XY plane stays a reshape((ny, nx)) away.
+        planned = planned[np.lexsort(planned.T)]
+    return planned, lambda coords: tuple(coords[a] for a in axes)
+
+
 def _write_positions(f, payload, meta):
     """Write the single grid positions_array row into open HDF5 ``f``.
 
@@ -13,6 +13,13 @@ import time
 import h5py
 import numpy as np
 
+# Min/max preview pyramid written next to each 1-D trace (``[storage]
+# preview_levels``, e.g. ``16, 256``; off by default). Each level is an
+# ``(ceil(n / k), 2)`` int16 ``<CH>_preview_<k>`` dataset of per-bin raw
+# [min, max] that plotting code draws instead of the full record. The layout
+# and builder live in scope_io so the writer and the readers share them.
+from scope_io import minmax_pyramid, preview_key
+
 # Prefer Blosc2 (bitshuffle+lz4) for int16 ADC data: bitshuffle groups bits by
 # significance and substantially outperforms byte-shuffle on correlated signals.
 # Fall back to lzf if hdf5plugin is not installed.
@@ -33,6 +40,23 @@ except ImportError:
 # use the exact same policy as the in-process writer.
 SHOT_WRITE_OPEN_KWARGS = {"libver": "latest", "rdcc_nbytes": 0}
 
+# Largest chunk (in samples) along the time axis of a trace dataset. The
+# default keeps a whole record (up to 8 Mi samples) in one chunk. A smaller
+# value -- ``[storage] trace_chunk_samples``, e.g. 65536 -- splits long 1-D
+# traces into time chunks so a windowed read (scope_io's ``samples=`` /
+# ``t_window=``) decompresses only the chunks overlapping the window.
+DEFAULT_TRACE_CHUNK_SAMPLES = 8 * 1024 * 1024
+
+
+def _trace_chunks(shape, chunk_samples=None):
+    """Chunk shape for a trace dataset: one segment per sequence row, and at
+    most ``chunk_samples`` (default :data:`DEFAULT_TRACE_CHUNK_SAMPLES`) along
+    time."""
+    limit = chunk_samples or DEFAULT_TRACE_CHUNK_SAMPLES
+    if len(shape) > 1:
+        return (1, max(1, min(shape[1], limit)))
+    return (max(1, min(shape[0], limit)),)
+
 
 # Files captured into the `source_code` HDF5 attribute for reproducibility.
 # Paths are resolved relative to the repository root at write time.
@@ -236,7 +260,8 @@ def scope_channel_descriptions(descriptions, scope_name, traces):
 
 
 def write_shot_data(save_path, all_data, shot_num, overwrite=False,
-                    acquisition_time=None):
+                    acquisition_time=None, chunk_samples=None, preview_levels=None,
+                    trigger=None):
     """Write shot_N for every scope (raw int16, blosc2/lzf-compressed, fletcher32 on).
 
     Args:
@@ -250,6 +275,14 @@ def write_shot_data(save_path, all_data, shot_num, overwrite=False,
             When None, falls back to "now" -- correct for the in-process writer,
             but a spooled offload writes minutes later, so it must pass the
             acquire-side stamp through.
+        chunk_samples: time-axis chunk length for the trace datasets (see
+            :data:`DEFAULT_TRACE_CHUNK_SAMPLES`); None keeps the default.
+        preview_levels: decimation factors of the min/max preview pyramid
+            written next to each 1-D trace (e.g. ``(16, 256)``); None or empty
+            writes none.
+        trigger: the shot's Pi trigger edge (see
+            :mod:`acquisition.trigger_timestamps`); each key is written as a
+            ``trigger_<key>`` attribute of the shot group. None writes none.
 
     Channel descriptions are NOT written here: they live once per scope as
     ``<trace>_description`` attributes on the scope group (see
@@ -257,11 +290,15 @@ def write_shot_data(save_path, all_data, shot_num, overwrite=False,
     """
     with h5py.File(save_path, 'a', **SHOT_WRITE_OPEN_KWARGS) as f:
         _write_shot_data_into(f, all_data, shot_num, overwrite=overwrite,
-                              acquisition_time=acquisition_time)
+                              acquisition_time=acquisition_time,
+                              chunk_samples=chunk_samples,
+                              preview_levels=preview_levels,
+                              trigger=trigger)
 
 
 def _write_shot_data_into(f, all_data, shot_num, overwrite=False,
-                          acquisition_time=None):
+                          acquisition_time=None, chunk_samples=None,
+                          preview_levels=None, trigger=None):
     """Write shot_N groups into an already-open HDF5 file handle.
 
     Split out of :func:`write_shot_data` so a caller that must also write other
@@ -278,27 +315,37 @@ def _write_shot_data_into(f, all_data, shot_num, overwrite=False,
             del scope_group[shot_name]
         shot_group = scope_group.create_group(shot_name)
         shot_group.attrs['acquisition_time'] = acquisition_time or time.ctime()
+        for key, value in (trigger or {}).items():
+            shot_group.attrs[f'trigger_{key}'] = value
 
         for tr in traces:
             if tr not in data:
                 continue
             trace_data = np.asarray(data[tr], dtype=np.int16)
-            is_sequence = len(trace_data.shape) > 1
-            if is_sequence:
-                chunk_size = (1, min(trace_data.shape[1], 8 * 1024 * 1024))
-            else:
-                chunk_size = (min(len(trace_data), 8 * 1024 * 1024),)
-
             data_ds = shot_group.create_dataset(
                 f'{tr}_data',
                 data=trace_data,
                 dtype='int16',
-                chunks=chunk_size,
+                chunks=_trace_chunks(trace_data.shape, chunk_samples),
                 **_COMPRESSION_KWARGS,
             )
             header_ds = shot_group.create_dataset(f'{tr}_header', data=np.void(headers[tr]))
             data_ds.attrs['dtype'] = 'int16'
             header_ds.attrs['description'] = f'Binary header data for {tr}'
+            if preview_levels and trace_data.ndim == 1:
+                _write_trace_preview(shot_group, tr, trace_data, preview_levels)
+
+
+def _write_trace_preview(shot_group, tr, trace_data, preview_levels):
+    """Write ``<tr>_preview_<k>`` min/max levels for one 1-D trace.
+
+    Levels that would not shrink the trace (``k >= len``) are skipped.
+    """
+    levels = [k for k in preview_levels if k < len(trace_data)]
+    for factor, minmax in minmax_pyramid(trace_data, levels).items():
+        ds = shot_group.create_dataset(preview_key(tr, factor), data=minmax,
+                                       **_COMPRESSION_KWARGS)
+        ds.attrs['decimation'] = factor
 
 
 def mark_shot_skipped_for_scopes(save_path, scope_names, shot_num, reason,
@@ -222,6 +222,18 @@ class MultiScopeAcquisition:
         # loudly here (ValueError) rather than mis-acquiring.
         self._scope_modes = config_module.get_scope_modes(config, self.scope_ips)
 
+        # Time-axis chunk length for trace datasets ([storage]
+        # trace_chunk_samples; None = one chunk per record). Passed to the
+        # in-process writer and, via the spool run metadata, to the offload.
+        self.trace_chunk_samples = config_module.get_trace_chunk_samples(config)
+        # Min/max preview levels ([storage] preview_levels; None = no previews),
+        # threaded the same way.
+        self.preview_levels = config_module.get_preview_levels(config)
+        # Offload-side per-position mean/std ([storage] position_stats; default on).
+        self.position_stats = config_module.get_position_stats_enabled(config)
+        # Live analysis tap the offload announces shots on ([live_tap]; None = off).
+        self.live_tap = config_module.get_live_tap_opts(config)
+
     def cleanup(self):
         """Close every open scope handle."""
         print("Cleaning up scope resources...")
@@ -320,7 +332,9 @@ class MultiScopeAcquisition:
         in as a general capability (no caller sets it on this branch).
         """
         hdf5_writer.write_shot_data(self.save_path, all_data, shot_num,
-                                    overwrite=overwrite)
+                                    overwrite=overwrite,
+                                    chunk_samples=self.trace_chunk_samples,
+                                    preview_levels=self.preview_levels)
 
     # -- scope lifecycle -----------------------------------------------------
     def initialize_scopes(self):
@@ -334,7 +348,7 @@ class MultiScopeAcquisition:
             print(f"\nInitializing {name}...", end='')
 
             try:
-                LeCroy_Scope = _lecroy_scope_class()
+                LeCroy_Scope = _lecroy_scope_class(ip)
                 # 30 s timeout. Set via the constructor (which normalizes units),
                 # never via scope.scope.timeout -- the VICP transport takes seconds.
                 self.scopes[name] = LeCroy_Scope(ip, verbose=False, timeout=30.0)
@@ -734,7 +748,13 @@ class _MasterArmError(RuntimeError):
     """
 
 
-def _lecroy_scope_class():
+def _lecroy_scope_class(address=None):
+    """Scope class for ``address``: the simulator for ``sim:`` addresses (see
+    :mod:`lapd_daq.devices.lecroy_sim`), otherwise lab_scopes' LeCroy_Scope."""
+    from lapd_daq.devices.lecroy_sim import SimulatedLeCroyScope, is_sim_address
+
+    if address is not None and is_sim_address(address):
+        return SimulatedLeCroyScope
     from lab_scopes.lecroy import LeCroy_Scope
 
     return LeCroy_Scope
@@ -818,9 +838,20 @@ def run_acquisition_spooled(spool_dir, hdf5_path, config_path):
     (experiment/scope metadata, time arrays, and the ``/Control/Positions``
     group) up front, then spools each shot's raw traces to the fast-disk
     ``spool_dir`` for a separate offload process to fill in.
+
+    With motors, the move to the next shot's position starts as soon as a
+    shot's traces and achieved position have been read, and runs while the
+    shot is spooled, so each position costs max(move, write) rather than
+    their sum. ``[acquisition] overlap_motion = False`` moves only between
+    spool writes.
+
+    With ``[raspberry_pi] timestamp_shots = true`` each shot also carries the
+    Pi trigger server's timestamp of the edge it was taken on (see
+    :mod:`acquisition.trigger_timestamps`).
     """
     from spooling import spool_format
     from . import grid_spool_adapter
+    from .trigger_timestamps import matcher_from_config
 
     print('Starting spooled grid acquisition loop at', time.ctime())
     config, raw_config_text = load_experiment_config(config_path)
@@ -847,6 +878,12 @@ def run_acquisition_spooled(spool_dir, hdf5_path, config_path):
     # Defined before the try so the finally can always report a correct count,
     # even if setup fails before the shot loop (0 shots emitted).
     shot_num = 0
+    mc = None
+    # Motion overlap: once a shot's traces are in memory, the move to the next
+    # shot's position runs on motion_pool while the shot is spooled.
+    motion_pool = None
+    pending_move = None
+    trigger_matcher = None
     with MultiScopeAcquisition(hdf5_path, config, raw_config_text,
                                description_path=description_path) as msa:
         try:
@@ -855,13 +892,23 @@ def run_acquisition_spooled(spool_dir, hdf5_path, config_path):
             print("done")
 
             if pos_manager is not None:
+                mc = pos_manager.initialize_motor()
+                if mc is not None:
+                    # Before the position group is written, so the setup array
+                    # records the order the shots are actually taken in.
+                    pos_manager.apply_scan_order(mc)
                 # append_mode: the offload owns the per-shot positions_array
                 # write (append per recorded shot) and pads to total at finalize.
                 pos_manager.initialize_position_hdf5(append_mode=True)
-                mc = pos_manager.initialize_motor()
                 if mc is None:
                     print("\n[!] Warning: Failed to initialize motor controller; "
                           "continuing stationary (motors disabled)")
+                else:
+                    # Whole plan to motor space + validated up front: an
+                    # unreachable point aborts here, before any shot is taken.
+                    pos_manager.plan_motor_targets(mc)
+                    print(f"Motion plan validated: {len(pos_manager.motor_targets)} "
+                          f"motor targets cached")
                 total_shots = len(pos_manager.positions)
             else:
                 mc = None
@@ -880,6 +927,10 @@ def run_acquisition_spooled(spool_dir, hdf5_path, config_path):
                 "config_scope_names": list(active_scopes.keys()),
                 "description_path": description_path,
                 "nz": pos_manager.nz if pos_manager is not None else None,
+                "trace_chunk_samples": msa.trace_chunk_samples,
+                "preview_levels": msa.preview_levels,
+                "position_stats": msa.position_stats,
+                "live_tap": msa.live_tap,
                 # Planned shot count: finalize pads the appended positions_array
                 # back to this length with zero-fill for shots that never recorded.
                 "total_shots": total_shots,
@@ -892,6 +943,10 @@ def run_acquisition_spooled(spool_dir, hdf5_path, config_path):
             pause_seconds, max_retries = get_disk_full_pause_opts(config)
             max_consecutive_skips = get_max_consecutive_skips(config)
             consecutive_skips = 0
+            if mc is not None and config.getboolean('acquisition', 'overlap_motion',
+                                                    fallback=True):
+                motion_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="grid-move")
+            trigger_matcher = matcher_from_config(config)
 
             with tqdm(total=total_shots, desc="Shots", unit="shot") as pbar:
                 for n in range(total_shots):
@@ -899,12 +954,12 @@ def run_acquisition_spooled(spool_dir, hdf5_path, config_path):
                     coords = None
 
                     if pos_manager is not None and mc is not None:
-                        positions = pos_manager.positions[n]
-                        # positions is a structured record (shot_num, x, y[, z]).
-                        target = {'x': float(positions['x']), 'y': float(positions['y'])}
-                        if pos_manager.nz is not None:
-                            target['z'] = float(positions['z'])
-                        if not _spooled_grid_move(mc, pos_manager, target):
+                        target = _grid_target(pos_manager, n)
+                        if pending_move is not None:
+                            moved, pending_move = pending_move.result(), None
+                        else:
+                            moved = _spooled_grid_move(mc, pos_manager, target, index=n)
+                        if not moved:
                             tqdm.write(f"Skipping shot {shot_num} due to movement failure.")
                             spool_format.write_shot(
                                 spool_dir,
@@ -917,7 +972,9 @@ def run_acquisition_spooled(spool_dir, hdf5_path, config_path):
                     full_skip_reason = None
                     try:
                         msa.arm_scopes_for_trigger(active_scopes, verbose=False)
+                        armed = time.perf_counter()
                         all_data = msa.acquire_shot_dispatch(active_scopes, shot_num, verbose=False)
+                        acquired = time.perf_counter()
                     except _MasterArmError as e:
                         all_data = {}
                         full_skip_reason = str(e)
@@ -949,8 +1006,18 @@ def run_acquisition_spooled(spool_dir, hdf5_path, config_path):
                             xpos, ypos, zpos = mc.probe_positions
                             coords = {'x': xpos, 'y': ypos, 'z': zpos}
 
+                    if motion_pool is not None and n + 1 < total_shots:
+                        # Traces and achieved position are in hand: start the
+                        # next move now, so it runs while this shot is spooled.
+                        pending_move = motion_pool.submit(
+                            _spooled_grid_move, mc, pos_manager,
+                            _grid_target(pos_manager, n + 1), n + 1)
+
+                    trigger = None
+                    if trigger_matcher is not None:
+                        trigger = trigger_matcher.match(armed, acquired, warn=tqdm.write)
                     payload = grid_spool_adapter.all_data_to_payload(
-                        all_data, shot_num, coords, missing_scopes=missing)
+                        all_data, shot_num, coords, missing_scopes=missing, trigger=trigger)
                     spool_format.write_shot_with_disk_full_retry(
                         spool_dir, payload, parallel=msa.parallel_spool_write,
                         pause_seconds=pause_seconds, max_retries=max_retries,
@@ -958,9 +1025,17 @@ def run_acquisition_spooled(spool_dir, hdf5_path, config_path):
                     pbar.update(1)
 
         except KeyboardInterrupt as err:
+            if pending_move is not None and not pending_move.done():
+                mc.stop_now
             print('\n______Halted due to Ctrl-C______', '  at', time.ctime())
             raise RuntimeError() from err
         finally:
+            if motion_pool is not None:
+                motion_pool.shutdown(wait=True)
+            if mc is not None:
+                mc.close()
+            if trigger_matcher is not None:
+                trigger_matcher.close()
             # Only signal completion if the run actually started (metadata
             # written). If setup failed before that, there is nothing for the
             # offload to finalize. shot_num is 0 here when no shot was emitted.
@@ -972,20 +1047,38 @@ def run_acquisition_spooled(spool_dir, hdf5_path, config_path):
                       "no RUN_COMPLETE emitted.")
 
 
-def _spooled_grid_move(mc, pos_manager, target):
+def _grid_target(pos_manager, index):
+    """Planned probe position of plan row ``index`` as a move target dict."""
+    # positions is a structured record (shot_num, x, y[, z]).
+    positions = pos_manager.positions[index]
+    target = {'x': float(positions['x']), 'y': float(positions['y'])}
+    if pos_manager.nz is not None:
+        target['z'] = float(positions['z'])
+    return target
+
+
+def _spooled_grid_move(mc, pos_manager, target, index=None):
     """Move the probe to ``target`` (a dict), returning True on success.
 
     Mirrors the motion part of :func:`handle_movement` but, since the offload
     owns the HDF5, it does NOT write skip metadata here — the caller spools a
-    skipped shot instead.
+    skipped shot instead. With ``index`` (the plan row of ``target``) and a
+    cached motion plan (:meth:`PositionManager.plan_motor_targets`), the move
+    uses the precomputed motor target and velocity.
+
+    Safe to run on a worker thread (the grid loop overlaps it with the spool
+    write) as long as nothing else drives ``mc`` meanwhile.
     """
     try:
         mc.enable
-        if pos_manager.nz is None:
+        if index is not None and pos_manager.motor_targets is not None:
+            pos_manager.move_to_planned(mc, index)
+        elif pos_manager.nz is None:
             mc.probe_positions = (target['x'], target['y'])
         else:
             mc.probe_positions = (target['x'], target['y'], target['z'])
-        mc.wait_for_motion_complete()
+        # No extra wait_for_motion_complete: the drive's position setters
+        # already block until the move is done and the probe has settled.
         mc.disable
         return True
     except KeyboardInterrupt:
@@ -20,6 +20,8 @@ import time
 import h5py
 import numpy as np
 
+from scope_io import PositionStatsAccumulator
+
 from . import config as config_module
 from . import hdf5_writer
 
@@ -29,7 +31,7 @@ WRITER_TAG = "acquisition"
 # --------------------------------------------------------------------------- #
 # Acquire side
 # --------------------------------------------------------------------------- #
-def all_data_to_payload(all_data, shot_num, coordinates, missing_scopes=None):
+def all_data_to_payload(all_data, shot_num, coordinates, missing_scopes=None, trigger=None):
     """Build a ShotPayload from ``all_data`` and a positions mapping.
 
     ``all_data`` is ``{scope_name: (traces, data, headers)}`` as produced by
@@ -38,6 +40,8 @@ def all_data_to_payload(all_data, shot_num, coordinates, missing_scopes=None):
     maps a scope name to the reason its data is absent for this shot (an
     arm/read failure); those scopes are recorded as skipped per-scope shot
     groups by the offload so a partial shot is preserved rather than aborted.
+    ``trigger`` is the shot's matched Pi trigger edge (a dict, see
+    :mod:`acquisition.trigger_timestamps`), or ``None``.
     """
     from spooling import ShotPayload, TracePayload
 
@@ -46,6 +50,7 @@ def all_data_to_payload(all_data, shot_num, coordinates, missing_scopes=None):
         coordinates=coordinates,
         acquisition_time=time.ctime(),
         missing=dict(missing_scopes or {}),
+        trigger=trigger,
     )
     for scope_name, (traces, data, headers) in all_data.items():
         scope_traces = []
@@ -100,8 +105,12 @@ def write_shot(hdf5_path, payload, meta):
     all_data = _payload_to_all_data(payload)
     with h5py.File(hdf5_path, "a", **hdf5_writer.SHOT_WRITE_OPEN_KWARGS) as f:
         hdf5_writer._write_shot_data_into(f, all_data, payload.shot_num,
-                                          acquisition_time=payload.acquisition_time)
+                                          acquisition_time=payload.acquisition_time,
+                                          trigger=payload.trigger,
+                                          chunk_samples=meta.get("trace_chunk_samples"),
+                                          preview_levels=meta.get("preview_levels"))
         _write_positions(f, payload, meta)
+        accumulate_position_stats(f, hdf5_path, payload, meta, _bmotion_plan)
 
     # Per-scope partial: scopes that failed to arm/read/spool for this shot get
     # their own skipped shot group, so every config scope always has a shot_N
@@ -119,11 +128,16 @@ def finalize(hdf5_path, meta, final_shot_num):
 
     Finally, pad each ``positions_array`` (grown append-only during offload) back
     to the planned ``total_shots`` with zero-fill, so the finished file matches
-    the historical pre-sized layout that the readers expect.
+    the historical pre-sized layout that the readers expect, and store the
+    per-position statistics accumulated while the shots were written.
     """
     hdf5_writer.record_shot_count(
         hdf5_path, meta["config_scope_names"], final_shot_num
     )
+    entry = _position_stats.pop(hdf5_path, None)
+    if entry is not None:
+        with h5py.File(hdf5_path, "a") as f:
+            entry[0].finish(f)
     total_shots = meta.get("total_shots")
     if total_shots:
         _pad_positions_to_total(hdf5_path, total_shots)
@@ -186,6 +200,64 @@ def _iter_positions_groups(pos_grp):
             yield child
 
 
+# hdf5_path -> (PositionStatsAccumulator, point_of), or None (disabled, or no
+# planned positions), for each run this offload process is writing; finalize
+# stores and drops it.
+_position_stats = {}
+
+
+def accumulate_position_stats(f, hdf5_path, payload, meta, read_plan):
+    """Fold a written shot into the run's per-position mean/std.
+
+    Shared by both offload adapters; ``read_plan(f)`` returns the run's
+    ``(planned, point_of)`` -- the ``(npos, ndim)`` planned positions and a
+    function mapping ``payload.coordinates`` to a recorded point (or None) -- or
+    None for a run without a plan. The accumulator is created on the first shot
+    this process writes; if the file already holds earlier shots (an offload
+    resumed mid-run) its statistics are marked incomplete and readers ignore
+    them. Disabled by ``meta["position_stats"] = False``.
+    """
+    if hdf5_path not in _position_stats:
+        entry = None
+        plan = read_plan(f) if meta.get("position_stats", True) else None
+        if plan is not None:
+            complete = not _has_earlier_shots(f, meta, payload.shot_num)
+            entry = (PositionStatsAccumulator(plan[0], complete=complete), plan[1])
+        _position_stats[hdf5_path] = entry
+    entry = _position_stats[hdf5_path]
+    if entry is None or not payload.coordinates:
+        return
+    stats, point_of = entry
+    point = point_of(payload.coordinates)
+    if point is None:
+        return
+    stats.add_shot(f, stats.position_index(point),
+                   ((scope, t.channel, t.data, t.header)
+                    for scope, traces in payload.traces.items() for t in traces))
+
+
+def _has_earlier_shots(f, meta, shot_num):
+    """True if any config scope already has a shot group other than ``shot_num``."""
+    current = f"shot_{shot_num}"
+    for scope in meta["config_scope_names"]:
+        if scope in f and any(k.startswith("shot_") and k != current for k in f[scope]):
+            return True
+    return False
+
+
+def _bmotion_plan(f):
+    """Planned ``(x, y)`` of the first motion group, keyed by its coordinates."""
+    pos_grp = f.get("Control/Positions")
+    if pos_grp is None:
+        return None
+    for mg_name, grp in pos_grp.items():
+        if isinstance(grp, h5py.Group) and "positions_setup_array" in grp:
+            setup = grp["positions_setup_array"][()]
+            planned = np.column_stack((setup["x"], setup["y"])).astype(float)
+            return planned, lambda coords, mg=mg_name: coords.get(mg)
+    return None
+
+
 def mark_shot_failed(hdf5_path, meta, shot_num, reason):
     """Replace a poison shot's HDF5 group with a failed marker (quarantine)."""
     hdf5_writer.mark_shot_failed_for_scopes(
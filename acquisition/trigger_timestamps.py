@@ -0,0 +1,138 @@
+"""Per-shot trigger timestamps from the Raspberry Pi trigger server.
+
+The Pi server (:mod:`pi_gpio.pi_server`) stamps every edge on its trigger pins
+with pigpio's microsecond tick and keeps the recent ones in a ring buffer. The
+grid loop brackets each shot on this PC's ``time.perf_counter()`` clock (scopes
+armed -> traces read) and :class:`ShotTriggerMatcher` picks the first rising
+edge on the trigger input inside that window, mapped onto the local clock via
+the server's ``CLOCK`` reply. The matched edge rides on the shot's
+:class:`spooling.ShotPayload` as ``trigger`` and lands as ``trigger_*``
+attributes on every scope's ``shot_N`` group:
+
+* ``trigger_seq`` -- the server's edge sequence number (gaps = edges not matched)
+* ``trigger_t_us`` -- pigpio tick of the edge (us; the sub-ms shot timing)
+* ``trigger_time`` -- the edge on this PC's wall clock (s since epoch)
+* ``trigger_pi_time`` -- the Pi's wall clock when its edge callback ran
+* ``trigger_interval_us`` -- tick since the previous rising input edge (rep rate)
+
+Enabled by ``[raspberry_pi] timestamp_shots = true`` (needs ``pi_host``). Any
+failure to reach the server is reported and the shot simply carries no trigger;
+the server is not asked again for RESYNC_S, so a dead Pi does not stall shots.
+"""
+
+import time
+
+TRIGGER_GPIO = 25       # pi_server.TRIG_IN_GPIO_NUM: the LAPD trigger input
+SLACK_S = 0.002         # window padding for the clock-offset error
+RESYNC_S = 60.0         # re-measure the clock offset this often (crystal drift),
+                        # and wait this long before retrying an unreachable server
+
+
+class ShotTriggerMatcher:
+    """
+    Match each shot to the Pi's timestamp of the trigger edge it was taken on.
+
+    Args:
+        client: pi_gpio.pi_client.TriggerClient (persistent mode recommended)
+        gpio (int): Trigger input GPIO on the Pi
+        slack_s (float): Extra margin on both ends of each shot's window
+    """
+
+    def __init__(self, client, gpio=TRIGGER_GPIO, slack_s=SLACK_S):
+        self.client = client
+        self.gpio = gpio
+        self.slack_s = slack_s
+        self.offset = None          # edge t_us * 1e-6 + offset = local perf_counter()
+        self.rtt = None
+        self.dropped = 0
+        self._epoch = None          # time.time() - time.perf_counter()
+        self._synced_at = None
+        self._retry_at = None
+        self._since = None
+        self._pending = []          # rising input edges not yet matched or passed
+        self._last_t_us = None      # previous rising input edge, for interval_us
+
+    def sync(self):
+        """Measure the clock offset; on the first call also skip past every
+        edge recorded before this run."""
+        self.offset, self.rtt = self.client.clock_offset()
+        self._epoch = time.time() - time.perf_counter()
+        self._synced_at = time.perf_counter()
+        if self._since is None:
+            _, self._since, _ = self.client.get_edges(since=1 << 62)
+
+    def match(self, start, end, warn=print):
+        """
+        Trigger for a shot whose scopes were armed at ``start`` and read by
+        ``end`` (both time.perf_counter()).
+
+        Returns:
+            dict of the matched edge (seq, gpio, t_us, time, pi_time and, when
+            known, interval_us), or None if no edge fell in the window or the
+            server could not be reached (reported through ``warn``)
+        """
+        now = time.perf_counter()
+        if self._retry_at is not None and now < self._retry_at:
+            return None
+        try:
+            if self._synced_at is None or now - self._synced_at > RESYNC_S:
+                self.sync()
+            edges, self._since, dropped = self.client.get_edges(since=self._since)
+        except Exception as e:
+            warn(f"[!] Trigger timestamp unavailable (retrying in {RESYNC_S:.0f} s): {e}")
+            self._synced_at = None
+            self._retry_at = time.perf_counter() + RESYNC_S
+            return None
+        self._retry_at = None
+        if dropped:
+            self.dropped += dropped
+            warn(f"[!] {dropped} trigger edge(s) overwritten on the Pi before they were read")
+        self._pending.extend(e for e in edges if e.gpio == self.gpio and e.level == 1)
+
+        found = None
+        while self._pending:
+            edge = self._pending[0]
+            local = edge.t_us * 1e-6 + self.offset
+            if local > end + self.slack_s:
+                break                   # a later shot's edge
+            self._pending.pop(0)
+            interval = None if self._last_t_us is None else edge.t_us - self._last_t_us
+            self._last_t_us = edge.t_us
+            if local >= start - self.slack_s:
+                found = {'seq': edge.seq, 'gpio': edge.gpio, 't_us': edge.t_us,
+                         'time': local + self._epoch, 'pi_time': edge.wall}
+                if interval is not None:
+                    found['interval_us'] = interval
+                break
+        return found
+
+    def close(self):
+        self.client.close()
+
+
+def matcher_from_config(config):
+    """A ShotTriggerMatcher for ``[raspberry_pi]``, or None when shot
+    timestamps are off (``timestamp_shots``, default false) or no ``pi_host``
+    is set. The server is asked for its clock here; if that fails the run goes
+    on without trigger timestamps."""
+    if not config.has_section('raspberry_pi') or \
+            not config.getboolean('raspberry_pi', 'timestamp_shots', fallback=False):
+        return None
+    host = config.get('raspberry_pi', 'pi_host', fallback=None)
+    if not host:
+        print("[!] timestamp_shots needs [raspberry_pi] pi_host; shots will carry no trigger time")
+        return None
+    from pi_gpio.pi_client import TriggerClient
+
+    client = TriggerClient(host, config.getint('raspberry_pi', 'pi_port', fallback=54321),
+                           persistent=True)
+    matcher = ShotTriggerMatcher(
+        client, gpio=config.getint('raspberry_pi', 'trigger_gpio', fallback=TRIGGER_GPIO))
+    try:
+        matcher.sync()
+    except Exception as e:
+        print(f"[!] No trigger timestamps from {host}: {e}")
+        matcher.close()
+        return None
+    print(f"Trigger timestamps from {host}: clock offset measured to {1e3 * matcher.rtt:.2f} ms")
+    return matcher
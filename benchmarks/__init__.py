@@ -0,0 +1,12 @@
+"""Performance benchmarks for LAPD_DAQ (not collected by the unit-test runner).
+
+Each ``bench_<subject>.py`` module is a standalone script with a ``main()``:
+
+    python -m benchmarks.bench_<subject>
+
+Benchmarks time a vectorized/optimized path against the reference it replaced
+(or measure a pipeline stage's throughput) and assert the outputs agree, so a
+speed-up can never silently change results. Pipeline benchmarks also write a
+JSON record (git commit, library versions, parameters, metrics) under
+``benchmarks/results/`` so runs can be compared across commits.
+"""
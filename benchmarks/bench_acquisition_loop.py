@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+Load-test the acquisition loop end to end against simulated LeCroy scopes.
+
+Builds a :class:`MultiScopeAcquisition` whose ``[scope_ips]`` are ``sim:``
+addresses (see :mod:`lapd_daq.devices.lecroy_sim`): ``--scopes`` scopes on one
+trigger bus at ``--rate`` Hz, each with ``--channels`` x ``--samples`` int16
+traces read at ``--bandwidth`` MB/s. Every shot runs the production sequence
+-- ``arm_scopes_for_trigger`` (slaves, then master), ``acquire_shot_dispatch``
+(wait for the fresh edge, read every trace), ``all_data_to_payload`` and
+``spool_format.write_shot`` -- and the benchmark reports the achieved shot rate
+against the trigger rate, the time per stage, and how many shots lost a scope.
+
+Each shot is also checked for sync: every scope must have captured the
+master's edge, so a faster loop can never silently desync the scopes.
+
+Results go to ``benchmarks/results/acquisition_loop_<commit>_<time>.json``
+(``--out`` to override); ``--compare OLD.json`` prints every metric against an
+earlier run.
+
+Run with:
+    python -m benchmarks.bench_acquisition_loop
+    python -m benchmarks.bench_acquisition_loop --rate 30 --samples 1000000 --miss-prob 0.01
+"""
+
+import argparse
+import configparser
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+from acquisition import scope_runner, spool_adapter
+from benchmarks.bench_spool_pipeline import RESULTS_DIR, _environment, _git_state, compare
+from spooling import spool_format
+
+SCHEMA_VERSION = 1
+_MB = 1e6
+
+
+def _sim_address(args, index):
+    return (f"sim:rate_hz={args.rate},samples={args.samples},segments={args.segments},"
+            f"channels={args.channels},bandwidth_mbps={args.bandwidth},"
+            f"latency_ms={args.latency},jitter_us={args.jitter},"
+            f"miss_prob={args.miss_prob},read_timeout_prob={args.read_timeout_prob},"
+            f"timeout_s={args.timeout},seed={args.seed + index},bus=bench")
+
+
+def _config(args):
+    config = configparser.ConfigParser()
+    config.read_dict({
+        "scope_ips": {f"scope{i + 1}": _sim_address(args, i) for i in range(args.scopes)},
+        "scope_modes": ({f"scope{i + 1}": "sequence" for i in range(args.scopes)}
+                        if args.segments > 1 else {}),
+        "acquisition": {"parallel_scope_read": str(not args.serial_read)},
+    })
+    return config
+
+
+def _stage(stats, name, seconds):
+    stats.setdefault(name, []).append(seconds)
+
+
+def _summary(samples):
+    samples = sorted(samples)
+    return {"mean_ms": 1e3 * sum(samples) / len(samples),
+            "p50_ms": 1e3 * samples[len(samples) // 2],
+            "max_ms": 1e3 * samples[-1]}
+
+
+def run_benchmark(args):
+    work = tempfile.mkdtemp(prefix="bench_acq_", dir=args.spool_dir)
+    hdf5_path = os.path.join(work, "sim.hdf5")
+    spool_dir = os.path.join(work, "spool")
+    stages, partial, skipped, desynced, nbytes = {}, 0, 0, 0, 0
+    try:
+        with contextlib.redirect_stdout(io.StringIO()), \
+                scope_runner.MultiScopeAcquisition(hdf5_path, _config(args), "") as msa:
+            msa.initialize_hdf5_base()
+            active = msa.initialize_scopes()
+            if len(active) != args.scopes:
+                raise RuntimeError(f"only {len(active)}/{args.scopes} simulated scopes "
+                                   f"initialized")
+            master = msa._master_scope(active)
+            start = time.perf_counter()
+            for shot in range(1, args.shots + 1):
+                t0 = time.perf_counter()
+                try:
+                    msa.arm_scopes_for_trigger(active, verbose=False)
+                except scope_runner._MasterArmError as e:
+                    skipped += 1
+                    payload = spool_adapter.skipped_payload(shot, str(e))
+                else:
+                    t1 = time.perf_counter()
+                    all_data = msa.acquire_shot_dispatch(active, shot, verbose=False)
+                    t2 = time.perf_counter()
+                    _stage(stages, "arm", t1 - t0)
+                    _stage(stages, "wait_and_read", t2 - t1)
+                    missing = msa.last_missing_scopes
+                    partial += bool(missing) and bool(all_data)
+                    skipped += not all_data
+                    edges = {msa.scopes[name]._edge for name in all_data}
+                    if master in all_data and len(edges) > 1:
+                        desynced += 1
+                    payload = spool_adapter.all_data_to_payload(
+                        all_data, shot, None, missing_scopes=missing)
+                    nbytes += sum(tr.data.nbytes for traces in payload.traces.values()
+                                  for tr in traces)
+                t3 = time.perf_counter()
+                if not args.no_spool:
+                    spool_format.write_shot(spool_dir, payload, parallel=True)
+                    _stage(stages, "spool_write", time.perf_counter() - t3)
+                    shutil.rmtree(spool_dir, ignore_errors=True)
+                if shot == 1:
+                    first_done = time.perf_counter()
+            end = time.perf_counter()
+            seconds = end - start
+            # Shots 2..N each take one trigger period once the loop is running;
+            # shot 1 also waits for the first edge after start, so it is left out.
+            rate = (args.shots - 1) / (end - first_done)
+            scope_stats = {name: scope.stats for name, scope in msa.scopes.items()}
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return {
+        "loop": {"seconds": seconds, "shots_per_s": rate,
+                 "target_shots_per_s": args.rate,
+                 "fraction_of_target": rate / args.rate,
+                 "mb_per_s": nbytes / _MB / seconds},
+        "stages": {name: _summary(samples) for name, samples in stages.items()},
+        "shots": {"partial": partial, "skipped": skipped, "desynced": desynced},
+        "scopes": scope_stats,
+    }
+
+
+def _print_results(results):
+    loop = results["loop"]
+    print(f"\nachieved {loop['shots_per_s']:.2f} shots/s of {loop['target_shots_per_s']:g} Hz "
+          f"target ({100 * loop['fraction_of_target']:.0f}%), "
+          f"{loop['mb_per_s']:.1f} MB/s of trace data")
+    print(f"\n{'stage':<16} {'mean ms':>9} {'p50 ms':>9} {'max ms':>9}")
+    for name, s in results["stages"].items():
+        print(f"{name:<16} {s['mean_ms']:>9.2f} {s['p50_ms']:>9.2f} {s['max_ms']:>9.2f}")
+    shots = results["shots"]
+    print(f"\npartial shots {shots['partial']}, skipped {shots['skipped']}, "
+          f"desynced {shots['desynced']}")
+
+
+def _parse_args(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip(),
+                                formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--scopes", type=int, default=2)
+    p.add_argument("--channels", type=int, default=4)
+    p.add_argument("--samples", type=int, default=100_000)
+    p.add_argument("--segments", type=int, default=1,
+                   help="sequence-mode segments per record (1 = single mode)")
+    p.add_argument("--shots", type=int, default=50)
+    p.add_argument("--rate", type=float, default=10.0, help="trigger rate, Hz")
+    p.add_argument("--bandwidth", type=float, default=100.0, help="per-scope MB/s")
+    p.add_argument("--latency", type=float, default=1.0, help="per-command ms")
+    p.add_argument("--jitter", type=float, default=20.0, help="trigger jitter, us rms")
+    p.add_argument("--miss-prob", type=float, default=0.0)
+    p.add_argument("--read-timeout-prob", type=float, default=0.0)
+    p.add_argument("--timeout", type=float, default=1.0,
+                   help="length of a simulated timeout, s")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--serial-read", action="store_true",
+                   help="read scopes one after another (parallel_scope_read = False)")
+    p.add_argument("--no-spool", action="store_true", help="skip the spool write stage")
+    p.add_argument("--spool-dir", default=None, help="parent dir for the spool (fast disk)")
+    p.add_argument("--out", default=None, help="results JSON path")
+    p.add_argument("--compare", default=None, metavar="OLD.json",
+                   help="print each metric against an earlier results file")
+    args = p.parse_args(argv)
+    if args.shots < 2:
+        p.error("--shots must be at least 2 (the rate is timed from shot 1 to the last)")
+    return args
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    print(f"acquisition loop: {args.shots} shots x {args.scopes} simulated scope(s) x "
+          f"{args.channels} ch x {args.samples} samples at {args.rate:g} Hz")
+    results = run_benchmark(args)
+    _print_results(results)
+
+    git = _git_state()
+    record = {
+        "benchmark": "acquisition_loop",
+        "schema": SCHEMA_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git": git,
+        "environment": _environment(),
+        "params": {k: v for k, v in vars(args).items()
+                   if k not in ("out", "compare", "spool_dir")},
+        "results": results,
+    }
+    out = args.out
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out = os.path.join(RESULTS_DIR, f"acquisition_loop_{(git['commit'] or 'nogit')[:10]}_"
+                                        f"{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(out, "w") as fh:
+        json.dump(record, fh, indent=2)
+    print(f"\nresults -> {out}")
+
+    if args.compare:
+        with open(args.compare) as fh:
+            compare(json.load(fh), record)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the closed-form ``Motor_Control_2D/3D.motor_to_probe`` against the
+``scipy.optimize.minimize`` (BFGS) solve it replaced.
+
+``probe_positions`` calls ``motor_to_probe`` on every recorded shot of a grid
+run. For a grid of reachable probe positions this converts each to motor
+coordinates, inverts it with both implementations, checks the closed form
+returns every position exactly at the 3-decimal rounding of the recorded
+positions, and prints the per-call latency (and the per-point cost of one
+vectorized batch call). Points where BFGS is off are counted. Near the
+corners of the grid it can converge to the mirror solution beyond the pivot.
+
+Run with:
+    python -m benchmarks.bench_motor_to_probe
+"""
+
+import itertools
+import os
+import sys
+import time
+
+import numpy as np
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+from scipy.optimize import minimize
+
+from motion.Motor_Control import Motor_Control_2D, Motor_Control_3D
+
+GRID = np.linspace(-35, 35, 8)
+Z_GRID = np.linspace(-10, 10, 3)
+
+
+def _drive(cls, probe_in, poi, ph):
+    """A drive with the production geometry but no motor connections."""
+    drive = cls.__new__(cls)
+    drive.probe_in, drive.poi, drive.ph = probe_in, poi, ph
+    return drive
+
+
+def _motor_to_probe_bfgs(drive, *motor):
+    """The original numerical inverse, kept here as the reference."""
+    def fun(p):
+        return np.linalg.norm(np.subtract(drive.probe_to_motor_LAPD(*p), motor))
+
+    res = minimize(fun, list(motor), options={'maxiter': 15000}, method='BFGS')
+    return tuple(round(v, 3) for v in res.x)
+
+
+def _per_call(fn, points):
+    start = time.perf_counter()
+    out = [fn(*p) for p in points]
+    return (time.perf_counter() - start) / len(points), np.array(out, dtype=float)
+
+
+def _bench(label, drive, probe_points):
+    motors = [drive.probe_to_motor_LAPD(*p) for p in probe_points]
+    t_ref, ref = _per_call(lambda *m: _motor_to_probe_bfgs(drive, *m), motors)
+    t_new, new = _per_call(drive.motor_to_probe, motors)
+
+    batch = np.array(motors).T
+    start = time.perf_counter()
+    batched = np.column_stack(drive.motor_to_probe(*batch))
+    t_batch = (time.perf_counter() - start) / len(motors)
+
+    truth = np.round(np.array(probe_points, dtype=float), 3)
+    np.testing.assert_array_equal(new, truth)
+    np.testing.assert_array_equal(batched, truth)
+    ref_err = np.abs(ref - truth).max(axis=1)
+    print(f"{label:<4} {len(motors):>5} pts  BFGS {1e6 * t_ref:>10.1f} us/call  "
+          f"closed-form {1e6 * t_new:>7.1f} us/call ({t_ref / t_new:>6.0f}x)  "
+          f"batch {1e6 * t_batch:>6.2f} us/pt  "
+          f"BFGS off at {np.count_nonzero(ref_err > 1e-3)} pts (max {ref_err.max():.3g} cm)")
+
+
+def main():
+    _bench("2D", _drive(Motor_Control_2D, 58.771, 120.5, 20),
+           list(itertools.product(GRID, GRID)))
+    _bench("3D", _drive(Motor_Control_3D, 58, 118, 30),
+           list(itertools.product(GRID, GRID, Z_GRID)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark ``BoundaryChecker.is_path_valid`` / ``find_path`` against the
+point-sampling check and fixed three-waypoint detour they replaced.
+
+The LAPD demo workspace and box obstacle are set up twice: once as the
+plain-callable predicates existing configs use, and once as ``Box``
+primitives. Random segments across the workspace are then checked three ways:
+with the original per-point sampling (``max(5, int(distance))`` points,
+reimplemented here as the reference), with the callables (vectorized sampling
+every ``check_resolution`` cm), and with the primitives (exact
+segment/box intersection). For each way the per-segment latency is printed,
+along with the number of blocked segments the reference misses.
+Blocked moves are then planned with ``find_path``, and the route length and
+planning time are reported.
+
+Run with:
+    python -m benchmarks.bench_path_validation
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+from motion.obstacle_avoidance import BoundaryChecker, Box
+
+N_SEGMENTS = 2000
+N_PLANS = 20
+
+
+def _outer(x, y, z):
+    return -40 <= x <= 60 and -20 <= y <= 20 and -15 <= z <= 15
+
+
+def _obstacle(x, y, z):
+    return not (-60.2 <= x <= -0.3 and -3.2 <= y <= 3.2 and -5.7 <= z <= 5.7)
+
+
+def _checkers():
+    callables = BoundaryChecker()
+    callables.add_probe_boundary(_outer, is_outer_boundary=True)
+    callables.add_probe_boundary(_obstacle)
+    primitives = BoundaryChecker()
+    primitives.add_probe_boundary(Box((-40, -20, -15), (60, 20, 15)), is_outer_boundary=True)
+    primitives.add_probe_boundary(Box((-60.2, -3.2, -5.7), (-0.3, 3.2, 5.7)))
+    return callables, primitives
+
+
+def _is_path_valid_sampled(start, end):
+    """The original check: endpoints, then max(5, int(distance)) samples per obstacle."""
+    if not (_outer(*start) and _obstacle(*start) and _outer(*end) and _obstacle(*end)):
+        return False
+    d = np.subtract(end, start)
+    num_checks = max(5, int(np.linalg.norm(d)))
+    return all(_obstacle(*(np.asarray(start) + i / num_checks * d)) for i in range(num_checks + 1))
+
+
+def _valid_points(checker, n, rng):
+    pts = rng.uniform((-40, -20, -15), (60, 20, 15), (4 * n, 3))
+    return pts[checker.positions_valid(pts)][:n]
+
+
+def _time_checks(fn, segments):
+    start = time.perf_counter()
+    out = [fn(tuple(a), tuple(b)) for a, b in segments]
+    return (time.perf_counter() - start) / len(segments), np.array(out)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    callables, primitives = _checkers()
+    pts = _valid_points(primitives, 2 * N_SEGMENTS, rng)
+    segments = list(zip(pts[:N_SEGMENTS], pts[N_SEGMENTS:]))
+
+    t_ref, ref = _time_checks(_is_path_valid_sampled, segments)
+    t_call, by_call = _time_checks(callables.is_path_valid, segments)
+    t_prim, by_prim = _time_checks(primitives.is_path_valid, segments)
+    print(f"is_path_valid over {len(segments)} segments ({np.count_nonzero(~by_prim)} blocked)")
+    print(f"  sampled (reference)  {1e6 * t_ref:>8.1f} us/segment  "
+          f"misses {np.count_nonzero(ref & ~by_prim)} blocked")
+    print(f"  callables, vector    {1e6 * t_call:>8.1f} us/segment  "
+          f"misses {np.count_nonzero(by_call & ~by_prim)} blocked")
+    print(f"  primitives, exact    {1e6 * t_prim:>8.1f} us/segment")
+
+    blocked = [(a, b) for (a, b), ok in zip(segments, by_prim) if not ok][:N_PLANS]
+    for label, checker in (("callables", callables), ("primitives", primitives)):
+        lengths, failed = [], 0
+        start = time.perf_counter()
+        for a, b in blocked:
+            try:
+                route = np.array([a] + checker.find_path(tuple(a), tuple(b)))
+            except ValueError:
+                failed += 1
+                continue
+            lengths.append(np.linalg.norm(np.diff(route, axis=0), axis=1).sum()
+                           / np.linalg.norm(b - a))
+        seconds = (time.perf_counter() - start) / len(blocked)
+        print(f"find_path {label:<11} {1e3 * seconds:>7.1f} ms/plan  "
+              f"route/straight {np.mean(lengths):.3f} mean, {np.max(lengths):.3f} max  "
+              f"failed {failed}/{len(blocked)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the spool -> offload -> HDF5 pipeline, per compression codec.
+
+Synthesizes realistic shots (``--scopes`` x ``--channels`` x ``--samples``,
+``--segments`` > 1 for sequence mode) from a :class:`FakeScopeDevice` whose
+traces are a damped, noisy signal quantized like a real ADC (random-looking
+low bits, so compression ratios are not flattered), then measures:
+
+  * spool write      -- ``spool_format.write_shot``, serial and parallel
+  * offload drain    -- ``offload_engine.run_offload`` into a bmotion skeleton,
+                        once per codec (write + read-back verify + delete)
+  * file size        -- bytes on disk and raw/stored ratio of the trace data
+  * reader           -- ``read_hdf5_scope_channel_shots`` over every shot, and
+                        ``open_run(...).mean_std()`` streamed over the run
+
+The offloaded data are checked against the synthesized shots, so a faster
+pipeline can never silently change what lands in the file.
+
+Results go to ``benchmarks/results/spool_pipeline_<commit>_<time>.json``
+(``--out`` to override) with the git commit, library versions and parameters;
+``--compare OLD.json`` prints every metric against an earlier run. Point
+``--spool-dir`` / ``--hdf5-dir`` at the real fast / slow disks to benchmark a
+machine rather than its temp directory.
+
+Run with:
+    python -m benchmarks.bench_spool_pipeline
+    python -m benchmarks.bench_spool_pipeline --samples 1000000 --shots 20 --codecs default,lzf
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from unittest import mock
+
+import numpy as np
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+import h5py
+
+import offload_engine
+from acquisition import bmotion, hdf5_writer, spool_adapter
+from lapd_daq.devices.fakes import FakeScopeDevice
+from lapd_daq.models import ScopeShot, ScopeTrace
+from scope_io import open_run, read_hdf5_scope_channel_shots
+from scope_io.wavedesc import LeCroyWavedesc
+from spooling import spool_format
+
+RESULTS_DIR = os.path.join(_REPO_ROOT, "benchmarks", "results")
+SCHEMA_VERSION = 1
+MG_NAME = "MG_bench"
+_MB = 1e6
+
+
+def _codecs():
+    """Codec name -> ``create_dataset`` kwargs swapped into the writer."""
+    codecs = {
+        f"default ({hdf5_writer._COMPRESSION_LABEL})": hdf5_writer._COMPRESSION_KWARGS,
+        "none": {"fletcher32": True},
+        "lzf": {"compression": "lzf", "shuffle": True, "fletcher32": True},
+        "gzip1": {"compression": "gzip", "compression_opts": 1, "shuffle": True,
+                  "fletcher32": True},
+        "gzip4": {"compression": "gzip", "compression_opts": 4, "shuffle": True,
+                  "fletcher32": True},
+    }
+    if hdf5_writer._hdf5plugin is not None:
+        blosc2 = hdf5_writer._hdf5plugin.Blosc2
+        codecs["blosc2-zstd"] = {
+            "compression": blosc2(cname="zstd", clevel=5, filters=blosc2.BITSHUFFLE),
+            "shuffle": False, "fletcher32": True}
+    return codecs
+
+
+def _select_codecs(spec):
+    available = _codecs()
+    if spec == "all":
+        return available
+    chosen = {}
+    for name in (s.strip() for s in spec.split(",") if s.strip()):
+        match = [k for k in available if k == name or k.split(" ")[0] == name]
+        if not match:
+            raise SystemExit(f"unknown codec {name!r}; available: "
+                             f"{', '.join(k.split(' ')[0] for k in available)}")
+        chosen[match[0]] = available[match[0]]
+    return chosen
+
+
+class SyntheticScope(FakeScopeDevice):
+    """:class:`FakeScopeDevice` producing plasma-like int16 records.
+
+    Each channel is a damped oscillation plus Gaussian noise of a few ADC
+    counts, with a real WAVEDESC header, so the offload's read-back verify and
+    the readers' volt scaling see what a LeCroy scope would send.
+    """
+
+    def __init__(self, name, channels, points, segments=1, seed=0):
+        super().__init__(name=name, channels=channels, points=points)
+        self.segments = segments
+        self._rng = np.random.default_rng(seed)
+        self._header = LeCroyWavedesc().generate_test_data(NTimes=points)
+        t = np.linspace(0.0, 1.0, points, endpoint=False)
+        self._signal = 8000.0 * np.exp(-3.0 * t) * np.sin(2 * np.pi * 40 * t)
+
+    def acquire(self, shot_num):
+        shape = (self.segments, self.points) if self.segments > 1 else (self.points,)
+        traces = []
+        for index, channel in enumerate(self.channels):
+            amp = 1.0 + 0.1 * np.sin(shot_num + index)
+            raw = np.rint(amp * self._signal + self._rng.normal(0.0, 12.0, shape))
+            traces.append(ScopeTrace(channel=channel, header=self._header,
+                                     raw=np.clip(raw, -32768, 32767).astype(np.int16)))
+        return ScopeShot(scope_name=self.name, traces=traces, acquisition_time=time.ctime())
+
+
+def _payload(scopes, shot_num, xy):
+    """Spool payload of one shot, via the acquire side's all_data layout."""
+    all_data = {}
+    for scope in scopes:
+        shot = scope.acquire(shot_num)
+        all_data[scope.name] = ([t.channel for t in shot.traces],
+                                {t.channel: t.raw for t in shot.traces},
+                                {t.channel: t.header for t in shot.traces})
+    return spool_adapter.all_data_to_payload(all_data, shot_num, {MG_NAME: xy})
+
+
+def _plan(shots, repeats):
+    """Row-major plane plan: ``(x, y)`` per shot, ``repeats`` shots per position."""
+    npos = -(-shots // repeats)
+    nx = max(1, int(np.ceil(np.sqrt(npos))))
+    xy = [(float(i % nx), float(i // nx)) for i in range(npos)]
+    return [xy[(s - 1) // repeats] for s in range(1, shots + 1)], xy
+
+
+def _build_skeleton(hdf5_path, scopes, positions, segments):
+    """The bmotion HDF5 skeleton the acquire process writes before offload."""
+    hdf5_writer.write_experiment_metadata(
+        hdf5_path, description="spool pipeline benchmark",
+        source_code={"benchmark": "bench_spool_pipeline"},
+        raw_config_text="[experiment]\nname = benchmark\n",
+        config=None, scope_names=[s.name for s in scopes])
+    for scope in scopes:
+        hdf5_writer.write_scope_metadata(
+            hdf5_path, scope_name=scope.name, description="synthetic scope",
+            ip_address="mock", scope_type="LECROY,BENCH,0,0",
+            channel_descriptions={ch: f"bench {ch}" for ch in scope.channels})
+        hdf5_writer.write_time_array(hdf5_path, scope.name, scope.time_array(),
+                                     1 if segments > 1 else 0)
+    setup = np.zeros(len(positions), dtype=bmotion._POSITION_DTYPE)
+    setup["shot_num"] = np.arange(1, len(positions) + 1)
+    setup["x"], setup["y"] = np.array(positions).T
+    bmotion.write_bmotion_position_groups(
+        hdf5_path, total_shots=len(positions), toml_text="# benchmark\n",
+        selection_blob='{"mg_keys": ["0"], "execution_order": "interleaved"}',
+        prepared=[("0", MG_NAME, setup, np.unique(setup["x"]), np.unique(setup["y"]))])
+
+
+def _timed_spool(spool_dir, payloads, parallel):
+    """Spool every payload; return (seconds, bytes of trace data)."""
+    nbytes = 0
+    start = time.perf_counter()
+    for payload in payloads:
+        spool_format.write_shot(spool_dir, payload, parallel=parallel)
+    seconds = time.perf_counter() - start
+    for payload in payloads:
+        nbytes += sum(tr.data.nbytes for traces in payload.traces.values() for tr in traces)
+    return seconds, nbytes
+
+
+def _rates(seconds, shots, nbytes):
+    return {"seconds": seconds, "shots_per_s": shots / seconds,
+            "mb_per_s": nbytes / _MB / seconds}
+
+
+def _stored_trace_bytes(hdf5_path):
+    """(raw bytes, stored bytes) of every ``*_data`` trace dataset."""
+    raw = stored = 0
+
+    def visit(name, obj):
+        nonlocal raw, stored
+        if isinstance(obj, h5py.Dataset) and name.endswith("_data"):
+            raw += obj.size * obj.dtype.itemsize
+            stored += obj.id.get_storage_size()
+
+    with h5py.File(hdf5_path, "r") as f:
+        f.visititems(visit)
+    return raw, stored
+
+
+def _check_offload(hdf5_path, payloads):
+    """The offloaded file holds exactly the synthesized traces: every shot of
+    every scope, channel by channel."""
+    with h5py.File(hdf5_path, "r") as f:
+        for scope in payloads[0].traces:
+            assert f[scope].attrs["shot_count"] == len(payloads)
+        for payload in payloads:
+            for scope, traces in payload.traces.items():
+                for tr in traces:
+                    np.testing.assert_array_equal(
+                        f[f"{scope}/shot_{payload.shot_num}/{tr.channel}_data"][()], tr.data)
+
+
+def _bench_reads(hdf5_path, scopes, shots):
+    """Reader throughput over every channel of the first scope (shots/s counts
+    whole shots of that scope)."""
+    scope = scopes[0]
+    nums = list(range(1, shots + 1))
+    nbytes = 0
+    start = time.perf_counter()
+    with h5py.File(hdf5_path, "r") as f:
+        for ch in scope.channels:
+            stack, _dt, _t0 = read_hdf5_scope_channel_shots(f, scope.name, ch, nums)
+            nbytes += stack.size * 2            # int16 on disk
+    stack_s = time.perf_counter() - start
+    result = {"channel_shots": _rates(stack_s, shots, nbytes)}
+    if scope.segments == 1:
+        start = time.perf_counter()
+        with open_run(hdf5_path) as run:
+            for ch in scope.channels:
+                run[scope.name, ch].mean_std()
+        result["open_run_mean_std"] = _rates(time.perf_counter() - start, shots, nbytes)
+    return result
+
+
+def run_benchmark(args):
+    scopes = [SyntheticScope(f"scope{i + 1}", tuple(f"C{c + 1}" for c in range(args.channels)),
+                             args.samples, args.segments, seed=i)
+              for i in range(args.scopes)]
+    shot_xy, positions = _plan(args.shots, args.repeats)
+    payloads = [_payload(scopes, s, xy) for s, xy in enumerate(shot_xy, start=1)]
+    shot_bytes = sum(tr.data.nbytes for traces in payloads[0].traces.values() for tr in traces)
+    print(f"spool pipeline: {args.shots} shots x {args.scopes} scope(s) x "
+          f"{args.channels} ch x {args.samples} samples"
+          f"{f' x {args.segments} segments' if args.segments > 1 else ''} "
+          f"({shot_bytes / _MB:.1f} MB/shot)")
+
+    results = {"spool_write": {}, "offload": {}, "read": {}}
+    work = tempfile.mkdtemp(prefix="bench_spool_", dir=args.spool_dir)
+    h5_dir = tempfile.mkdtemp(prefix="bench_h5_", dir=args.hdf5_dir)
+    try:
+        for mode, parallel in (("serial", False), ("parallel", True)):
+            spool = os.path.join(work, f"spool_{mode}")
+            seconds, nbytes = _timed_spool(spool, payloads, parallel)
+            results["spool_write"][mode] = _rates(seconds, args.shots, nbytes)
+            shutil.rmtree(spool)
+
+        for name, kwargs in _select_codecs(args.codecs).items():
+            spool = os.path.join(work, "spool_offload")
+            hdf5_path = os.path.join(h5_dir, f"{name.split(' ')[0]}.hdf5")
+            with contextlib.redirect_stdout(io.StringIO()):
+                _build_skeleton(hdf5_path, scopes, positions, args.segments)
+            _timed_spool(spool, payloads, False)
+            spool_format.write_run_metadata(spool, {
+                "writer": spool_adapter.WRITER_TAG, "hdf5_path": hdf5_path,
+                "config_scope_names": [s.name for s in scopes],
+                "total_shots": args.shots, "position_stats": args.position_stats})
+            spool_format.write_run_complete(spool, args.shots)
+            with mock.patch.object(hdf5_writer, "_COMPRESSION_KWARGS", kwargs), \
+                    contextlib.redirect_stdout(io.StringIO()), \
+                    contextlib.redirect_stderr(io.StringIO()):
+                start = time.perf_counter()
+                offload_engine.run_offload(spool, poll_seconds=0.01)
+                seconds = time.perf_counter() - start
+            shutil.rmtree(spool)
+            _check_offload(hdf5_path, payloads)
+            raw, stored = _stored_trace_bytes(hdf5_path)
+            results["offload"][name] = {
+                **_rates(seconds, args.shots, raw),
+                "file_bytes": os.path.getsize(hdf5_path),
+                "trace_bytes_raw": raw,
+                "trace_bytes_stored": stored,
+                "compression_ratio": raw / stored if stored else None,
+            }
+            results["read"][name] = _bench_reads(hdf5_path, scopes, args.shots)
+            os.remove(hdf5_path)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+        shutil.rmtree(h5_dir, ignore_errors=True)
+    return results
+
+
+def _git_state():
+    def git(*cmd):
+        try:
+            return subprocess.run(["git", *cmd], cwd=_REPO_ROOT, capture_output=True,
+                                  text=True, timeout=30).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+    return {"commit": git("rev-parse", "HEAD") or None,
+            "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def _environment():
+    try:
+        import hdf5plugin
+        plugin = hdf5plugin.version
+    except ImportError:
+        plugin = None
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "machine": platform.node(), "numpy": np.__version__,
+            "h5py": h5py.version.version, "hdf5": h5py.version.hdf5_version,
+            "hdf5plugin": plugin}
+
+
+def _print_results(results):
+    print(f"\n{'spool write':<28} {'s':>8} {'shots/s':>9} {'MB/s':>9}")
+    for mode, r in results["spool_write"].items():
+        print(f"{mode:<28} {r['seconds']:>8.3f} {r['shots_per_s']:>9.1f} {r['mb_per_s']:>9.1f}")
+    print(f"\n{'offload drain':<28} {'s':>8} {'shots/s':>9} {'MB/s':>9} "
+          f"{'file MB':>9} {'ratio':>7} {'read MB/s':>10}")
+    for name, r in results["offload"].items():
+        read = results["read"][name]["channel_shots"]["mb_per_s"]
+        ratio = r["compression_ratio"]
+        print(f"{name:<28} {r['seconds']:>8.3f} {r['shots_per_s']:>9.1f} "
+              f"{r['mb_per_s']:>9.1f} {r['file_bytes'] / _MB:>9.1f} "
+              f"{ratio if ratio is not None else float('nan'):>7.2f} {read:>10.1f}")
+
+
+def _flatten(tree, prefix=""):
+    flat = {}
+    for key, value in tree.items():
+        path = f"{prefix}/{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(_flatten(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def compare(old, new):
+    """Print every metric present in both result records, with new/old."""
+    a, b = _flatten(old["results"]), _flatten(new["results"])
+    print(f"\ncompare {(old['git']['commit'] or '?')[:10]} -> "
+          f"{(new['git']['commit'] or '?')[:10]}")
+    changed = sorted(k for k in old["params"].keys() | new["params"].keys()
+                     if old["params"].get(k) != new["params"].get(k))
+    if changed:
+        print(f"WARNING: parameters differ ({', '.join(changed)}); "
+              f"ratios compare different workloads")
+    for key in sorted(a.keys() & b.keys()):
+        ratio = b[key] / a[key] if a[key] else float("nan")
+        print(f"{key:<60} {a[key]:>12.4g} {b[key]:>12.4g} {ratio:>7.2f}x")
+
+
+def _parse_args(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip(),
+                                formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--scopes", type=int, default=2)
+    p.add_argument("--channels", type=int, default=4)
+    p.add_argument("--samples", type=int, default=100_000)
+    p.add_argument("--segments", type=int, default=1,
+                   help="sequence-mode segments per record (1 = single mode)")
+    p.add_argument("--shots", type=int, default=40)
+    p.add_argument("--repeats", type=int, default=4, help="shots per position")
+    p.add_argument("--codecs", default="all",
+                   help="comma-separated codec names, or 'all' (default)")
+    p.add_argument("--no-position-stats", dest="position_stats", action="store_false",
+                   help="offload without the per-position mean/std accumulator")
+    p.add_argument("--spool-dir", default=None, help="parent dir for the spool (fast disk)")
+    p.add_argument("--hdf5-dir", default=None, help="parent dir for the HDF5 files")
+    p.add_argument("--out", default=None, help="results JSON path")
+    p.add_argument("--compare", default=None, metavar="OLD.json",
+                   help="print each metric against an earlier results file")
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    results = run_benchmark(args)
+    _print_results(results)
+
+    git = _git_state()
+    record = {
+        "benchmark": "spool_pipeline",
+        "schema": SCHEMA_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git": git,
+        "environment": _environment(),
+        "params": {k: v for k, v in vars(args).items()
+                   if k not in ("out", "compare", "spool_dir", "hdf5_dir")},
+        "results": results,
+    }
+    out = args.out
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out = os.path.join(RESULTS_DIR, f"spool_pipeline_{(git['commit'] or 'nogit')[:10]}_"
+                                        f"{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(out, "w") as fh:
+        json.dump(record, fh, indent=2)
+    print(f"\nresults -> {out}")
+
+    if args.compare:
+        with open(args.compare) as fh:
+            compare(json.load(fh), record)
+
+
+if __name__ == "__main__":
+    main()
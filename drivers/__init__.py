@@ -1 +1,2 @@
-"""Hardware-interface drivers (LeCroy scope, Phantom camera)."""
+"""Hardware-interface drivers (LeCroy scope, Phantom camera), plus the
+round-trip latency histograms shared by the motor and trigger links."""
@@ -0,0 +1,55 @@
+"""Round-trip latency histograms for command/reply links to hardware.
+
+Used by the motor drives (motion.Motor_Control_1D) and the Raspberry Pi trigger
+client (pi_gpio.pi_client) for their ``latency_report()``. Standard library
+only, so importing it does not pull in either package.
+"""
+
+import math
+
+
+class LatencyHistogram:
+    """Round-trip times of one command, in log-spaced buckets (BUCKETS_PER_DECADE
+    per decade from MIN_S up; slower replies land in the last bucket)."""
+
+    MIN_S = 1e-4
+    BUCKETS_PER_DECADE = 4
+    N_BUCKETS = 21          # 0.1 ms .. 10 s
+
+    def __init__(self):
+        self.counts = [0] * self.N_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def _bucket(self, seconds):
+        if seconds <= self.MIN_S:
+            return 0
+        b = int(math.log10(seconds / self.MIN_S) * self.BUCKETS_PER_DECADE)
+        return min(b, self.N_BUCKETS - 1)
+
+    def upper_edge(self, bucket):
+        """Upper edge (s) of ``bucket``."""
+        return self.MIN_S * 10 ** ((bucket + 1) / self.BUCKETS_PER_DECADE)
+
+    def add(self, seconds):
+        self.counts[self._bucket(seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q):
+        """Upper bucket edge (s) below which ``q`` percent of round trips fell."""
+        if not self.count:
+            return 0.0
+        need = q / 100 * self.count
+        seen = 0
+        for b, n in enumerate(self.counts):
+            seen += n
+            if seen >= need:
+                return min(self.upper_edge(b), self.max)
+        return self.max
@@ -28,6 +28,12 @@ class LabScopesLeCroyScopeAdapter:
         self._displayed_traces = None
 
     def connect(self) -> None:
+        from lapd_daq.devices.lecroy_sim import SimulatedLeCroyScope, is_sim_address
+
+        if is_sim_address(self.ip_address):
+            self.scope = SimulatedLeCroyScope(self.ip_address, verbose=False,
+                                              timeout=self.timeout)
+            return
         from lab_scopes.lecroy import LeCroyScope
 
         self.scope = LeCroyScope(self.ip_address, verbose=False, timeout=self.timeout)
@@ -0,0 +1,462 @@
+"""Simulated LeCroy scope for load-testing the acquisition loop without hardware.
+
+:class:`SimulatedLeCroyScope` implements the slice of ``lab_scopes``'
+``LeCroy_Scope`` that :mod:`acquisition.scope_runner` and
+:class:`~lapd_daq.devices.lab_scopes.LabScopesLeCroyScopeAdapter` call
+(``displayed_traces``, ``acquire_bytes``, ``translate_header_bytes``,
+``time_array``, ``set_trigger_mode``, ``arm_single_and_confirm``,
+``arm_master_single``, ``wait_for_stop_then_complete``, ``acquire``,
+``acquire_sequence_data``, ...) with realistic timing instead of
+:class:`~lapd_daq.devices.fakes.FakeScopeDevice`'s instant 16-sample ramps:
+
+* **trigger rate / jitter** -- scopes sharing a trigger bus see one
+  free-running timer at ``rate_hz``, each edge jittered by ``jitter_us``. The
+  master (armed with ``arm_master_single``) fires on the first edge after it is
+  live; slaves armed before that capture the same edge, a slave armed after it
+  misses it, exactly the desync the master-last arm order prevents. Sequence
+  mode captures ``segments`` consecutive edges.
+* **transfer** -- each trace read costs ``latency_ms`` plus its bytes at
+  ``bandwidth_mbps`` (MB/s); separate scopes are separate links.
+* **faults** -- with probability ``miss_prob`` an arm gets no trigger (the
+  completion wait times out) and with ``read_timeout_prob`` a trace read raises
+  ``TimeoutError``. A simulated timeout lasts the caller's timeout, or
+  ``timeout_s`` if set, so a fault-heavy load test does not sit out 25 s waits.
+* **data** -- int16 damped oscillations plus ADC noise with valid WAVEDESC
+  headers (gain/offset, ``dt``/``t0``, segment count, trigger time), so the
+  writers, the offload verify and the readers all see what a scope would send.
+
+Select it with a ``sim`` address in ``[scope_ips]``, optionally with
+comma-separated overrides of :data:`SIM_DEFAULTS`::
+
+    [scope_ips]
+    BdotScope = sim:rate_hz=10,samples=1000000,channels=4,bandwidth_mbps=80
+    XrayScope = sim:rate_hz=10,samples=500000,miss_prob=0.01
+
+Scopes whose ``bus``/``rate_hz``/``jitter_us`` match share a trigger bus (its
+jitter is drawn from the first such scope's ``seed``). Timing goes through the module-level ``_now``/``_sleep`` seams.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import numpy as np
+
+from scope_io.wavedesc import WAVEDESC_DTYPE, LeCroyWavedesc
+
+SIM_SCHEME = "sim"
+
+#: Address parameters and their defaults (see the module docstring).
+SIM_DEFAULTS = {
+    "rate_hz": 10.0,            # trigger (rep) rate of the free-running timer
+    "jitter_us": 20.0,          # rms trigger-edge jitter
+    "samples": 100_000,         # points per record (per segment in sequence mode)
+    "segments": 1,              # > 1: sequence mode, one edge per segment
+    "channels": 4,              # displayed traces C1..Cn
+    "dt_ns": 10.0,              # sample interval
+    "bandwidth_mbps": 100.0,    # waveform transfer rate, MB/s
+    "latency_ms": 1.0,          # per-command round trip
+    "ready_ms": 0.5,            # arm -> trigger-ready (INR) delay
+    "miss_prob": 0.0,           # chance an arm never sees a trigger
+    "read_timeout_prob": 0.0,   # chance a trace read times out
+    "timeout_s": None,          # length of a simulated timeout (None: caller's)
+    "seed": None,               # RNG seed for data, jitter and faults
+    "bus": "default",           # trigger bus name
+}
+
+_INR_NEW_SIGNAL = 0x0001
+_INR_TRIGGER_READY = 0x2000
+
+# Injectable clock seams (tests patch these module attributes).
+_now = time.monotonic
+_sleep = time.sleep
+
+
+def is_sim_address(address) -> bool:
+    """True for a ``sim`` / ``sim:<key>=<value>,...`` scope address."""
+    text = str(address).strip().lower()
+    return text == SIM_SCHEME or text.startswith(SIM_SCHEME + ":")
+
+
+def parse_sim_address(address) -> dict:
+    """Parse a ``sim:`` address into a full parameter dict.
+
+    Raises ``ValueError`` for an unknown key or a value of the wrong type.
+    """
+    if not is_sim_address(address):
+        raise ValueError(f"not a simulated-scope address: {address!r}")
+    params = dict(SIM_DEFAULTS)
+    _, _, spec = str(address).strip().partition(":")
+    for item in filter(None, (s.strip() for s in spec.split(","))):
+        key, sep, value = item.partition("=")
+        key, value = key.strip().lower(), value.strip()
+        if not sep or key not in SIM_DEFAULTS:
+            raise ValueError(f"bad simulated-scope parameter {item!r} in {address!r}; "
+                             f"known: {', '.join(SIM_DEFAULTS)}")
+        default = SIM_DEFAULTS[key]
+        try:
+            if key == "bus":
+                params[key] = value
+            elif key in ("samples", "segments", "channels", "seed"):
+                params[key] = int(value)
+            else:
+                params[key] = float(value)
+        except ValueError:
+            raise ValueError(f"simulated-scope {key} must be a number, got {value!r} "
+                             f"(default {default!r})") from None
+    if params["rate_hz"] <= 0 or params["bandwidth_mbps"] <= 0:
+        raise ValueError(f"rate_hz and bandwidth_mbps must be > 0 in {address!r}")
+    if params["samples"] < 1 or params["segments"] < 1 or params["channels"] < 1:
+        raise ValueError(f"samples, segments and channels must be >= 1 in {address!r}")
+    return params
+
+
+class _TriggerBus:
+    """Free-running trigger timer shared by the scopes of one run.
+
+    The master's arm schedules the edge it (and every slave already armed)
+    will capture; :meth:`edge_after` answers which edge a scope armed at a
+    given time saw.
+    """
+
+    def __init__(self, rate_hz, jitter_s, seed):
+        self.period = 1.0 / rate_hz
+        self.jitter_s = jitter_s
+        self._phase = _now()
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self._edge = None           # time of the edge the master last fired on
+
+    def fire_after(self, t, miss=False):
+        """Master went live at ``t``: schedule its edge (or none on a miss)."""
+        with self._lock:
+            if miss:
+                self._edge = None
+                return None
+            k = np.floor((t - self._phase) / self.period) + 1
+            jitter = self._rng.normal(0.0, self.jitter_s) if self.jitter_s else 0.0
+            self._edge = self._phase + k * self.period + abs(jitter)
+            return self._edge
+
+    def edge_after(self, armed_at):
+        """The master's edge, if the scope armed at ``armed_at`` captures it."""
+        with self._lock:
+            edge = self._edge
+        return edge if edge is not None and edge >= armed_at else None
+
+
+_BUSES = {}
+_BUSES_LOCK = threading.Lock()
+
+
+def _trigger_bus(params):
+    key = (params["bus"], params["rate_hz"], params["jitter_us"])
+    with _BUSES_LOCK:
+        if key not in _BUSES:
+            _BUSES[key] = _TriggerBus(params["rate_hz"], params["jitter_us"] * 1e-6,
+                                      params["seed"])
+        return _BUSES[key]
+
+
+class _SimTransport:
+    """Stand-in for ``LeCroy_Scope.scope`` (the VICP transport), whose
+    ``chunk_size``/``timeout`` the acquisition code tunes."""
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.chunk_size = 1024 * 1024
+
+
+class SimulatedLeCroyScope:
+    """Drop-in for ``lab_scopes.lecroy.LeCroy_Scope`` backed by a timing model.
+
+    ``address`` is a ``sim:...`` string (see :func:`parse_sim_address`).
+    :attr:`stats` counts arms, captured and missed triggers, read timeouts and
+    bytes transferred.
+    """
+
+    def __init__(self, address=SIM_SCHEME, verbose=False, timeout=30.0):
+        self.address = address
+        self.params = p = parse_sim_address(address)
+        self.verbose = verbose
+        self.scope = _SimTransport(timeout)
+        self.idn_string = f"LECROY,SIM-HDO,{p['channels']}CH,{address}"
+        self._bus = _trigger_bus(p)
+        self._rng = np.random.default_rng(p["seed"])
+        self._channels = tuple(f"C{i + 1}" for i in range(p["channels"]))
+        self._dt = float(np.float32(p["dt_ns"] * 1e-9))   # as stored in WAVEDESC
+        self._t0 = -0.1 * p["samples"] * self._dt
+        self._gain = 1.0 / 3200.0      # +-32000 counts = +-10 V
+        self._offset = 0.0
+        self._shape = ((p["segments"], p["samples"]) if p["segments"] > 1
+                       else (p["samples"],))
+        self._lock = threading.Lock()
+        self._mode = "STOP"
+        self._armed_at = None
+        self._ready_at = None
+        self._complete_at = None    # when the captured record is fully in memory
+        self._edge = None
+        self._miss = False
+        self._stats = {"arms": 0, "captured": 0, "missed": 0,
+                       "read_timeouts": 0, "bytes": 0}
+        self._build_waveforms()
+        self._headers = {ch: self._header_record(i) for i, ch in enumerate(self._channels)}
+
+    # -- context manager / identity ---------------------------------------------
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._mode = "STOP"
+
+    @property
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    # -- channel discovery --------------------------------------------------------
+    def displayed_traces(self):
+        self._command()
+        return self._channels
+
+    def displayed_channels(self):
+        return self._channels
+
+    def validate_channel(self, channel):
+        if channel not in self._channels:
+            raise ValueError(f"{channel} is not displayed on {self.address}")
+        return channel
+
+    def time_array(self, trace=None):
+        return self._t0 + self._dt * np.arange(self.params["samples"])
+
+    def translate_header_bytes(self, header_bytes):
+        """Decode WAVEDESC bytes to the field record (``.subarray_count`` etc.)."""
+        return LeCroyWavedesc(bytes(header_bytes)).wd
+
+    # -- trigger / arm ------------------------------------------------------------
+    def set_trigger_mode(self, mode):
+        if mode == "":
+            return self._state()
+        self._command()
+        mode = mode.upper()
+        with self._lock:
+            if mode == "STOP":
+                self._mode = "STOP"
+                self._armed_at = None
+            elif mode in ("SINGLE", "NORMAL", "AUTO"):
+                self._arm_locked()
+            else:
+                raise ValueError(f"unknown trigger mode {mode!r}")
+        return mode
+
+    def clear_sweeps(self):
+        self._command()
+        with self._lock:
+            self._complete_at = None
+            self._edge = None
+
+    def sweeps_per_acq(self, channel=None):
+        return 1 if self._state() == "STOP" and self._complete_at is not None else 0
+
+    def arm_single(self, channel=None):
+        self.clear_sweeps()
+        self.set_trigger_mode("SINGLE")
+        return channel if channel is not None else self._channels[0]
+
+    def read_inr(self):
+        self._command()
+        with self._lock:
+            now = _now()
+            inr = 0
+            if self._mode == "SINGLE" and self._ready_at is not None and now >= self._ready_at:
+                inr |= _INR_TRIGGER_READY
+        if self.sweeps_per_acq():
+            inr |= _INR_NEW_SIGNAL
+        return inr
+
+    def wait_for_trigger_ready(self, timeout=5.0, poll=0.01):
+        with self._lock:
+            ready_at = self._ready_at
+        if ready_at is None:
+            return False
+        wait = ready_at - _now()
+        if wait > timeout:
+            _sleep(timeout)
+            return False
+        if wait > 0:
+            _sleep(wait)
+        return True
+
+    def arm_single_and_confirm(self, channel=None, ready_timeout=5.0):
+        """Slave arm: CLEAR_SWEEPS + SINGLE, then confirm trigger-ready."""
+        channel = self.arm_single(channel)
+        return channel, self.wait_for_trigger_ready(timeout=ready_timeout)
+
+    def arm_master_single(self, channel=None):
+        """Master arm: go live, then fire on the bus's next timer edge."""
+        channel = self.arm_single(channel)
+        with self._lock:
+            self._miss = bool(self._rng.random() < self.params["miss_prob"])
+            live_at = self._ready_at
+        self._bus.fire_after(live_at, miss=self._miss)
+        return channel
+
+    def wait_for_stop_then_complete(self, channel=None, timeout=100, poll=0.02):
+        """Block until this arm's record is complete; False on a (simulated) timeout."""
+        deadline = _now() + self._timeout(timeout)
+        while True:
+            if self._state() == "STOP":
+                return self._complete_at is not None
+            now = _now()
+            with self._lock:
+                complete_at = self._complete_at
+            if complete_at is not None:
+                if complete_at <= deadline:
+                    _sleep(max(0.0, complete_at - now))
+                    continue
+                _sleep(max(0.0, deadline - now))
+                return False
+            if now >= deadline:
+                with self._lock:
+                    self._stats["missed"] += 1
+                return False
+            _sleep(min(poll, max(0.0, deadline - now)))
+
+    # -- data ---------------------------------------------------------------------
+    def acquire(self, trace, raw=True):
+        """One trace: int16 counts (``raw=True``) or volts, plus WAVEDESC bytes."""
+        data, header = self._read(trace)
+        return (data if raw else data * self._gain - self._offset), header
+
+    def acquire_sequence_data(self, trace, raw=True):
+        """Sequence-mode trace as a list of per-segment arrays, plus WAVEDESC bytes."""
+        data, header = self._read(trace)
+        data = np.atleast_2d(data)
+        return ([seg for seg in data] if raw
+                else [seg * self._gain - self._offset for seg in data]), header
+
+    def acquire_bytes(self, trace):
+        data, header = self._read(trace)
+        return data.tobytes(), header
+
+    # -- internals ----------------------------------------------------------------
+    def _command(self):
+        _sleep(self.params["latency_ms"] * 1e-3)
+
+    def _timeout(self, caller_timeout):
+        own = self.params["timeout_s"]
+        return caller_timeout if own is None else min(caller_timeout, own)
+
+    def _arm_locked(self):
+        now = _now()
+        self._mode = "SINGLE"
+        self._armed_at = now
+        self._ready_at = now + self.params["ready_ms"] * 1e-3
+        self._complete_at = None
+        self._edge = None
+        self._stats["arms"] += 1
+
+    def _state(self):
+        """Trigger state, capturing the bus edge once this arm has seen it."""
+        with self._lock:
+            if self._mode != "SINGLE" or self._armed_at is None:
+                return self._mode
+            if self._complete_at is None:
+                edge = self._bus.edge_after(self._ready_at)
+                if edge is None:
+                    return self._mode
+                p = self.params
+                self._edge = edge
+                self._complete_at = (edge + (p["segments"] - 1) * self._bus.period
+                                     + p["samples"] * self._dt)
+            if _now() >= self._complete_at:
+                self._mode = "STOP"
+                self._stats["captured"] += 1
+            return self._mode
+
+    def _read(self, trace):
+        self.validate_channel(trace)
+        p = self.params
+        start = _now()
+        if self._rng.random() < p["read_timeout_prob"]:
+            _sleep(self._timeout(self.scope.timeout))
+            with self._lock:
+                self._stats["read_timeouts"] += 1
+            raise TimeoutError(f"simulated read timeout on {trace} ({self.address})")
+        data = self._waveform(trace)
+        header = self._header(trace)
+        # Data synthesis counts toward the transfer time, not on top of it.
+        done = start + p["latency_ms"] * 1e-3 + (data.nbytes + len(header)) / (
+            p["bandwidth_mbps"] * 1e6)
+        _sleep(max(0.0, done - _now()))
+        with self._lock:
+            self._stats["bytes"] += data.nbytes + len(header)
+        return data, header
+
+    def _build_waveforms(self):
+        """Per-channel noiseless records plus one shared noise bank; a shot adds
+        a random window of the bank, so each read costs one pass over the data."""
+        n = int(np.prod(self._shape))
+        t = np.arange(self.params["samples"]) / self.params["samples"]
+        self._base = {}
+        for i, ch in enumerate(self._channels):
+            record = (6000.0 * (i + 1) * np.exp(-4.0 * t)
+                      * np.sin(2 * np.pi * (20 + 7 * i) * t))
+            self._base[ch] = np.broadcast_to(np.rint(record), self._shape).astype(np.int16)
+        self._noise = np.rint(self._rng.normal(0.0, 10.0, 2 * n)).astype(np.int16)
+
+    def _waveform(self, trace):
+        n = self._base[trace].size
+        off = int(self._rng.integers(0, n + 1))
+        noise = self._noise[off:off + n].reshape(self._shape)
+        return np.add(self._base[trace], noise, dtype=np.int16)
+
+    def _header_record(self, index):
+        p = self.params
+        n = p["samples"] * p["segments"]
+        rec = np.zeros((), dtype=WAVEDESC_DTYPE)
+        rec["descriptor_name"] = b"WAVEDESC"
+        rec["template_name"] = b"LECROY_2_3"
+        rec["comm_type"] = 1                    # 16-bit samples
+        rec["comm_order"] = 1                   # LOFIRST
+        rec["wave_descriptor"] = WAVEDESC_DTYPE.itemsize
+        rec["wave_array_1"] = 2 * n
+        rec["instrument_name"] = b"LECROYSIM"
+        rec["wave_array_count"] = n
+        rec["pnts_per_screen"] = p["samples"]
+        rec["last_valid_pnt"] = n - 1
+        rec["sparsing_factor"] = 1
+        rec["subarray_count"] = p["segments"]
+        rec["nom_subarray_count"] = p["segments"]
+        rec["sweeps_per_acq"] = 1
+        rec["vertical_gain"] = self._gain
+        rec["vertical_offset"] = self._offset
+        rec["max_value"] = 32512
+        rec["min_value"] = -32768
+        rec["nominal_bits"] = 12
+        rec["horiz_interval"] = self._dt
+        rec["horiz_offset"] = self._t0
+        rec["vertunit"] = b"V"
+        rec["horunit"] = b"S"
+        rec["acq_duration"] = p["samples"] * self._dt
+        rec["probe_att"] = 1.0
+        rec["wave_source"] = index
+        return rec
+
+    def _header(self, trace):
+        """WAVEDESC bytes of ``trace``, stamped with this arm's trigger time."""
+        rec = self._headers[trace].copy()
+        with self._lock:
+            edge = self._edge
+        if edge is not None:
+            wall = time.time() - (_now() - edge)
+            tm = time.localtime(wall)
+            rec["tt_second"] = tm.tm_sec + (wall % 1.0)
+            rec["tt_minute"] = tm.tm_min
+            rec["tt_hours"] = tm.tm_hour
+            rec["tt_days"] = tm.tm_mday
+            rec["tt_months"] = tm.tm_mon
+            rec["tt_year"] = tm.tm_year
+        return rec.tobytes()
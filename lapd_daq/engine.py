@@ -199,7 +199,10 @@ def _build_direct_trigger(config: RunConfig):
         return None
     from pi_gpio.pi_client import TriggerClient
 
-    return PiGPIOTriggerAdapter(TriggerClient(str(params["pi_host"]), int(params.get("pi_port", 54321))))
+    persistent = str(params.get("pi_persistent", False)).lower() in {"true", "yes", "on", "1"}
+    return PiGPIOTriggerAdapter(
+        TriggerClient(str(params["pi_host"]), int(params.get("pi_port", 54321)), persistent=persistent)
+    )
 
 
 def _resolution(value) -> tuple[int, int]:
@@ -10,10 +10,70 @@ Created on Tue Oct 24 14:29:25 2017
 
 import math
 from .Motor_Control_1D import Motor_Control
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 import numpy
 from .obstacle_avoidance import BoundaryChecker
-from scipy.optimize import minimize
+
+# wait_for_motion_complete: status poll period bounds (s) and settle time after stop (s).
+_STATUS_POLL_MIN_S = 0.01
+_STATUS_POLL_MAX_S = 0.05
+_SETTLE_S = 0.2
+
+
+def _poll_interval(elapsed):
+	"""Status poll period for a move that has run ``elapsed`` seconds: tight
+	while short moves finish, backing off to a quarter of the elapsed time
+	(so completion is seen within ~25% of the move, and at most _STATUS_POLL_MAX_S late)."""
+	return min(_STATUS_POLL_MAX_S, max(_STATUS_POLL_MIN_S, elapsed / 4))
+
+
+_AXIS_POOL_LOCK = threading.Lock()
+
+
+def _query_axes(drive, query):
+	"""Run ``query(axis)`` on every axis of ``drive`` at once and return the
+	results in axis order.
+
+	Each axis talks to its own drive over its own socket, so the queries run
+	one thread per axis: a poll costs the slowest axis's round trip rather
+	than the sum of them. The pool is created on first use and kept on the drive
+	until its close().
+	"""
+	axes = [getattr(drive, f'{name}_mc') for name in drive.AXES]
+	pool = drive.__dict__.get('_axis_pool')
+	if pool is None:
+		with _AXIS_POOL_LOCK:
+			pool = drive.__dict__.get('_axis_pool')
+			if pool is None:
+				pool = ThreadPoolExecutor(max_workers=len(axes), thread_name_prefix='axis-query')
+				drive._axis_pool = pool
+	futures = [pool.submit(query, axis) for axis in axes]
+	return tuple(f.result() for f in futures)
+
+
+def _close_drive(drive):
+	"""Shut down ``drive``'s axis-query threads and close each axis's connection."""
+	with _AXIS_POOL_LOCK:
+		pool = drive.__dict__.pop('_axis_pool', None)
+	if pool is not None:
+		pool.shutdown(wait=True)
+	for name in drive.AXES:
+		getattr(drive, f'{name}_mc').close()
+
+
+def _axis_reading(axis):
+	return axis.motor_position, axis.motor_status
+
+
+def _shaft_angle(c, poi, ph):
+	"""Solve c*cos(theta) - poi*sin(theta) = ph for the probe shaft angle theta,
+	on the branch with theta = 0 at c = ph (the shaft square to the wall).
+
+	Shared by the 2D and 3D inverse kinematics; c may be an array.
+	"""
+	return numpy.arccos(ph / numpy.hypot(c, poi)) - numpy.arctan2(poi, c)
 
 # TODO: fix calculate_velocity to read from cm_per_turn directly
 #############################################################################################
@@ -21,6 +81,8 @@ from scipy.optimize import minimize
 class Motor_Control_2D:
 	"""Controls a 2-motor (x, y) probe drive built on Motor_Control_1D."""
 
+	AXES = 'xy'
+
 	def __init__(self, x_ip_addr = None, y_ip_addr = None, **kwargs):
 		verbose = kwargs.get('verbose', False)
 		
@@ -56,29 +118,27 @@ class Motor_Control_2D:
 		self.motor_velocity = v_motor_x, v_motor_y
 
 	def calculate_velocity(self, del_x, del_y):
-		"""Convert a probe velocity vector to a motor velocity vector."""
+		"""Convert a probe velocity vector to a motor velocity vector.
+		Accepts scalars or arrays (every move of a plan at once)."""
 		default_speed = 5.0
 
-		del_r = math.sqrt(del_x**2 + del_y**2)
-		if del_r == 0:
-			v_x, v_y = 0.0, 0.0
-		else:
-			v_x = default_speed * del_x / del_r
-			v_y = default_speed * del_y / del_r
+		del_x = numpy.asarray(del_x, dtype=float)
+		del_y = numpy.asarray(del_y, dtype=float)
+		del_r = numpy.hypot(del_x, del_y)
+		scale = numpy.divide(default_speed, del_r, out=numpy.zeros_like(del_r), where=del_r != 0)
+		v_x = del_x * scale
+		v_y = del_y * scale
 
 		v_motor_x = v_x * 2  # factor of 2 due to different cm_per_turn
 		v_motor_y = v_y
 
-		v_motor_x = round(v_motor_x, 3)
-		v_motor_y = round(v_motor_y, 3)
-
-		return v_motor_x, v_motor_y
+		return numpy.round(v_motor_x, 3), numpy.round(v_motor_y, 3)
 
 	#--------------------------------------------------------------------------------------------------
 	# Current motor position (get/set); setter waits for motion to complete
 	@property
 	def motor_positions(self):
-		return self.x_mc.motor_position, self.y_mc.motor_position
+		return _query_axes(self, lambda axis: axis.motor_position)
 	
 	@motor_positions.setter
 	def motor_positions(self, mpos):
@@ -90,24 +150,27 @@ class Motor_Control_2D:
 			
 	#-------------------------------------------------------------------------------------------
 	def wait_for_motion_complete(self):
-		"""Block until both motors stop moving (or a 5-min timeout)."""
-		timeout = time.time() + 300
+		"""Block until both motors stop moving (or a 5-min timeout).
+
+		All axes' status is polled at once (see _query_axes) on an adaptive
+		period (see _poll_interval), then the probe is given _SETTLE_S to settle."""
+		start = time.time()
+		timeout = start + 300
 
 		while True:
 			try:
-				x_stat = self.x_mc.motor_status
-				y_stat = self.y_mc.motor_status
+				x_stat, y_stat = _query_axes(self, lambda axis: axis.motor_status)
 
 				x_not_moving = x_stat.find('M') == -1
 				y_not_moving = y_stat.find('M') == -1
 
 				if x_not_moving and y_not_moving:
-					time.sleep(0.2)
+					time.sleep(_SETTLE_S)
 					break
 				elif time.time() > timeout:
 					raise TimeoutError("Motor has been moving for over 5min???")
 
-				time.sleep(0.2)
+				time.sleep(_poll_interval(time.time() - start))
 			except KeyboardInterrupt:
 				self.x_mc.stop_now
 				self.y_mc.stop_now
@@ -132,18 +195,25 @@ class Motor_Control_2D:
 
 	@property
 	def motor_alarm(self):
-		x_al = self.x_mc.check_alarm
-		y_al = self.y_mc.check_alarm
+		x_al, y_al = _query_axes(self, lambda axis: axis.check_alarm)
 
 		return x_al, y_al
 
+	def read_all(self):
+		"""Read every axis's position (cm) and status string in one concurrent
+		round-trip window. Returns (positions, statuses), each in axis order."""
+		positions, statuses = zip(*_query_axes(self, _axis_reading))
+		return positions, statuses
+
 	#-------------------------------------------------------------------------------------------
 	def probe_to_motor_LAPD(self, x, y):
-		"""Convert probe-space position (cm) to motor movement (cm)."""
-		x = self.probe_in - x
+		"""Convert probe-space position (cm) to motor movement (cm).
+		Accepts scalars or arrays (a whole plan at once)."""
+		x = self.probe_in - numpy.asarray(x, dtype=float)
+		y = numpy.asarray(y, dtype=float)
 
-		D = math.sqrt(x**2 + y**2)
-		d2 = self.ph/math.sqrt((y/x)**2+1)
+		D = numpy.sqrt(x**2 + y**2)
+		d2 = self.ph/numpy.sqrt((y/x)**2+1)
 		Ltc = y/x * d2
 
 		motor_x = D - self.probe_in
@@ -152,21 +222,21 @@ class Motor_Control_2D:
 		return motor_x, motor_y
 
 	def motor_to_probe(self, motor_x, motor_y):
-		"""Recover probe position from motor encoder feedback via scipy.minimize."""
-		def distance_fun(r1, r2):
-			a = numpy.array(r1)
-			b = numpy.array(r2)
-			return numpy.linalg.norm(a-b)
-
-		def fun(x, *args):
-			mx, my = self.probe_to_motor_LAPD(x[0], x[1])
-			return distance_fun((mx, my), args)
-
-		args = [motor_x, motor_y]
-		X0 = [motor_x, motor_y]
-		res = minimize(fun, X0, (args,), options={'maxiter':15000}, method='BFGS')
-		
-		return round(res.x[0], 3), round(res.x[1], 3)
+		"""Recover probe position (cm) from motor positions: the exact inverse of
+		probe_to_motor_LAPD. Accepts scalars or arrays (a batch of points).
+
+		With theta the shaft angle (tan(theta) = y/(probe_in - x)), motor_y reduces
+		to ph*(1 - sec(theta)) - poi*tan(theta), i.e. c*cos(theta) - poi*sin(theta) = ph
+		with c = ph - motor_y, solved on the branch through theta = 0; motor_x
+		gives the pivot-to-tip distance D = motor_x + probe_in.
+		"""
+		theta = _shaft_angle(self.ph - numpy.asarray(motor_y, dtype=float), self.poi, self.ph)
+		D = numpy.asarray(motor_x, dtype=float) + self.probe_in
+
+		x = self.probe_in - D*numpy.cos(theta)
+		y = D*numpy.sin(theta)
+
+		return numpy.round(x, 3), numpy.round(y, 3)
 
 	#-------------------------------------------------------------------------------------------------
 	@property
@@ -214,11 +284,23 @@ class Motor_Control_2D:
 		self.x_mc.disable
 		self.y_mc.disable
 
+	def close(self):
+		"""Shut down the axis-query threads and close the axis connections."""
+		_close_drive(self)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
+
 #############################################################################################
 #############################################################################################
 
 class Motor_Control_3D:
 	"""Controls a 3-motor (x, y, z) probe drive built on Motor_Control_1D."""
+
+	AXES = 'xyz'
 	def __init__(self, *args, **kwargs):
 		verbose = kwargs.get('verbose', False)
 
@@ -260,28 +342,26 @@ class Motor_Control_3D:
 		delta_y = abs(motor_y - y_m)
 		delta_z = abs(motor_z - z_m)
 
-		max_delta = max(delta_x, delta_y, delta_z)
-		default_speed = 2.0  # Max speed in rev/sec
+		self.motor_velocity = self.calculate_velocity(delta_x, delta_y, delta_z)
 
-		if max_delta == 0:
-			self.motor_velocity = 0.0, 0.0, 0.0
-			return
-
-		v_x = default_speed * delta_x / max_delta
-		v_y = default_speed * delta_y / max_delta
-		v_z = default_speed * delta_z / max_delta
+	def calculate_velocity(self, del_x, del_y, del_z):
+		"""Per-motor velocities for motor travel (del_x, del_y, del_z): the
+		longest-travel axis runs at max speed. Accepts scalars or arrays."""
+		default_speed = 2.0  # Max speed in rev/sec
 
-		v_motor_x = round(v_x, 3)
-		v_motor_y = round(v_y, 3)
-		v_motor_z = round(v_z, 3)
+		deltas = numpy.abs(numpy.stack(numpy.broadcast_arrays(
+			numpy.asarray(del_x, dtype=float), del_y, del_z)))
+		max_delta = deltas.max(axis=0)
+		scale = numpy.divide(default_speed, max_delta, out=numpy.zeros_like(max_delta), where=max_delta != 0)
+		v_x, v_y, v_z = numpy.round(deltas * scale, 3)
 
-		self.motor_velocity = v_motor_x, v_motor_y, v_motor_z
+		return v_x, v_y, v_z
 
 	#--------------------------------------------------------------------------------------------------
 	# Current motor position (get/set); setter waits for motion to complete
 	@property
 	def motor_positions(self):
-		self._current_pos = self.x_mc.motor_position, self.y_mc.motor_position, self.z_mc.motor_position
+		self._current_pos = _query_axes(self, lambda axis: axis.motor_position)
 		return self._current_pos
 	
 	@motor_positions.setter
@@ -295,14 +375,16 @@ class Motor_Control_3D:
 			
 	#-------------------------------------------------------------------------------------------
 	def wait_for_motion_complete(self):
-		"""Block until all motors stop moving (or a 5-min timeout)."""
-		timeout = time.time() + 300
+		"""Block until all motors stop moving (or a 5-min timeout).
+
+		All axes' status is polled at once (see _query_axes) on an adaptive
+		period (see _poll_interval), then the probe is given _SETTLE_S to settle."""
+		start = time.time()
+		timeout = start + 300
 
 		while True:
 			try:
-				x_stat = self.x_mc.motor_status
-				y_stat = self.y_mc.motor_status
-				z_stat = self.z_mc.motor_status
+				x_stat, y_stat, z_stat = _query_axes(self, lambda axis: axis.motor_status)
 
 				x_disabled = x_stat.find('D') == 1
 				y_disabled = y_stat.find('D') == 1
@@ -316,12 +398,12 @@ class Motor_Control_3D:
 				z_not_moving = z_stat.find('M') == -1
 				
 				if x_not_moving and y_not_moving and z_not_moving:
-					time.sleep(0.2)
+					time.sleep(_SETTLE_S)
 					break
 				elif time.time() > timeout:
 					raise TimeoutError("Motor has been moving for over 5min???")
 
-				time.sleep(0.2)
+				time.sleep(_poll_interval(time.time() - start))
 
 			except KeyboardInterrupt:
 				# Send stop commands immediately to all motors
@@ -357,19 +439,26 @@ class Motor_Control_3D:
 
 	@property
 	def motor_alarm(self):
-		x_al = self.x_mc.check_alarm
-		y_al = self.y_mc.check_alarm
-		z_al = self.z_mc.check_alarm
+		x_al, y_al, z_al = _query_axes(self, lambda axis: axis.check_alarm)
 
 		return x_al, y_al, z_al
 
+	def read_all(self):
+		"""Read every axis's position (cm) and status string in one concurrent
+		round-trip window. Returns (positions, statuses), each in axis order."""
+		positions, statuses = zip(*_query_axes(self, _axis_reading))
+		return positions, statuses
+
 	#-------------------------------------------------------------------------------------------
 	def probe_to_motor_LAPD(self, x, y, z):
-		"""Convert probe-space position (cm) to motor movement (cm)."""
-		x = self.probe_in - x
-
-		D = math.sqrt(x**2 + y**2 + z**2)
-		d2 = self.ph/math.sqrt((y/x)**2+1)
+		"""Convert probe-space position (cm) to motor movement (cm).
+		Accepts scalars or arrays (a whole plan at once)."""
+		x = self.probe_in - numpy.asarray(x, dtype=float)
+		y = numpy.asarray(y, dtype=float)
+		z = numpy.asarray(z, dtype=float)
+
+		D = numpy.sqrt(x**2 + y**2 + z**2)
+		d2 = self.ph/numpy.sqrt((y/x)**2+1)
 		Ltc = y/x * d2
 
 		motor_x = D - self.probe_in
@@ -379,21 +468,24 @@ class Motor_Control_3D:
 		return motor_x, motor_y, motor_z
 
 	def motor_to_probe(self, motor_x, motor_y, motor_z):
-		"""Recover probe position from motor encoder feedback via scipy.minimize."""
-		def distance_fun(r1, r2):
-			a = numpy.array(r1)
-			b = numpy.array(r2)
-			return numpy.linalg.norm(a-b)
-
-		def fun(x, *args):
-			mx, my, mz = self.probe_to_motor_LAPD(x[0], x[1], x[2])
-			return distance_fun((mx, my, mz), args)
-
-		args = [motor_x, motor_y, motor_z]
-		X0 = [motor_x, motor_y, motor_z]
-		res = minimize(fun, X0, (args,), options={'maxiter':15000}, method='BFGS')
-		
-		return round(res.x[0], 3), round(res.x[1], 3), round(res.x[2], 3)
+		"""Recover probe position (cm) from motor positions: the exact inverse of
+		probe_to_motor_LAPD. Accepts scalars or arrays (a batch of points).
+
+		motor_y fixes the in-plane shaft angle theta (ph*(sec(theta) - 1) +
+		poi*tan(theta) = motor_y, the 2D relation mirrored); motor_z then gives
+		z/u = motor_z/(poi + ph*sin(theta)) with u = probe_in - x, and
+		D = motor_x + probe_in = u*sqrt(sec(theta)**2 + (z/u)**2) fixes u.
+		"""
+		theta = _shaft_angle(numpy.asarray(motor_y, dtype=float) + self.ph, self.poi, self.ph)
+		D = numpy.asarray(motor_x, dtype=float) + self.probe_in
+		z_per_u = numpy.asarray(motor_z, dtype=float) / (self.poi + self.ph*numpy.sin(theta))
+
+		u = D / numpy.sqrt(1/numpy.cos(theta)**2 + z_per_u**2)
+		x = self.probe_in - u
+		y = u*numpy.tan(theta)
+		z = u*z_per_u
+
+		return numpy.round(x, 3), numpy.round(y, 3), numpy.round(z, 3)
 
 	#-------------------------------------------------------------------------------------------------
 	@property
@@ -479,6 +571,16 @@ class Motor_Control_3D:
 		self.y_mc.disable
 		self.z_mc.disable
 
+	def close(self):
+		"""Shut down the axis-query threads and close the axis connections."""
+		_close_drive(self)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
+
 	def add_common_path(self, name, start_region, end_region, waypoints):
 		"""Add a pre-calculated path for common movements"""
 		self._common_paths[name] = (start_region, end_region, waypoints)
@@ -12,6 +12,12 @@ Oct.2024 Update
 - Change cm_per_turn as input value to init; allow setting for different Velmex drives
 - Add function to turn motor by step and read motor current step
 - Minor change in init function
+
+Commands go over one persistent TCP connection per drive (MotorConnection):
+kept open with keep-alive, several commands can be pipelined in one write with
+their replies matched in order, a dropped connection is re-opened and the
+unanswered commands re-sent, and every command's round trip is recorded in a
+per-command LatencyHistogram (Motor_Control.latency_report()).
 """
 
 
@@ -20,8 +26,12 @@ if sys.version_info[0] < 3: raise RuntimeError('This script should be run under
 
 import socket
 import select
+import threading
 import time
 import logging
+import re
+
+from drivers.latency import LatencyHistogram
 
 # TODO: 'DL2' should be sent to motor when limit switch is connected properly
 #       Add boolean in init to choose when stop switch is connected or not
@@ -29,6 +39,142 @@ import logging
 #===============================================================================================================================================
 #===============================================================================================================================================
 
+class MotorConnection:
+    """Persistent TCP connection to one Applied Motion drive (eSCL over TCP).
+
+    Commands are framed as 0x00 0x07 <text> CR and each reply comes back the
+    same way, in order, so several commands can be written at once and their
+    replies read back one by one (``request``). The socket stays open between
+    calls, with TCP keep-alive; if it drops or a reply times out it is closed,
+    re-opened and the commands not yet answered are sent again. The drive
+    treats the commands used here (absolute positions, settings, queries) the
+    same when repeated. Thread-safe: one request at a time holds the socket.
+    """
+
+    HEADER = bytes((0, 7))
+    TERMINATOR = b'\r'
+    CONNECT_RETRIES = 30
+    DEFAULT_TIMEOUT = 10.0
+
+    def __init__(self, server_ip_addr, port, name='not named', timeout=DEFAULT_TIMEOUT):
+        self.server_ip_addr = server_ip_addr
+        self.port = port
+        self.name = name
+        self.timeout = timeout
+        self.latency = {}       # command code (e.g. 'EP') -> LatencyHistogram
+        self.reconnects = 0
+        self._sock = None
+        self._buf = b''
+        self._lock = threading.RLock()
+
+    def _connect(self):
+        retry_count = 0
+        while True:
+            try:
+                s = socket.create_connection((self.server_ip_addr, self.port), timeout=self.timeout)
+                break
+            except ConnectionRefusedError:
+                retry_count += 1
+                print('...connection refused, at',time.ctime(),' Is motor_server process running on remote machine?',
+                           '  Retry', retry_count, '/', self.CONNECT_RETRIES, "on", str(self.server_ip_addr))
+            except (TimeoutError, socket.timeout):
+                retry_count += 1
+                print('...connection attempt timed out, at',time.ctime(),
+                           '  Retry', retry_count, '/', self.CONNECT_RETRIES, "on", str(self.server_ip_addr))
+            except KeyboardInterrupt:
+                sys.exit('_______Halt due to CRTL_C________')
+            if retry_count >= self.CONNECT_RETRIES:
+                print(' motor server', self.server_ip_addr, 'still unreachable; retrying')
+                retry_count = 0
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock = s
+        self._buf = b''
+
+    def close(self):
+        with self._lock:
+            if self._sock is not None:
+                try:
+                    self._sock.close()
+                except OSError:
+                    pass
+            self._sock = None
+            self._buf = b''
+
+    def _frame(self, text):
+        return self.HEADER + text.encode('ASCII') + self.TERMINATOR
+
+    def _read_reply(self, timeout):
+        while self.TERMINATOR not in self._buf:
+            self._sock.settimeout(timeout)
+            data = self._sock.recv(2048)
+            if not data:
+                raise ConnectionResetError('motor server closed the connection')
+            self._buf += data
+        reply, self._buf = self._buf.split(self.TERMINATOR, 1)
+        return (reply + self.TERMINATOR).decode('ASCII')
+
+    def _record(self, text, seconds):
+        code = re.match(r'[A-Z]*', text).group() or text
+        hist = self.latency.get(code)
+        if hist is None:
+            hist = self.latency[code] = LatencyHistogram()
+        hist.add(seconds)
+
+    def request(self, commands, timeout=None):
+        """Send ``commands`` (a list of command strings) in one write and return
+        their replies, in order, each as the drive sent it (header and CR included).
+        Re-opens the connection and re-sends the unanswered commands once if it fails."""
+        timeout = self.timeout if timeout is None else timeout
+        replies = []
+        with self._lock:
+            for attempt in (0, 1):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    pending = commands[len(replies):]
+                    sent = time.perf_counter()
+                    self._sock.sendall(b''.join(self._frame(c) for c in pending))
+                    for text in pending:
+                        replies.append(self._read_reply(timeout))
+                        self._record(text, time.perf_counter() - sent)
+                    return replies
+                except OSError as err:
+                    self.close()
+                    if attempt:
+                        raise
+                    self.reconnects += 1
+                    print(self.name + '-motor: connection lost (%s); reconnecting' % err)
+                except BaseException:
+                    # e.g. Ctrl-C mid-batch: unread replies would pair with later commands.
+                    self.close()
+                    raise
+
+    def send(self, text):
+        """Send a command whose reply is not awaited (e.g. a drive reset), then
+        drop the connection so a late reply cannot be matched to a later command."""
+        with self._lock:
+            try:
+                if self._sock is None:
+                    self._connect()
+                self._sock.sendall(self._frame(text))
+            except OSError:
+                self.close()
+                self._connect()
+                self._sock.sendall(self._frame(text))
+            self.close()
+
+    def latency_report(self):
+        """One line per command code: count, mean, p50/p90/p99 and max round trip (ms)."""
+        lines = ['%s-motor: %d reconnect(s)' % (self.name, self.reconnects)]
+        for code in sorted(self.latency):
+            h = self.latency[code]
+            lines.append('  %-4s n=%-6d mean %7.2f  p50 %7.2f  p90 %7.2f  p99 %7.2f  max %7.2f ms'
+                         % (code, h.count, 1e3 * h.mean, 1e3 * h.percentile(50),
+                            1e3 * h.percentile(90), 1e3 * h.percentile(99), 1e3 * h.max))
+        return '\n'.join(lines)
+
+
 class Motor_Control:
     """Talks to a single Applied Motion drive over a TCP socket."""
 
@@ -132,7 +278,14 @@ class Motor_Control:
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
-        """ no special processing after __init__() """
+        """ close the drive connection """
+        self.close()
+
+    def close(self):
+        """ close the drive connection (re-opened on the next command) """
+        conn = self.__dict__.get('_connection')
+        if conn is not None:
+            conn.close()
 
     def __del__(self):
         """ no special processing after __init__() """
@@ -140,57 +293,32 @@ class Motor_Control:
 ########################################################################################################
 ########################################################################################################
 
-    def send_text(self, text, timeout:int=None, receive=True) -> str:
-        """Open a socket, send a command to the motor server, return its reply.
+    def connection(self):
+        """The drive's persistent MotorConnection, opened on first use."""
+        conn = self.__dict__.get('_connection')
+        if conn is None or conn.server_ip_addr != self.server_ip_addr:
+            if conn is not None:
+                conn.close()
+            conn = self._connection = MotorConnection(self.server_ip_addr, self.MOTOR_SERVER_PORT, self.name)
+        return conn
 
-        Note: timeout is currently ignored (needs MS-specific iocontrol).
+    def send_text(self, text, timeout:int=None, receive=True) -> str:
+        """Send a command to the motor server over the persistent connection and
+        return its reply (None if ``receive`` is False). ``timeout`` (s) bounds
+        the wait for the reply; default MotorConnection.DEFAULT_TIMEOUT.
         """
-        RETRIES = 30
-        retry_count = 0
-        while retry_count < RETRIES:  # Retries added 17-07-11
-            try:
-                s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                ##if timeout is not None:
-                ##	#not on windows: socket.settimeout(timeout)
-                ##	s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVTIMEO, struct.pack('LL', timeout, 0))
-                s.connect((self.server_ip_addr, self.MOTOR_SERVER_PORT))
-                break
-            except ConnectionRefusedError:
-                retry_count += 1
-                print('...connection refused, at',time.ctime(),' Is motor_server process running on remote machine?',
-                           '  Retry', retry_count, '/', RETRIES, "on", str(self.server_ip_addr))
-            except TimeoutError:
-                retry_count += 1
-                print('...connection attempt timed out, at',time.ctime(),
-                           '  Retry', retry_count, '/', RETRIES, "on", str(self.server_ip_addr))
-            except KeyboardInterrupt:
-                sys.exit('_______Halt due to CRTL_C________')
-
-
-        if retry_count >= RETRIES:
-            (" pausing in motor_control.py send_text() function, hit Enter to try again, or ^C: ")
-            s.close()
-            return self.send_text(text, timeout)  # tail-recurse if retry is requested
-
-
-        message = bytearray(text, encoding = 'ASCII')
-        buf = bytearray(2)
-        buf[0] = 0
-        buf[1] = 7
-        for i in range(len(message)):
-            buf.append(message[i])
-        buf.append(13)
-
-        s.send(buf)
-
-        if receive:
-            BUF_SIZE = 2048
-            data = s.recv(BUF_SIZE)
-            return_text = data.decode('ASCII')
-            return return_text
+        if not receive:
+            self.connection().send(text)
+            return None
+        return self.connection().request([text], timeout)[0]
 
-        s.close()
+    def send_commands(self, *texts, timeout:int=None) -> list:
+        """Pipeline several commands in one write; return their replies in order."""
+        return self.connection().request(list(texts), timeout)
 
+    def latency_report(self) -> str:
+        """Per-command round-trip statistics of this drive's connection."""
+        return self.connection().latency_report()
 
 ########################################################################################################
     def steps_per_rev(self):
@@ -279,8 +407,8 @@ class Motor_Control:
 
         while retry_count < RETRIES:
 
-            resp = self.send_text('EP')  # Ask for encoder position
-            resp1 = self.send_text('SP') # Ask for motor internal position
+            resp, resp1 = self.send_commands('EP',  # Ask for encoder position
+                                             'SP')  # Ask for motor internal position
 
             try:
                 pos = float(resp[5:])  /self.__stepsPerRev * self.cm_per_turn
@@ -319,16 +447,14 @@ class Motor_Control:
 
         step = self.cm_to_steps(pos)
 
-        self.send_text('DI'+str(step))
-        self.send_text('FP')
+        self.send_commands('DI'+str(step), 'FP')
 
 #-------------------------------------------------------------------------------------------
     def turn_to(self, step):
         '''
         Turn motor by step
         '''
-        self.send_text('DI'+str(step))
-        self.send_text('FP')
+        self.send_commands('DI'+str(step), 'FP')
 
     def current_step(self):
         '''
@@ -434,7 +560,7 @@ class Motor_Control:
 #===============================================================================================================================================
 #<o> <o> <o> <o> <o> <o> <o> <o> <o> <o> <o> <o> <o> <o> <o> <o> <o> <o> <o> <o> <o> <o> <o> <o> <o> <o> <o> <o> <o> <o> <o> <o> <o> <o> <o> <o> <o>
 #===============================================================================================================================================
-# standalone testing:
+# standalone testing (from the repo root: python -m motion.Motor_Control_1D):
 
 if __name__ == '__main__':
 
@@ -1,8 +1,298 @@
+import heapq
+import itertools
+from collections import OrderedDict
+
 import numpy as np
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
-import inspect
-import re
+
+# Fewest points sampled along a segment when checking a plain-callable boundary.
+_MIN_PATH_SAMPLES = 5
+# Planning lattice: most nodes per axis (the spacing grows to fit), and how
+# many lattices (one per bounds/boundary set) a checker keeps.
+_MAX_LATTICE_CELLS = 40
+_LATTICE_CACHE_SIZE = 8
+# Route tightening: finest compass-search step (cm), and most search rounds.
+_TIGHTEN_MIN_STEP = 0.01
+_TIGHTEN_MAX_ROUNDS = 200
+# Planned moves keep min_clearance from a plain-callable boundary: it must also
+# hold at these offsets (the 26 compass directions, unit length) from each sample.
+_CLEARANCE_DIRECTIONS = np.array([d for d in itertools.product((-1, 0, 1), repeat=3) if any(d)],
+                                 dtype=float)
+_CLEARANCE_DIRECTIONS /= np.linalg.norm(_CLEARANCE_DIRECTIONS, axis=1)[:, None]
+
+#===============================================================================================================================================
+# Geometric boundary primitives
+#===============================================================================================================================================
+
+class Box:
+    """Axis-aligned box ``lo <= (x, y, z) <= hi`` in probe space (cm). Bounds may be +/-inf."""
+
+    def __init__(self, lo, hi):
+        self.lo = np.asarray(lo, dtype=float)
+        self.hi = np.asarray(hi, dtype=float)
+        if self.lo.shape != (3,) or self.hi.shape != (3,) or np.any(self.lo > self.hi):
+            raise ValueError(f"Box needs 3-vectors with lo <= hi, got {lo}, {hi}")
+
+    @property
+    def bounds(self):
+        return self.lo, self.hi
+
+    def contains(self, points):
+        """True for each row of ``points`` (N x 3) inside the box (faces included)."""
+        p = np.atleast_2d(points)
+        return np.all((p >= self.lo) & (p <= self.hi), axis=1)
+
+    def clip(self, p0, p1):
+        """Parameter interval (t0, t1) of segment p0 + t (p1 - p0), 0 <= t <= 1,
+        inside the box, or None if the segment misses it."""
+        p0 = np.asarray(p0, dtype=float)
+        return _clip_slabs(p0, np.asarray(p1, dtype=float) - p0, self.lo, self.hi, 0.0, 1.0)
+
+
+class Cylinder:
+    """Solid cylinder along ``axis`` ('x', 'y' or 'z'): radius ``radius`` about
+    ``center`` (the other two coordinates, in x, y, z order), between
+    ``span = (lo, hi)`` along the axis (unbounded by default)."""
+
+    def __init__(self, axis, center, radius, span=(-np.inf, np.inf)):
+        if axis not in ('x', 'y', 'z'):
+            raise ValueError(f"Cylinder axis must be 'x', 'y' or 'z', got {axis!r}")
+        self.axis = axis
+        self.center = np.asarray(center, dtype=float)
+        self.radius = float(radius)
+        self.span = (float(span[0]), float(span[1]))
+        if self.center.shape != (2,) or self.radius <= 0 or self.span[0] > self.span[1]:
+            raise ValueError(f"Bad cylinder: center {center}, radius {radius}, span {span}")
+        self._k = 'xyz'.index(axis)
+        self._uv = [i for i in range(3) if i != self._k]
+
+    @property
+    def bounds(self):
+        lo, hi = np.empty(3), np.empty(3)
+        lo[self._uv], hi[self._uv] = self.center - self.radius, self.center + self.radius
+        lo[self._k], hi[self._k] = self.span
+        return lo, hi
+
+    def contains(self, points):
+        p = np.atleast_2d(points)
+        r2 = ((p[:, self._uv] - self.center) ** 2).sum(axis=1)
+        along = p[:, self._k]
+        return (r2 <= self.radius ** 2) & (along >= self.span[0]) & (along <= self.span[1])
+
+    def clip(self, p0, p1):
+        p0 = np.asarray(p0, dtype=float)
+        d = np.asarray(p1, dtype=float) - p0
+        k = self._k
+        interval = _clip_slabs(p0[[k]], d[[k]], [self.span[0]], [self.span[1]], 0.0, 1.0)
+        if interval is None:
+            return None
+        # |q + t e|^2 <= r^2 across the axis.
+        q, e = p0[self._uv] - self.center, d[self._uv]
+        a, b, c = e @ e, 2 * (q @ e), q @ q - self.radius ** 2
+        if a == 0:
+            return interval if c <= 0 else None
+        disc = b * b - 4 * a * c
+        if disc < 0:
+            return None
+        root = np.sqrt(disc)
+        t0, t1 = max(interval[0], (-b - root) / (2 * a)), min(interval[1], (-b + root) / (2 * a))
+        return (t0, t1) if t0 <= t1 else None
+
+
+class HalfSpace:
+    """Half-space ``normal . (x, y, z) <= offset``."""
+
+    def __init__(self, normal, offset):
+        self.normal = np.asarray(normal, dtype=float)
+        self.offset = float(offset)
+        if self.normal.shape != (3,) or not self.normal.any():
+            raise ValueError(f"HalfSpace needs a non-zero 3-vector normal, got {normal}")
+
+    @property
+    def bounds(self):
+        lo, hi = np.full(3, -np.inf), np.full(3, np.inf)
+        axes = np.flatnonzero(self.normal)
+        if len(axes) == 1:                       # axis-aligned: one finite face
+            k = axes[0]
+            if self.normal[k] > 0:
+                hi[k] = self.offset / self.normal[k]
+            else:
+                lo[k] = self.offset / self.normal[k]
+        return lo, hi
+
+    def contains(self, points):
+        return np.atleast_2d(points) @ self.normal <= self.offset
+
+    def clip(self, p0, p1):
+        p0 = np.asarray(p0, dtype=float)
+        nd = self.normal @ (np.asarray(p1, dtype=float) - p0)
+        gap = self.offset - self.normal @ p0
+        if nd == 0:
+            return (0.0, 1.0) if gap >= 0 else None
+        t0, t1 = (0.0, min(1.0, gap / nd)) if nd > 0 else (max(0.0, gap / nd), 1.0)
+        return (t0, t1) if t0 <= t1 else None
+
+
+_REGIONS = (Box, Cylinder, HalfSpace)
+
+
+def _clip_slabs(p0, d, lo, hi, t0, t1):
+    """Liang-Barsky: narrow (t0, t1) to where p0 + t d lies within [lo, hi] on each axis."""
+    for k in range(len(p0)):
+        if d[k] == 0:
+            if p0[k] < lo[k] or p0[k] > hi[k]:
+                return None
+            continue
+        ta, tb = (lo[k] - p0[k]) / d[k], (hi[k] - p0[k]) / d[k]
+        if ta > tb:
+            ta, tb = tb, ta
+        t0, t1 = max(t0, ta), min(t1, tb)
+        if t0 > t1:
+            return None
+    return t0, t1
+
+
+class KeepOut:
+    """Boundary function: a position is valid if it is outside ``region``."""
+
+    def __init__(self, region):
+        self.region = region
+
+    def __call__(self, x, y, z):
+        return not self.region.contains((x, y, z))[0]
+
+    def valid(self, points):
+        return ~self.region.contains(points)
+
+    def segment_valid(self, p0, p1):
+        return self.region.clip(p0, p1) is None
+
+
+class KeepIn:
+    """Boundary function: a position is valid if it is inside ``region``."""
+
+    def __init__(self, region):
+        self.region = region
+
+    def __call__(self, x, y, z):
+        return bool(self.region.contains((x, y, z))[0])
+
+    def valid(self, points):
+        return self.region.contains(points)
+
+    def segment_valid(self, p0, p1):
+        interval = self.region.clip(p0, p1)
+        return interval is not None and interval[0] <= 0 and interval[1] >= 1
+
+
+def boundary_mask(boundary_func, points):
+    """Evaluate ``boundary_func`` at every row of ``points`` (N x 3); True where valid.
+
+    KeepIn/KeepOut primitives are evaluated as one array operation. A plain
+    callable is first called with whole coordinate arrays, which works for
+    numpy-expressible predicates (``&``, ``|``, ``np.hypot``...); one that
+    cannot take arrays (chained comparisons, ``and``/``or``, ``math``) is
+    called per point.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    valid = getattr(boundary_func, 'valid', None)
+    if valid is not None:
+        return np.asarray(valid(points), dtype=bool)
+    if len(points) > 1:
+        try:
+            with np.errstate(all='ignore'):
+                out = np.asarray(boundary_func(*points.T))
+            return np.broadcast_to(out, (len(points),)).astype(bool)
+        except (TypeError, ValueError):
+            pass
+    return np.fromiter((bool(boundary_func(*p)) for p in points.tolist()), dtype=bool,
+                       count=len(points))
+
+
+class _PlanningLattice:
+    """Regular grid of probe positions over ``lo..hi`` with a free/blocked flag
+    per node, searched with A* (26-connected). With ``is_clear`` (and its
+    ``clearance`` in cm), free nodes within that distance of a blocked node must
+    also pass ``is_clear``; nodes farther in are taken as clear."""
+
+    def __init__(self, lo, hi, spacing, is_free, is_clear=None, clearance=0.0):
+        self.axes = [lo[k] + spacing * np.arange(int(np.floor((hi[k] - lo[k]) / spacing + 1e-9)) + 1)
+                     for k in range(3)]
+        self.shape = tuple(len(a) for a in self.axes)
+        self.spacing = spacing
+        self.coords = np.stack(np.meshgrid(*self.axes, indexing='ij'), axis=-1).reshape(-1, 3)
+        self.free = is_free(self.coords)
+        if is_clear is not None and clearance > 0:
+            near = self._near_blocked(int(np.ceil(clearance / spacing)))
+            self.free[near] = is_clear(self.coords[near])
+        # A diagonal step also needs the nodes of the cube it crosses free, so it
+        # cannot cut the corner of an obstacle between two free nodes.
+        self._steps = []
+        for d in itertools.product((-1, 0, 1), repeat=3):
+            if any(d):
+                corners = [c for c in itertools.product(*[(0, v) if v else (0,) for v in d])
+                           if any(c) and c != d]
+                self._steps.append((d, corners, spacing * np.sqrt(sum(v * v for v in d))))
+
+    def _near_blocked(self, r):
+        """Indices of free nodes with a blocked node within ``r`` steps per axis."""
+        blocked = np.pad(~self.free.reshape(self.shape), r, constant_values=False)
+        near = np.zeros(self.shape, dtype=bool)
+        nx, ny, nz = self.shape
+        for i, j, k in itertools.product(range(2 * r + 1), repeat=3):
+            near |= blocked[i:i + nx, j:j + ny, k:k + nz]
+        return np.flatnonzero(near.ravel() & self.free)
+
+    def free_nodes_near(self, pos):
+        """Free nodes of the 4 x 4 x 4 block around ``pos``."""
+        ranges = []
+        for k in range(3):
+            c = int(np.floor((pos[k] - self.axes[k][0]) / self.spacing))
+            ranges.append(range(max(c - 1, 0), min(c + 3, self.shape[k])))
+        nodes = np.ravel_multi_index(np.array(list(itertools.product(*ranges))).T, self.shape)
+        return nodes[self.free[nodes]]
+
+    def search(self, starts, goals, target):
+        """Cheapest node route from ``starts`` ({node: entry cost}) to any of
+        ``goals`` ({node: exit cost}), or None. ``target`` is the end position
+        (A* heuristic)."""
+        nx, ny, nz = self.shape
+        h = np.linalg.norm(self.coords - np.asarray(target, dtype=float), axis=1).tolist()
+        cost = dict(starts)
+        came_from = {}
+        heap = [(g + h[n], g, n) for n, g in starts.items()]
+        heapq.heapify(heap)
+        best_exit, best_total = None, np.inf
+        while heap:
+            f, g, node = heapq.heappop(heap)
+            if f >= best_total:
+                break
+            if g > cost.get(node, np.inf):
+                continue
+            if node in goals and g + goals[node] < best_total:
+                best_exit, best_total = node, g + goals[node]
+            i, rem = divmod(node, ny * nz)
+            j, k = divmod(rem, nz)
+            for (di, dj, dk), corners, step in self._steps:
+                a, b, c = i + di, j + dj, k + dk
+                if not (0 <= a < nx and 0 <= b < ny and 0 <= c < nz):
+                    continue
+                nbr = (a * ny + b) * nz + c
+                if not self.free[nbr] or not all(
+                        self.free[((i + ci) * ny + j + cj) * nz + k + ck] for ci, cj, ck in corners):
+                    continue
+                g2 = g + step
+                if g2 < cost.get(nbr, np.inf):
+                    cost[nbr] = g2
+                    came_from[nbr] = node
+                    heapq.heappush(heap, (g2 + h[nbr], g2, nbr))
+        if best_exit is None:
+            return None
+        route = [best_exit]
+        while route[-1] in came_from:
+            route.append(came_from[route[-1]])
+        return [self.coords[n] for n in reversed(route)]
 
 #===============================================================================================================================================
 #===============================================================================================================================================
@@ -13,38 +303,46 @@ class BoundaryChecker:
         self.outer_boundary = None  # Function defining the valid workspace
         self.obstacle_boundaries = []  # Functions defining obstacles
         self.motor_boundaries = []
-        self.check_resolution = 0.1
+        self.check_resolution = 0.1  # cm between samples when checking a path against a plain callable
+        # cm that planned routes (find_path) keep from plain-callable boundaries,
+        # which are only sampled: it covers the gaps between samples. Primitives
+        # are checked exactly and carry their own buffer.
         self.min_clearance = 1.0
         self.verbose = verbose
-        self.safe_x = 0  # Default safe x position when no obstacles
-        
+        # Planner: lattice spacing (cm), and the region it covers. planning_bounds
+        # = (lo, hi) overrides; by default the outer boundary's primitive bounds,
+        # else the start/end box padded by planning_margin on unbounded axes.
+        self.planning_resolution = 1.0
+        self.planning_bounds = None
+        self.planning_margin = 10.0
+        self._lattices = OrderedDict()
+
     def _debug_print(self, *args, **kwargs):
         """Helper method for debug printing"""
         if self.verbose:
             print(*args, **kwargs)
-            
+
     def add_probe_boundary(self, boundary_func, is_outer_boundary=False):
         """Add a boundary function that operates in probe space
         Args:
-            boundary_func: Function that returns True if position is valid
+            boundary_func: Function that returns True if position is valid, or a
+                Box/Cylinder/HalfSpace: the workspace (outer) or an obstacle to avoid
             is_outer_boundary: If True, this defines the valid workspace limits
         """
+        if isinstance(boundary_func, _REGIONS):
+            boundary_func = KeepIn(boundary_func) if is_outer_boundary else KeepOut(boundary_func)
         if is_outer_boundary:
             self.outer_boundary = boundary_func
         else:
             self.obstacle_boundaries.append(boundary_func)
-            # For the first obstacle, set safe_x to be 5cm beyond the obstacle's max x
-            if len(self.obstacle_boundaries) == 1:
-                source = inspect.getsource(boundary_func)
-                # Get the second number in the x range (x_max)
-                x_max = float(re.findall(r'-?\d+(?:\.\d+)?', source)[1])
-                self.safe_x = x_max + 5  # Set safe_x 5cm beyond obstacle's max x
-                self._debug_print(f"Safe x position set to: {self.safe_x}")
-        
+
     def add_motor_boundary(self, boundary_func):
         """Add a boundary function that operates in motor space"""
         self.motor_boundaries.append(boundary_func)
 
+    def _probe_boundaries(self):
+        return ([self.outer_boundary] if self.outer_boundary else []) + list(self.obstacle_boundaries)
+
     def is_position_valid(self, probe_pos, motor_pos=None):
         """Check if position is valid in probe space (and motor space if given)."""
         x, y, z = probe_pos
@@ -61,14 +359,23 @@ class BoundaryChecker:
             for boundary in self.motor_boundaries:
                 if not boundary(mx, my, mz):
                     return False
-                
+
         return True
 
+    def positions_valid(self, points):
+        """Vectorized is_position_valid over the rows of ``points`` (N x 3, probe space)."""
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        valid = np.ones(len(points), dtype=bool)
+        for boundary in self._probe_boundaries():
+            valid[valid] = boundary_mask(boundary, points[valid])
+        return valid
+
     def is_path_valid(self, start_pos, end_pos):
-        """Check if straight line path between points is valid"""
-        x1, y1, z1 = start_pos
-        x2, y2, z2 = end_pos
-        
+        """Check if straight line path between points is valid.
+
+        Primitive boundaries are tested exactly (segment/solid intersection);
+        plain callables are sampled every ``check_resolution`` cm along the path.
+        """
         # If start or end point is invalid, path is invalid
         if not self.is_position_valid(start_pos):
             self._debug_print(f"Start position {start_pos} is invalid")
@@ -76,60 +383,180 @@ class BoundaryChecker:
         if not self.is_position_valid(end_pos):
             self._debug_print(f"End position {end_pos} is invalid")
             return False
-            
-        # For each obstacle boundary
-        for obstacle in self.obstacle_boundaries:
-            dx = x2 - x1
-            dy = y2 - y1
-            dz = z2 - z1
-            
-            # Check several points, with more checks if the distance is larger
-            distance = np.sqrt(dx*dx + dy*dy + dz*dz)
-            num_checks = max(5, int(distance))  # At least 5 checks, more for longer distances
-            
-            for i in range(num_checks + 1):
-                t = i / num_checks
-                point = (
-                    x1 + t*dx,
-                    y1 + t*dy,
-                    z1 + t*dz
-                )
-                
-                # If any point along the line is inside the obstacle, path is invalid
-                if not obstacle(*point):
-                    self._debug_print(f"Path intersects obstacle at point {point} (t={t:.2f})")
+
+        start = np.asarray(start_pos, dtype=float)
+        end = np.asarray(end_pos, dtype=float)
+        samples = None
+        for boundary in self._probe_boundaries():
+            segment_valid = getattr(boundary, 'segment_valid', None)
+            if segment_valid is not None:
+                if not segment_valid(start, end):
+                    self._debug_print(f"Path {start_pos} -> {end_pos} crosses {boundary.region}")
                     return False
-                    
+                continue
+            if samples is None:
+                samples = self._path_samples(start, end)
+            bad = np.flatnonzero(~boundary_mask(boundary, samples))
+            if len(bad):
+                self._debug_print(f"Path intersects obstacle at point {tuple(samples[bad[0]])}")
+                return False
+
         return True
 
+    def _path_samples(self, start, end, spacing=None):
+        num_checks = max(_MIN_PATH_SAMPLES,
+                         int(np.ceil(np.linalg.norm(end - start) / (spacing or self.check_resolution))))
+        return start + np.linspace(0, 1, num_checks + 1)[:, None] * (end - start)
+
+    def _sampled_boundaries(self):
+        return [b for b in self._probe_boundaries() if not hasattr(b, 'segment_valid')]
+
+    def _clear(self, points):
+        """True for each row of ``points`` (N x 3) that every plain-callable
+        boundary accepts at min_clearance in each compass direction as well."""
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        clear = np.ones(len(points), dtype=bool)
+        if self.min_clearance <= 0:
+            return clear
+        for boundary in self._sampled_boundaries():
+            probes = points[clear][:, None, :] + self.min_clearance * _CLEARANCE_DIRECTIONS
+            ok = boundary_mask(boundary, probes.reshape(-1, 3))
+            clear[clear] = ok.reshape(-1, len(_CLEARANCE_DIRECTIONS)).all(axis=1)
+        return clear
+
+    def _planned_move_valid(self, p0, p1, ends):
+        """is_path_valid for a move the planner chose, plus min_clearance from
+        plain-callable boundaries along it, so the route cannot cut a corner
+        between two check_resolution samples. Near an end of the requested move
+        (``ends``) that is itself closer than min_clearance, the clearance is
+        waived: the probe has to get there."""
+        if not self.is_path_valid(tuple(p0), tuple(p1)):
+            return False
+        if self.min_clearance <= 0 or not self._sampled_boundaries():
+            return True
+        # A clear sample keeps a box obstacle >= min_clearance / sqrt(3) away, so
+        # samples min_clearance / 2 apart leave no gap along the move.
+        samples = self._path_samples(np.asarray(p0, dtype=float), np.asarray(p1, dtype=float),
+                                     self.min_clearance / 2)
+        need = np.ones(len(samples), dtype=bool)
+        for end, end_clear in ends:
+            if not end_clear:
+                need &= np.linalg.norm(samples - end, axis=1) > self.min_clearance
+        return bool(self._clear(samples[need]).all())
+
     def find_path(self, start_pos, end_pos):
-        """Find path by first moving in +x direction to clear obstacle,
-        then to target y,z, then back to target x"""
+        """Shortest safe route from start_pos to end_pos, as the waypoints after
+        start_pos (ending with end_pos); [end_pos] if the straight move is valid.
+
+        Otherwise A* over a lattice of valid probe positions (planning_resolution
+        spacing, built once per bounds and boundary set and cached), connected to
+        both ends by valid straight moves, then shortened by replacing runs of
+        waypoints with straight moves wherever that stays valid and pulling
+        the remaining waypoints taut against the obstacles (see _tighten). Primitive
+        boundaries carry their own safety buffer, so the route may pass right
+        along one. Plain callables are only sampled, so planned moves keep
+        min_clearance from them (see _planned_move_valid).
 
-        # If direct path is valid, return it
+        Raises ValueError if either end is invalid or no route exists.
+        """
         if self.is_path_valid(start_pos, end_pos):
             return [end_pos]
-            
-        x1, y1, z1 = start_pos
-        x2, y2, z2 = end_pos
-        
-        # Create waypoint at safe x position
-        waypoint1 = (self.safe_x, y1, z1)
-        
-        # Check if path to first waypoint is valid
-        if not self.is_path_valid(start_pos, waypoint1):
-            raise ValueError("Cannot find safe path to clear obstacle in x direction")
-            
-        # Now move to target y,z coordinates while staying at safe_x
-        waypoint2 = (self.safe_x, y2, z2)
-        if not self.is_path_valid(waypoint1, waypoint2):
-            raise ValueError("Cannot find safe path to target y,z coordinates")
-            
-        # Finally move back to target x
-        if not self.is_path_valid(waypoint2, end_pos):
-            raise ValueError("Cannot find safe path to final target")
-            
-        return [waypoint1, waypoint2, end_pos]
+        for label, pos in (("Start", start_pos), ("Target", end_pos)):
+            if not self.is_position_valid(pos):
+                raise ValueError(f"{label} position {pos} is not valid")
+
+        start = np.asarray(start_pos, dtype=float)
+        end = np.asarray(end_pos, dtype=float)
+        ends = [(p, bool(self._clear(p)[0])) for p in (start, end)]
+
+        def move_valid(p0, p1):
+            return self._planned_move_valid(p0, p1, ends)
+
+        lattice = self._planning_lattice(start, end)
+        starts = {int(n): float(np.linalg.norm(lattice.coords[n] - start))
+                  for n in lattice.free_nodes_near(start)
+                  if move_valid(start, lattice.coords[n])}
+        goals = {int(n): float(np.linalg.norm(lattice.coords[n] - end))
+                 for n in lattice.free_nodes_near(end)
+                 if move_valid(lattice.coords[n], end)}
+        route = lattice.search(starts, goals, end) if starts and goals else None
+        if route is None:
+            raise ValueError(f"No safe path from {start_pos} to {end_pos}")
+
+        route = [start] + route + [end]
+        waypoints, i = [], 0
+        while i < len(route) - 1:
+            j = next((j for j in range(len(route) - 1, i, -1)
+                      if move_valid(route[i], route[j])), None)
+            if j is None:
+                raise ValueError(f"No safe path from {start_pos} to {end_pos} at "
+                                 f"{self.planning_resolution} cm planning resolution")
+            waypoints.append(route[j])
+            i = j
+        waypoints = self._tighten([start] + waypoints, lattice.spacing / 2, move_valid)[1:]
+        self._debug_print(f"Path {start_pos} -> {end_pos} via {len(waypoints) - 1} waypoint(s)")
+        return [tuple(float(c) for c in p) for p in waypoints[:-1]] + [end_pos]
+
+    def _tighten(self, route, step, move_valid):
+        """Shorten ``route`` (start, waypoints..., end) off the lattice: compass
+        search moving each waypoint by ``step`` (along the axes and diagonals) while that
+        shortens the route and both adjacent moves stay ``move_valid``, halving ``step``
+        when nothing improves, and dropping waypoints that become unnecessary.
+        Waypoints end up sliding along the obstacles they wrap around."""
+        route = [np.asarray(p, dtype=float) for p in route]
+        directions = np.array([d for d in itertools.product((-1, 0, 1), repeat=3) if any(d)], dtype=float)
+        directions /= np.linalg.norm(directions, axis=1)[:, None]
+        for _ in range(_TIGHTEN_MAX_ROUNDS):
+            if step < _TIGHTEN_MIN_STEP:
+                break
+            improved = False
+            for i in range(1, len(route) - 1):
+                prev, nxt = route[i - 1], route[i + 1]
+                for d in directions:
+                    cur = route[i]
+                    cand = cur + step * d
+                    gain = (np.linalg.norm(cur - prev) + np.linalg.norm(nxt - cur)
+                            - np.linalg.norm(cand - prev) - np.linalg.norm(nxt - cand))
+                    if gain > 1e-9 and move_valid(prev, cand) and move_valid(cand, nxt):
+                        route[i] = cand
+                        improved = True
+            i = 1
+            while i < len(route) - 1:
+                if move_valid(route[i - 1], route[i + 1]):
+                    del route[i]
+                    improved = True
+                else:
+                    i += 1
+            if not improved:
+                step /= 2
+        return route
+
+    def _planning_lattice(self, start, end):
+        if self.planning_bounds is not None:
+            lo, hi = (np.asarray(b, dtype=float) for b in self.planning_bounds)
+        else:
+            region = getattr(self.outer_boundary, 'region', None)
+            if isinstance(self.outer_boundary, KeepIn):
+                lo, hi = (b.copy() for b in region.bounds)
+            else:
+                lo, hi = np.full(3, -np.inf), np.full(3, np.inf)
+            # Pad unbounded axes around the move, snapped to the margin so that
+            # nearby moves share one lattice.
+            m = self.planning_margin
+            lo = np.where(np.isfinite(lo), lo, np.floor((np.minimum(start, end) - m) / m) * m)
+            hi = np.where(np.isfinite(hi), hi, np.ceil((np.maximum(start, end) + m) / m) * m)
+        spacing = max(self.planning_resolution, float((hi - lo).max()) / _MAX_LATTICE_CELLS)
+        key = (tuple(lo), tuple(hi), spacing, self.min_clearance, tuple(self._probe_boundaries()))
+        lattice = self._lattices.get(key)
+        if lattice is None:
+            lattice = _PlanningLattice(lo, hi, spacing, self.positions_valid,
+                                       self._clear, self.min_clearance)
+            self._lattices[key] = lattice
+            if len(self._lattices) > _LATTICE_CACHE_SIZE:
+                self._lattices.popitem(last=False)
+        else:
+            self._lattices.move_to_end(key)
+        return lattice
 
 #===============================================================================================================================================
 # Test functions
@@ -227,8 +654,6 @@ def test_small_box_obstacle():
     checker = BoundaryChecker(verbose=False)  # Set to True to enable debug prints
     checker.check_resolution = 0.1  # Finer resolution for small obstacle
     checker.min_clearance = 1.0    # Increased minimum clearance
-    checker.buffer = 0.5           # Safety buffer
-    checker.min_offset = 4.0       # Minimum offset for path finding
     
     # Define boundaries and obstacles
     def outer_boundary(x, y, z):
@@ -245,10 +670,6 @@ def test_small_box_obstacle():
     checker.add_probe_boundary(outer_boundary, is_outer_boundary=True)
     checker.add_probe_boundary(small_box_obstacle)
     
-    # Print the calculated obstacle dimensions and offsets
-    print(f"Obstacle dimensions: {checker.obstacle_dimensions}")
-    print(f"XY offset: {checker.xy_offset}, Z offset: {checker.z_offset}")
-    
     # Define test cases that require obstacle avoidance
     test_cases = [
         ((4, 0, 0), (-4, 0, 0), "X-axis path around obstacle"),
@@ -277,7 +698,7 @@ def test_small_box_obstacle():
         
         try:
             # Try to find a path
-            path = [start_point] + checker.find_alternative_path(start_point, end_point)
+            path = [start_point] + checker.find_path(start_point, end_point)
             print("Found path with waypoints:")
             for j, point in enumerate(path):
                 print(f"Point {j}: {point}")
@@ -383,7 +804,7 @@ def test_lapd_boundaries():
                 continue
             
             # Try to find a path
-            path = [start_point] + checker.find_alternative_path(start_point, end_point)
+            path = [start_point] + checker.find_path(start_point, end_point)
             print("Found path with waypoints:")
             for j, point in enumerate(path):
                 print(f"Point {j}: {point}")
@@ -19,6 +19,8 @@ import numpy as np
 import h5py
 from .Motor_Control import Motor_Control_2D, Motor_Control_3D
 from .Motor_Control_1D import Motor_Control
+from . import scan_order as scan_order_module
+from .obstacle_avoidance import boundary_mask
 
 # Chunk for the append-only positions_array (see acquisition.spool_adapter for
 # the matching offload writer); 1024 rows ~16 KB keeps per-shot appends in-chunk.
@@ -294,6 +296,44 @@ def motor_boundary_2D(x, y, z, config):
     return in_outer_boundary
 
 
+# Probe/motor limit keys of [position] checked by PositionManager.plan_motor_targets,
+# per coordinate column (x, y, z). Absent keys are not checked.
+_PROBE_LIMIT_KEYS = ('x_limits', 'y_limits', 'z_limits')
+_MOTOR_LIMIT_KEYS = ('xm_limits', 'ym_limits', 'zm_limits')
+# Chamber-wall radius enforced by Motor_Control_2D/3D.probe_positions.
+_MAX_PROBE_RADIUS = 40
+# How many unreachable points a plan-validation error lists before summarizing.
+_MAX_LISTED_UNREACHABLE = 20
+
+
+def _outside_limits(values, config, keys):
+    """Boolean mask of rows of ``values`` (N x ncols) outside any configured
+    ``[lo, hi]`` limit in ``keys`` (one key per column)."""
+    bad = np.zeros(len(values), dtype=bool)
+    for col, key in enumerate(keys[:values.shape[1]]):
+        limits = (config or {}).get(key)
+        if limits is not None:
+            bad |= (values[:, col] < limits[0]) | (values[:, col] > limits[1])
+    return bad
+
+
+def _fails_predicates(points, predicates):
+    """Boolean mask of ``points`` rejected by any ``predicate(x, y, z)``.
+
+    Predicates are evaluated with obstacle_avoidance.boundary_mask (one array
+    operation for primitives and numpy-expressible callables), once per distinct
+    point (duplicate shots share a position).
+    """
+    bad = np.zeros(len(points), dtype=bool)
+    if not predicates:
+        return bad
+    unique, inverse = np.unique(points, axis=0, return_inverse=True)
+    unique_bad = np.zeros(len(unique), dtype=bool)
+    for pred in predicates:
+        unique_bad |= ~boundary_mask(pred, unique)
+    return unique_bad[inverse.ravel()]
+
+
 
 # ============================================================================
 # MAIN POSITION MANAGER CLASS
@@ -341,6 +381,16 @@ class PositionManager:
         else:
             # For 3D movement, get_positions_xyz returns (positions, xpos, ypos, zpos)
             self.positions, self.xpos, self.ypos, self.zpos = positions_result
+
+        # Visiting order of the plan; apply_scan_order() may change it from raster
+        self.scan_order = 'raster'
+
+        # Motor-space plan, filled by plan_motor_targets() at run start
+        self.motor_targets = None
+        self.motor_velocities = None
+        self.direct_moves = None
+        self._plan_coords = None
+        self._last_planned_move = None
         
     def get_positions(self):
         """Get position arrays based on acquisition type"""
@@ -369,6 +419,42 @@ class PositionManager:
             else:
                 return get_positions_xyz(pos_params)
     
+    def apply_scan_order(self, mc=None):
+        """Reorder the plan by ``scan_order`` in [position] (see motion/scan_order.py).
+
+        ``raster`` (default) keeps the generated order; ``serpentine`` snakes
+        through the grid; ``tsp`` minimizes the motion time of drive ``mc``
+        (falls back to serpentine without a drive). Call before
+        :meth:`initialize_position_hdf5` so ``positions_setup_array`` records
+        the executed order; shot numbers are renumbered 1..N along it.
+        Returns the order applied.
+        """
+        requested = str((self.pos_config or {}).get('scan_order', 'raster')).strip().lower()
+        if requested not in scan_order_module.SCAN_ORDERS:
+            raise ValueError(f"Unknown scan_order '{requested}' in [position]; "
+                             f"valid: {', '.join(scan_order_module.SCAN_ORDERS)}")
+        if self.is_45deg or self.pos_config is None or requested == 'raster':
+            return self.scan_order
+        if requested == 'tsp' and mc is None:
+            print("Warning: scan_order = tsp needs the motor drive; using serpentine")
+            requested = 'serpentine'
+
+        block = len(self.positions) // self.num_run_repeats
+        coords = self.plan_coordinates()[:block:self.num_duplicate_shots]
+        if requested == 'serpentine':
+            order = scan_order_module.serpentine_order(coords)
+        else:
+            order = scan_order_module.tsp_order(mc, coords)
+        if mc is not None:
+            before = scan_order_module.plan_travel_time(mc, coords)
+            after = scan_order_module.plan_travel_time(mc, coords, order)
+            print(f"Scan order {requested}: estimated motion time per pass "
+                  f"{after:.0f} s (raster {before:.0f} s)")
+        self.positions = scan_order_module.reorder_plan(
+            self.positions, order, self.num_duplicate_shots, self.num_run_repeats)
+        self.scan_order = requested
+        return requested
+
     def initialize_position_hdf5(self, append_mode=False):
         """Initialize HDF5 position structure and return positions.
 
@@ -391,11 +477,11 @@ class PositionManager:
                     'P34': [('shot_num', '>u4'), ('x', '>f4')],
                     'P42': [('shot_num', '>u4'), ('x', '>f4')]}
         else:
+            # The plan as it will be executed (apply_scan_order may have reordered it).
+            positions, xpos, ypos, zpos = self.positions, self.xpos, self.ypos, self.zpos
             if self.nz is None:
-                positions, xpos, ypos = self.get_positions()
                 dtype = [('shot_num', '>u4'), ('x', '>f4'), ('y', '>f4')]
             else:
-                positions, xpos, ypos, zpos = self.get_positions()
                 dtype = [('shot_num', '>u4'), ('x', '>f4'), ('y', '>f4'), ('z', '>f4')]
 
         with h5py.File(self.save_path, 'a') as f:
@@ -425,6 +511,7 @@ class PositionManager:
                     # Create positions setup array with metadata
                     pos_ds = pos_grp.create_dataset('positions_setup_array', data=positions, dtype=dtype)
                     pos_ds.attrs['xpos'] = xpos
+                    pos_ds.attrs['scan_order'] = self.scan_order
                     if not self.is_45deg:
                         pos_ds.attrs['ypos'] = ypos
                         if self.nz is not None:
@@ -458,6 +545,114 @@ class PositionManager:
                     # 3D case - need x, y, and z
                     pos_arr[shot_num-1] = (shot_num, positions['x'], positions['y'], positions['z'])
 
+    # ============================================================================
+    # MOTION PLAN FUNCTIONS
+    # ============================================================================
+    def plan_coordinates(self):
+        """Planned probe positions as an (N, 2) or (N, 3) float array (x, y[, z])."""
+        axes = ('x', 'y') if self.nz is None else ('x', 'y', 'z')
+        return np.column_stack([self.positions[a].astype(float) for a in axes])
+
+    def plan_motor_targets(self, mc):
+        """Transform the whole plan to motor space and validate it, in one pass.
+
+        Every planned position is converted with ``mc.probe_to_motor_LAPD`` in a
+        single vectorized call and checked against everything the drive's
+        ``probe_positions`` setter would reject at move time -- the chamber-wall
+        radius, the probe/motor limits of [position] (x/y/z_limits,
+        xm/ym/zm_limits) and the drive's BoundaryChecker (outer, obstacle and
+        motor boundaries) -- plus positions with no motor solution.
+
+        On success caches, for the run loop (see :meth:`move_to_planned`):
+          - ``motor_targets``: (N, naxes) motor positions;
+          - ``motor_velocities``: (N, naxes) per-move motor velocities assuming
+            the previous planned target was reached (row 0 is NaN: the first
+            move starts wherever the probe is);
+          - ``direct_moves``: (N,) True where the straight move from the
+            previous target needs no obstacle waypoints.
+
+        Raises ValueError listing the unreachable points (shot number and
+        position), so a bad plan fails before the run starts instead of
+        skipping shots one by one.
+        """
+        coords = self.plan_coordinates()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            motor = np.column_stack(mc.probe_to_motor_LAPD(*coords.T))
+
+        checker = mc.boundary_checker
+        points3 = coords if coords.shape[1] == 3 else np.column_stack([coords, np.zeros(len(coords))])
+        motor3 = motor if motor.shape[1] == 3 else np.column_stack([motor, np.zeros(len(motor))])
+        checks = [
+            ("no motor solution", ~np.isfinite(motor).all(axis=1)),
+            ("too close to the chamber wall",
+             np.hypot(coords[:, 0], coords[:, 1]) > _MAX_PROBE_RADIUS),
+            ("outside probe limits", _outside_limits(coords, self.pos_config, _PROBE_LIMIT_KEYS)),
+            ("outside motor limits", _outside_limits(motor, self.pos_config, _MOTOR_LIMIT_KEYS)),
+        ]
+        if self.nz is not None:
+            # Only the 3D drive checks probe-space boundaries at move time.
+            outer = [checker.outer_boundary] if checker.outer_boundary else []
+            checks.append(("outside probe outer boundary", _fails_predicates(points3, outer)))
+            checks.append(("collides with obstacle",
+                           _fails_predicates(points3, checker.obstacle_boundaries)))
+        finite = np.isfinite(motor3).all(axis=1)
+        motor_bad = np.zeros(len(coords), dtype=bool)
+        motor_bad[finite] = _fails_predicates(motor3[finite], checker.motor_boundaries)
+        checks.append(("outside motor boundaries", motor_bad))
+
+        unreachable = np.zeros(len(coords), dtype=bool)
+        for _, bad in checks:
+            unreachable |= bad
+        if unreachable.any():
+            lines = []
+            for i in np.flatnonzero(unreachable)[:_MAX_LISTED_UNREACHABLE]:
+                why = ", ".join(label for label, bad in checks if bad[i])
+                lines.append(f"  shot {int(self.positions['shot_num'][i])} "
+                             f"{tuple(round(float(c), 3) for c in coords[i])}: {why}")
+            more = int(unreachable.sum()) - len(lines)
+            if more:
+                lines.append(f"  ... and {more} more")
+            raise ValueError(f"{int(unreachable.sum())} of {len(coords)} planned positions "
+                             f"are unreachable:\n" + "\n".join(lines))
+
+        velocities = np.full_like(motor, np.nan)
+        if len(motor) > 1:
+            velocities[1:] = np.column_stack(mc.calculate_velocity(*np.abs(np.diff(motor, axis=0)).T))
+
+        direct = np.ones(len(coords), dtype=bool)
+        direct[0] = False
+        if self.nz is not None and checker.obstacle_boundaries:
+            for i in range(1, len(coords)):
+                if not np.array_equal(coords[i], coords[i - 1]):
+                    direct[i] = checker.is_path_valid(tuple(coords[i - 1]), tuple(coords[i]))
+
+        self._plan_coords = coords
+        self.motor_targets = motor
+        self.motor_velocities = velocities
+        self.direct_moves = direct
+        self._last_planned_move = None
+        return motor
+
+    def move_to_planned(self, mc, index):
+        """Move to planned position ``index`` using the cached motor-space plan.
+
+        A direct move straight after the previous planned move succeeded uses the
+        cached target and velocity. Any other move (the first, one after a failed
+        move, or one needing obstacle waypoints) goes through
+        ``mc.probe_positions``, which plans from the probe's actual position.
+        Raises whatever the drive raises; the move is then not counted as
+        reached.
+        """
+        if self.motor_targets is None:
+            raise RuntimeError("plan_motor_targets() has not been run")
+        self._last_planned_move, previous = None, self._last_planned_move
+        if self.direct_moves[index] and previous == index - 1:
+            mc.motor_velocity = tuple(float(v) for v in self.motor_velocities[index])
+            mc.motor_positions = tuple(float(m) for m in self.motor_targets[index])
+        else:
+            mc.probe_positions = tuple(float(c) for c in self._plan_coords[index])
+        self._last_planned_move = index
+
     # ============================================================================
     # MOTOR CONTROL FUNCTIONS
     # ============================================================================
@@ -0,0 +1,219 @@
+"""
+Travel-time-aware visiting order for grid position plans.
+
+get_positions_xy/xyz emit positions in raster order: every row starts back at
+xmin, so each row ends with a full-width flyback. This module reorders the
+distinct positions of a plan (duplicate shots stay together; each run repeat
+traverses the order, odd repeats in reverse so the probe never flies back):
+
+* ``raster``     -- unchanged (the default);
+* ``serpentine`` -- boustrophedon: alternate rows run backwards (and, in 3D,
+                    alternate z layers walk their rows backwards), so every
+                    move is one grid step;
+* ``tsp``        -- the cheaper of a nearest-neighbour tour and the
+                    serpentine, improved by 2-opt, over the actual
+                    move time of the drive: per-axis velocities as the drive's
+                    ``calculate_velocity`` sets them (``set_movement_velocity``
+                    semantics), each axis's ``cm_per_turn``, and the slowest
+                    axis deciding. On a 3D drive with obstacle boundaries a move
+                    whose straight path is blocked costs its BoundaryChecker
+                    detour (``find_path`` waypoints), or is forbidden if none.
+
+Select with ``scan_order = serpentine`` (or ``tsp``) in ``[position]``.
+:meth:`PositionManager.apply_scan_order` applies it before the HDF5 position
+group is written, so ``positions_setup_array`` holds the executed order with
+shot numbers renumbered 1..N (and a ``scan_order`` attr).
+"""
+
+import time
+
+import numpy as np
+
+SCAN_ORDERS = ('raster', 'serpentine', 'tsp')
+
+# 2-opt: candidate neighbours per position, and wall-clock budget per plan.
+_TSP_NEIGHBOURS = 8
+_TSP_TWO_OPT_SECONDS = 5.0
+# Slowest velocity a drive command can express (calculate_velocity rounds to 3 decimals).
+_MIN_VELOCITY = 1e-3
+
+
+def serpentine_order(coords):
+    """Boustrophedon visiting order of grid points ``coords`` (N x 2 or N x 3,
+    columns x, y[, z]). Returns an index array into ``coords``."""
+    coords = np.asarray(coords, dtype=float)
+    ix, iy = (np.unique(coords[:, c], return_inverse=True)[1].ravel() for c in (0, 1))
+    ny = iy.max() + 1 if len(iy) else 0
+    if coords.shape[1] > 2:
+        iz = np.unique(coords[:, 2], return_inverse=True)[1].ravel()
+    else:
+        iz = np.zeros(len(coords), dtype=int)
+    row_in_layer = np.where(iz % 2 == 0, iy, ny - 1 - iy)
+    row = iz * ny + row_in_layer                 # global row counter along the snake
+    x_key = np.where(row % 2 == 0, ix, -ix)
+    return np.lexsort((x_key, row))
+
+
+def _axis_cm_per_turn(mc, naxes):
+    return np.array([getattr(mc, f'{axis}_mc').cm_per_turn for axis in 'xyz'[:naxes]])
+
+
+def move_times(mc, motor_from, motor_to):
+    """Seconds to move between motor positions (rows of N x naxes arrays), as the
+    drive would: velocities from ``mc.calculate_velocity`` (rev/s), travel in
+    cm, the slowest axis deciding."""
+    delta = np.abs(np.asarray(motor_to, dtype=float) - np.asarray(motor_from, dtype=float))
+    delta = np.atleast_2d(delta)
+    rev_per_s = np.column_stack(mc.calculate_velocity(*delta.T))
+    cm_per_s = np.maximum(rev_per_s, _MIN_VELOCITY) * _axis_cm_per_turn(mc, delta.shape[1])
+    return (delta / cm_per_s).max(axis=1)
+
+
+def plan_travel_time(mc, coords, order=None):
+    """Total motion time (s) of visiting ``coords`` in ``order`` (straight moves)."""
+    coords = np.asarray(coords, dtype=float)
+    if order is not None:
+        coords = coords[order]
+    if len(coords) < 2:
+        return 0.0
+    motor = np.column_stack(mc.probe_to_motor_LAPD(*coords.T))
+    return float(move_times(mc, motor[:-1], motor[1:]).sum())
+
+
+class _EdgeCost:
+    """Move time between plan points ``i`` and ``j``, cached; with obstacles, a
+    blocked straight path costs the BoundaryChecker detour (inf if none)."""
+
+    def __init__(self, mc, coords, motor, obstacles):
+        self.mc = mc
+        self.coords = coords
+        self.motor = motor
+        self.obstacles = obstacles
+        self._cache = {}
+
+    def direct(self, i, js):
+        return move_times(self.mc, self.motor[i], self.motor[js])
+
+    def __call__(self, i, j):
+        key = (i, j) if i < j else (j, i)
+        cost = self._cache.get(key)
+        if cost is None:
+            cost = float(self.direct(i, [j])[0])
+            if self.obstacles and i != j:
+                cost = self._detour(i, j, cost)
+            self._cache[key] = cost
+        return cost
+
+    def _detour(self, i, j, direct_cost):
+        checker = self.mc.boundary_checker
+        start, end = tuple(self.coords[i]), tuple(self.coords[j])
+        if checker.is_path_valid(start, end):
+            return direct_cost
+        try:
+            waypoints = [start] + list(checker.find_path(start, end))
+        except ValueError:
+            return np.inf
+        motor = np.column_stack(self.mc.probe_to_motor_LAPD(*np.array(waypoints, dtype=float).T))
+        return float(move_times(self.mc, motor[:-1], motor[1:]).sum())
+
+
+def _nearest_neighbour_tour(cost, n, start=0):
+    visited = np.zeros(n, dtype=bool)
+    tour = [start]
+    visited[start] = True
+    cur = start
+    for _ in range(n - 1):
+        t = cost.direct(cur, np.arange(n))
+        t[visited] = np.inf
+        if not cost.obstacles:
+            cur = int(np.argmin(t))
+        else:
+            # Direct time is a lower bound of the true (detour) cost: scan
+            # candidates by direct time until none can beat the best found.
+            best, best_j = np.inf, None
+            for j in np.argsort(t):
+                if t[j] >= best or visited[j]:
+                    break
+                c = cost(cur, int(j))
+                if c < best:
+                    best, best_j = c, int(j)
+            cur = best_j if best_j is not None else int(np.argmin(t))
+        visited[cur] = True
+        tour.append(cur)
+    return np.array(tour)
+
+
+def _neighbour_lists(cost, n, k):
+    k = min(k, n - 1)
+    nbrs = np.empty((n, k), dtype=int)
+    for i in range(n):
+        t = cost.direct(i, np.arange(n))
+        t[i] = np.inf
+        part = np.argpartition(t, k - 1)[:k]
+        nbrs[i] = part[np.argsort(t[part])]
+    return nbrs
+
+
+def _two_opt(tour, cost, neighbours, seconds):
+    """Open-path 2-opt over neighbour lists: reverse tour[i+1..j] while that
+    shortens edges (a=tour[i], b=tour[i+1]) + (c=tour[j], d=tour[j+1])."""
+    n = len(tour)
+    pos = np.empty(n, dtype=int)
+    pos[tour] = np.arange(n)
+    deadline = time.monotonic() + seconds
+    improved = True
+    while improved and time.monotonic() < deadline:
+        improved = False
+        for i in range(n - 1):
+            a, b = int(tour[i]), int(tour[i + 1])
+            ab = cost(a, b)
+            for c in neighbours[a]:
+                j = int(pos[c])
+                if j <= i + 1:
+                    continue
+                c = int(c)
+                d = int(tour[j + 1]) if j + 1 < n else None
+                delta = cost(a, c) - ab
+                if d is not None:
+                    delta += cost(b, d) - cost(c, d)
+                if delta < -1e-9:
+                    tour[i + 1:j + 1] = tour[i + 1:j + 1][::-1].copy()
+                    pos[tour[i + 1:j + 1]] = np.arange(i + 1, j + 1)
+                    improved = True
+                    break
+            if time.monotonic() >= deadline:
+                break
+    return tour
+
+
+def tsp_order(mc, coords, two_opt_seconds=_TSP_TWO_OPT_SECONDS):
+    """Motion-time-minimizing visiting order of ``coords`` on drive ``mc``,
+    starting at the first point. Returns an index array into ``coords``."""
+    coords = np.asarray(coords, dtype=float)
+    n = len(coords)
+    if n < 3:
+        return np.arange(n)
+    motor = np.column_stack(mc.probe_to_motor_LAPD(*coords.T))
+    checker = getattr(mc, 'boundary_checker', None)
+    obstacles = coords.shape[1] == 3 and bool(checker and checker.obstacle_boundaries)
+    cost = _EdgeCost(mc, coords, motor, obstacles)
+    # Nearest neighbour strands points on a regular grid, where the serpentine
+    # is already near-optimal; improve whichever of the two starts cheaper.
+    tour = min((_nearest_neighbour_tour(cost, n), serpentine_order(coords)),
+               key=lambda t: sum(cost(int(a), int(b)) for a, b in zip(t[:-1], t[1:])))
+    return _two_opt(tour, cost, _neighbour_lists(cost, n, _TSP_NEIGHBOURS), two_opt_seconds)
+
+
+def reorder_plan(positions, order, num_duplicate_shots, num_run_repeats):
+    """Apply visiting ``order`` (over the distinct positions of one repeat) to a
+    raster-generated ``positions`` array and renumber ``shot_num`` 1..N.
+
+    ``positions`` is laid out repeat-major, duplicate-minor, as
+    get_positions_xy/xyz build it; odd repeats run the order backwards.
+    """
+    blocks = positions.reshape(num_run_repeats, -1, num_duplicate_shots)
+    order = np.asarray(order)
+    out = np.concatenate([blocks[r][order if r % 2 == 0 else order[::-1]].ravel()
+                          for r in range(num_run_repeats)])
+    out['shot_num'] = np.arange(1, len(out) + 1)
+    return out
@@ -11,6 +11,9 @@ The loop itself is storage-agnostic: it dispatches to a per-path adapter chosen
 by the ``"writer"`` tag in the spooled run metadata (``acquisition`` for bmotion,
 ``grid`` for PositionManager grids). A new path's adapter can be added without
 touching this loop.
+
+If the run metadata carries ``live_tap`` settings, every shot is also announced
+to live viewers once it is committed (:class:`scope_io.LiveTapPublisher`).
 """
 
 import importlib
@@ -30,6 +33,7 @@ try:
 except ImportError:
     pass
 
+from scope_io import LiveTapPublisher
 from spooling import spool_format
 
 _log = logging.getLogger("offload")
@@ -153,13 +157,42 @@ def _run_offload(spool_dir: str, poll_seconds: float, max_retries: int,
     adapter = _get_adapter(meta.get("writer"))
     print(f"Offload: writer={meta.get('writer')}, filling -> {hdf5_path}")
 
-    processed, quarantined, complete, final_shot_num = _drain_loop(
-        spool_dir, hdf5_path, meta, adapter, poll_seconds, max_retries)
+    tap = _start_live_tap(meta, hdf5_path)
+    try:
+        processed, quarantined, complete, final_shot_num = _drain_loop(
+            spool_dir, hdf5_path, meta, adapter, poll_seconds, max_retries, tap)
+    finally:
+        if tap is not None:
+            tap.close()
 
     _finalize_and_report(spool_dir, hdf5_path, meta, adapter, processed,
                          quarantined, complete, final_shot_num)
 
 
+def _start_live_tap(meta: dict, hdf5_path: str) -> Optional[LiveTapPublisher]:
+    """Start the live analysis tap if the run asked for one.
+
+    A tap that cannot bind (port in use, bad host) only costs the live view, so
+    it is reported and the offload carries on without it.
+    """
+    opts = meta.get("live_tap")
+    if not opts:
+        return None
+    try:
+        tap = LiveTapPublisher(**opts, run_info={
+            "hdf5_path": hdf5_path,
+            "writer": meta.get("writer"),
+            "total_shots": meta.get("total_shots"),
+        })
+    except OSError as e:
+        print(f"Offload WARNING: live tap not started on "
+              f"{opts.get('host')}:{opts.get('port')}: {e}")
+        _log.warning("live tap not started: %s", e)
+        return None
+    print(f"Offload: live tap on {tap.host}:{tap.port}")
+    return tap
+
+
 @dataclass
 class _DrainState:
     """Mutable accumulators threaded through the drain loop.
@@ -175,9 +208,12 @@ class _DrainState:
 
 
 def _drain_loop(spool_dir: str, hdf5_path: str, meta: dict, adapter,
-                poll_seconds: float, max_retries: int):
+                poll_seconds: float, max_retries: int,
+                tap: Optional[LiveTapPublisher] = None):
     """Poll the spool, writing each ready shot, until RUN_COMPLETE drains it.
 
+    Each committed shot is published on ``tap`` when one is given.
+
     Returns ``(processed, quarantined, complete, final_shot_num)``: the set of
     shot numbers handled, the list that exhausted retries (quarantined), the
     RUN_COMPLETE payload (or None), and the run's final shot number (or None).
@@ -193,7 +229,7 @@ def _drain_loop(spool_dir: str, hdf5_path: str, meta: dict, adapter,
             ready = [s for s in spool_format.iter_ready_shots(spool_dir)
                      if s not in state.processed]
             _process_ready_shots(ready, spool_dir, hdf5_path, meta, adapter,
-                                 max_retries, state, pbar)
+                                 max_retries, state, pbar, tap)
 
             # While shots are still arriving the sentinel can't be there yet, so
             # only pay the read_run_complete + second iter_ready scan once a pass
@@ -225,7 +261,7 @@ def _drain_loop(spool_dir: str, hdf5_path: str, meta: dict, adapter,
 
 def _process_ready_shots(ready, spool_dir: str, hdf5_path: str, meta: dict,
                          adapter, max_retries: int, state: "_DrainState",
-                         pbar) -> None:
+                         pbar, tap: Optional[LiveTapPublisher] = None) -> None:
     """Write each ready shot, updating ``state`` in place.
 
     A transient write/verify error keeps the bin and bumps the shot's failure
@@ -236,10 +272,12 @@ def _process_ready_shots(ready, spool_dir: str, hdf5_path: str, meta: dict,
     """
     for shot_num in ready:
         try:
-            _offload_one_shot(spool_dir, hdf5_path, meta, adapter, shot_num)
+            payload = _offload_one_shot(spool_dir, hdf5_path, meta, adapter, shot_num)
             state.processed.add(shot_num)
             state.failures.pop(shot_num, None)
             pbar.update(1)
+            if tap is not None:
+                tap.publish(payload)
         except Exception as e:
             attempts = state.failures[shot_num] = state.failures.get(shot_num, 0) + 1
             if attempts >= max_retries:
@@ -310,9 +348,11 @@ def _finalize_and_report(spool_dir: str, hdf5_path: str, meta: dict, adapter,
 
 
 def _offload_one_shot(spool_dir: str, hdf5_path: str, meta: dict, adapter,
-                      shot_num: int) -> None:
+                      shot_num: int):
     """Write one shot, verify it read-back, then delete its spool copy.
 
+    Returns the committed payload.
+
     Idempotent for retries: if ``shot_N`` already exists in the HDF5 from a prior
     interrupted attempt, the write is skipped and the existing data verified
     instead, so a retry never trips ``write_shot_data``'s "already exists" guard.
@@ -331,6 +371,7 @@ def _offload_one_shot(spool_dir: str, hdf5_path: str, meta: dict, adapter,
         _verify_shot_in_hdf5(hdf5_path, payload)
 
     spool_format.delete_shot(spool_dir, shot_num)
+    return payload
 
 
 def _shot_in_hdf5(hdf5_path: str, payload) -> bool:
@@ -0,0 +1,118 @@
+'''
+In-process stand-in for the compiled gpio_detect.so, for running the trigger
+server without a Raspberry Pi (tests, or `python pi_server.py --fake`).
+
+FakeGPIOLib has the same functions as gpio_detect.c, called the same way
+TriggerServer calls them through ctypes. Pin levels live in a dict. Input
+edges come from pulse()/set_level(), or from a loopback wire: a pulse on an
+output pin is echoed as a rising edge on the wired input pin. Edge callbacks
+are called from the thread that makes the edge, as pigpio calls them from
+its alert thread, and they get a microsecond tick like gpioTick().
+
+Usage:
+    gpio = FakeGPIOLib(loopback={23: 25})
+    server = TriggerServer(trig_out_gpio_num=23, trig_in_gpio_num=25, gpio_lib=gpio)
+    gpio.pulse(25)          # an external trigger arriving on GPIO 25
+'''
+
+import threading
+import time
+
+
+class FakeGPIOLib:
+    """
+    Fake gpio_detect.so backend.
+
+    Args:
+        loopback (dict): Output GPIO -> input GPIO wired to it; each output pulse
+            becomes a rising edge on the input after ``loopback_delay_s``
+        loopback_delay_s (float): Cable/device delay of the loopback wire
+        edge_callbacks (bool): Provide set_edge_callback (False mimics a
+            gpio_detect.so built before it existed, so the server polls)
+        pulse_width_s (float): Output pulse width (gpio_detect.c: 1 ms)
+        tick_start_us (int): get_tick() value at creation (e.g. just short of
+            2**32 to exercise the tick wrap)
+    """
+    def __init__(self, loopback=None, loopback_delay_s=0.0, edge_callbacks=True, pulse_width_s=0.001,
+                 tick_start_us=0):
+        self.loopback = dict(loopback or {})
+        self.loopback_delay_s = loopback_delay_s
+        self.pulse_width_s = pulse_width_s
+        self.levels = {}
+        self.modes = {}
+        self.pulses = {}            # output GPIO -> pulses sent
+        self.waits = 0              # wait_for_gpio_high calls (polling waits)
+        self._callbacks = {}
+        self._t0 = time.perf_counter() - tick_start_us * 1e-6
+        self._cond = threading.Condition()
+        if edge_callbacks:
+            # Only bound when asked for, so hasattr() can report an old library.
+            self.set_edge_callback = self._set_edge_callback
+
+    # -- gpio_detect.c API -------------------------------------------------
+    def initialize_pigpio(self):
+        return 0
+
+    def terminate_pigpio(self):
+        self._callbacks.clear()
+
+    def setup_gpio_pin(self, gpio_num):
+        self.modes[gpio_num] = 'in'
+        self.levels.setdefault(gpio_num, 0)
+        return 0
+
+    def setup_gpio_output_pin(self, gpio_num):
+        self.modes[gpio_num] = 'out'
+        self.set_level(gpio_num, 1)
+        return 0
+
+    def wait_for_gpio_high(self, gpio_num, timeout_us):
+        self.waits += 1
+        deadline = time.monotonic() + timeout_us * 1e-6
+        with self._cond:
+            while self.levels.get(gpio_num, 0) != 1:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def send_gpio_pulse(self, gpio_num):
+        self.set_level(gpio_num, 0)         # inverted output: pulse is LOW
+        time.sleep(self.pulse_width_s)
+        self.set_level(gpio_num, 1)
+        self.pulses[gpio_num] = self.pulses.get(gpio_num, 0) + 1
+        if gpio_num in self.loopback:
+            target = self.loopback[gpio_num]
+            if self.loopback_delay_s > 0:
+                threading.Timer(self.loopback_delay_s, self.pulse, args=(target,)).start()
+            else:
+                self.pulse(target)
+
+    def get_tick(self):
+        """Microseconds since creation (plus tick_start_us), wrapping at 2**32 like gpioTick()."""
+        return int((time.perf_counter() - self._t0) * 1e6) & 0xFFFFFFFF
+
+    def _set_edge_callback(self, gpio_num, callback):
+        if callback is None:
+            self._callbacks.pop(gpio_num, None)
+        else:
+            self._callbacks[gpio_num] = callback
+        return 0
+
+    # -- test controls -----------------------------------------------------
+    def set_level(self, gpio_num, level):
+        """Drive ``gpio_num`` to ``level``; an actual change fires its edge callback."""
+        with self._cond:
+            changed = self.levels.get(gpio_num) != level
+            self.levels[gpio_num] = level
+            self._cond.notify_all()
+        callback = self._callbacks.get(gpio_num)
+        if changed and callback is not None:
+            callback(gpio_num, level, self.get_tick())
+
+    def pulse(self, gpio_num, width_s=0.001):
+        """A HIGH pulse on input ``gpio_num``: rising edge, ``width_s``, falling edge."""
+        self.set_level(gpio_num, 1)
+        time.sleep(width_s)
+        self.set_level(gpio_num, 0)
@@ -11,6 +11,8 @@ Usage:
     setup_gpio_pin(17);
     wait_for_gpio_high(17, 1000000);
     send_gpio_pulse(17);
+    set_edge_callback(17, cb);   // cb(gpio, level, tick) on every edge; NULL cancels
+    get_tick();                  // the microsecond tick edges are stamped with
     terminate_pigpio();
 
 */
@@ -113,3 +115,22 @@ void send_gpio_pulse(int gpio_num) {
     gpioWrite(gpio_num, PI_HIGH);
     fprintf(stderr, "CCC Trigger pulse sent on GPIO# %d.\n", gpio_num);
 }
+
+// Callback for set_edge_callback: level 0/1 after the edge (2 = watchdog timeout),
+// tick = pigpio microsecond timestamp of the edge (wraps every ~72 min)
+typedef void (*edge_callback_t)(int gpio, int level, uint32_t tick);
+
+// Call cb on every level change of gpio_num, from pigpio's alert thread.
+// Edges are timestamped by pigpio's sampler, not when cb runs. cb == NULL cancels.
+int set_edge_callback(int gpio_num, edge_callback_t cb) {
+    if (!pigpio_initialized) {
+        fprintf(stderr, "CCC pigpio not initialized. Call initialize_pigpio() first.\n");
+        return -1;
+    }
+    return gpioSetAlertFunc(gpio_num, (gpioAlertFunc_t) cb);
+}
+
+// Current pigpio tick (microseconds, wraps every ~72 min), the clock edge ticks use
+uint32_t get_tick() {
+    return gpioTick();
+}
@@ -9,6 +9,7 @@ plus utility functions for motor control operations. The client can:
 - Send trigger commands to the Pi
 - Wait for trigger responses from the Pi  
 - Run GPIO input/output tests
+- Fetch the server's timestamped trigger edges and map them onto this PC's clock
 - Control motor sequences with trigger synchronization
 
 Usage:
@@ -16,10 +17,22 @@ Usage:
     client.send_trigger()
     client.wait_for_trigger(timeout=5)
 
-TODO: both class needs proper exit/close
+    # Keep one connection open (lower, steadier trigger latency):
+    with TriggerClient(persistent=True) as client:
+        client.send_trigger()
+        print(client.latency_report())
+
+    # Trigger edges recorded by the Pi, on this PC's time.perf_counter() clock:
+    offset, rtt = client.clock_offset()
+    edges, next_seq, dropped = client.get_edges(since=0)
+    shot_times = [e.t_us * 1e-6 + offset for e in edges if e.level == 1]
+
+TODO: TungstenDropper needs proper exit/close
 '''
 
+import collections
 import socket
+import threading
 import time
 import select
 import pickle
@@ -34,12 +47,27 @@ parent_dir = os.path.dirname(current_dir)
 if os.path.exists(parent_dir) and parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
+from drivers.latency import LatencyHistogram
+
 # Configuration variables - modify these to match your setup
 PI_HOST = '192.168.7.38'      # Pi server IP address
 PI_PORT = 54321            # Pi server port (must match pi_server.py)
 DROPPER_IP = '192.168.7.99'  
 BUFFER_SIZE = 1024         # Socket buffer size
 KAPTON_WINDOW_IP = '192.168.7.98'  
+HEARTBEAT_S = 5.0          # Persistent mode: ping the server after this long idle
+REPLY_TIMEOUT_S = 5.0      # Wait for a reply (WAIT_TRIG adds its own timeout)
+EDGES_PER_REQUEST = 256    # GET_EDGES batch size (pi_server.EDGE_BATCH_MAX)
+CLOCK_SAMPLES = 5          # CLOCK round trips per clock_offset(); the fastest one is used
+
+# One edge recorded by the Pi server: t_us is the pigpio microsecond tick of the
+# edge (unwrapped), wall the Pi's time.time() when its callback ran.
+TriggerEdge = collections.namedtuple('TriggerEdge', 'seq gpio level t_us wall')
+
+
+class CommandLostError(ConnectionError):
+    """The connection failed after the command was written, before its reply
+    arrived. It is not sent again: the server may already have acted on it."""
 
 
 class TriggerClient:
@@ -48,35 +76,84 @@ class TriggerClient:
     
     Provides methods to send commands to the Pi server and receive responses.
     Handles connection management, retries, and error handling automatically.
+
+    By default every command opens its own connection (one-shot mode). With
+    persistent=True one connection is kept open instead: commands and replies
+    are newline-framed lines on it, an idle connection is pinged every
+    ``heartbeat`` seconds (and re-opened in the background if it died), and a
+    command that finds the connection dropped reconnects and is sent again.
+    If the server cannot be reached that way, the command falls back to
+    one-shot mode. A command is only sent again if it was never written: once
+    it is, a reply that times out (TimeoutError) or a connection that fails
+    (CommandLostError) is raised, since the server may already have acted on
+    it (e.g. fired a trigger).
+
+    Every command's round trip is recorded per command; see latency_report().
     
     Attributes:
         host (str): Pi server IP address
         port (int): Pi server port number
         BUF_SIZE (int): Socket buffer size for receiving data
+        persistent (bool): Keep one connection open between commands
+        latency (dict): Command name -> LatencyHistogram of round trips
     """
-    def __init__(self, host=PI_HOST, port=PI_PORT):
+    def __init__(self, host=PI_HOST, port=PI_PORT, persistent=False, heartbeat=HEARTBEAT_S,
+                 timeout=REPLY_TIMEOUT_S):
         self.host = host
         self.port = port
         self.BUF_SIZE = BUFFER_SIZE
+        self.persistent = persistent
+        self.heartbeat = heartbeat
+        self.timeout = timeout
+        self.latency = {}
+        self.reconnects = 0
+        self.fallbacks = 0
+        self._sock = None
+        self._rbuf = b''
+        self._unread = 0            # replies to receive=False commands still to discard
+        self._last_io = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._heartbeat_thread = None
         
     def send_command(self, command, receive=True, retries=30):
         """
         Send command to Pi with error handling and retries.
         
-        Creates a new socket connection for each command and closes it afterward.
-        This ensures no persistent connections are maintained, improving reliability
-        for long-running operations.
+        In one-shot mode (the default) a new socket connection is created for
+        each command and closed afterward. In persistent mode the command goes
+        over the open connection; see the class docstring.
         
         Args:
             command (str): Command to send to Pi server
             receive (bool): Whether to wait for and return response
-            retries (int): Number of retry attempts on failure
+            retries (int): Number of retry attempts on failure (one-shot mode)
             
         Returns:
             str or None: Server response if receive=True, None otherwise
         """
+        start = time.perf_counter()
+        if self.persistent:
+            try:
+                response = self._send_persistent(command, receive)
+            except (TimeoutError, CommandLostError):
+                raise
+            except OSError as e:
+                self.fallbacks += 1
+                print(f"Persistent connection to {self.host}:{self.port} failed ({e}); sending one-shot")
+                response = self._send_once(command, receive, retries, resend=False)
+        else:
+            response = self._send_once(command, receive, retries)
+        if receive:
+            self._record(command, time.perf_counter() - start)
+        return response
+
+    def _send_once(self, command, receive, retries, resend=True):
+        """One-shot mode: connect, send, wait for the reply and close. With
+        resend=False a command already written is not retried."""
         for attempt in range(retries):
             s = None
+            sent = False
             try:
                 s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
                 s.settimeout(5)
@@ -84,18 +161,25 @@ class TriggerClient:
 
                 message = f"{command}\n"
                 s.send(message.encode('ascii'))
+                sent = True
 
                 if receive:
-                    readable, _, _ = select.select([s], [], [], 5.0)
-                    if readable:
-                        data = s.recv(self.BUF_SIZE)
-                        return data.decode('ascii').strip()
-                    else:
-                        raise TimeoutError("No response from server")
+                    data = b''
+                    while not data.endswith(b'\n'):     # a reply may span several reads
+                        readable, _, _ = select.select([s], [], [], self._reply_timeout(command))
+                        if not readable:
+                            raise TimeoutError("No response from server")
+                        chunk = s.recv(self.BUF_SIZE)
+                        if not chunk:
+                            break
+                        data += chunk
+                    return data.decode('ascii').strip()
                         
                 return None
                 
             except TimeoutError:
+                if sent and not resend:
+                    raise TimeoutError(f"No response from server to {command!r}")
                 if attempt == retries - 1:
                     raise TimeoutError(f"Connection timed out after {retries} attempts")
                 time.sleep(0.5)
@@ -104,6 +188,8 @@ class TriggerClient:
                     raise ConnectionRefusedError(f"Connection refused by {self.host}:{self.port}")
                 time.sleep(0.5)
             except Exception as e:
+                if sent and not resend:
+                    raise CommandLostError(f"Lost {command!r} after sending it: {e}") from e
                 if attempt == retries - 1:
                     raise Exception(f"Failed to communicate with Pi: {str(e)}")
                 time.sleep(0.5)
@@ -112,6 +198,151 @@ class TriggerClient:
                     s.close()
         
         return None
+
+    def _reply_timeout(self, command):
+        """Seconds to wait for the reply to ``command``: WAIT_TRIG blocks on the
+        server for its own timeout first."""
+        parts = command.split()
+        if parts and parts[0].upper() == 'WAIT_TRIG':
+            try:
+                return self.timeout + float(parts[1]) if len(parts) > 1 else self.timeout + 1.0
+            except ValueError:
+                pass
+        return self.timeout
+
+    def _connect(self):
+        try:
+            s = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        except OSError as e:
+            raise ConnectionError(f"Cannot connect to {self.host}:{self.port}: {e}") from e
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock = s
+        self._rbuf = b''
+        self._unread = 0
+        self._last_io = time.monotonic()
+        if self._heartbeat_thread is None and self.heartbeat:
+            self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, daemon=True,
+                                                      name=f'trigger-heartbeat-{self.host}')
+            self._heartbeat_thread.start()
+
+    def _close_socket(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._rbuf = b''
+        self._unread = 0
+
+    def _read_line(self, timeout):
+        while b'\n' not in self._rbuf:
+            self._sock.settimeout(timeout)
+            data = self._sock.recv(self.BUF_SIZE)
+            if not data:
+                raise ConnectionResetError("Server closed the connection")
+            self._rbuf += data
+        line, self._rbuf = self._rbuf.split(b'\n', 1)
+        self._last_io = time.monotonic()
+        return line.decode('ascii').strip()
+
+    def _exchange(self, command, receive, timeout):
+        """Write one line; unless ``receive`` is False, read its reply line.
+        An OSError after the line went out is raised as CommandLostError."""
+        # A connection the server already closed shows up as EOF: catch it before
+        # writing, while the command can still be sent on a new one.
+        if select.select([self._sock], [], [], 0)[0]:
+            data = self._sock.recv(self.BUF_SIZE)
+            if not data:
+                raise ConnectionResetError("Server closed the connection")
+            self._rbuf += data
+        try:
+            self._sock.sendall(f"{command}\n".encode('ascii'))
+        except socket.timeout as e:
+            raise CommandLostError(f"Lost {command!r} while sending it: {e}") from e
+        self._last_io = time.monotonic()
+        if not receive:
+            self._unread += 1
+            return None
+        try:
+            while self._unread:
+                self._read_line(timeout)
+                self._unread -= 1
+            return self._read_line(timeout)
+        except socket.timeout:
+            raise
+        except OSError as e:
+            raise CommandLostError(f"Lost {command!r} after sending it: {e}") from e
+
+    def _send_persistent(self, command, receive):
+        with self._lock:
+            for attempt in (0, 1):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._exchange(command, receive, self._reply_timeout(command))
+                except socket.timeout:
+                    self._close_socket()
+                    raise TimeoutError(f"No response from server to {command!r}")
+                except CommandLostError:
+                    self._close_socket()
+                    raise
+                except OSError:
+                    self._close_socket()
+                    if attempt:
+                        raise
+                    self.reconnects += 1
+                except BaseException:
+                    # e.g. Ctrl-C while waiting: the reply would pair with the next command.
+                    self._close_socket()
+                    raise
+
+    def _heartbeat_loop(self):
+        """Ping the server whenever the connection has been idle for ``heartbeat``
+        seconds; re-open it if it died. Skipped while a command is in flight."""
+        while not self._stop.wait(self.heartbeat / 2):
+            if time.monotonic() - self._last_io < self.heartbeat:
+                continue
+            if not self._lock.acquire(blocking=False):
+                continue
+            try:
+                if self._sock is None:
+                    self._connect()
+                self._exchange('PING', True, self.timeout)   # any reply means alive
+            except OSError:
+                self._close_socket()
+                self._last_io = time.monotonic()            # retry after another interval
+            finally:
+                self._lock.release()
+
+    def _record(self, command, seconds):
+        name = command.split()[0].upper() if command.split() else command
+        hist = self.latency.get(name)
+        if hist is None:
+            hist = self.latency[name] = LatencyHistogram()
+        hist.add(seconds)
+
+    def latency_report(self):
+        """One line per command: count, mean, p50/p90/p99 and max round trip (ms)."""
+        mode = 'persistent' if self.persistent else 'one-shot'
+        lines = [f"{self.host}:{self.port} ({mode}): {self.reconnects} reconnect(s), "
+                 f"{self.fallbacks} one-shot fallback(s)"]
+        for name in sorted(self.latency):
+            h = self.latency[name]
+            lines.append('  %-10s n=%-6d mean %7.2f  p50 %7.2f  p90 %7.2f  p99 %7.2f  max %7.2f ms'
+                         % (name, h.count, 1e3 * h.mean, 1e3 * h.percentile(50),
+                            1e3 * h.percentile(90), 1e3 * h.percentile(99), 1e3 * h.max))
+        return '\n'.join(lines)
+
+    def close(self):
+        """Stop the heartbeat and close the persistent connection (if any)."""
+        self._stop.set()
+        if self._heartbeat_thread is not None:
+            self._heartbeat_thread.join(timeout=1.0)
+            self._heartbeat_thread = None
+        with self._lock:
+            self._close_socket()
         
     def send_trigger(self):
         """Send trigger command"""
@@ -146,6 +377,56 @@ class TriggerClient:
             raise RuntimeError(f"Server not ready: {response}")
         return True
 
+    def get_edges(self, since=0):
+        """
+        Trigger edges the server recorded from sequence number ``since`` on.
+
+        Returns:
+            (edges, next_seq, dropped): TriggerEdge list (oldest first), the
+            ``since`` for the next call, and how many edges were lost because
+            the server's ring buffer overwrote them before they were fetched
+        Raises RuntimeError if the server keeps no edge record (older server,
+        or a gpio_detect.so without edge callbacks)
+        """
+        edges, dropped = [], 0
+        while True:
+            response = self.send_command(f'GET_EDGES since={since} max={EDGES_PER_REQUEST}')
+            parts = (response or '').split()
+            if not parts or parts[0] != 'EDGES':
+                raise RuntimeError(f"Unexpected edges response: {response}")
+            fields = dict(p.split('=', 1) for p in parts[1:3])
+            since = int(fields['next'])
+            dropped += int(fields['dropped'])
+            for record in parts[3:]:
+                seq, gpio, level, t_us, wall = record.split(':')
+                edges.append(TriggerEdge(int(seq), int(gpio), int(level), int(t_us), float(wall)))
+            if len(parts) - 3 < EDGES_PER_REQUEST:
+                return edges, since, dropped
+
+    def clock_offset(self, samples=CLOCK_SAMPLES):
+        """
+        Offset between the server's edge clock and this PC's time.perf_counter().
+
+        Asks the server for its tick ``samples`` times and keeps the fastest
+        round trip, taking the tick as read halfway through it.
+
+        Returns:
+            (offset, rtt): ``t_us * 1e-6 + offset`` is an edge's perf_counter()
+            time here; ``rtt`` (s) bounds the error of the mapping
+        Raises RuntimeError if the server has no CLOCK (older server or library)
+        """
+        best = None
+        for _ in range(samples):
+            start = time.perf_counter()
+            response = self.send_command('CLOCK')
+            end = time.perf_counter()
+            parts = (response or '').split()
+            if len(parts) != 3 or parts[0] != 'CLOCK':
+                raise RuntimeError(f"Unexpected clock response: {response}")
+            if best is None or end - start < best[1]:
+                best = ((start + end) / 2 - int(parts[1]) * 1e-6, end - start)
+        return best
+
     def trigger_loop(self, operation_func=None, iterations=1000, delay=0.1, timeout=120):
         """Run a loop sending triggers and executing operations
         
@@ -221,8 +502,8 @@ class TriggerClient:
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
-        """Context manager exit - no special processing"""
-        pass
+        """Context manager exit - close the persistent connection"""
+        self.close()
 
     def __del__(self):
         """Destructor - no special processing"""
@@ -4,7 +4,20 @@ Created 2024-12 by J. Han
 Modified 2025-07-17 by PP
 
 Runs on Raspberry Pi
+- Protocol: one ASCII command per line, one reply line per command. A client
+  may keep its connection open and send many commands (pi_client.TriggerClient
+  with persistent=True); PING answers PONG for its heartbeat.
+- Clients are served concurrently on an asyncio event loop. WAIT_TRIG waits for
+  the next rising edge reported by pigpio's edge callback, so a long wait does
+  not hold up STATUS or TRIG from another client. Blocking GPIO work (pulses,
+  self-tests) runs in worker threads.
+- Every edge on the trigger input and output pins is timestamped by pigpio
+  (microsecond tick, unwrapped past its 72-minute wrap) and kept in a ring
+  buffer of the last EDGE_BUFFER_SIZE edges. GET_EDGES since=<seq> returns the
+  edges recorded since then; CLOCK returns the current tick with the Pi's wall
+  time, so a client can map edge ticks onto its own clock.
 - Run normal server mode: python pi_server.py
+- Run without a Pi (fake GPIO, output looped back to input): python pi_server.py --fake
 - Run self-test mode: python pi_server.py --test
 - Run custom test parameters: python pi_server.py --test --iterations <N> --delay <T>
 NOTE:
@@ -17,7 +30,10 @@ NOTE:
        pull-up or pull-down resistors, making them unsuitable for output. 
 '''
 
+import asyncio
+import collections
 import socket
+import threading
 import time
 import signal
 import sys
@@ -31,12 +47,24 @@ PORT    = 54321
 TRIG_OUT_GPIO_NUM = 23
 TRIG_IN_GPIO_NUM  = 25
 
+# gpio_detect.c set_edge_callback: cb(gpio, level, tick)
+EDGE_CALLBACK = ctypes.CFUNCTYPE(None, ctypes.c_int, ctypes.c_int, ctypes.c_uint32)
+
+EDGE_BUFFER_SIZE = 8192     # edges kept for GET_EDGES (~14 min of both edges on 2 pins at 2.5 Hz)
+EDGE_BATCH_MAX = 256        # edges per GET_EDGES reply; ask again from its next=
+TICK_WRAP = 1 << 32         # pigpio ticks are uint32 microseconds
+
+Edge = collections.namedtuple('Edge', 'seq gpio level t_us wall')
+
 class TriggerServer:
     '''
     Trigger server class that manages GPIO pins and network communication for sending trigger pulses.
 
     This class sets up a TCP server that listens for trigger requests and controls GPIO pins on a Raspberry Pi.
-    It uses a C library (gpio_detect.so) for low-level GPIO control.
+    It uses a C library (gpio_detect.so) for low-level GPIO control, or any object with the
+    same functions passed as ``gpio_lib`` (e.g. pi_gpio.fake_gpio.FakeGPIOLib).
+    If the library has no set_edge_callback (built before it existed), WAIT_TRIG
+    falls back to the polling wait_for_gpio_high in a worker thread.
 
     Attributes:
         host (str): IP address to bind the server to
@@ -46,29 +74,45 @@ class TriggerServer:
         running (bool): Server run state
         gpio_lib: Loaded C library for GPIO control
         sock: TCP socket for network communication
+        edge_callbacks (bool): Input edges arrive by callback (else WAIT_TRIG polls
+            and there is no edge record for GET_EDGES)
+        edges (deque): The last EDGE_BUFFER_SIZE Edge records, oldest first
 
     Example:
         server = TriggerServer(host='192.168.1.100', port=5000, 
                              trig_out_gpio_num=25, trig_in_gpio_num=27)
         server.start()  # Starts listening for trigger requests
     '''
-    def __init__(self, trig_out_gpio_num, trig_in_gpio_num, host=IP_ADDR, port=PORT):
+    def __init__(self, trig_out_gpio_num, trig_in_gpio_num, host=IP_ADDR, port=PORT, gpio_lib=None):
         self.host = host
         self.port = port
         self.trig_out_gpio_num = trig_out_gpio_num
         self.trig_in_gpio_num  = trig_in_gpio_num
         self.running = True
+        self._loop = None
+        self._stopping = None
+        self._pulse_lock = None
+        self._edge_cb = None
+        self._edge_waiters = set()
+        self.edges = collections.deque(maxlen=EDGE_BUFFER_SIZE)
+        self._edge_seq = 0                  # seq of the next edge recorded
+        self._edge_lock = threading.Lock()  # edges are recorded on pigpio's alert thread
+        self._tick = None                   # last (raw tick, unwrapped t_us, wall) seen
 
-        gpio_lib_path = "./gpio_detect.so" #  WAS "/home/generalpi/pi_gpio/gpio_detect.so"
-        if not os.path.exists(gpio_lib_path):
-            raise FileNotFoundError(f'compiled "gpio_detect.c" library not found at {gpio_lib_path}')
+        if gpio_lib is not None:
+            self.gpio_lib = gpio_lib
+        else:
+            gpio_lib_path = "./gpio_detect.so" #  WAS "/home/generalpi/pi_gpio/gpio_detect.so"
+            if not os.path.exists(gpio_lib_path):
+                raise FileNotFoundError(f'compiled "gpio_detect.c" library not found at {gpio_lib_path}')
 
-        try:
-            self.gpio_lib = ctypes.CDLL(gpio_lib_path)
-        except OSError as e:
-            raise RuntimeError(f'Failed to load compiled "gpio_detect.c" library: {str(e)}')
+            try:
+                self.gpio_lib = ctypes.CDLL(gpio_lib_path)
+            except OSError as e:
+                raise RuntimeError(f'Failed to load compiled "gpio_detect.c" library: {str(e)}')
 
-        self._setup_gpio_functions()
+            self._setup_gpio_functions()
+        self.edge_callbacks = hasattr(self.gpio_lib, 'set_edge_callback')
 
         if self.gpio_lib.initialize_pigpio() < 0:
             raise RuntimeError("Failed to initialize pigpio")
@@ -86,10 +130,7 @@ class TriggerServer:
         try:
             self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             self.sock.bind((self.host, self.port))
-                
-            # Setup signal handlers
-            signal.signal(signal.SIGINT, self.signal_handler)
-            signal.signal(signal.SIGTERM, self.signal_handler)
+            self.port = self.sock.getsockname()[1]      # resolves port=0
             
         except Exception as e:
             # Clean up if initialization fails
@@ -119,6 +160,18 @@ class TriggerServer:
             self.gpio_lib.send_gpio_pulse.restype = None
         except AttributeError as e:
             raise RuntimeError(f"Failed to setup GPIO functions: {str(e)}")
+        try:
+            # Edge callbacks (newer builds only; see edge_callbacks)
+            self.gpio_lib.set_edge_callback.argtypes = [ctypes.c_int, EDGE_CALLBACK]
+            self.gpio_lib.set_edge_callback.restype = ctypes.c_int
+        except AttributeError:
+            pass
+        try:
+            # Current pigpio tick, for CLOCK (newer builds only)
+            self.gpio_lib.get_tick.argtypes = []
+            self.gpio_lib.get_tick.restype = ctypes.c_uint32
+        except AttributeError:
+            pass
     
     def send_trigger(self):
         """Send a trigger pulse using C function"""
@@ -129,11 +182,25 @@ class TriggerServer:
         except Exception as e:
             raise RuntimeError(f"Failed to send trigger: {str(e)}")
     
-    def wait_for_trigger(self, timeout=1):
-        """Wait for rising edge using C function"""
+    async def wait_for_trigger(self, timeout=1):
+        """Wait up to ``timeout`` s for the next rising edge on the input GPIO
+        without blocking the event loop: by edge callback, or else by the
+        polling C wait in a worker thread."""
+        print(f'>>> waiting for trigger on GPIO# {self.trig_in_gpio_num}...', end='', flush=True)
         try:
-            print(f'>>> waiting for trigger on GPIO# {self.trig_in_gpio_num}...', end='', flush=True)
-            wait_status = self.gpio_lib.wait_for_gpio_high(self.trig_in_gpio_num, int(timeout * 1000000))  # Convert to microseconds
+            if self.edge_callbacks:
+                edge = self._loop.create_future()
+                self._edge_waiters.add(edge)
+                try:
+                    await asyncio.wait_for(edge, timeout)
+                    wait_status = True
+                except asyncio.TimeoutError:
+                    wait_status = False
+                finally:
+                    self._edge_waiters.discard(edge)
+            else:
+                wait_status = bool(await self._loop.run_in_executor(
+                    None, self.gpio_lib.wait_for_gpio_high, self.trig_in_gpio_num, int(timeout * 1000000)))  # Convert to microseconds
             if wait_status:
                 print('>>> got it', flush=True)
             else:
@@ -142,21 +209,114 @@ class TriggerServer:
         except Exception as e:
             print('failed', flush=True)
             raise RuntimeError(f"Failed to wait for trigger: {str(e)}")
+
+    def _gpio_edge(self, gpio, level, tick):
+        """Edge callback, on pigpio's alert thread: record the edge and hand
+        rising input edges to the loop."""
+        if level not in (0, 1):
+            return                              # 2 = watchdog timeout, not an edge
+        self._record_edge(gpio, level, tick)
+        loop = self._loop
+        if level == 1 and gpio == self.trig_in_gpio_num and loop is not None:
+            loop.call_soon_threadsafe(self._on_rising_edge, gpio, tick)
+
+    def _unwrap_tick(self, tick, wall):
+        """pigpio tick -> microseconds on a 64-bit count that does not wrap.
+        Ticks arrive in (nearly) time order; the wall clock decides how many
+        2**32 us wraps passed since the previous tick, so a quiet hour or more
+        between edges does not lose one. Call with _edge_lock held."""
+        if self._tick is None:
+            t_us = tick
+        else:
+            last_tick, last_t_us, last_wall = self._tick
+            delta = (tick - last_tick) % TICK_WRAP
+            delta += round(((wall - last_wall) * 1e6 - delta) / TICK_WRAP) * TICK_WRAP
+            t_us = last_t_us + delta
+        self._tick = (tick, t_us, wall)
+        return t_us
+
+    def _record_edge(self, gpio, level, tick):
+        wall = time.time()
+        with self._edge_lock:
+            self.edges.append(Edge(self._edge_seq, gpio, level, self._unwrap_tick(tick, wall), wall))
+            self._edge_seq += 1
+
+    def get_edges(self, since=0, max_edges=EDGE_BATCH_MAX):
+        """
+        Edges recorded from sequence number ``since`` on.
+
+        Returns:
+            (edges, next_seq, dropped): at most ``max_edges`` Edge records, the
+            seq to ask for next time, and how many edges since ``since`` were
+            already pushed out of the ring buffer
+        """
+        with self._edge_lock:
+            since = min(since, self._edge_seq)  # a seq from before a server restart
+            first = self._edge_seq - len(self.edges)
+            dropped = max(0, first - since)
+            start = max(since, first) - first
+            batch = [self.edges[i] for i in range(start, min(len(self.edges), start + max_edges))]
+            next_seq = batch[-1].seq + 1 if batch else max(since, first)
+        return batch, next_seq, dropped
+
+    def read_clock(self):
+        """Current (t_us, wall): the unwrapped pigpio tick that edges are
+        stamped with, and the Pi's wall time, sampled together."""
+        tick = self.gpio_lib.get_tick()
+        wall = time.time()
+        with self._edge_lock:
+            return self._unwrap_tick(tick, wall), wall
+
+    def _on_rising_edge(self, gpio, tick):
+        for edge in self._edge_waiters:
+            if not edge.done():
+                edge.set_result(tick)
+        self._edge_waiters.clear()
     
-    def handle_command(self, command):
+    async def _run_blocking(self, func, *args):
+        """Run a blocking GPIO call in a worker thread so the loop keeps serving."""
+        return await self._loop.run_in_executor(None, func, *args)
+
+    async def handle_command(self, command):
         if not command:
             return 'ERR EMPTY_COMMAND'
             
         try:
-            print(f'>>> got command {command}', flush=True)
             cmd_parts = command.upper().split()
             cmd = cmd_parts[0]
+            if cmd == 'PING':
+                return 'PONG'
+            if cmd not in ('GET_EDGES', 'CLOCK'):       # polled every shot: keep the console readable
+                print(f'>>> got command {command}', flush=True)
             
             if cmd == 'TRIG':
-                self.send_trigger()
+                async with self._pulse_lock:        # one pulse at a time on the output
+                    await self._run_blocking(self.send_trigger)
                 return 'OK'
             elif cmd == 'STATUS':
                 return 'READY'
+            elif cmd == 'GET_EDGES':
+                # GET_EDGES [since=]<seq> [max=<n>]
+                # -> EDGES next=<seq> dropped=<n> <seq>:<gpio>:<level>:<t_us>:<wall> ...
+                if not self.edge_callbacks:
+                    return 'ERR NO_EDGE_CALLBACKS'
+                try:
+                    args = dict(part.partition('=')[::2] if '=' in part else ('SINCE', part)
+                                for part in cmd_parts[1:])
+                    since = int(args.pop('SINCE', 0))
+                    max_edges = min(int(args.pop('MAX', EDGE_BATCH_MAX)), EDGE_BATCH_MAX)
+                except ValueError:
+                    return 'ERR INVALID_PARAMETERS'
+                if args or since < 0 or max_edges < 1:
+                    return 'ERR INVALID_PARAMETERS'
+                edges, next_seq, dropped = self.get_edges(since, max_edges)
+                return ' '.join([f'EDGES next={next_seq} dropped={dropped}'] +
+                                [f'{e.seq}:{e.gpio}:{e.level}:{e.t_us}:{e.wall:.6f}' for e in edges])
+            elif cmd == 'CLOCK':
+                if not hasattr(self.gpio_lib, 'get_tick'):
+                    return 'ERR NO_TICK'
+                t_us, wall = self.read_clock()
+                return f'CLOCK {t_us} {wall:.6f}'
             elif cmd == 'TEST_INPUT':
                 # Parse test parameters
                 if len(cmd_parts) < 2:
@@ -168,7 +328,7 @@ class TriggerServer:
                 except ValueError:
                     return 'ERR INVALID_PARAMETERS'
                     
-                success = self.test_gpio_input(gpio_num, iterations, delay)
+                success = await self._run_blocking(self.test_gpio_input, gpio_num, iterations, delay)
                 return 'TEST_PASS' if success else 'TEST_FAIL'
                 
             elif cmd == 'TEST_OUTPUT':
@@ -182,7 +342,7 @@ class TriggerServer:
                 except ValueError:
                     return 'ERR INVALID_PARAMETERS'
                     
-                success = self.test_gpio_output(gpio_num, iterations, delay)
+                success = await self._run_blocking(self.test_gpio_output, gpio_num, iterations, delay)
                 return 'TEST_PASS' if success else 'TEST_FAIL'
                 
             elif cmd == 'WAIT_TRIG':
@@ -191,7 +351,7 @@ class TriggerServer:
                 except ValueError:
                     return 'ERR INVALID_TIMEOUT'
                     
-                if self.wait_for_trigger(timeout=timeout):
+                if await self.wait_for_trigger(timeout=timeout):
                     return 'TRIGGERED'
                 return 'NO_TRIGGER'
                 
@@ -297,49 +457,71 @@ class TriggerServer:
             return False
     
     def start(self):
+        """Serve until stop(), Ctrl-C or SIGTERM. Blocks; may run in any thread
+        (signal handlers are only installed from the main thread)."""
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, self.signal_handler)
+            signal.signal(signal.SIGTERM, self.signal_handler)
+        try:
+            asyncio.run(self._serve())
+        except Exception as e:
+            print(f"Fatal error: {str(e)}", flush=True)
+            self.cleanup()
+
+    def stop(self):
+        """Ask a running server to shut down (thread-safe)."""
+        self.running = False
+        loop, stopping = self._loop, self._stopping
+        if loop is not None:
+            loop.call_soon_threadsafe(stopping.set)
+
+    async def _serve(self):
+        self._stopping = asyncio.Event()
+        self._pulse_lock = asyncio.Lock()
+        self._loop = asyncio.get_running_loop()
+        if self.edge_callbacks:
+            self._edge_cb = EDGE_CALLBACK(self._gpio_edge)
+            if self.gpio_lib.set_edge_callback(self.trig_in_gpio_num, self._edge_cb) < 0:
+                print("Edge callback unavailable; WAIT_TRIG will poll", flush=True)
+                self.edge_callbacks = False
+            elif self.gpio_lib.set_edge_callback(self.trig_out_gpio_num, self._edge_cb) < 0:
+                print(f"No edge record for output GPIO# {self.trig_out_gpio_num}", flush=True)
         try:
-            self.sock.listen(1)
+            server = await asyncio.start_server(self.serve_connection, sock=self.sock)
             print(f"Server listening on {self.host}:{self.port}", flush=True)
-            
+            async with server:
+                if not self.running:
+                    return
+                await self._stopping.wait()
+        finally:
+            if self.edge_callbacks:
+                self.gpio_lib.set_edge_callback(self.trig_in_gpio_num, None)
+                self.gpio_lib.set_edge_callback(self.trig_out_gpio_num, None)
+            self._loop = None
+
+    async def serve_connection(self, reader, writer):
+        """Answer newline-framed commands from one client until it disconnects.
+        Its commands are answered in order; other clients are served meanwhile."""
+        addr = writer.get_extra_info('peername')
+        print(f"\nsocket connection from {addr}", flush=True)
+        try:
             while self.running:
+                line = await reader.readline()
+                if not line.endswith(b'\n'):
+                    break                           # closed (possibly mid-line)
+                command = line.decode('ascii').strip()
                 try:
-                    conn, addr = self.sock.accept()
-                    print(f"\nsocket connection from {addr}", flush=True)
-                    
-                    while self.running:
-                        try:
-                            data = conn.recv(1024)
-                            if not data:
-                                break
-                                
-                            command = data.decode('ascii').strip()
-                            response = self.handle_command(command)
-                            conn.send(f"{response}\n".encode('ascii'))
-                            
-                        except socket.error as e:
-                            print(f"Socket error while handling client: {str(e)}", flush=True)
-                            break
-                        except Exception as e:
-                            print(f"Error handling command: {str(e)}", flush=True)
-                            
-                except KeyboardInterrupt:
-                    print("\nReceived keyboard interrupt...", flush=True)
-                    break
-                except socket.error as e:
-                    print(f"Socket error: {str(e)}", flush=True)
+                    response = await self.handle_command(command)
                 except Exception as e:
-                    print(f"Error: {str(e)}", flush=True)
-                finally:
-                    if 'conn' in locals():
-                        try:
-                            conn.close()
-                        except:
-                            pass
-                            
-        except Exception as e:
-            print(f"Fatal error: {str(e)}", flush=True)
-            self.cleanup()
-    
+                    print(f"Error handling command: {str(e)}", flush=True)
+                    response = f'ERR {str(e)}'
+                writer.write(f"{response}\n".encode('ascii'))
+                await writer.drain()
+        except (ConnectionError, OSError) as e:
+            print(f"Socket error while handling client: {str(e)}", flush=True)
+        finally:
+            writer.close()
+
     def signal_handler(self, signum, frame):
         print("\nShutting down server...", flush=True)
         self.running = False
@@ -365,9 +547,19 @@ class TriggerServer:
 #===============================================================================================================================================
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='GPIO trigger server')
+    parser.add_argument('--fake', action='store_true',
+                        help='no Pi: fake GPIO with the trigger output looped back to the input')
+    args = parser.parse_args()
+
+    gpio_lib = None
+    if args.fake:
+        from fake_gpio import FakeGPIOLib
+        gpio_lib = FakeGPIOLib(loopback={TRIG_OUT_GPIO_NUM: TRIG_IN_GPIO_NUM})
+
     try:
         server = TriggerServer(trig_out_gpio_num=TRIG_OUT_GPIO_NUM, trig_in_gpio_num=TRIG_IN_GPIO_NUM, 
-                             host=IP_ADDR, port=PORT)
+                             host=IP_ADDR, port=PORT, gpio_lib=gpio_lib)
     except Exception as e:
         print(f"Failed to initialize server: {str(e)}")
         sys.exit(1)
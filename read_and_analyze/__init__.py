@@ -31,14 +31,21 @@ _FILTER_NAMES = (
 )
 _SMART_NAMES = (
     "analyze_smart_triggers",
+    "full_scan_smart_triggers",
     "plot_smart_triggers",
     "detect_glitch",
     "detect_runt",
     "detect_slew",
     "detect_interval",
 )
+_TABLE_NAMES = (
+    "write_analysis_tables",
+    "read_analysis_tables",
+    "list_analysis_tables",
+)
 
-__all__ = [*_READER_NAMES, *_FLUCTUATION_NAMES, *_FILTER_NAMES, *_SMART_NAMES]
+__all__ = [*_READER_NAMES, *_FLUCTUATION_NAMES, *_FILTER_NAMES, *_SMART_NAMES,
+           *_TABLE_NAMES]
 
 
 def __getattr__(name):
@@ -54,4 +61,7 @@ def __getattr__(name):
     if name in _SMART_NAMES:
         from . import smart_trigger_analysis
         return getattr(smart_trigger_analysis, name)
+    if name in _TABLE_NAMES:
+        from . import analysis_tables
+        return getattr(analysis_tables, name)
     raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
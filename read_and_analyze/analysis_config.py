@@ -13,6 +13,7 @@ clearly separated sections:
                          (read_bmotion_data.py uses only these shared knobs.)
   * FLUCTUATION       -- fluctuation_analysis.py (quietest-window search)
   * XY_MAP            -- plot_xy_map.py (2D XY-plane maps)
+  * LIVE              -- live_monitor.py (live view of the shots being offloaded)
 
 SmartTrigger knobs live in their own ``smart_trigger_config.py`` (which imports
 the SHARED knobs from this file), kept separate because there are many of them,
@@ -45,6 +46,8 @@ SELECT_CHAN  = None     # channels to analyze; None = all channels (shared by ev
 
 SHOW_PLOT   = True  # display figures interactively (shared by every module)
 SAVE_PLOT   = False  # write PNGs to a "plots/" subdir next to the data file (shared by every module)
+SAVE_TABLES = False  # write result tables into the run file under /analysis/<tool> (reload with
+                     # analysis_tables.read_analysis_tables; shared by every module)
 
 AUTO_PLOT   = True  # fallback default for the post-acquisition auto-plot hook when
                     # called without a config; the run's [analysis] auto_plot key
@@ -72,8 +75,24 @@ XY_T_END_MS     = 2.0         # window end   (ms), used when XY_MODE == "range"
 XY_T_STEP_MS    = [10,12,15,19]  # snapshot time(s) in ms for "step" mode; one panel per time.
                                    # A single float (e.g. 4.0) is also accepted -> one panel.
 
-XY_SHOT_INDEX   = 0           # which shot (0-based) per position to map; no shot averaging yet
+XY_SHOT_INDEX   = 0           # which shot (0-based) per position to map when XY_STAT == "shot"
+XY_STAT         = "shot"      # "shot" = one filtered shot (XY_SHOT_INDEX); "mean" / "std" = over the
+                              # repeat shots at each position, unfiltered -- read from the run's
+                              # /analysis/position_mean|std when the offload wrote them (fast)
 
 XY_SHOW_CONTOUR = False       # overlay contour lines on top of the image
 XY_N_CONTOURS   = 8           # number of contour levels when XY_SHOW_CONTOUR is True
 XY_CMAP         = "rainbow"   # imshow colormap
+
+XY_WORKERS      = 1           # parallel per-position filter+reduce; 1 = serial (HDF5 reads
+                              # always stay sequential in the main thread)
+XY_POOL         = "thread"    # "thread" or "process" pool when XY_WORKERS > 1
+
+
+# ======================================================================================
+# LIVE -- live_monitor.py: watch the shots of a running acquisition as the offload
+#         commits them (needs a [live_tap] port in the run's experiment_config.ini)
+# ======================================================================================
+LIVE_HOST   = "127.0.0.1"     # machine running the offload
+LIVE_PORT   = 5760            # must match [live_tap] port
+LIVE_LAST_N = 10              # overlay the most recent N shots per channel (older ones fade)
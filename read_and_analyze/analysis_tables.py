@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Store analysis result tables in the run HDF5 and load them back.
+
+The analysis tools can return their results as compact structured NumPy arrays
+(``as_table=True`` on :func:`~read_and_analyze.smart_trigger_analysis.analyze_smart_triggers`
+and :func:`~read_and_analyze.fluctuation_analysis.find_quiet_window`; always for
+:func:`~read_and_analyze.smart_trigger_analysis.full_scan_smart_triggers`). This
+module writes such a set of tables into the run file itself, one group per
+tool::
+
+    /analysis/<name>/<table>      structured dataset (one row per record/event)
+    /analysis/<name>.attrs        the run-wide settings that produced them
+
+so a long scan is computed once and reloaded later without re-reading a single
+trace. Re-writing a name replaces the previous group. ``/analysis`` is not a
+scope group, so the readers/validators skip it.
+
+Example::
+
+    records, events = analyze_smart_triggers(path, as_table=True)
+    write_analysis_tables(path, "smart_trigger",
+                          {"records": records, "events": events},
+                          attrs={"holdoff_us": 3000.0})
+    tables, attrs = read_analysis_tables(path, "smart_trigger")
+"""
+
+import time
+
+import numpy as np
+
+ANALYSIS_GROUP = "analysis"
+
+
+def write_analysis_tables(path, name, tables, attrs=None):
+    """Write ``tables`` (``{table_name: structured array}``) to ``/analysis/<name>``.
+
+    Any existing ``/analysis/<name>`` group is replaced. ``attrs`` (run-wide
+    settings such as ``math`` or ``window_us``) are stored on the group; ``None``
+    values are omitted (HDF5 has no null attribute) and read back as absent.
+    Non-empty tables are gzip-compressed. Returns the group path written.
+    """
+    import h5py
+
+    with h5py.File(path, "a") as f:
+        root = f.require_group(ANALYSIS_GROUP)
+        if name in root:
+            del root[name]
+        g = root.create_group(name)
+        for key, arr in tables.items():
+            arr = np.asarray(arr)
+            if arr.dtype.names is None:
+                raise ValueError(f"table {key!r} is not a structured array "
+                                 f"(dtype {arr.dtype})")
+            if len(arr):
+                g.create_dataset(key, data=arr, compression="gzip", shuffle=True)
+            else:
+                g.create_dataset(key, shape=(0,), dtype=arr.dtype)
+        for key, value in (attrs or {}).items():
+            if value is not None:
+                g.attrs[key] = value
+        g.attrs["created"] = time.ctime()
+        return g.name
+
+
+def read_analysis_tables(path, name):
+    """Load ``/analysis/<name>``; return ``(tables, attrs)``.
+
+    ``tables`` maps each table name to its structured array (in memory);
+    ``attrs`` is a plain dict of the stored settings. Raises ``KeyError`` if
+    the file has no such result group.
+    """
+    import h5py
+
+    with h5py.File(path, "r") as f:
+        key = f"{ANALYSIS_GROUP}/{name}"
+        if key not in f:
+            raise KeyError(f"no analysis tables '/{key}' in {path}")
+        g = f[key]
+        tables = {k: ds[()] for k, ds in g.items()}
+        attrs = {k: (v.item() if isinstance(v, np.generic) else v)
+                 for k, v in g.attrs.items()}
+    return tables, attrs
+
+
+def list_analysis_tables(path):
+    """Names of the result groups stored under ``/analysis`` (empty if none)."""
+    import h5py
+
+    with h5py.File(path, "r") as f:
+        root = f.get(ANALYSIS_GROUP)
+        return sorted(root.keys()) if root is not None else []
@@ -43,11 +43,13 @@ try:  # works as a package (python -m read_and_analyze.filter_data)
     from read_and_analyze.read_bmotion_data import (
         read_positions, build_positions_index,
         _scope_groups, _shot_numbers, _channel_names, resolve_data_file,
+        _figure_pixel_width, _plot_decimated,
     )
 except ImportError:  # fallback when run directly from inside the folder
     from read_bmotion_data import (
         read_positions, build_positions_index,
         _scope_groups, _shot_numbers, _channel_names, resolve_data_file,
+        _figure_pixel_width, _plot_decimated,
     )
 
 # --------------------------------------------------------------------------------------
@@ -181,7 +183,9 @@ def plot_sample_traces(path, scope=None, channels=None,
     one per panel. Each panel overlays three traces vs time for one
     representative shot — the raw trace, the trace after the median filter, and
     the trace after median+gaussian — using one color per channel with
-    increasing alpha so the final filtered trace reads on top. Honors
+    increasing alpha so the final filtered trace reads on top. Each stage is
+    min/max-decimated to the figure's pixel width for drawing, so long records
+    render quickly (filtering still runs on the full trace). Honors
     SHOW_PLOT/SAVE_PLOT (override with
     show/save). Saves one PNG per scope to a ``plots/`` subdir next to the data
     file. Returns the saved paths.
@@ -229,6 +233,7 @@ def plot_sample_traces(path, scope=None, channels=None,
             fig, axes = plt.subplots(len(picks), 1, figsize=(10, 3 * len(picks)),
                                      sharex=True, squeeze=False)
             axes = axes[:, 0]
+            max_points = _figure_pixel_width(fig)
             for ax, ((x, y), shots) in zip(axes, picks):
                 for ci, ch in enumerate(chans):
                     # One representative shot per channel: the first that reads cleanly.
@@ -253,12 +258,13 @@ def plot_sample_traces(path, scope=None, channels=None,
                     # increasing alpha so the final filtered trace reads on top.
 
                     pre = f"{ch} (shot {shot_used})"
-                    ax.plot(tarr * 1e3, raw, lw=0.6, color='r', alpha=0.25,
-                            label=f"{pre} raw")
-                    ax.plot(tarr * 1e3, med, lw=0.7, color='g', alpha=0.5,
-                            label=f"{pre} +median")
-                    ax.plot(tarr * 1e3, full, lw=1.1, color='b', alpha=1.0,
-                            label=f"{pre} +median+gaussian")
+                    t_ms = tarr * 1e3
+                    _plot_decimated(ax, t_ms, raw, max_points, lw=0.6, color='r',
+                                    alpha=0.25, label=f"{pre} raw")
+                    _plot_decimated(ax, t_ms, med, max_points, lw=0.7, color='g',
+                                    alpha=0.5, label=f"{pre} +median")
+                    _plot_decimated(ax, t_ms, full, max_points, lw=1.1, color='b',
+                                    alpha=1.0, label=f"{pre} +median+gaussian")
 
                 ax.set_title(f"x={x:.1f}, y={y:.1f}", fontsize=10, loc="left")
                 ax.set_ylabel("V")
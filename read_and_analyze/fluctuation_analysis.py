@@ -50,9 +50,10 @@ try:  # works as a package (python -m read_and_analyze.fluctuation_analysis)
     from read_and_analyze.filter_data import (
         _filter_trace, _as_list, _shots_by_position, FilteredTraceCache,
     )
+    from read_and_analyze.analysis_tables import write_analysis_tables
     from read_and_analyze.analysis_config import (
         MED_SIZE, GAUSS_SIGMA, POS_TOL as _POS_TOL,
-        SELECT_SCOPE as SCOPE, SELECT_CHAN as CHANNELS, SHOW_PLOT, SAVE_PLOT,
+        SELECT_SCOPE as SCOPE, SELECT_CHAN as CHANNELS, SHOW_PLOT, SAVE_PLOT, SAVE_TABLES,
         FLUCT_WINDOW_US as WINDOW_US, FLUCT_SIGNAL_FRAC as SIGNAL_FRAC,
     )
 except ImportError:  # fallback when run directly from inside the folder
@@ -63,9 +64,10 @@ except ImportError:  # fallback when run directly from inside the folder
     from filter_data import (
         _filter_trace, _as_list, _shots_by_position, FilteredTraceCache,
     )
+    from analysis_tables import write_analysis_tables
     from analysis_config import (
         MED_SIZE, GAUSS_SIGMA, POS_TOL as _POS_TOL,
-        SELECT_SCOPE as SCOPE, SELECT_CHAN as CHANNELS, SHOW_PLOT, SAVE_PLOT,
+        SELECT_SCOPE as SCOPE, SELECT_CHAN as CHANNELS, SHOW_PLOT, SAVE_PLOT, SAVE_TABLES,
         FLUCT_WINDOW_US as WINDOW_US, FLUCT_SIGNAL_FRAC as SIGNAL_FRAC,
     )
 
@@ -73,9 +75,20 @@ except ImportError:  # fallback when run directly from inside the folder
 # ======================================================================================
 # Core analysis
 # ======================================================================================
+# Compact table form of the per-position records (``find_quiet_window(...,
+# as_table=True)``): same fields as the record dicts, one row per
+# (scope, channel, position), in the same best-first order.
+QUIET_RECORD_DTYPE = np.dtype([
+    ("scope", "S32"), ("channel", "S8"), ("x", "<f8"), ("y", "<f8"),
+    ("n_shots", "<i4"), ("t_center", "<f8"), ("t_start", "<f8"), ("t_end", "<f8"),
+    ("flatness_rel", "<f8"), ("cv_shots", "<f8"), ("grad_x", "<f8"),
+    ("score", "<f8"), ("window_mean", "<f8"),
+])
+
 
 def find_quiet_window(path, scope=None, channels=None, window_us=None,
-                      med_size=None, gauss_sigma=None, signal_frac=None):
+                      med_size=None, gauss_sigma=None, signal_frac=None,
+                      as_table=False):
     """Find the quiet, steep-gradient window per (scope, channel, position).
 
     Parameters default to the module constants. Traces are denoised with a
@@ -86,6 +99,9 @@ def find_quiet_window(path, scope=None, channels=None, window_us=None,
     that has a valid window), sorted by ``score`` ascending (best first). Each
     record has keys: ``scope, channel, x, y, n_shots, t_center, t_start, t_end,
     flatness_rel, cv_shots, grad_x, score, window_mean``.
+
+    With ``as_table=True`` returns the same rows as one ``QUIET_RECORD_DTYPE``
+    structured array (see :func:`quiet_records_to_table`).
     """
     import h5py
 
@@ -130,7 +146,16 @@ def find_quiet_window(path, scope=None, channels=None, window_us=None,
             records.extend(scope_records)
 
     records.sort(key=lambda r: r["score"])
-    return records
+    return quiet_records_to_table(records) if as_table else records
+
+
+def quiet_records_to_table(records):
+    """Pack :func:`find_quiet_window` record dicts into a ``QUIET_RECORD_DTYPE``
+    array (row order kept), ready for
+    :func:`read_and_analyze.analysis_tables.write_analysis_tables`."""
+    names = QUIET_RECORD_DTYPE.names
+    return np.array([tuple(r[k] for k in names) for r in records],
+                    dtype=QUIET_RECORD_DTYPE)
 
 
 def _add_gradient_term(cache, scope, recs, by_pos, tarr):
@@ -211,16 +236,32 @@ def _best_window_for_position(cache, scope, ch, x, y, shots, tarr, w, signal_fra
 def _cv_curve(traces, mean_trace, tarr, w):
     """Slide a length-``w`` window across the record; return (window-start indices,
     window-center times, shot-to-shot CV per window). ``traces`` is (n_shots, N)
-    filtered; ``mean_trace`` is its across-shot mean."""
+    filtered; ``mean_trace`` is its across-shot mean.
+
+    All windows are evaluated at once on a strided ``sliding_window_view`` (no
+    copy; windows overlap by half), so the per-window means come out of one
+    reduction instead of a Python loop over window starts. Each window is still
+    reduced along its own contiguous sample axis, and the shot std along a
+    contiguous shot axis, so the result matches the per-window loop exactly.
+    """
+    from numpy.lib.stride_tricks import sliding_window_view
+
     n = mean_trace.size
     stride = max(1, w // 2)
     starts = np.arange(0, n - w + 1, stride)
-    t_centers = np.array([tarr[s + w // 2] for s in starts], dtype=float)
-    cv = np.empty(starts.size, dtype=float)
-    for j, start in enumerate(starts):
-        m_i = traces[:, start:start + w].mean(axis=1)        # per-shot window means
-        window_mean = float(mean_trace[start:start + w].mean())
-        cv[j] = float(np.std(m_i)) / abs(window_mean) if window_mean != 0 else np.nan
+    if starts.size == 0:
+        return starts, np.empty(0, dtype=float), np.empty(0, dtype=float)
+    t_centers = np.asarray(tarr[starts + w // 2], dtype=float)
+
+    # (n_shots, n_windows) per-shot window means -> (n_windows, n_shots) so the
+    # std runs along a contiguous axis, exactly as np.std on one window's m_i.
+    m = sliding_window_view(traces, w, axis=1)[:, ::stride].mean(axis=2)
+    m = np.ascontiguousarray(m.T)
+    window_mean = sliding_window_view(mean_trace, w)[::stride].mean(axis=1)
+    sd = np.std(m, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cv = sd / np.abs(window_mean)
+    cv[window_mean == 0] = np.nan
     return starts, t_centers, cv
 
 
@@ -423,6 +464,12 @@ def main():
     data_file = resolve_data_file()
     records = find_quiet_window(data_file)
     _print_table(records)
+    if SAVE_TABLES:
+        where = write_analysis_tables(
+            data_file, "quiet_window", {"records": quiet_records_to_table(records)},
+            attrs={"window_us": WINDOW_US, "med_size": MED_SIZE,
+                   "gauss_sigma": GAUSS_SIGMA, "signal_frac": SIGNAL_FRAC})
+        print(f"Saved tables: {where}")
     if SHOW_PLOT or SAVE_PLOT:
         plot_quiet_window(data_file)
 
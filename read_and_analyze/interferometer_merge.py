@@ -33,14 +33,16 @@ pad_seconds to widen the window, or (interactive=True) get a terminal prompt.
 The interferometer time actually saved for each shot is recorded as attributes
 on every merged dataset and printed to the terminal.
 
-TODO (future, if needed): shot-to-shot matching for every shot. The building
-block get_shot_timestamps() already returns every shot's trigger time; the
-robust clock-offset estimator (estimate_clock_offset / _nearest_delta) that
-would drive a tight per-shot tolerance was left in
-bapsf_interferometer/interf_merge_lapd_daq.py and can be restored from there.
-It is omitted here because the offset is only identifiable modulo the shot
-period (both systems trigger off the same periodic LAPD edge), so per-shot
-pairing is ambiguous when the clocks are badly out of sync.
+Shot-to-shot matching for every shot (merge_interferometer_per_shot; on at the
+end of offload when PER_SHOT_INDEX is set): estimate_clock_offset folds every
+interferometer trace time onto the shot grid and takes the densest phase as the
+clock offset, then match_shots pairs each shot with its nearest trace within a
+tolerance. The result is a compact shot -> trace index table at
+diagnostics/interferometer/shot_index (trace data is copied only on request).
+Caveat: the offset is only identifiable modulo the shot period (both systems
+trigger off the same periodic LAPD edge); the branch nearest zero is used, so
+clocks more than half a period apart pair every shot with a neighbouring shot's
+trace. The offset confidence recorded with the table flags a poor lock.
 
 The new acquisition (LAPD_DAQ repo, spooled) writes:
 
@@ -76,7 +78,6 @@ interferometer times were saved is noted on every merged dataset
 import os
 import re
 import sys
-import bisect
 import contextlib
 import datetime
 import time
@@ -98,7 +99,9 @@ if _REPO_ROOT not in sys.path:
 # the same class from lab_scopes.lecroy.) scope_shot_numbers is the shared
 # shot_<n> parser so we don't re-derive it; scope_io depends only on numpy+h5py.
 from scope_io import scope_shot_numbers as _shot_numbers
-from scope_io.wavedesc import LeCroyWavedesc
+from scope_io.wavedesc import (
+	LeCroyWavedesc, WAVEDESC_SIZE, decode_wavedescs, wavedesc_trigger_epochs,
+)
 
 
 #===============================================================================================================================================
@@ -116,6 +119,14 @@ INTERFEROMETER_DATA_DIR = r"N:\interferometer"   # <-- set to the real path
 # for older formats.
 DATA_GROUPS = ("phase_p20", "phase_p29", "phase_p40", "time_array", "time_array_p40")
 
+# Per-shot matching (merge_interferometer_per_shot). With PER_SHOT_INDEX on, the
+# end-of-offload merge also writes the shot->interferometer index table (no
+# trace data is copied for it). PER_SHOT_TOLERANCE_S is the largest |residual|
+# between a shot (after the estimated clock offset) and its trace for the pair
+# to count; None = a tenth of the shot period.
+PER_SHOT_INDEX = False
+PER_SHOT_TOLERANCE_S = None
+
 
 #===============================================================================================================================================
 # New-format datarun reading
@@ -198,6 +209,54 @@ def _shot_trigger_timestamp(shot_group):
 	return None, None
 
 
+def _scope_shot_timestamps(sg):
+	'''
+	Trigger timestamps for every non-skipped shot of one scope group.
+
+	Each shot's first stored header (sorted key order, as _shot_trigger_timestamp
+	tries them) is read into one buffer and decoded in bulk
+	(scope_io.wavedesc.decode_wavedescs + wavedesc_trigger_epochs, local time,
+	exactly _wavedesc_epoch_local per shot). Shots whose first header is missing, malformed, or has
+	no trigger time go through the per-shot _shot_trigger_timestamp path (other
+	channels' headers, then the acquisition_time fallback).
+
+	Returns (shots, stamps, sources) lists, shots without any timestamp dropped.
+	'''
+	shot_nums = []
+	bulk_rows, bulk_raw = [], []
+	for n in _shot_numbers(sg):
+		shot = sg[f'shot_{n}']
+		if shot.attrs.get('skipped', False):
+			continue
+		shot_nums.append(n)
+		hdr = next((k for k in sorted(shot.keys()) if k.endswith('_header')), None)
+		if hdr is None:
+			continue
+		try:
+			raw = bytes(shot[hdr][()])
+		except Exception:
+			continue
+		if len(raw) == WAVEDESC_SIZE:
+			bulk_rows.append(len(shot_nums) - 1)
+			bulk_raw.append(raw)
+
+	stamps = np.full(len(shot_nums), np.nan)
+	if bulk_raw:
+		stamps[bulk_rows] = wavedesc_trigger_epochs(decode_wavedescs(b''.join(bulk_raw)))
+
+	shots, out_stamps, sources = [], [], []
+	for n, ts in zip(shot_nums, stamps.tolist()):
+		source = 'wavedesc'
+		if ts != ts:  # NaN: not decodable in bulk -> per-shot fallbacks
+			ts, source = _shot_trigger_timestamp(sg[f'shot_{n}'])
+			if ts is None:
+				continue
+		shots.append(n)
+		out_stamps.append(ts)
+		sources.append(source)
+	return shots, out_stamps, sources
+
+
 def get_shot_timestamps(datarun_path, verbose=True):
 	'''
 	Get shot numbers and trigger timestamps from a LAPD_DAQ-format datarun file.
@@ -209,6 +268,10 @@ def get_shot_timestamps(datarun_path, verbose=True):
 	Skipped shots (attrs['skipped']) are excluded -- they have no scope data and
 	their acquisition_time may be an offload-lagged stamp.
 
+	The WAVEDESC trigger times are decoded in bulk per scope (see
+	_scope_shot_timestamps), so the cost is one header read per shot plus a
+	single vectorized decode.
+
 	Parameters:
 	datarun_path (str): Path to the datarun hdf5 file.
 	verbose (bool): Print the reference scope and shot count.
@@ -226,18 +289,7 @@ def get_shot_timestamps(datarun_path, verbose=True):
 
 		best = None  # (shots, timestamps, sources, scope_name)
 		for scope_name in scopes:
-			sg = f[scope_name]
-			shots, stamps, sources = [], [], []
-			for n in _shot_numbers(sg):
-				shot = sg[f'shot_{n}']
-				if shot.attrs.get('skipped', False):
-					continue
-				ts, source = _shot_trigger_timestamp(shot)
-				if ts is None:
-					continue
-				shots.append(n)
-				stamps.append(ts)
-				sources.append(source)
+			shots, stamps, sources = _scope_shot_timestamps(f[scope_name])
 			if not shots:
 				continue
 			if 'wavedesc' in sources:
@@ -320,18 +372,19 @@ def _open_interf_index(stack, interf_paths):
 	'''Open all candidate interferometer files and build one unified index.
 
 	Files are opened read-only on the caller's ExitStack. The unified index is
-	sorted by timestamp so a per-shot lookup is a single O(log N) bisect
-	regardless of how many candidate files were supplied.
+	sorted by timestamp so shots are matched against it with np.searchsorted
+	(one vectorized pass for any number of shots) regardless of how many
+	candidate files were supplied.
 
 	Returns (f_interfs, all_pairs, sorted_floats, per_file_groups) where
 	all_pairs is [(float_timestamp, dataset_name, file_idx)] sorted by time,
-	sorted_floats are the timestamps alone, and per_file_groups[i] is the set
-	of DATA_GROUPS present in file i (so per-shot reads know which channels to
-	look up in which file).
+	sorted_floats is a float ndarray of the timestamps alone, and
+	per_file_groups[i] is the set of DATA_GROUPS present in file i (so reads
+	know which channels to look up in which file).
 	'''
 	f_interfs = [stack.enter_context(h5py.File(p, "r")) for p in interf_paths]
 
-	all_pairs = []
+	names, file_ids = [], []
 	per_file_groups = []
 	for file_idx, f_interf in enumerate(f_interfs):
 		# phase_p20 is the canonical reader index in newer files (it is
@@ -341,76 +394,106 @@ def _open_interf_index(stack, interf_paths):
 		if index_group is None:
 			raise ValueError(f"No interferometer groups found in {interf_paths[file_idx]}")
 		per_file_groups.append(set(g for g in DATA_GROUPS if g in f_interf))
-		for name in f_interf[index_group].keys():
-			all_pairs.append((float(name), name, file_idx))
-
-	all_pairs.sort(key=lambda p: p[0])
-	sorted_floats = [p[0] for p in all_pairs]
+		keys = list(f_interf[index_group].keys())
+		names.extend(keys)
+		file_ids.extend([file_idx] * len(keys))
+
+	stamps = np.array(names, dtype=float) if names else np.zeros(0)
+	order = np.argsort(stamps, kind='stable')
+	sorted_floats = stamps[order]
+	all_pairs = [(float(sorted_floats[k]), names[i], file_ids[i])
+	             for k, i in enumerate(order.tolist())]
 	return f_interfs, all_pairs, sorted_floats, per_file_groups
 
 
-def _available_groups(datarun_path, per_file_groups):
-	'''Groups available for writing = groups present in the datarun file AND
-	present in at least one interferometer file.'''
-	with h5py.File(datarun_path, "r") as f_datarun:
-		datarun_groups = set(f_datarun.get("diagnostics/interferometer", {}).keys())
+def _nearest_index(sorted_floats, targets):
+	'''Index of the trace nearest each target time, in one searchsorted pass.
+
+	sorted_floats must be non-empty and ascending. Ties go to the EARLIER
+	trace, and among equal timestamps to the first one, i.e. the same pick as
+	min(range(n), key=lambda j: abs(sorted_floats[j] - t)). Returns an int
+	array shaped like targets.
+	'''
+	targets = np.asarray(targets, dtype=float)
+	n = len(sorted_floats)
+	j = np.searchsorted(sorted_floats, targets, side='left')
+	left = np.clip(j - 1, 0, n - 1)
+	right = np.clip(j, 0, n - 1)
+	take_left = np.abs(targets - sorted_floats[left]) <= np.abs(sorted_floats[right] - targets)
+	idx = np.where(take_left, left, right)
+	# Collapse duplicate timestamps onto their first occurrence.
+	return np.searchsorted(sorted_floats, sorted_floats[idx], side='left')
+
+
+def _available_groups(f_datarun, per_file_groups):
+	'''Groups available for writing = groups present in the (open) datarun file
+	AND present in at least one interferometer file.'''
+	datarun_groups = set(f_datarun.get("diagnostics/interferometer", {}).keys())
 	union_interf_groups = set().union(*per_file_groups) if per_file_groups else set()
 	return [g for g in DATA_GROUPS
 	        if g in union_interf_groups and g in datarun_groups]
 
 
-def _copy_shot_datasets(datarun_path, f_interf, groups_in_this_file,
-                        available_groups, matching_set, shot_n,
-                        extra_attrs=None):
-	'''Copy one interferometer trace set into the datarun as shot ``shot_n``.
+def _write_merged_shots(datarun_path, f_interfs, per_file_groups, merges,
+                        parent_attrs=None, verbose=False):
+	'''Bulk merge engine: copy many interferometer trace sets into the datarun.
 
-	Reads each available group's ``matching_set`` dataset from the open source
-	file and writes it under diagnostics/interferometer/<group>/<shot_n>,
-	copying the source attributes (plus ``extra_attrs``, if given). Datasets
-	that already exist are left untouched, so re-runs are idempotent. The
-	datarun file is opened just for this shot so an interruption mid-run
-	leaves already-merged shots safely flushed to disk.
+	merges is a sequence of (shot_n, trace_name, file_idx, extra_attrs): each
+	available group's trace_name dataset in f_interfs[file_idx] is written to
+	diagnostics/interferometer/<group>/<shot_n> with the source attributes plus
+	extra_attrs. parent_attrs (provenance) are set on
+	diagnostics/interferometer. Datasets that already exist are left untouched,
+	so re-runs are idempotent.
 
-	Returns True if any dataset was written.
-	'''
-	shot_data = {}
-	shot_attrs = {}
-	for g in available_groups:
-		# Skip groups not present in this particular source file
-		# (e.g. older files without phase_p40), and shots where
-		# phase_p40 is legitimately absent for that file.
-		if g not in groups_in_this_file or matching_set not in f_interf[g]:
-			continue
-		ds = f_interf[g][matching_set]
-		shot_data[g] = ds[:]
-		shot_attrs[g] = dict(ds.attrs)
+	The datarun is opened ONCE for the whole batch and flushed + fsynced once
+	at the end -- not per shot -- so a full shot-to-shot merge of thousands of
+	shots costs one open/fsync cycle. An exception mid-batch still closes (and
+	so flushes) the file with everything written so far.
 
-	wrote_any = False
+	Returns the list of shot_n values for which any dataset was written.
+	'''
+	written = []
 	with h5py.File(datarun_path, "a") as f_datarun:
-		for g, data in shot_data.items():
-			dest = f_datarun[f"diagnostics/interferometer/{g}"]
-			if shot_n in dest:
-				continue
-			new_ds = dest.create_dataset(shot_n, data=data)
-			for attr_name, attr_value in shot_attrs[g].items():
-				new_ds.attrs[attr_name] = attr_value
-			if extra_attrs:
-				for attr_name, attr_value in extra_attrs.items():
+		available_groups = _available_groups(f_datarun, per_file_groups)
+		parent = f_datarun.require_group("diagnostics/interferometer")
+		for name, value in (parent_attrs or {}).items():
+			parent.attrs[name] = value
+		dests = {g: parent[g] for g in available_groups}
+
+		for shot_n, trace_name, file_idx, extra_attrs in merges:
+			f_interf = f_interfs[file_idx]
+			groups_in_this_file = per_file_groups[file_idx]
+			wrote_any = False
+			for g in available_groups:
+				# Skip groups not present in this particular source file
+				# (e.g. older files without phase_p40), and shots where
+				# phase_p40 is legitimately absent for that file.
+				if g not in groups_in_this_file or trace_name not in f_interf[g]:
+					continue
+				if shot_n in dests[g]:
+					continue
+				src = f_interf[g][trace_name]
+				new_ds = dests[g].create_dataset(shot_n, data=src[()])
+				for attr_name, attr_value in src.attrs.items():
 					new_ds.attrs[attr_name] = attr_value
-			wrote_any = True
-		if wrote_any:
-			# Push h5py library buffers to the kernel, then ask the
-			# kernel to push its page cache to disk. Narrows the
-			# window where an OS crash or power loss could lose the
-			# just-written shot.
-			f_datarun.flush()
-			try:
-				os.fsync(f_datarun.id.get_vfd_handle())
-			except (OSError, AttributeError):
-				# Some VFDs don't expose a raw fd; flush() alone has
-				# already done what it can.
-				pass
-	return wrote_any
+				for attr_name, attr_value in (extra_attrs or {}).items():
+					new_ds.attrs[attr_name] = attr_value
+				wrote_any = True
+			if wrote_any:
+				written.append(shot_n)
+				if verbose:
+					print(f"Shot {shot_n} wrote into datarun file")
+
+		# Push h5py library buffers to the kernel, then ask the kernel to
+		# push its page cache to disk -- once, for the whole batch.
+		f_datarun.flush()
+		try:
+			os.fsync(f_datarun.id.get_vfd_handle())
+		except (OSError, AttributeError):
+			# Some VFDs don't expose a raw fd; flush() alone has
+			# already done what it can.
+			pass
+	return written
 
 
 _DATE_RE = re.compile(r'(\d{4}-\d{2}-\d{2})')
@@ -560,12 +643,12 @@ def merge_interferometer_data(datarun_path, interf_path,
 		def window_selection(pad):
 			'''Indices into all_pairs of the traces (within the padded window)
 			closest to the first and last shot, or None if the window is empty.'''
-			lo = bisect.bisect_left(sorted_floats, t_first - pad)
-			hi = bisect.bisect_right(sorted_floats, t_last + pad)
+			lo = int(np.searchsorted(sorted_floats, t_first - pad, side='left'))
+			hi = int(np.searchsorted(sorted_floats, t_last + pad, side='right'))
 			if lo >= hi:
 				return None
-			i_first = min(range(lo, hi), key=lambda j: abs(sorted_floats[j] - t_first))
-			i_last = min(range(lo, hi), key=lambda j: abs(sorted_floats[j] - t_last))
+			i_first, i_last = (_nearest_index(sorted_floats[lo:hi], [t_first, t_last])
+			                   + lo).tolist()
 			return i_first, i_last, hi - lo
 
 		_log(f"Run window: {_fmt_local(t_first)} -> {_fmt_local(t_last)} "
@@ -624,12 +707,9 @@ def merge_interferometer_data(datarun_path, interf_path,
 			_log(f"Shot {shot_num} <- interferometer trace {trace_name} "
 			     f"({_fmt_local(trace_ts)}, {trace_ts - shot_ts:+.3f} s from shot trigger)")
 
-		available_groups = _available_groups(datarun_path, per_file_groups)
-
 		# Provenance: how the selection was made, recorded once per merge.
-		with h5py.File(datarun_path, "a") as f_datarun:
-			parent = f_datarun.require_group("diagnostics/interferometer")
-			parent.attrs['timestamp source'] = (
+		parent_attrs = {
+			'timestamp source': (
 				"Shot times: WAVEDESC trigger time from stored scope headers (scope "
 				"RTC, local time); 'acquisition_time' attr fallback for undecodable "
 				"headers. Interferometer traces acquired within the run window were "
@@ -637,34 +717,254 @@ def merge_interferometer_data(datarun_path, interf_path,
 				"shot number) and the one closest to the last shot (saved under the "
 				"last shot number). Sequence-mode shots are timed by their first "
 				"segment only. See each dataset's attributes for the exact "
-				"interferometer time saved.")
-			parent.attrs['reference scope'] = ref_scope
-			parent.attrs['run window (s since epoch)'] = np.array([t_first, t_last])
-			parent.attrs['window pad applied (s)'] = pad_applied
-			parent.attrs['merged shot numbers'] = np.array(
-				[p[0] for p in picks], dtype=int)
-			parent.attrs['merged interferometer timestamps (s since epoch)'] = np.array(
-				[p[2] for p in picks])
-
-		for shot_num, shot_ts, trace_ts, trace_name, file_idx in picks:
-			# Clearly note which interferometer time this data is from.
-			provenance = {
-				'interferometer timestamp (s since epoch)': float(trace_ts),
-				'interferometer time (local)': _fmt_local(trace_ts),
-				'time difference from shot trigger (s)': float(trace_ts - shot_ts),
-			}
-			if _copy_shot_datasets(datarun_path, f_interfs[file_idx],
-			                       per_file_groups[file_idx], available_groups,
-			                       trace_name, str(shot_num),
-			                       extra_attrs=provenance):
-				shots_written += 1
-
-			_log(f"Shot {shot_num} wrote into datarun file")
+				"interferometer time saved."),
+			'reference scope': ref_scope,
+			'run window (s since epoch)': np.array([t_first, t_last]),
+			'window pad applied (s)': pad_applied,
+			'merged shot numbers': np.array([p[0] for p in picks], dtype=int),
+			'merged interferometer timestamps (s since epoch)': np.array(
+				[p[2] for p in picks]),
+		}
+		# Clearly note which interferometer time each dataset is from.
+		merges = [(str(shot_num), trace_name, file_idx, {
+			'interferometer timestamp (s since epoch)': float(trace_ts),
+			'interferometer time (local)': _fmt_local(trace_ts),
+			'time difference from shot trigger (s)': float(trace_ts - shot_ts),
+		}) for shot_num, shot_ts, trace_ts, trace_name, file_idx in picks]
+		shots_written = len(_write_merged_shots(
+			datarun_path, f_interfs, per_file_groups, merges,
+			parent_attrs=parent_attrs, verbose=verbose))
 
 	_log(f'Interferometer data merged into datarun file ({shots_written} shots written).')
 	return shots_written
 
 
+#===============================================================================================================================================
+# Per-shot matching (every shot, clock offset estimated by phase folding)
+#===============================================================================================================================================
+
+# One row per datarun shot: which interferometer trace it was paired with.
+# Unmatched shots keep their row with interf_time/residual NaN, file_idx -1 and
+# an empty trace name, so the table is indexable by shot order.
+SHOT_INDEX_DTYPE = np.dtype([
+	('shot_num', '<i4'), ('shot_time', '<f8'), ('interf_time', '<f8'),
+	('residual', '<f8'), ('file_idx', '<i2'), ('trace', 'S32'),
+])
+
+SHOT_INDEX_PATH = "diagnostics/interferometer/shot_index"
+
+
+def estimate_clock_offset(shot_ts, interf_ts, period=None, bins=100):
+	'''
+	Estimate the interferometer-minus-scope clock offset MODULO the shot period.
+
+	Both systems trigger off the same periodic LAPD edge, so each interferometer
+	trace sits at (some shot's trigger time + offset), and the offset is only
+	identifiable modulo the shot period. Every trace is folded onto the shot
+	grid -- its time minus the nearest shot's time, a phase in [-P/2, P/2] --
+	and the folded phases are histogrammed (circularly) over all candidates at
+	once; the densest bin, refined by the circular mean of the phases near it,
+	is the offset. The branch nearest zero is returned, i.e. the clocks are
+	assumed to agree to within half a shot period; a larger true offset shifts
+	every pairing by whole shots and cannot be told apart here.
+
+	Parameters:
+	shot_ts (array): Shot trigger times (epoch s), ascending.
+	interf_ts (array): Candidate interferometer trace times (epoch s), ascending.
+	period (float | None): Shot period (s); None = median shot spacing.
+	bins (int): Histogram bins across one period.
+
+	Returns:
+	(float, float, float): offset (s, in [-P/2, P/2)), the period used, and the
+		fraction of traces folded within one bin width of the offset (a
+		confidence: ~1 for a clean lock, ~2/bins for no lock at all).
+	'''
+	shot_ts = np.asarray(shot_ts, dtype=float)
+	interf_ts = np.asarray(interf_ts, dtype=float)
+	if period is None:
+		if len(shot_ts) < 2:
+			raise ValueError("Need >= 2 shots (or an explicit period) to fold on the shot period")
+		period = float(np.median(np.diff(shot_ts)))
+	if not np.isfinite(period) or period <= 0:
+		raise ValueError(f"Shot period must be positive, got {period}")
+	if len(interf_ts) == 0 or len(shot_ts) == 0:
+		raise ValueError("No timestamps to estimate a clock offset from")
+
+	nearest = _nearest_index(shot_ts, interf_ts)
+	phase = interf_ts - shot_ts[nearest]
+	phase = phase[np.abs(phase) <= period / 2]        # traces outside the run
+	if len(phase) == 0:
+		raise ValueError("No interferometer trace within half a period of any shot")
+	phase = _wrap(phase, period)
+
+	counts, edges = np.histogram(phase, bins=bins, range=(-period / 2, period / 2))
+	width = edges[1] - edges[0]
+	peak = edges[np.argmax(counts)] + width / 2
+	near = np.abs(_wrap(phase - peak, period)) <= 1.5 * width
+	angle = np.angle(np.mean(np.exp(2j * np.pi * phase[near] / period)))
+	offset = float(_wrap(angle * period / (2 * np.pi), period))
+	confidence = float(np.mean(np.abs(_wrap(phase - offset, period)) <= width))
+	return offset, period, confidence
+
+
+def _wrap(x, period):
+	'''Wrap times onto [-period/2, period/2).'''
+	return (np.asarray(x, dtype=float) + period / 2) % period - period / 2
+
+
+def match_shots(shot_ts, interf_ts, offset, tolerance):
+	'''
+	Pair every shot with its nearest interferometer trace, one searchsorted pass.
+
+	Each shot's expected trace time is shot_ts + offset; the nearest trace in
+	interf_ts (ascending) is taken if it lies within tolerance seconds. A trace
+	is paired with at most one shot: when several shots land on the same trace
+	the closest keeps it and the others go unmatched.
+
+	Returns:
+	(numpy.ndarray, numpy.ndarray): per shot, the index into interf_ts (-1 if
+		unmatched) and the residual trace_time - (shot_time + offset) (NaN if
+		unmatched).
+	'''
+	shot_ts = np.asarray(shot_ts, dtype=float)
+	interf_ts = np.asarray(interf_ts, dtype=float)
+	idx = np.full(len(shot_ts), -1, dtype=np.int64)
+	residual = np.full(len(shot_ts), np.nan)
+	if len(interf_ts) == 0 or len(shot_ts) == 0:
+		return idx, residual
+
+	expected = shot_ts + offset
+	cand = _nearest_index(interf_ts, expected)
+	res = interf_ts[cand] - expected
+	ok = np.flatnonzero(np.abs(res) <= tolerance)
+	# One shot per trace: order by (trace, |residual|) and keep each trace's first.
+	order = ok[np.lexsort((np.abs(res[ok]), cand[ok]))]
+	first = np.ones(len(order), dtype=bool)
+	first[1:] = cand[order][1:] != cand[order][:-1]
+	keep = order[first]
+	idx[keep] = cand[keep]
+	residual[keep] = res[keep]
+	return idx, residual
+
+
+def merge_interferometer_per_shot(datarun_path, interf_path, tolerance=None,
+                                  offset=None, copy_data=False, verbose=True):
+	'''
+	Shot-to-shot interferometer matching for EVERY shot of a LAPD_DAQ run.
+
+	Call init_datarun_groups(datarun_path, interf_path) first. The clock offset
+	is estimated from the whole timestamp series (estimate_clock_offset) unless
+	given, every shot is paired with its nearest trace within tolerance
+	(match_shots), and the pairing is written as one compact SHOT_INDEX_DTYPE
+	table at diagnostics/interferometer/shot_index -- trace names and times,
+	not trace data -- with the offset, period, tolerance, confidence and source
+	file names as attributes. Rewriting replaces the table.
+
+	With copy_data=True the matched traces are also copied under
+	diagnostics/interferometer/<group>/<shot_number>, all in one datarun open
+	(_write_merged_shots); existing datasets (e.g. from the first+last merge)
+	are kept.
+
+	Parameters:
+	datarun_path (str): Path to the datarun hdf5 file.
+	interf_path (str | list[str]): One or more interferometer hdf5 files.
+	tolerance (float | None): Max |residual| (s) for a pair; None =
+		PER_SHOT_TOLERANCE_S, or a tenth of the shot period if that is None.
+	offset (float | None): Known clock offset (s); None = estimate it (needs
+		>= 2 shots: a single-shot run has no period to fold on).
+	copy_data (bool): Also copy every matched trace into the datarun.
+	verbose (bool): Print the offset estimate and match summary.
+
+	Returns:
+	numpy.ndarray: The SHOT_INDEX_DTYPE table that was written.
+	'''
+	def _log(msg):
+		if verbose:
+			print(msg)
+
+	shot_numbers, shot_ts, _sources, ref_scope = \
+		get_shot_timestamps(datarun_path, verbose=verbose)
+	interf_paths = _normalize_interf_paths(interf_path)
+
+	with contextlib.ExitStack() as stack:
+		f_interfs, all_pairs, sorted_floats, per_file_groups = \
+			_open_interf_index(stack, interf_paths)
+		if len(shot_ts) > 1:
+			period = float(np.median(np.diff(shot_ts)))
+		else:
+			period = float('nan')
+
+		if offset is None:
+			if not np.isfinite(period):
+				raise ValueError(f"Cannot estimate the clock offset from {len(shot_ts)} shot "
+				                 "timestamp(s); pass offset (and tolerance) explicitly")
+			offset, period, confidence = estimate_clock_offset(shot_ts, sorted_floats, period)
+			_log(f"Clock offset (interferometer - scope): {offset:+.4f} s modulo the "
+			     f"{period:.4f} s shot period (confidence {confidence:.2f})")
+		else:
+			confidence = float('nan')
+		if tolerance is None:
+			tolerance = PER_SHOT_TOLERANCE_S
+		if tolerance is None:
+			if not np.isfinite(period):
+				raise ValueError("Pass tolerance explicitly for a single-shot run")
+			tolerance = 0.1 * period
+
+		idx, residual = match_shots(shot_ts, sorted_floats, offset, tolerance)
+		matched = idx >= 0
+
+		table = np.zeros(len(shot_numbers), dtype=SHOT_INDEX_DTYPE)
+		table['shot_num'] = shot_numbers
+		table['shot_time'] = shot_ts
+		table['interf_time'] = np.nan
+		table['interf_time'][matched] = sorted_floats[idx[matched]]
+		table['residual'] = residual
+		table['file_idx'] = -1
+		for k in np.flatnonzero(matched).tolist():
+			_ts, name, file_idx = all_pairs[idx[k]]
+			table['file_idx'][k] = file_idx
+			table['trace'][k] = name.encode()
+		_log(f"Matched {int(matched.sum())}/{len(table)} shots within +/-{tolerance:g} s")
+
+		with h5py.File(datarun_path, "a") as f_datarun:
+			parent = f_datarun.require_group("diagnostics/interferometer")
+			if SHOT_INDEX_PATH in f_datarun:
+				del f_datarun[SHOT_INDEX_PATH]
+			ds = parent.create_dataset("shot_index", data=table)
+			ds.attrs['clock offset (s)'] = float(offset)
+			ds.attrs['shot period (s)'] = period
+			ds.attrs['tolerance (s)'] = float(tolerance)
+			ds.attrs['offset confidence'] = confidence
+			ds.attrs['reference scope'] = ref_scope
+			ds.attrs['source files'] = np.array(
+				[os.path.basename(str(p)) for p in interf_paths], dtype='S')
+			ds.attrs['description'] = (
+				"Per-shot interferometer match: trace = dataset name in the "
+				"interferometer file's DATA_GROUPS, file_idx indexes 'source files'. "
+				"The clock offset is known only modulo the shot period (branch "
+				"nearest zero). Unmatched shots: file_idx -1, interf_time NaN.")
+
+		if copy_data and matched.any():
+			merges = [(str(int(r['shot_num'])), r['trace'].decode(), int(r['file_idx']), {
+				'interferometer timestamp (s since epoch)': float(r['interf_time']),
+				'interferometer time (local)': _fmt_local(float(r['interf_time'])),
+				'time difference from shot trigger (s)':
+					float(r['interf_time'] - r['shot_time']),
+			}) for r in table[matched]]
+			n = len(_write_merged_shots(datarun_path, f_interfs, per_file_groups, merges))
+			_log(f"Copied traces for {n} shot(s) into the datarun file")
+	return table
+
+
+def read_shot_index(datarun_path):
+	'''Load the per-shot match table; returns (table, attrs) or (None, {}) if absent.'''
+	with h5py.File(datarun_path, "r") as f:
+		if SHOT_INDEX_PATH not in f:
+			return None, {}
+		ds = f[SHOT_INDEX_PATH]
+		return ds[()], dict(ds.attrs)
+
+
 #===============================================================================================================================================
 # Batch wrapper
 #===============================================================================================================================================
@@ -830,6 +1130,9 @@ def run_interferometer_merge(hdf5_path):
 	  SKIPPED - the data folder or a same-date interferometer file is missing
 	  NO traces - no interferometer trace fell in the run window
 	  FAILED  - an exception occurred (type + message reported)
+	With PER_SHOT_INDEX set, the per-shot index table is written as well (when
+	any trace was merged) and its match count, or its own failure, appended to
+	the status line.
 
 	Parameters:
 	hdf5_path (str): Path to the just-finalized datarun hdf5 file.
@@ -861,6 +1164,14 @@ def run_interferometer_merge(hdf5_path):
 		else:
 			note = _merged_times_note(hdf5_path)
 			msg = f"Interferometer merge OK: {n} shot(s) merged ({note})."
+		if PER_SHOT_INDEX and n > 0:
+			# Its own try: a per-shot index failure must not hide the merge status.
+			try:
+				table = merge_interferometer_per_shot(hdf5_path, candidates, verbose=True)
+				msg += (f" Per-shot index: {int((table['file_idx'] >= 0).sum())}/"
+				        f"{len(table)} shots matched.")
+			except Exception as e:
+				msg += f" Per-shot index FAILED: {type(e).__name__}: {e}"
 		print(msg)
 		return msg
 	except Exception as e:
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Live view of a running acquisition: the last N shots per channel, as offloaded.
+
+The offload announces every shot it has written and verified on the run's live
+tap (``[live_tap] port`` in experiment_config.ini; see :mod:`scope_io.live`).
+This script connects to it and keeps one panel per (scope, channel) showing
+the min/max envelope of the most recent LIVE_LAST_N shots -- newest opaque,
+older ones fading -- with the shot number and probe position in the title. It
+never opens the HDF5 file, so it cannot disturb the write.
+
+Start it any time during the run (it waits for the offload to come up); close
+the window to stop. The tap's run description (HDF5 path, planned shots) is
+shown in the window title.
+
+There is NO command line; all knobs are the LIVE_* constants in
+analysis_config.py. Run with:
+    python -m read_and_analyze.live_monitor
+
+Created Oct.2026
+@author: Jia Han
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+# Allow running directly (IDE "Run" button / from inside this folder) as well as
+# ``python -m read_and_analyze.<module>`` from the repo root: the root-level
+# ``scope_io``/``acquisition`` packages need the repo root on sys.path, which ``-m``
+# adds but a direct script run does not, so put it there ourselves.
+import sys
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+from scope_io import LiveTapSubscriber
+try:  # works as a package (python -m read_and_analyze.live_monitor)
+    from read_and_analyze.analysis_config import LIVE_HOST, LIVE_PORT, LIVE_LAST_N
+except ImportError:  # fallback when run directly from inside the folder
+    from analysis_config import LIVE_HOST, LIVE_PORT, LIVE_LAST_N
+
+
+# Seconds between connection attempts while the offload is not up yet, and
+# between redraws of the figure.
+_CONNECT_RETRY_S = 1.0
+_REDRAW_S = 0.25
+
+
+class ShotHistory:
+    """Thread-safe ring of the most recent shots, filled by the receiver thread."""
+
+    def __init__(self, last_n):
+        self._shots = deque(maxlen=max(1, int(last_n)))
+        self._lock = threading.Lock()
+        self.version = 0            # bumped on every new shot; the plot redraws on change
+        self.run_info = None        # the tap's run description (set on connect)
+        self.finished = False
+
+    def add(self, shot):
+        with self._lock:
+            self._shots.append(shot)
+            self.version += 1
+
+    def snapshot(self):
+        with self._lock:
+            return list(self._shots), self.version
+
+
+def connect(host, port, retry_s=_CONNECT_RETRY_S):
+    """Connect to the live tap, retrying until the offload is listening."""
+    waiting = False
+    while True:
+        try:
+            return LiveTapSubscriber(host, port)
+        except OSError:
+            if not waiting:
+                print(f"Waiting for the offload's live tap on {host}:{port} ...")
+                waiting = True
+            time.sleep(retry_s)
+
+
+def receive_into(subscriber, history):
+    """Feed every shot from ``subscriber`` into ``history`` until the tap closes."""
+    try:
+        for shot in subscriber:
+            history.add(shot)
+    except OSError:
+        pass                        # connection dropped: keep showing what we have
+    finally:
+        history.finished = True
+        subscriber.close()
+
+
+def draw_shots(fig, shots):
+    """Redraw ``fig`` with one panel per (scope, channel) of ``shots`` (oldest first)."""
+    fig.clf()
+    keys = sorted({key for shot in shots for key in shot.traces})
+    if not keys:
+        return
+    axes = fig.subplots(len(keys), 1, sharex=True, squeeze=False)[:, 0]
+    n = len(shots)
+    for ax, key in zip(axes, keys):
+        for age, shot in enumerate(shots):
+            tr = shot.traces.get(key)
+            if tr is None:
+                continue
+            newest = age == n - 1
+            ax.fill_between(tr.t, tr.lo, tr.hi, step="post", linewidth=0,
+                            color="C0" if newest else "0.5",
+                            alpha=1.0 if newest else 0.15 + 0.45 * (age + 1) / n)
+        units = next(s.traces[key].units for s in shots if key in s.traces)
+        ax.set_ylabel(f"{key[0]} {key[1]} ({units})")
+        ax.grid(alpha=0.3)
+    last = shots[-1]
+    where = "" if last.coordinates is None else f" @ {last.coordinates}"
+    state = f"  SKIPPED ({last.skip_reason})" if last.skipped else ""
+    axes[0].set_title(f"shot {last.shot_num}{where}{state}  "
+                      f"(last {n} shot{'s' if n != 1 else ''})",
+                      fontsize=10, loc="left")
+    axes[-1].set_xlabel("time (s)" if last.traces and
+                        next(iter(last.traces.values())).units == "V" else "bin")
+
+
+def monitor(host=LIVE_HOST, port=LIVE_PORT, last_n=LIVE_LAST_N):
+    """Show the live view until the window is closed."""
+    import matplotlib.pyplot as plt
+
+    history = ShotHistory(last_n)
+    subscriber = connect(host, port)
+    history.run_info = subscriber.run_info
+    print(f"Connected to live tap {host}:{port}")
+    threading.Thread(target=receive_into, args=(subscriber, history),
+                     name="live-monitor-recv", daemon=True).start()
+
+    fig = plt.figure(figsize=(10, 7))
+    shown = -1
+    announced_end = False
+    while plt.fignum_exists(fig.number):
+        shots, version = history.snapshot()
+        if version != shown and shots:
+            if history.run_info:
+                info = history.run_info
+                fig.canvas.manager.set_window_title(
+                    f"live: {os.path.basename(str(info.get('hdf5_path')))}  "
+                    f"({info.get('total_shots')} shots planned)")
+            draw_shots(fig, shots)
+            fig.canvas.draw_idle()
+            shown = version
+        if history.finished and not announced_end:
+            print("Live tap closed (run finished or offload stopped); "
+                  "close the window to exit.")
+            announced_end = True
+        plt.pause(_REDRAW_S)
+
+
+def main():
+    monitor()
+
+
+if __name__ == "__main__":
+    main()
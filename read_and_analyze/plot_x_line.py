@@ -22,6 +22,10 @@ values are simply laid out along the moving axis -- no encoder-position binning.
 Only **line scans** are supported; genuine 2D planes are skipped (use
 plot_xy_map for those).
 
+``XY_STAT = "mean"`` / ``"std"`` plots the repeat-shot statistic per position,
+read from the run's stored ``/analysis/position_mean|std`` when present (see
+:func:`plot_xy_map.position_stat_values`).
+
 There is NO command line; all knobs live in :mod:`read_and_analyze.analysis_config`.
 Run with:
     python -m read_and_analyze.plot_x_line
@@ -65,13 +69,15 @@ try:  # works as a package (python -m read_and_analyze.plot_x_line)
     from read_and_analyze.plot_xy_map import (
         _reduction_indices, _reduce_trace, _step_indices, _as_step_list,
         _reduction_label, _plane_axes, make_single_shot_reduce,
-        _position_shotnums, _load_stack,
+        _position_shotnums, _load_stack, _padded_window, _stat_tag,
+        position_stat_values,
     )
     from read_and_analyze.analysis_config import (
         MED_SIZE, GAUSS_SIGMA,
         SELECT_SCOPE as SCOPE, SELECT_CHAN as CHANNELS, SHOW_PLOT, SAVE_PLOT,
         XY_MODE as MODE, XY_T_START_MS as T_START_MS, XY_T_END_MS as T_END_MS,
         XY_T_STEP_MS as T_STEP_MS, XY_CMAP as CMAP, XY_SHOT_INDEX as SHOT_INDEX,
+        XY_STAT as STAT,
     )
 except ImportError:  # fallback when run directly from inside the folder
     from read_bmotion_data import (
@@ -82,13 +88,15 @@ except ImportError:  # fallback when run directly from inside the folder
     from plot_xy_map import (
         _reduction_indices, _reduce_trace, _step_indices, _as_step_list,
         _reduction_label, _plane_axes, make_single_shot_reduce,
-        _position_shotnums, _load_stack,
+        _position_shotnums, _load_stack, _padded_window, _stat_tag,
+        position_stat_values,
     )
     from analysis_config import (
         MED_SIZE, GAUSS_SIGMA,
         SELECT_SCOPE as SCOPE, SELECT_CHAN as CHANNELS, SHOW_PLOT, SAVE_PLOT,
         XY_MODE as MODE, XY_T_START_MS as T_START_MS, XY_T_END_MS as T_END_MS,
         XY_T_STEP_MS as T_STEP_MS, XY_CMAP as CMAP, XY_SHOT_INDEX as SHOT_INDEX,
+        XY_STAT as STAT,
     )
 
 
@@ -120,13 +128,15 @@ def _line_axis(xpos, ypos):
 # Line assembly
 # ======================================================================================
 
-def build_line(f, scope, ch, positions, reduce_fn, med_size, gauss_sigma):
+def build_line(f, scope, ch, positions, reduce_fn, med_size, gauss_sigma,
+               t_window_ms=None):
     """Reduce every planned position to one scalar and lay it out along the line.
 
     Reads each position's repeat-shot stack in acquisition order, applies
     ``reduce_fn(stack, tarr, pos_idx)``, and returns ``(vals, axis_pos,
     axis_name, fixed_val)``; or ``(None, None, None, None)`` if the run has no
-    setup array or is not a 1D line.
+    setup array or is not a 1D line. ``t_window_ms`` limits the read to the
+    reducer's time window, as in :func:`plot_xy_map.build_plane`.
     """
     xpos, ypos, npos, _name = _plane_axes(positions)
     if not _is_line(xpos, ypos):
@@ -141,11 +151,19 @@ def build_line(f, scope, ch, positions, reduce_fn, med_size, gauss_sigma):
         print(f"  warning: scope '{scope}' has {total} shots != npos({npos}) x "
               f"nshot -- not a clean grid; using position-lookup fallback")
 
+    samples = None
+    tarr_w = tarr
+    if t_window_ms is not None:
+        i0, i1 = _reduction_indices(tarr, "range", *t_window_ms, None)
+        samples = _padded_window(len(tarr), i0, i1, med_size, gauss_sigma)
+        tarr_w = tarr[samples[0]:samples[1]]
+
     vals = np.full(npos, np.nan, dtype=float)
     for i, shotnums in tqdm(_position_shotnums(positions, npos, nshot, mismatch),
                             total=npos, desc=f"reduce {scope}/{ch}", unit="pos"):
-        stack = _load_stack(f, scope, ch, shotnums, tarr, med_size, gauss_sigma)
-        vals[i] = reduce_fn(stack, tarr, i)
+        stack = _load_stack(f, scope, ch, shotnums, tarr, med_size, gauss_sigma,
+                            samples)
+        vals[i] = reduce_fn(stack, tarr_w, i)
 
     return vals, axis_pos, axis_name, fixed_val
 
@@ -154,8 +172,9 @@ def build_lines_step(f, scope, ch, positions, t_steps_ms, shot_index,
                      med_size, gauss_sigma):
     """Build one line profile per snapshot time in a single read pass.
 
-    Loads each position's stack once, picks shot ``shot_index``, and samples it at
-    every requested snapshot index. Returns ``(curves, axis_pos, axis_name,
+    Loads each position's stack once (only the samples spanning the snapshots,
+    plus the filter margin), picks shot ``shot_index``, and samples it at every
+    requested snapshot index. Returns ``(curves, axis_pos, axis_name,
     fixed_val, t_los)`` where ``curves`` is a list of length-``npos`` arrays
     parallel to ``t_los`` (realized tarr-snapped times in seconds); or
     ``(None, None, None, None, None)`` if not a line.
@@ -174,25 +193,45 @@ def build_lines_step(f, scope, ch, positions, t_steps_ms, shot_index,
         print(f"  warning: scope '{scope}' has {total} shots != npos({npos}) x "
               f"nshot -- not a clean grid; using position-lookup fallback")
 
+    samples = _padded_window(len(tarr), min(idxs), max(idxs) + 1, med_size, gauss_sigma)
+
     curves = [np.full(npos, np.nan, dtype=float) for _ in idxs]
     for i, shotnums in tqdm(_position_shotnums(positions, npos, nshot, mismatch),
                             total=npos, desc=f"reduce {scope}/{ch}", unit="pos"):
-        stack = _load_stack(f, scope, ch, shotnums, tarr, med_size, gauss_sigma)
+        stack = _load_stack(f, scope, ch, shotnums, tarr, med_size, gauss_sigma,
+                            samples)
         if stack is None or shot_index >= stack.shape[0]:
             continue
         trace = stack[shot_index]
         for k, idx in enumerate(idxs):
-            curves[k][i] = float(trace[idx])
+            curves[k][i] = float(trace[idx - samples[0]])
 
     return curves, axis_pos, axis_name, fixed_val, t_los
 
 
+def build_lines_stat(f, scope, ch, positions, stat, mode, t_start, t_end, t_step):
+    """Line profile(s) of the repeat-shot ``stat`` (``"mean"``/``"std"``).
+
+    One curve for ``range`` mode, one per snapshot time for ``step`` (see
+    :func:`plot_xy_map.position_stat_values`). Returns ``(curves, axis_pos,
+    axis_name, fixed_val, t_los)`` like :func:`build_lines_step`; or all
+    ``None`` if not a line.
+    """
+    xpos, ypos, _npos, _name = _plane_axes(positions)
+    if not _is_line(xpos, ypos):
+        return None, None, None, None, None
+    axis_pos, axis_name, fixed_val = _line_axis(xpos, ypos)
+    vals, t_los = position_stat_values(f, scope, ch, positions, stat, mode,
+                                       t_start, t_end, t_step)
+    return list(vals), axis_pos, axis_name, fixed_val, t_los
+
+
 # ======================================================================================
 # Rendering
 # ======================================================================================
 
 def _render_line(plt, vals, axis_pos, axis_name, fixed_val, scope, ch, label,
-                 shot_index, path):
+                 which, path):
     """Draw the single-curve ``range``/``step``-scalar line profile."""
     fig, ax = plt.subplots(figsize=(8, 5))
     order = np.argsort(axis_pos)
@@ -202,14 +241,14 @@ def _render_line(plt, vals, axis_pos, axis_name, fixed_val, scope, ch, label,
     ax.set_ylabel(label)
     ax.grid(True, alpha=0.3)
     ax.set_title(f"scope '{scope}' / {ch}: {label}  "
-                 f"({fixed_name}={fixed_val:.1f} mm, shot {shot_index})",
+                 f"({fixed_name}={fixed_val:.1f} mm, {which})",
                  fontsize=10, loc="left")
     fig.suptitle(f"{os.path.basename(path)}  —  line profile", fontsize=10)
     fig.tight_layout()
 
 
 def _render_step_overlay(plt, curves, axis_pos, axis_name, fixed_val, t_los,
-                         scope, ch, cmap, shot_index, path):
+                         scope, ch, cmap, which, path):
     """Draw the ``step``-mode overlay: one curve per snapshot time on shared axes,
     colored along ``cmap`` from earliest to latest time."""
     import matplotlib.cm as cm
@@ -227,7 +266,7 @@ def _render_step_overlay(plt, curves, axis_pos, axis_name, fixed_val, t_los,
     ax.grid(True, alpha=0.3)
     ax.legend(fontsize=8, ncol=2)
     ax.set_title(f"scope '{scope}' / {ch}: line profile (step)  "
-                 f"({fixed_name}={fixed_val:.1f} mm, shot {shot_index})",
+                 f"({fixed_name}={fixed_val:.1f} mm, {which})",
                  fontsize=10, loc="left")
     fig.suptitle(f"{os.path.basename(path)}  —  line profile (step)", fontsize=10)
     fig.tight_layout()
@@ -240,10 +279,11 @@ def _render_step_overlay(plt, curves, axis_pos, axis_name, fixed_val, t_los,
 def plot_line(path, scope=None, channels=None, mode=None,
               t_start=None, t_end=None, t_step=None, shot_index=None,
               med_size=None, gauss_sigma=None,
-              cmap=None, show=None, save=None):
+              cmap=None, show=None, save=None, stat=None):
     """Render a line-only profile per (scope, channel), x-line or y-line.
 
-    For each scope/channel: pick one shot per position by ``shot_index``, reduce it
+    For each scope/channel: pick one shot per position by ``shot_index`` (or,
+    with ``stat`` ``"mean"``/``"std"``, the repeat-shot statistic), reduce it
     in time (``range`` -> mean over [t_start, t_end] ms; ``step`` -> overlay one
     curve per ``t_step`` time), and plot value vs probe position. The moving axis
     (x or y) is detected automatically from the position setup array. Genuine 2D
@@ -260,6 +300,7 @@ def plot_line(path, scope=None, channels=None, mode=None,
     t_end = T_END_MS if t_end is None else t_end
     t_step = T_STEP_MS if t_step is None else t_step
     shot_index = SHOT_INDEX if shot_index is None else shot_index
+    stat = STAT if stat is None else stat
     med_size = MED_SIZE if med_size is None else med_size
     gauss_sigma = GAUSS_SIGMA if gauss_sigma is None else gauss_sigma
     cmap = CMAP if cmap is None else cmap
@@ -269,6 +310,9 @@ def plot_line(path, scope=None, channels=None, mode=None,
 
     if mode not in ("range", "step"):
         raise ValueError(f"MODE must be 'range' or 'step', got {mode!r}")
+    if stat not in ("shot", "mean", "std"):
+        raise ValueError(f"XY_STAT must be 'shot', 'mean' or 'std', got {stat!r}")
+    which = _stat_tag(stat, shot_index)
 
     saved = []
     if save:
@@ -298,20 +342,28 @@ def plot_line(path, scope=None, channels=None, mode=None,
 
             for ch in chans:
                 if mode == "step":
-                    t_steps = _as_step_list(t_step)
-                    curves, axp, axn, fixed, t_los = build_lines_step(
-                        f, sc, ch, positions, t_steps, shot_index,
-                        med_size, gauss_sigma)
+                    if stat == "shot":
+                        curves, axp, axn, fixed, t_los = build_lines_step(
+                            f, sc, ch, positions, _as_step_list(t_step), shot_index,
+                            med_size, gauss_sigma)
+                    else:
+                        curves, axp, axn, fixed, t_los = build_lines_stat(
+                            f, sc, ch, positions, stat, mode, t_start, t_end, t_step)
                     if curves is None or all(np.all(np.isnan(c)) for c in curves):
                         print(f"scope '{sc}' / {ch}: no usable shots — skipping")
                         continue
                     _render_step_overlay(plt, curves, axp, axn, fixed, t_los,
-                                         sc, ch, cmap, shot_index, path)
+                                         sc, ch, cmap, which, path)
                 else:
-                    vals, axp, axn, fixed = build_line(
-                        f, sc, ch, positions,
-                        make_single_shot_reduce(shot_index, mode, t_start, t_end, t_step),
-                        med_size, gauss_sigma)
+                    if stat == "shot":
+                        vals, axp, axn, fixed = build_line(
+                            f, sc, ch, positions,
+                            make_single_shot_reduce(shot_index, mode, t_start, t_end, t_step),
+                            med_size, gauss_sigma, t_window_ms=(t_start, t_end))
+                    else:
+                        curves, axp, axn, fixed, _t_los = build_lines_stat(
+                            f, sc, ch, positions, stat, mode, t_start, t_end, t_step)
+                        vals = None if curves is None else curves[0]
                     if vals is None or np.all(np.isnan(vals)):
                         print(f"scope '{sc}' / {ch}: no usable shots — skipping")
                         continue
@@ -319,7 +371,7 @@ def plot_line(path, scope=None, channels=None, mode=None,
                     i0, i1 = _reduction_indices(tarr, mode, t_start, t_end, t_step)
                     label = _reduction_label(mode, float(tarr[i0]), float(tarr[i1 - 1]))
                     _render_line(plt, vals, axp, axn, fixed, sc, ch, label,
-                                 shot_index, path)
+                                 which, path)
 
                 if save:
                     # name the PNG after the detected moving axis: _xline / _yline
@@ -21,6 +21,17 @@ and contour align exactly (no half-cell offset).
 Only **planes** are supported; line scans (one axis with a single position) are
 skipped.
 
+On large planes the per-position filter + reduction can be spread over a thread
+or process pool (``XY_WORKERS`` / ``XY_POOL``). HDF5 reads stay sequential in the
+main thread; only the CPU-bound work after the read is parallel, and the output
+order and progress bar are unchanged.
+
+``XY_STAT = "mean"`` / ``"std"`` maps the mean or std over the repeat shots at
+each position instead of one shot. Runs offloaded with ``[storage]
+position_stats`` on carry these per-position traces in ``/analysis`` (see
+:mod:`scope_io.position_stats`), so the map is a windowed read of ``npos`` rows;
+older runs fall back to reading the shots.
+
 There is NO command line; all knobs live in :mod:`read_and_analyze.analysis_config`.
 Run with:
     python -m read_and_analyze.plot_xy_map
@@ -32,6 +43,9 @@ Created May.2026
 """
 
 import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 
 import numpy as np
 
@@ -52,6 +66,7 @@ if _REPO_ROOT not in sys.path:
 
 from scope_io import (
     open_hdf5_readonly, read_hdf5_scope_channel_shots, read_hdf5_scope_tarr,
+    read_position_stats,
 )
 try:  # works as a package (python -m read_and_analyze.plot_xy_map)
     from read_and_analyze.read_bmotion_data import (
@@ -65,6 +80,7 @@ try:  # works as a package (python -m read_and_analyze.plot_xy_map)
         XY_MODE as MODE, XY_T_START_MS as T_START_MS, XY_T_END_MS as T_END_MS,
         XY_T_STEP_MS as T_STEP_MS, XY_SHOW_CONTOUR as SHOW_CONTOUR,
         XY_N_CONTOURS as N_CONTOURS, XY_CMAP as CMAP, XY_SHOT_INDEX as SHOT_INDEX,
+        XY_STAT as STAT, XY_WORKERS as WORKERS, XY_POOL as POOL,
     )
 except ImportError:  # fallback when run directly from inside the folder
     from read_bmotion_data import (
@@ -78,6 +94,7 @@ except ImportError:  # fallback when run directly from inside the folder
         XY_MODE as MODE, XY_T_START_MS as T_START_MS, XY_T_END_MS as T_END_MS,
         XY_T_STEP_MS as T_STEP_MS, XY_SHOW_CONTOUR as SHOW_CONTOUR,
         XY_N_CONTOURS as N_CONTOURS, XY_CMAP as CMAP, XY_SHOT_INDEX as SHOT_INDEX,
+        XY_STAT as STAT, XY_WORKERS as WORKERS, XY_POOL as POOL,
     )
 
 
@@ -116,6 +133,28 @@ def _reduce_trace(vf, tarr, mode, t_start, t_end, t_step):
     return float(np.nanmean(vf[i0:i1]))
 
 
+def _filter_margin(med_size, gauss_sigma):
+    """Samples either side of a point that the median + Gaussian filters read:
+    the median half-width plus the Gaussian's truncation radius (4 sigma)."""
+    margin = int(med_size) // 2 if med_size and med_size > 1 else 0
+    if gauss_sigma and gauss_sigma > 0:
+        margin += int(4.0 * float(gauss_sigma) + 0.5)
+    return margin
+
+
+def _padded_window(n, i0, i1, med_size, gauss_sigma):
+    """Sample range ``(w0, w1)`` to read so that filtering just that slice gives
+    the same values on ``[i0, i1)`` as filtering the whole ``n``-sample record.
+
+    The window is widened by :func:`_filter_margin` on each side (clamped to the
+    record), so the filters' edge handling only touches the padding. Reading
+    this slice instead of the full trace is what lets a short reduction window
+    skip decompressing the rest of a long, time-chunked record.
+    """
+    margin = _filter_margin(med_size, gauss_sigma)
+    return max(0, i0 - margin), min(n, i1 + margin)
+
+
 def _step_indices(tarr, t_steps_ms):
     """For each snapshot time (ms) return the nearest ``tarr`` sample index and the
     realized (snapped) time in seconds. Returns ``(idxs, t_los)`` parallel lists."""
@@ -134,6 +173,13 @@ def _as_step_list(t_step):
     return [float(t) for t in t_step]
 
 
+def _stat_tag(stat, shot_index):
+    """Title fragment naming what was mapped: one shot, or a repeat-shot statistic."""
+    if stat == "shot":
+        return f"shot {shot_index}"
+    return f"{stat} over repeat shots"
+
+
 def _reduction_label(mode, t_lo, t_hi):
     """Human-readable description of the time reduction, for titles/colorbars,
     using the realized (``tarr``-snapped) bounds ``t_lo``/``t_hi`` (seconds).
@@ -188,18 +234,33 @@ def _is_plane(xpos, ypos):
 # lets future reducers do per-position time indexing or shot-averaging /
 # normalized-std without touching the plane builder or rendering.
 
+def _single_shot_reduce(shot_index, mode, t_start, t_end, t_step,
+                        stack, tarr, pos_idx):
+    """Body of :func:`make_single_shot_reduce` (module level so it pickles)."""
+    if stack is None or shot_index >= stack.shape[0]:
+        return np.nan
+    return _reduce_trace(stack[shot_index], tarr, mode, t_start, t_end, t_step)
+
+
 def make_single_shot_reduce(shot_index, mode, t_start, t_end, t_step):
     """Reducer: pick one shot per position by ``shot_index`` and reduce it in time.
 
     No shot averaging -- this is the current default. The full stack is still
     passed in so other reducers (per-position time index, shot-averaged
     normalized-std) can replace this one later with no other code changes.
+    Returned as a ``partial`` of a module-level function rather than a closure
+    so it can be shipped to a ``"process"`` pool (see ``XY_POOL``).
     """
-    def reduce_fn(stack, tarr, pos_idx):
-        if stack is None or shot_index >= stack.shape[0]:
-            return np.nan
-        return _reduce_trace(stack[shot_index], tarr, mode, t_start, t_end, t_step)
-    return reduce_fn
+    return partial(_single_shot_reduce, shot_index, mode, t_start, t_end, t_step)
+
+
+def _step_samples_reduce(shot_index, idxs, stack, tarr, pos_idx):
+    """Reducer for ``step`` mode: shot ``shot_index`` sampled at every index in
+    ``idxs``. Returns a float array parallel to ``idxs``, or None if the shot is
+    absent."""
+    if stack is None or shot_index >= stack.shape[0]:
+        return None
+    return stack[shot_index, idxs].astype(float)
 
 
 # ======================================================================================
@@ -247,62 +308,216 @@ def _position_shotnums(positions, npos, nshot, mismatch):
         yield i, buckets[i]
 
 
-def _load_stack(f, scope, ch, shotnums, tarr, med_size, gauss_sigma):
+def _filter_stack(raw, med_size, gauss_sigma):
+    """Filter each non-NaN row of a raw ``(nshot, nsamples)`` stack; NaN rows
+    (missing/skipped shots) pass through. Returns None if ``raw`` is None."""
+    if raw is None:
+        return None
+    rows = [row if np.isnan(row).all() else _filter_trace(row, med_size, gauss_sigma)
+            for row in raw]
+    return np.vstack(rows)
+
+
+def _load_stack(f, scope, ch, shotnums, tarr, med_size, gauss_sigma, samples=None):
     """Read + filter the given shots into a ``(nshot, nsamples)`` stack.
 
     The raw shots are read in one pass via ``read_hdf5_scope_channel_shots`` (the
     channel's WAVEDESC is decoded once, not per shot); missing/skipped/length-
     mismatched shots come back as NaN rows. Each non-NaN row is then filtered.
-    Reducers are NaN-aware. Returns None if no shot could be read at all.
+    Reducers are NaN-aware. ``samples=(w0, w1)`` reads only that slice of each
+    trace (see :func:`_padded_window`). Returns None if no shot could be read at
+    all.
     """
     raw, _dt, _t0 = read_hdf5_scope_channel_shots(
-        f, scope, ch, shotnums, expected_len=len(tarr))
-    if raw is None:
-        return None
-    rows = [row if np.isnan(row).all() else _filter_trace(row, med_size, gauss_sigma)
-            for row in raw]
-    return np.vstack(rows)
+        f, scope, ch, shotnums, expected_len=len(tarr), samples=samples)
+    return _filter_stack(raw, med_size, gauss_sigma)
+
+
+def _filter_and_reduce(raw, tarr, pos_idx, reduce_fn, med_size, gauss_sigma):
+    """Worker body: filter one position's raw stack and apply ``reduce_fn``.
+
+    Touches no HDF5 handle, so it is safe to run on a thread or process pool
+    while the main thread keeps reading the next positions.
+    """
+    return reduce_fn(_filter_stack(raw, med_size, gauss_sigma), tarr, pos_idx)
+
+
+def _reduce_positions(f, scope, ch, position_shots, tarr, reduce_fn,
+                      med_size, gauss_sigma, workers=1, pool="thread", samples=None):
+    """Yield ``(pos_idx, reduce_fn(stack, tarr, pos_idx))`` in position order.
+
+    ``samples=(w0, w1)`` reads only that slice of every trace; ``reduce_fn``
+    then sees the matching ``tarr[w0:w1]``.
+
+    ``workers <= 1`` runs read -> filter -> reduce serially. Otherwise the raw
+    stacks are still read **sequentially in this thread** (h5py is not safe to
+    share across threads, and a process cannot use our open handle), but the
+    filtering + reduction -- the CPU-bound part -- is dispatched to a
+    ``"thread"`` or ``"process"`` pool. At most ``2 * workers`` positions are in
+    flight, which bounds memory to a few raw stacks, and results are yielded in
+    submission order so the caller's output order is unchanged.
+    """
+    def _read(shotnums):
+        raw, _dt, _t0 = read_hdf5_scope_channel_shots(
+            f, scope, ch, shotnums, expected_len=full_len, samples=samples)
+        return raw
+
+    full_len = len(tarr)
+    if samples is not None:
+        tarr = tarr[samples[0]:samples[1]]
+
+    if workers is None or workers <= 1:
+        for i, shotnums in position_shots:
+            yield i, _filter_and_reduce(_read(shotnums), tarr, i, reduce_fn,
+                                        med_size, gauss_sigma)
+        return
+
+    if pool not in ("thread", "process"):
+        raise ValueError(f"XY_POOL must be 'thread' or 'process', got {pool!r}")
+    executor_cls = ProcessPoolExecutor if pool == "process" else ThreadPoolExecutor
+    max_in_flight = 2 * workers
+    in_flight = deque()
+    with executor_cls(max_workers=workers) as ex:
+        for i, shotnums in position_shots:
+            in_flight.append((i, ex.submit(_filter_and_reduce, _read(shotnums), tarr,
+                                           i, reduce_fn, med_size, gauss_sigma)))
+            if len(in_flight) >= max_in_flight:
+                j, fut = in_flight.popleft()
+                yield j, fut.result()
+        while in_flight:
+            j, fut = in_flight.popleft()
+            yield j, fut.result()
+
+
+def _position_stat_rows(f, scope, ch, positions, npos, stat, samples):
+    """Per-position ``stat`` (``"mean"``/``"std"`` over repeat shots) traces
+    over ``samples=(i0, i1)``, as an ``(npos, i1 - i0)`` array in plan order.
+
+    Read from the run's stored ``/analysis/position_mean|std`` when present
+    (see :mod:`scope_io.position_stats`); otherwise computed here from each
+    position's raw shots. Either way unfiltered, population std, NaN rows for
+    positions without a readable shot. Returns ``(rows, source)`` with
+    ``source`` ``"stored"`` or ``"traces"``.
+    """
+    stored = read_position_stats(f, scope, ch, samples)
+    if stored is not None and len(stored[0]) == npos:
+        return (stored[1] if stat == "mean" else stored[2]), "stored"
+
+    full_len = len(read_hdf5_scope_tarr(f, scope))
+    nshot, mismatch = _plane_shot_layout(f, scope, npos)
+    rows = np.full((npos, samples[1] - samples[0]), np.nan)
+    for i, shotnums in tqdm(_position_shotnums(positions, npos, nshot, mismatch),
+                            total=npos, desc=f"{stat} {scope}/{ch}", unit="pos"):
+        raw, _dt, _t0 = read_hdf5_scope_channel_shots(
+            f, scope, ch, shotnums, expected_len=full_len, samples=samples)
+        if raw is None:
+            continue
+        raw = raw[~np.isnan(raw).all(axis=1)]
+        if len(raw):
+            rows[i] = raw.mean(axis=0) if stat == "mean" else raw.std(axis=0)
+    return rows, "traces"
+
 
+def position_stat_values(f, scope, ch, positions, stat, mode, t_start, t_end, t_step):
+    """Reduce each position's repeat-shot ``stat`` trace in time.
 
-def build_plane(f, scope, ch, positions, reduce_fn, med_size, gauss_sigma):
+    ``mode == "range"``: one row, the mean over [t_start, t_end] ms.
+    ``mode == "step"``: one row per ``t_step`` snapshot time. Returns
+    ``(vals, t_los)`` -- ``vals`` is ``(nrows, npos)`` in plan order, ``t_los``
+    the realized snapshot times (seconds; ``None`` for ``range``) -- or
+    ``(None, None)`` for a run without a setup array.
+    """
+    if stat not in ("mean", "std"):
+        raise ValueError(f"XY_STAT must be 'shot', 'mean' or 'std', got {stat!r}")
+    _xpos, _ypos, npos, _name = _plane_axes(positions)
+    if not npos:
+        return None, None
+    tarr = read_hdf5_scope_tarr(f, scope)
+    if mode == "step":
+        idxs, t_los = _step_indices(tarr, _as_step_list(t_step))
+        samples = (min(idxs), max(idxs) + 1)
+    else:
+        samples = _reduction_indices(tarr, "range", t_start, t_end, None)
+        t_los = None
+    rows, source = _position_stat_rows(f, scope, ch, positions, npos, stat, samples)
+    print(f"  {scope}/{ch}: position {stat} from {source}")
+    if mode == "step":
+        return rows[:, [i - samples[0] for i in idxs]].T, t_los
+    vals = np.full(npos, np.nan)
+    has = ~np.isnan(rows).all(axis=1)
+    vals[has] = np.nanmean(rows[has], axis=1)
+    return vals[None, :], None
+
+
+def _plane_shot_layout(f, scope, npos):
+    """Return ``(nshot, mismatch)`` for a scope: repeat shots per position and
+    whether the recorded shot count fails to tile the plan cleanly."""
+    total = len(_shot_numbers(f[scope]))
+    nshot = total // npos if npos else 0
+    mismatch = (nshot == 0) or (npos * nshot != total)
+    if mismatch:
+        print(f"  warning: scope '{scope}' has {total} shots != npos({npos}) x "
+              f"nshot -- not a clean grid; using position-lookup fallback")
+    return nshot, mismatch
+
+
+def build_plane(f, scope, ch, positions, reduce_fn, med_size, gauss_sigma,
+                workers=None, pool=None, t_window_ms=None):
     """Reduce every planned position to one scalar and reshape onto the plane.
 
     Reads each position's repeat-shot stack in acquisition order, applies
     ``reduce_fn(stack, tarr, pos_idx)``, and reshapes the per-position values to
-    ``(ny, nx)``. Returns ``(Z, xpos, ypos)``; or ``(None, None, None)`` if the
-    run has no setup array or is not a 2D plane.
+    ``(ny, nx)``. ``workers``/``pool`` default to ``XY_WORKERS``/``XY_POOL``;
+    with more than one worker the filter+reduce step runs on a pool (see
+    :func:`_reduce_positions`), so ``reduce_fn`` must be picklable for a
+    ``"process"`` pool. ``t_window_ms=(t_start, t_end)`` declares the only
+    times ``reduce_fn`` looks at: each trace is then read over that window plus
+    the filter margin (:func:`_padded_window`) instead of in full, with
+    identical results. Returns ``(Z, xpos, ypos)``; or ``(None, None, None)`` if
+    the run has no setup array or is not a 2D plane.
     """
+    workers = WORKERS if workers is None else workers
+    pool = POOL if pool is None else pool
     xpos, ypos, npos, _name = _plane_axes(positions)
     if not _is_plane(xpos, ypos):
         return None, None, None
     nx, ny = len(xpos), len(ypos)
 
     tarr = read_hdf5_scope_tarr(f, scope)
-    total = len(_shot_numbers(f[scope]))
-    nshot = total // npos if npos else 0
-    mismatch = (nshot == 0) or (npos * nshot != total)
-    if mismatch:
-        print(f"  warning: scope '{scope}' has {total} shots != npos({npos}) x "
-              f"nshot -- not a clean grid; using position-lookup fallback")
+    nshot, mismatch = _plane_shot_layout(f, scope, npos)
+
+    samples = None
+    if t_window_ms is not None:
+        i0, i1 = _reduction_indices(tarr, "range", *t_window_ms, None)
+        samples = _padded_window(len(tarr), i0, i1, med_size, gauss_sigma)
 
     vals = np.full(npos, np.nan, dtype=float)
-    for i, shotnums in tqdm(_position_shotnums(positions, npos, nshot, mismatch),
-                            total=npos, desc=f"reduce {scope}/{ch}", unit="pos"):
-        stack = _load_stack(f, scope, ch, shotnums, tarr, med_size, gauss_sigma)
-        vals[i] = reduce_fn(stack, tarr, i)
+    results = _reduce_positions(
+        f, scope, ch, _position_shotnums(positions, npos, nshot, mismatch),
+        tarr, reduce_fn, med_size, gauss_sigma, workers, pool, samples)
+    for i, v in tqdm(results, total=npos, desc=f"reduce {scope}/{ch}", unit="pos"):
+        vals[i] = v
 
     return vals.reshape((ny, nx)), xpos, ypos
 
 
 def build_planes_step(f, scope, ch, positions, t_steps_ms, shot_index,
-                      med_size, gauss_sigma):
+                      med_size, gauss_sigma, workers=None, pool=None):
     """Build one plane per snapshot time in a single read pass.
 
     Loads each position's stack once, picks shot ``shot_index``, and samples it at
-    every requested snapshot index. Returns ``(Zs, xpos, ypos, t_los)`` where
-    ``Zs`` is a list of ``(ny, nx)`` arrays parallel to ``t_los`` (realized
-    tarr-snapped times in seconds); or ``(None, None, None, None)`` if not a plane.
+    every requested snapshot index. Only the samples spanning the snapshots
+    (plus the filter margin) are read. ``workers``/``pool`` behave as in
+    :func:`build_plane`. Returns ``(Zs, xpos, ypos, t_los)`` where ``Zs`` is a
+    list of ``(ny, nx)`` arrays parallel to ``t_los`` (realized tarr-snapped
+    times in seconds); or ``(None, None, None, None)`` if not a plane.
+
+    Raises ValueError if ``t_steps_ms`` is empty.
     """
+    if len(t_steps_ms) == 0:
+        raise ValueError("build_planes_step needs at least one snapshot time, got an empty t_steps_ms")
+    workers = WORKERS if workers is None else workers
+    pool = POOL if pool is None else pool
     xpos, ypos, npos, _name = _plane_axes(positions)
     if not _is_plane(xpos, ypos):
         return None, None, None, None
@@ -310,27 +525,39 @@ def build_planes_step(f, scope, ch, positions, t_steps_ms, shot_index,
 
     tarr = read_hdf5_scope_tarr(f, scope)
     idxs, t_los = _step_indices(tarr, t_steps_ms)
-    total = len(_shot_numbers(f[scope]))
-    nshot = total // npos if npos else 0
-    mismatch = (nshot == 0) or (npos * nshot != total)
-    if mismatch:
-        print(f"  warning: scope '{scope}' has {total} shots != npos({npos}) x "
-              f"nshot -- not a clean grid; using position-lookup fallback")
+    nshot, mismatch = _plane_shot_layout(f, scope, npos)
 
-    vals = [np.full(npos, np.nan, dtype=float) for _ in idxs]
-    for i, shotnums in tqdm(_position_shotnums(positions, npos, nshot, mismatch),
-                            total=npos, desc=f"reduce {scope}/{ch}", unit="pos"):
-        stack = _load_stack(f, scope, ch, shotnums, tarr, med_size, gauss_sigma)
-        if stack is None or shot_index >= stack.shape[0]:
-            continue
-        trace = stack[shot_index]
-        for k, idx in enumerate(idxs):
-            vals[k][i] = float(trace[idx])
+    samples = _padded_window(len(tarr), min(idxs), max(idxs) + 1, med_size, gauss_sigma)
+    local_idxs = [i - samples[0] for i in idxs]
+
+    vals = np.full((len(idxs), npos), np.nan, dtype=float)
+    results = _reduce_positions(
+        f, scope, ch, _position_shotnums(positions, npos, nshot, mismatch),
+        tarr, partial(_step_samples_reduce, shot_index, local_idxs),
+        med_size, gauss_sigma, workers, pool, samples)
+    for i, picked in tqdm(results, total=npos, desc=f"reduce {scope}/{ch}", unit="pos"):
+        if picked is not None:
+            vals[:, i] = picked
 
     Zs = [v.reshape((ny, nx)) for v in vals]
     return Zs, xpos, ypos, t_los
 
 
+def build_planes_stat(f, scope, ch, positions, stat, mode, t_start, t_end, t_step):
+    """Map the repeat-shot ``stat`` (``"mean"``/``"std"``) onto the plane.
+
+    One plane for ``range`` mode, one per snapshot time for ``step`` (see
+    :func:`position_stat_values`). Returns ``(Zs, xpos, ypos, t_los)`` like
+    :func:`build_planes_step`; or ``(None, None, None, None)`` if not a plane.
+    """
+    xpos, ypos, _npos, _name = _plane_axes(positions)
+    if not _is_plane(xpos, ypos):
+        return None, None, None, None
+    vals, t_los = position_stat_values(f, scope, ch, positions, stat, mode,
+                                       t_start, t_end, t_step)
+    return [v.reshape((len(ypos), len(xpos))) for v in vals], xpos, ypos, t_los
+
+
 # ======================================================================================
 # Rendering   (origin='upper': reshape row 0 = max-y; contour on meshgrid aligns)
 # ======================================================================================
@@ -359,19 +586,19 @@ def _draw_plane(ax, Z, xpos, ypos, cmap, show_contour, vmin=None, vmax=None):
 
 
 def _render_map(plt, Z, xpos, ypos, scope, ch, label, cmap, show_contour,
-                shot_index, path):
+                which, path):
     """Draw the single-plane ``range``/``step``-scalar figure."""
     fig, ax = plt.subplots(figsize=(8, 6.5))
     im = _draw_plane(ax, Z, xpos, ypos, cmap, show_contour)
     fig.colorbar(im, ax=ax, label=label)
-    ax.set_title(f"scope '{scope}' / {ch}: {label}  (shot {shot_index})",
+    ax.set_title(f"scope '{scope}' / {ch}: {label}  ({which})",
                  fontsize=10, loc="left")
     fig.suptitle(f"{os.path.basename(path)}  —  XY map", fontsize=10)
     fig.tight_layout()
 
 
 def _render_step_montage(plt, Zs, xpos, ypos, t_los, scope, ch, cmap,
-                         show_contour, shot_index, path):
+                         show_contour, which, path):
     """Draw the ``step``-mode montage: one plane per snapshot time, wrapped into a
     roughly square grid, sharing a common color scale and one colorbar."""
     n = len(Zs)
@@ -395,7 +622,7 @@ def _render_step_montage(plt, Zs, xpos, ypos, t_los, scope, ch, cmap,
     if im is not None:
         fig.colorbar(im, ax=axes, label="V", shrink=0.9)
     fig.suptitle(f"{os.path.basename(path)}  —  scope '{scope}' / {ch}: "
-                 f"XY map (step, shot {shot_index})", fontsize=10)
+                 f"XY map (step, {which})", fontsize=10)
 
 
 # ======================================================================================
@@ -405,15 +632,16 @@ def _render_step_montage(plt, Zs, xpos, ypos, t_los, scope, ch, cmap,
 def plot_xy_map(path, scope=None, channels=None, mode=None,
                 t_start=None, t_end=None, t_step=None, shot_index=None,
                 med_size=None, gauss_sigma=None,
-                show_contour=None, cmap=None, show=None, save=None):
+                show_contour=None, cmap=None, show=None, save=None, stat=None):
     """Render a plane-only XY map per (scope, channel).
 
-    For each scope/channel: pick one shot per position by ``shot_index``, reduce it
-    in time (``range`` -> mean over [t_start, t_end] ms; ``step`` -> snapshot
-    montage at the ``t_step`` time(s)), reshape onto the plane, and imshow with an
-    optional aligned contour. Line scans are skipped. Honors SHOW_PLOT/SAVE_PLOT
-    (override with show/save); saves one PNG per (scope, channel). Returns the
-    saved paths.
+    For each scope/channel: pick one shot per position by ``shot_index`` (or,
+    with ``stat`` ``"mean"``/``"std"``, the repeat-shot statistic -- see
+    :func:`position_stat_values`), reduce it in time (``range`` -> mean over
+    [t_start, t_end] ms; ``step`` -> snapshot montage at the ``t_step``
+    time(s)), reshape onto the plane, and imshow with an optional aligned
+    contour. Line scans are skipped. Honors SHOW_PLOT/SAVE_PLOT (override with
+    show/save); saves one PNG per (scope, channel). Returns the saved paths.
     """
     import matplotlib.pyplot as plt
 
@@ -424,6 +652,7 @@ def plot_xy_map(path, scope=None, channels=None, mode=None,
     t_end = T_END_MS if t_end is None else t_end
     t_step = T_STEP_MS if t_step is None else t_step
     shot_index = SHOT_INDEX if shot_index is None else shot_index
+    stat = STAT if stat is None else stat
     med_size = MED_SIZE if med_size is None else med_size
     gauss_sigma = GAUSS_SIGMA if gauss_sigma is None else gauss_sigma
     show_contour = SHOW_CONTOUR if show_contour is None else show_contour
@@ -434,6 +663,9 @@ def plot_xy_map(path, scope=None, channels=None, mode=None,
 
     if mode not in ("range", "step"):
         raise ValueError(f"MODE must be 'range' or 'step', got {mode!r}")
+    if stat not in ("shot", "mean", "std"):
+        raise ValueError(f"XY_STAT must be 'shot', 'mean' or 'std', got {stat!r}")
+    which = _stat_tag(stat, shot_index)
 
     saved = []
     if save:
@@ -463,20 +695,28 @@ def plot_xy_map(path, scope=None, channels=None, mode=None,
 
             for ch in chans:
                 if mode == "step":
-                    t_steps = _as_step_list(t_step)
-                    Zs, xp, yp, t_los = build_planes_step(
-                        f, sc, ch, positions, t_steps, shot_index,
-                        med_size, gauss_sigma)
+                    if stat == "shot":
+                        Zs, xp, yp, t_los = build_planes_step(
+                            f, sc, ch, positions, _as_step_list(t_step), shot_index,
+                            med_size, gauss_sigma)
+                    else:
+                        Zs, xp, yp, t_los = build_planes_stat(
+                            f, sc, ch, positions, stat, mode, t_start, t_end, t_step)
                     if Zs is None or all(np.all(np.isnan(Z)) for Z in Zs):
                         print(f"scope '{sc}' / {ch}: no usable shots — skipping")
                         continue
                     _render_step_montage(plt, Zs, xp, yp, t_los, sc, ch, cmap,
-                                         show_contour, shot_index, path)
+                                         show_contour, which, path)
                 else:
-                    Z, xp, yp = build_plane(
-                        f, sc, ch, positions,
-                        make_single_shot_reduce(shot_index, mode, t_start, t_end, t_step),
-                        med_size, gauss_sigma)
+                    if stat == "shot":
+                        Z, xp, yp = build_plane(
+                            f, sc, ch, positions,
+                            make_single_shot_reduce(shot_index, mode, t_start, t_end, t_step),
+                            med_size, gauss_sigma, t_window_ms=(t_start, t_end))
+                    else:
+                        Zs, xp, yp, _t_los = build_planes_stat(
+                            f, sc, ch, positions, stat, mode, t_start, t_end, t_step)
+                        Z = None if Zs is None else Zs[0]
                     if Z is None or np.all(np.isnan(Z)):
                         print(f"scope '{sc}' / {ch}: no usable shots — skipping")
                         continue
@@ -484,7 +724,7 @@ def plot_xy_map(path, scope=None, channels=None, mode=None,
                     i0, i1 = _reduction_indices(tarr, mode, t_start, t_end, t_step)
                     label = _reduction_label(mode, float(tarr[i0]), float(tarr[i1 - 1]))
                     _render_map(plt, Z, xp, yp, sc, ch, label, cmap,
-                                show_contour, shot_index, path)
+                                show_contour, which, path)
 
                 if save:
                     out_png = os.path.join(plots_dir, f"{base}_{sc}_{ch}_xymap.png")
@@ -39,7 +39,10 @@ if _REPO_ROOT not in sys.path:
 
 from scope_io import (
     WAVEDESC_SIZE as WAVEDESC_BYTES,
+    envelope_polyline,
+    minmax_decimate,
     read_hdf5_scope_channel_descriptions,
+    read_hdf5_scope_channel_preview,
     read_hdf5_scope_channel_shots,
     read_hdf5_scope_data,
     read_hdf5_scope_tarr,
@@ -57,7 +60,7 @@ except ImportError:  # fallback when run directly from inside the folder
         DATA_DIR, DATA_FILE as DEFAULT_FILE, SHOW_PLOT, SAVE_PLOT,
     )
 
-NON_SCOPE_GROUPS = {"Configuration", "Control"}  # root groups that aren't scopes
+NON_SCOPE_GROUPS = {"Configuration", "Control", "analysis"}  # root groups that aren't scopes
 _EXPECTED_POSITION_FIELDS = ("shot_num", "x", "y")
 
 
@@ -565,6 +568,28 @@ def print_summary(path):
 # Plotting
 # ======================================================================================
 
+def _figure_pixel_width(fig, dpi=150):
+    """Pixel columns across ``fig`` at ``dpi`` (the saved-PNG resolution): the
+    most points a trace spanning the figure can show."""
+    return int(np.ceil(fig.get_figwidth() * dpi))
+
+
+def _plot_minmax(ax, t, lo, hi, **kwargs):
+    """Draw a min/max envelope as one vertical stroke per bin -- at a bin no
+    wider than a pixel this looks exactly like the full-resolution trace."""
+    return ax.plot(*envelope_polyline(t, lo, hi), **kwargs)
+
+
+def _plot_decimated(ax, t, volts, max_points, **kwargs):
+    """Plot ``volts`` vs ``t``, min/max-decimated in memory when it has more
+    than ``2 * max_points`` samples (a no-op for short traces)."""
+    factor = len(volts) // max_points if max_points else 1
+    if factor < 2 or len(volts) <= 2 * max_points:
+        return ax.plot(t, volts, **kwargs)
+    mm = minmax_decimate(volts, factor)
+    return _plot_minmax(ax, t[::factor], mm[:, 0], mm[:, 1], **kwargs)
+
+
 def _plot_sequence_shot(f, scope, ch, shot, ax, tarr=None):
     """Plot every segment of ONE sequence-mode shot of one channel onto ``ax``.
 
@@ -594,12 +619,55 @@ def _plot_sequence_shot(f, scope, ch, shot, ax, tarr=None):
     return len(segs)
 
 
+def _plot_channel_shots(f, scope, ch, shots, positions, ax, max_points):
+    """Overlay ``shots`` of one 1-D channel on ``ax``; False if none is readable.
+
+    Uses the coarsest stored min/max preview level that still has
+    ``max_points`` bins (see :mod:`scope_io.preview`), so a long record is
+    drawn without reading its full-resolution data. Runs without previews
+    read the shots in one pass (WAVEDESC decoded once) and are decimated in
+    memory for drawing. NaN rows mark unreadable/skipped shots.
+    """
+    preview = read_hdf5_scope_channel_preview(f, scope, ch, shots, max_points)
+    if preview is not None:
+        t, lo, hi, _factor = preview
+    else:
+        stack, dt, t0 = read_hdf5_scope_channel_shots(f, scope, ch, shots)
+        if stack is None:
+            print(f"  skip {scope}/{ch}: no readable shots")
+            return False
+        try:
+            t = read_hdf5_scope_tarr(f, scope)
+            if len(t) != stack.shape[1]:
+                t = np.arange(stack.shape[1]) * dt + t0
+        except Exception:
+            t = np.arange(stack.shape[1]) * dt + t0
+        lo = hi = stack
+
+    for s, row_lo, row_hi in zip(shots, lo, hi):
+        if np.isnan(row_lo).all():
+            print(f"  skip {scope}/shot_{s}/{ch}: unreadable")
+            continue
+        pos = _position_for_shot(positions, s)
+        label = f"shot {s}"
+        if pos is not None:
+            label += f" @ x={pos[0]:.1f}, y={pos[1]:.1f}"
+        if preview is not None:
+            _plot_minmax(ax, t * 1e3, row_lo, row_hi, lw=0.8, label=label)
+        else:
+            _plot_decimated(ax, t * 1e3, row_lo, max_points, lw=0.8, label=label)
+    return True
+
+
 def plot_traces(path, scope=None, channels=None, shots=None, show=None, save=None):
     """Overlay a few traces per scope for visual comparison against the scope.
 
     scope/channels/shots default to all-scopes / all-channels / first-middle-last.
     show/save default to module-level SHOW_PLOT/SAVE_PLOT; saved PNGs go in a
-    ``plots/`` subdir next to the data file (one per scope). Returns saved paths.
+    ``plots/`` subdir next to the data file (one per scope). Long single-mode
+    traces are drawn from the run's min/max preview pyramid when it has one
+    (``[storage] preview_levels``), at the coarsest level that still resolves
+    the figure's pixel width. Returns saved paths.
     """
     import h5py
     import matplotlib.pyplot as plt
@@ -669,28 +737,11 @@ def plot_traces(path, scope=None, channels=None, shots=None, show=None, save=Non
                                           figsize=(10, 2.4 * len(use_channels)),
                                           squeeze=False)
                 axes = axes2[:, 0]
+                max_points = _figure_pixel_width(fig)
                 for ax, ch in zip(axes, use_channels):
-                    # Read all plotted shots of this channel in one pass (WAVEDESC
-                    # decoded once); NaN rows mark unreadable/skipped shots.
-                    stack, dt, t0 = read_hdf5_scope_channel_shots(f, sc, ch, use_shots)
-                    if stack is None:
-                        print(f"  skip {sc}/{ch}: no readable shots")
+                    if not _plot_channel_shots(f, sc, ch, use_shots, positions, ax,
+                                               max_points):
                         continue
-                    try:
-                        tarr = read_hdf5_scope_tarr(f, sc)
-                        if len(tarr) != stack.shape[1]:
-                            tarr = np.arange(stack.shape[1]) * dt + t0
-                    except Exception:
-                        tarr = np.arange(stack.shape[1]) * dt + t0
-                    for s, volts in zip(use_shots, stack):
-                        if np.isnan(volts).all():
-                            print(f"  skip {sc}/shot_{s}/{ch}: unreadable")
-                            continue
-                        pos = _position_for_shot(positions, s)
-                        label = f"shot {s}"
-                        if pos is not None:
-                            label += f" @ x={pos[0]:.1f}, y={pos[1]:.1f}"
-                        ax.plot(tarr * 1e3, volts, lw=0.8, label=label)
                     ax.set_ylabel("V")
                     ax.set_title(f"{ch}: {descs.get(ch, '')}", fontsize=9, loc="left")
                     ax.legend(fontsize=8, loc="upper right")
@@ -20,6 +20,11 @@ Each SmartTrigger type is a separate, pure function of ``(volts, tarr)`` so they
 are unit-testable without HDF5 and reusable on their own:
     detect_glitch, detect_runt, detect_slew, detect_interval
 
+By default a handful of shots is scanned (``SHOTS``, or first/middle/last).
+``FULL_SCAN`` instead streams every shot of the run through a process pool
+(:func:`full_scan_smart_triggers`) and reports per-position event rates from
+compact structured-array tables rather than a list of dicts.
+
 Two scope-like preprocessing knobs apply before detection:
   * MATH       -- run a waveform-math op (derivative / integral / abs) first,
                   mimicking triggering off a scope Math trace.
@@ -41,9 +46,17 @@ Created May.2026
 """
 
 import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
 
+try:  # progress bar over the full-run scan; optional dependency
+    from tqdm import tqdm
+except ImportError:  # fall back to a no-op pass-through if tqdm isn't installed
+    def tqdm(iterable, *args, **kwargs):
+        return iterable
+
 # Allow running directly (IDE "Run" button / from inside this folder) as well as
 # ``python -m read_and_analyze.<module>`` from the repo root: the root-level
 # ``scope_io``/``acquisition`` packages need the repo root on sys.path, which ``-m``
@@ -58,7 +71,7 @@ from scope_io import (
 )
 try:  # works as a package (python -m read_and_analyze.smart_trigger_analysis)
     from read_and_analyze.read_bmotion_data import (
-        read_positions, _position_for_shot, _scope_groups, _shot_numbers,
+        read_positions, build_positions_index, _position_for_shot, _scope_groups, _shot_numbers,
         _channel_names, _sample_shots, resolve_data_file,
     )
     from read_and_analyze.filter_data import (
@@ -66,7 +79,7 @@ try:  # works as a package (python -m read_and_analyze.smart_trigger_analysis)
     )
 except ImportError:  # fallback when run directly from inside the folder
     from read_bmotion_data import (
-        read_positions, _position_for_shot, _scope_groups, _shot_numbers,
+        read_positions, build_positions_index, _position_for_shot, _scope_groups, _shot_numbers,
         _channel_names, _sample_shots, resolve_data_file,
     )
     from filter_data import (
@@ -77,8 +90,12 @@ except ImportError:  # fallback when run directly from inside the folder
 # mode; import the module so edits there take effect without touching this file.
 try:  # works as a package (python -m read_and_analyze.smart_trigger_analysis)
     from read_and_analyze import smart_trigger_config as cfg
+    from read_and_analyze.analysis_config import POS_TOL as _POS_TOL
+    from read_and_analyze.analysis_tables import write_analysis_tables
 except ImportError:  # fallback when run directly from inside the folder
     import smart_trigger_config as cfg
+    from analysis_config import POS_TOL as _POS_TOL
+    from analysis_tables import write_analysis_tables
 
 # General knobs hoisted to module level for convenience / backwards compat.
 # (The input file is resolved at run time via resolve_data_file, not a knob here.)
@@ -91,6 +108,8 @@ SAVE_PLOT  = cfg.SAVE_PLOT
 SHOTS      = cfg.SHOTS
 HOLDOFF_US = cfg.HOLDOFF_US
 MATH       = cfg.MATH
+FULL_SCAN  = cfg.FULL_SCAN
+SAVE_TABLES = cfg.SAVE_TABLES
 
 # Per-kind colors and marker shapes for the plot's detected-event scatter points.
 _KIND_COLORS = {"glitch": "red", "runt": "purple", "slew": "green", "interval": "orange"}
@@ -152,13 +171,69 @@ def _outside(value_s, min_s, max_s):
     return False
 
 
-def _interp_cross(tarr, volts, i, level):
-    """Linear-interpolated time at which the segment [i, i+1] crosses ``level``."""
-    v0, v1 = volts[i], volts[i + 1]
-    if v1 == v0:
-        return float(tarr[i])
-    frac = (level - v0) / (v1 - v0)
-    return float(tarr[i] + frac * (tarr[i + 1] - tarr[i]))
+def _interp_cross(tarr, volts, idx, level):
+    """Linear-interpolated times at which the segments [i, i+1] (for every ``i``
+    in the index array ``idx``) cross ``level``. Returns a float array parallel
+    to ``idx``; a flat segment reports its left sample time."""
+    t = np.asarray(tarr, dtype=float)
+    v0, v1 = volts[idx], volts[idx + 1]
+    dv = v1 - v0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        frac = (level - v0) / dv
+    cross = t[idx] + frac * (t[idx + 1] - t[idx])
+    return np.where(dv == 0, t[idx], cross)
+
+
+def _up_crossings(v, level):
+    """Indices ``i`` where ``v[i] < level <= v[i+1]`` (an upward crossing)."""
+    return np.flatnonzero((v[:-1] < level) & (level <= v[1:]))
+
+
+def _down_crossings(v, level):
+    """Indices ``i`` where ``v[i] > level >= v[i+1]`` (a downward crossing)."""
+    return np.flatnonzero((v[:-1] > level) & (level >= v[1:]))
+
+
+def _resolve_hysteresis(up_idx, down_idx, state):
+    """Run the hysteresis state machine over the crossing candidates only.
+
+    ``up_idx``/``down_idx`` are the sorted up-crossing (at ``hi``) and
+    down-crossing (at ``lo``) sample indices; ``state`` is the initial state
+    (``1`` high, ``0`` low, ``-1`` unknown). An up-crossing is accepted unless
+    the state is already high, a down-crossing unless it is already low, and an
+    accepted crossing sets the state. Returns the accepted ``(up, down)`` index
+    arrays.
+
+    Because a rejected candidate always has the type of the current state, the
+    state before candidate ``k`` is simply the type of candidate ``k-1``, so the
+    machine reduces to "keep candidates whose type differs from the previous
+    one" -- one vectorized comparison. Only when ``lo > hi`` can one sample be
+    both an up- and a down-crossing; that order-dependent case is resolved with a
+    short loop over the (few) candidates instead.
+    """
+    if np.intersect1d(up_idx, down_idx).size:
+        up_set, down_set = set(up_idx.tolist()), set(down_idx.tolist())
+        up, down = [], []
+        for i in np.union1d(up_idx, down_idx).tolist():
+            if state != 1 and i in up_set:
+                up.append(i)
+                state = 1
+            elif state != 0 and i in down_set:
+                down.append(i)
+                state = 0
+        return np.array(up, dtype=np.intp), np.array(down, dtype=np.intp)
+
+    idx = np.concatenate((up_idx, down_idx))
+    kind = np.concatenate((np.ones(up_idx.size, dtype=np.int8),
+                           np.zeros(down_idx.size, dtype=np.int8)))
+    order = np.argsort(idx, kind="stable")
+    idx, kind = idx[order], kind[order]
+    prev = np.empty_like(kind)
+    if kind.size:
+        prev[0] = state
+        prev[1:] = kind[:-1]
+    keep = kind != prev
+    return idx[keep & (kind == 1)], idx[keep & (kind == 0)]
 
 
 def _edges(volts, tarr, lo, hi):
@@ -168,23 +243,14 @@ def _edges(volts, tarr, lo, hi):
     interpolated. Returns ``(rising_times, falling_times)`` as float arrays.
 
     The lo/hi band debounces noise near a single level so a wiggle doesn't
-    register multiple edges; pass ``lo == hi`` for a plain threshold.
+    register multiple edges; pass ``lo == hi`` for a plain threshold. Candidate
+    crossings are found with whole-array comparisons and the hysteresis is
+    resolved on that subset only (:func:`_resolve_hysteresis`).
     """
     v = np.asarray(volts, dtype=float)
-    rising, falling = [], []
-    state = None  # "low" once we've been <= lo, "high" once we've been >= hi
-    if v[0] >= hi:
-        state = "high"
-    elif v[0] <= lo:
-        state = "low"
-    for i in range(len(v) - 1):
-        if state != "high" and v[i] < hi <= v[i + 1]:
-            rising.append(_interp_cross(tarr, v, i, hi))
-            state = "high"
-        elif state != "low" and v[i] > lo >= v[i + 1]:
-            falling.append(_interp_cross(tarr, v, i, lo))
-            state = "low"
-    return np.array(rising, dtype=float), np.array(falling, dtype=float)
+    state = 1 if v[0] >= hi else (0 if v[0] <= lo else -1)
+    up, down = _resolve_hysteresis(_up_crossings(v, hi), _down_crossings(v, lo), state)
+    return _interp_cross(tarr, v, up, hi), _interp_cross(tarr, v, down, lo)
 
 
 def _pulses(rising, falling):
@@ -252,31 +318,50 @@ def detect_runt(volts, tarr, lo=None, hi=None):
     hi = cfg.RUNT_HI if hi is None else hi
 
     v = np.asarray(volts, dtype=float)
-    events = []
-    i, n = 0, len(v)
-    while i < n - 1:
-        # find a LO upward crossing
-        if v[i] < lo <= v[i + 1]:
-            t_up = _interp_cross(tarr, v, i, lo)
-            reached_hi = False
-            j = i + 1
-            while j < n - 1 and not (v[j] > lo >= v[j + 1]):
-                if v[j] >= hi:
-                    reached_hi = True
-                j += 1
-            if j < n - 1:
-                t_dn = _interp_cross(tarr, v, j, lo)
-            else:
-                t_dn = float(tarr[-1])
-            if not reached_hi:
-                events.append({"t_start": t_up, "t_end": t_dn,
-                               "value": float(t_dn - t_up), "kind": "runt"})
-            i = j + 1
-        else:
-            i += 1
+    n = len(v)
+    # Excursions alternate LO-up / LO-down: a plain threshold at LO, starting in
+    # the "below" state so a leading LO-down is ignored. Each accepted LO-up
+    # pairs with the next accepted LO-down (or the record end if it never
+    # returns).
+    up, down = _resolve_hysteresis(_up_crossings(v, lo), _down_crossings(v, lo), 0)
+    if up.size == 0:
+        return _result([], None)
+    ends = np.full(up.size, n - 1, dtype=np.intp)
+    ends[:down.size] = down
+    # Samples strictly inside (up, end) that reach HI, via a prefix count.
+    at_hi = np.concatenate(([0], np.cumsum(v >= hi)))
+    reached_hi = (at_hi[ends] - at_hi[up + 1]) > 0
+
+    t_up = _interp_cross(tarr, v, up, lo)
+    t_dn = np.full(up.size, float(tarr[-1]))
+    if down.size:
+        t_dn[:down.size] = _interp_cross(tarr, v, down, lo)
+    events = [{"t_start": float(a), "t_end": float(b),
+               "value": float(b - a), "kind": "runt"}
+              for a, b in zip(t_up[~reached_hi], t_dn[~reached_hi])]
     return _result(events, None)
 
 
+def _pair_slew(v, tarr, open_idx, open_level, close_idx, close_level):
+    """Pair slew-edge opening crossings with closing crossings.
+
+    Each closing crossing (sample ``c``) takes the latest opening crossing at
+    ``o <= c``, provided it came after the previous closing crossing (an opening
+    is consumed once). Returns ``(t_open, t_close, close_idx)`` for the
+    completed transitions.
+    """
+    if open_idx.size == 0 or close_idx.size == 0:
+        empty = np.empty(0, dtype=float)
+        return empty, empty, np.empty(0, dtype=np.intp)
+    k = np.searchsorted(open_idx, close_idx, side="right") - 1
+    prev_close = np.concatenate(([-1], close_idx[:-1]))
+    ok = k >= 0
+    ok[ok] = open_idx[k[ok]] > prev_close[ok]
+    o, c = open_idx[k[ok]], close_idx[ok]
+    return (_interp_cross(tarr, v, o, open_level),
+            _interp_cross(tarr, v, c, close_level), c)
+
+
 def detect_slew(volts, tarr, lo=None, hi=None, min_ns=None, max_ns=None):
     """Slew rate: measure each edge's LO<->HI transition time; flag edges whose
     transition time is OUTSIDE the [min, max] bounds (faster than ``min_ns`` or
@@ -291,21 +376,19 @@ def detect_slew(volts, tarr, lo=None, hi=None, min_ns=None, max_ns=None):
         max_ns = cfg.SLEW_MAX_NS
 
     v = np.asarray(volts, dtype=float)
-    transitions = []  # (t_start, t_end, dt)
-    last_lo = last_hi = None
-    for i in range(len(v) - 1):
-        if v[i] < lo <= v[i + 1]:
-            last_lo = _interp_cross(tarr, v, i, lo)
-        if v[i] < hi <= v[i + 1] and last_lo is not None:  # rising edge LO->HI
-            t_hi = _interp_cross(tarr, v, i, hi)
-            transitions.append((last_lo, t_hi, t_hi - last_lo))
-            last_lo = None
-        if v[i] > hi >= v[i + 1]:
-            last_hi = _interp_cross(tarr, v, i, hi)
-        if v[i] > lo >= v[i + 1] and last_hi is not None:  # falling edge HI->LO
-            t_lo = _interp_cross(tarr, v, i, lo)
-            transitions.append((last_hi, t_lo, t_lo - last_hi))
-            last_hi = None
+    # Rising: each HI-up completes the most recent LO-up at or before it, unless
+    # an earlier HI-up already consumed that LO-up. Falling mirrors it with
+    # HI-down opening and LO-down closing.
+    t_rise_s, t_rise_e, i_rise = _pair_slew(v, tarr, _up_crossings(v, lo), lo,
+                                            _up_crossings(v, hi), hi)
+    t_fall_s, t_fall_e, i_fall = _pair_slew(v, tarr, _down_crossings(v, hi), hi,
+                                            _down_crossings(v, lo), lo)
+    # Report in record order; at one sample a rising edge precedes a falling one.
+    order = np.lexsort((np.concatenate((np.zeros(i_rise.size), np.ones(i_fall.size))),
+                        np.concatenate((i_rise, i_fall))))
+    t_s = np.concatenate((t_rise_s, t_fall_s))[order]
+    t_e = np.concatenate((t_rise_e, t_fall_e))[order]
+    transitions = list(zip(t_s.tolist(), t_e.tolist(), (t_e - t_s).tolist()))
     if not transitions:
         return _result([], None)
     dts = np.array([t[2] for t in transitions], dtype=float)
@@ -371,7 +454,8 @@ def _resolve_shots(sg, shots):
 
 
 def analyze_smart_triggers(path, scope=None, channels=None, shots=None, kinds=None,
-                           holdoff_us=None, math=None, med_size=None, gauss_sigma=None):
+                           holdoff_us=None, math=None, med_size=None, gauss_sigma=None,
+                           as_table=False):
     """Scan recorded traces for the events each SmartTrigger type would catch.
 
     Parameters default to the module constants. ``shots`` may be a list, tuple,
@@ -384,6 +468,11 @@ def analyze_smart_triggers(path, scope=None, channels=None, shots=None, kinds=No
     (scope, channel, shot, kind) -- each with keys: ``scope, channel, shot, x,
     y, kind, math, holdoff_us, n_events, nominal, events`` (``events`` is the
     detector's per-event list).
+
+    With ``as_table=True`` returns ``(records, events)`` structured arrays
+    instead (``SMART_RECORD_DTYPE`` / ``SMART_EVENT_DTYPE``; events joined to
+    records on ``record``) -- the compact form that
+    :func:`read_and_analyze.analysis_tables.write_analysis_tables` stores.
     """
     scope = SCOPE if scope is None else scope
     channels = CHANNELS if channels is None else channels
@@ -394,10 +483,11 @@ def analyze_smart_triggers(path, scope=None, channels=None, shots=None, kinds=No
     gauss_sigma = GAUSS_SIGMA if gauss_sigma is None else gauss_sigma
     channels = _as_list(channels)
     kinds = list(DETECTORS) if kinds is None else list(kinds)
+    holdoff_us = float(holdoff_us)
 
-    records = []
+    rec_chunks, ev_chunks = [], []
     with open_hdf5_readonly(path) as f:
-        positions = read_positions(f)
+        pos_index = build_positions_index(read_positions(f))
         scopes = [scope] if scope else _scope_groups(f)
 
         for sc in scopes:
@@ -416,26 +506,242 @@ def analyze_smart_triggers(path, scope=None, channels=None, shots=None, kinds=No
                     f, sc, ch, shot_list, expected_len=len(tarr))
                 if stack is None:
                     continue
-                for s, volts in zip(shot_list, stack):
-                    if np.isnan(volts).all():
-                        continue
-                    filt = _filter_trace(volts, med_size, gauss_sigma)
-                    sig = _apply_math(filt, tarr, math)
-                    sig, t = _holdoff_slice(sig, tarr, holdoff_us)
-                    if len(sig) < 4:
-                        continue
-                    pos = _position_for_shot(positions, s)
-                    x, y = (pos if pos is not None else (float("nan"), float("nan")))
-                    for kind in kinds:
-                        res = DETECTORS[kind](sig, t)
-                        records.append({
-                            "scope": sc, "channel": ch, "shot": s,
-                            "x": float(x), "y": float(y), "kind": kind,
-                            "math": math, "holdoff_us": float(holdoff_us),
-                            "n_events": res["n"], "nominal": res["nominal"],
-                            "events": res["events"],
-                        })
-    return records
+                xy = [pos_index.get(s, (np.nan, np.nan)) for s in shot_list]
+                recs, evs = _scan_chunk(sc, ch, shot_list, [p[0] for p in xy],
+                                        [p[1] for p in xy], stack, tarr, kinds, math,
+                                        holdoff_us, med_size, gauss_sigma)
+                rec_chunks.append(recs)
+                ev_chunks.append(evs)
+    records, events = _concat_tables(rec_chunks, ev_chunks)
+    if as_table:
+        return records, events
+    return smart_table_to_dicts(records, events, math, holdoff_us)
+
+
+def smart_table_to_dicts(records, events, math, holdoff_us):
+    """Expand ``(records, events)`` tables into the list-of-dicts record form.
+
+    Inverse of the compact layout: one dict per records row with keys ``scope,
+    channel, shot, x, y, kind, math, holdoff_us, n_events, nominal, events``.
+    ``math``/``holdoff_us`` are run-wide settings (stored once, e.g. as HDF5
+    attrs, not per row). Useful after reloading tables written by
+    :func:`read_and_analyze.analysis_tables.write_analysis_tables`.
+    """
+    ev_sorted = events[np.argsort(events["record"], kind="stable")]
+    out = []
+    for r in records:
+        kind = r["kind"].decode()
+        lo, hi = np.searchsorted(ev_sorted["record"], [r["record"], r["record"] + 1])
+        out.append({
+            "scope": r["scope"].decode(), "channel": r["channel"].decode(),
+            "shot": int(r["shot"]), "x": float(r["x"]), "y": float(r["y"]),
+            "kind": kind, "math": math, "holdoff_us": float(holdoff_us),
+            "n_events": int(r["n_events"]), "nominal": float(r["nominal"]),
+            "events": [{"t_start": float(e["t_start"]), "t_end": float(e["t_end"]),
+                        "value": float(e["value"]), "kind": kind}
+                       for e in ev_sorted[lo:hi]],
+        })
+    return out
+
+
+# ======================================================================================
+# Full-run scan  (every shot, process pool, compact tables)
+# ======================================================================================
+# One row per (scope, channel, shot, kind). Events live in a separate flat table
+# keyed by ``record`` (the row's index in the records table) instead of a nested
+# per-record list, so a whole run's results stay a few compact arrays.
+SMART_RECORD_DTYPE = np.dtype([
+    ("record", "<i8"), ("scope", "S32"), ("channel", "S8"), ("shot", "<i4"),
+    ("x", "<f8"), ("y", "<f8"), ("kind", "S8"),
+    ("n_events", "<i4"), ("nominal", "<f8"),
+])
+SMART_EVENT_DTYPE = np.dtype([
+    ("record", "<i8"), ("t_start", "<f8"), ("t_end", "<f8"), ("value", "<f8"),
+])
+# Per-position event rate: events per scanned shot, positions rounded to POS_TOL.
+SMART_RATE_DTYPE = np.dtype([
+    ("scope", "S32"), ("channel", "S8"), ("x", "<f8"), ("y", "<f8"), ("kind", "S8"),
+    ("n_shots", "<i4"), ("n_events", "<i8"), ("rate", "<f8"),
+])
+
+
+def _cfg_snapshot():
+    """The SmartTrigger knob values as a plain dict (shipped to pool workers)."""
+    return {k: v for k, v in vars(cfg).items() if k.isupper()}
+
+
+def _scan_worker_init(knobs):
+    """Pool initializer: mirror the parent's knob values into this worker's
+    ``cfg``, so runtime overrides (e.g. ``cfg.RUNT_LO = 0.3`` in a notebook)
+    apply even where workers re-import the module (spawn on Windows)."""
+    for k, v in knobs.items():
+        setattr(cfg, k, v)
+
+
+def _scan_chunk(scope, ch, shots, xs, ys, raw, tarr, kinds, math, holdoff_us,
+                med_size, gauss_sigma):
+    """Worker body: filter -> math -> holdoff -> detectors for a chunk of shots.
+
+    ``raw`` is the ``(nshot, nsamples)`` volt stack for ``shots`` (NaN rows for
+    unreadable shots, which produce no records). Returns ``(records, events)``
+    structured arrays with ``record`` numbered from 0 within the chunk; the
+    caller offsets them to run-global ids.
+    """
+    rec_rows, ev_rows = [], []
+    for s, x, y, volts in zip(shots, xs, ys, raw):
+        if np.isnan(volts).all():
+            continue
+        filt = _filter_trace(volts, med_size, gauss_sigma)
+        sig, t = _holdoff_slice(_apply_math(filt, tarr, math), tarr, holdoff_us)
+        if len(sig) < 4:
+            continue
+        for kind in kinds:
+            res = DETECTORS[kind](sig, t)
+            rid = len(rec_rows)
+            rec_rows.append((rid, scope, ch, s, x, y, kind, res["n"], res["nominal"]))
+            ev_rows.extend((rid, ev["t_start"], ev["t_end"], ev["value"])
+                           for ev in res["events"])
+    return (np.array(rec_rows, dtype=SMART_RECORD_DTYPE),
+            np.array(ev_rows, dtype=SMART_EVENT_DTYPE))
+
+
+def _concat_tables(rec_chunks, ev_chunks):
+    """Join per-chunk ``(records, events)`` tables into one pair, renumbering
+    ``record`` so ids stay unique (chunks from :func:`_scan_chunk` each start
+    at 0; already-global chunks are left as they are)."""
+    next_id = 0
+    for recs, evs in zip(rec_chunks, ev_chunks):
+        if len(recs) and recs["record"][0] != next_id:
+            offset = next_id - recs["record"][0]
+            recs["record"] += offset
+            evs["record"] += offset
+        next_id += len(recs)
+    records = (np.concatenate(rec_chunks) if rec_chunks
+               else np.zeros(0, dtype=SMART_RECORD_DTYPE))
+    events = (np.concatenate(ev_chunks) if ev_chunks
+              else np.zeros(0, dtype=SMART_EVENT_DTYPE))
+    return records, events
+
+
+def iter_full_scan(path, scope=None, channels=None, kinds=None, holdoff_us=None,
+                   math=None, med_size=None, gauss_sigma=None, workers=None,
+                   chunk_shots=None):
+    """Stream every shot of every selected channel through the SmartTrigger scan.
+
+    Yields ``(records, events)`` structured-array chunks (see
+    ``SMART_RECORD_DTYPE`` / ``SMART_EVENT_DTYPE``) in run order as they
+    complete, with ``record`` ids already global, so a caller can write or
+    aggregate results without holding the whole run. Shots are read
+    sequentially here (``chunk_shots`` at a time, one WAVEDESC decode per
+    chunk) and the filter/math/holdoff/detector work runs on a process pool of
+    ``workers`` (``None`` = all CPUs; ``1`` = in-process, no pool) with at most
+    ``2 * workers`` chunks in flight. Skipped shots are excluded.
+    """
+    scope = SCOPE if scope is None else scope
+    channels = CHANNELS if channels is None else channels
+    holdoff_us = HOLDOFF_US if holdoff_us is None else holdoff_us
+    math = MATH if math is None else math
+    med_size = MED_SIZE if med_size is None else med_size
+    gauss_sigma = GAUSS_SIGMA if gauss_sigma is None else gauss_sigma
+    workers = cfg.SCAN_WORKERS if workers is None else workers
+    workers = workers or os.cpu_count() or 1
+    chunk_shots = cfg.SCAN_CHUNK_SHOTS if chunk_shots is None else chunk_shots
+    channels = _as_list(channels)
+    kinds = list(DETECTORS) if kinds is None else list(kinds)
+    holdoff_us = float(holdoff_us)
+
+    ex = (ProcessPoolExecutor(max_workers=workers, initializer=_scan_worker_init,
+                              initargs=(_cfg_snapshot(),))
+          if workers > 1 else None)
+    in_flight = deque()
+    next_id = 0
+
+    def _collect(item):
+        nonlocal next_id
+        recs, evs = item.result() if ex is not None else item
+        recs["record"] += next_id
+        evs["record"] += next_id
+        next_id += len(recs)
+        return recs, evs
+
+    try:
+        with open_hdf5_readonly(path) as f:
+            pos_index = build_positions_index(read_positions(f))
+            scopes = [scope] if scope else _scope_groups(f)
+            for sc in scopes:
+                sg = f[sc]
+                tarr = read_hdf5_scope_tarr(f, sc)
+                shot_list = _resolve_shots(sg, _shot_numbers(sg))
+                if not shot_list:
+                    print(f"scope '{sc}': no usable shots to scan -- skipping")
+                    continue
+                chans = channels if channels else _channel_names(sg, shot_list[0])
+                for ch in chans:
+                    for k in range(0, len(shot_list), chunk_shots):
+                        shots = shot_list[k:k + chunk_shots]
+                        raw, _dt, _t0 = read_hdf5_scope_channel_shots(
+                            f, sc, ch, shots, expected_len=len(tarr))
+                        if raw is None:
+                            continue
+                        xy = [pos_index.get(s, (np.nan, np.nan)) for s in shots]
+                        args = (sc, ch, shots, [p[0] for p in xy], [p[1] for p in xy],
+                                raw, tarr, kinds, math, holdoff_us, med_size, gauss_sigma)
+                        if ex is None:
+                            yield _collect(_scan_chunk(*args))
+                            continue
+                        in_flight.append(ex.submit(_scan_chunk, *args))
+                        if len(in_flight) >= 2 * workers:
+                            yield _collect(in_flight.popleft())
+        while in_flight:
+            yield _collect(in_flight.popleft())
+    finally:
+        if ex is not None:
+            ex.shutdown(cancel_futures=True)
+
+
+def event_rates(records):
+    """Per-position event rates from a ``SMART_RECORD_DTYPE`` table.
+
+    Groups rows by (scope, channel, x, y, kind) with positions rounded to
+    ``POS_TOL`` (so repeat shots at one nominal position pool together) and
+    returns a ``SMART_RATE_DTYPE`` array: shots scanned, flagged events, and
+    ``rate`` = events per shot. Sorted by scope, channel, y, x, kind.
+    """
+    if len(records) == 0:
+        return np.zeros(0, dtype=SMART_RATE_DTYPE)
+    keys = np.zeros(len(records), dtype=[("scope", "S32"), ("channel", "S8"),
+                                         ("y", "<f8"), ("x", "<f8"), ("kind", "S8")])
+    keys["scope"], keys["channel"], keys["kind"] = (
+        records["scope"], records["channel"], records["kind"])
+    keys["x"] = np.round(records["x"] / _POS_TOL) * _POS_TOL
+    keys["y"] = np.round(records["y"] / _POS_TOL) * _POS_TOL
+    uniq, inverse = np.unique(keys, return_inverse=True)
+    inverse = inverse.ravel()
+    out = np.zeros(len(uniq), dtype=SMART_RATE_DTYPE)
+    for name in ("scope", "channel", "x", "y", "kind"):
+        out[name] = uniq[name]
+    out["n_shots"] = np.bincount(inverse, minlength=len(uniq))
+    out["n_events"] = np.bincount(inverse, weights=records["n_events"],
+                                  minlength=len(uniq)).astype(np.int64)
+    out["rate"] = out["n_events"] / out["n_shots"]
+    return out
+
+
+def full_scan_smart_triggers(path, **kwargs):
+    """Scan EVERY shot of the run; return ``(records, events, rates)`` tables.
+
+    Collects :func:`iter_full_scan` (same keyword arguments) into one
+    ``SMART_RECORD_DTYPE`` records table and one flat ``SMART_EVENT_DTYPE``
+    events table (join on ``record``), plus the per-position
+    :func:`event_rates`. Progress is shown per scanned chunk.
+    """
+    rec_chunks, ev_chunks = [], []
+    for recs, evs in tqdm(iter_full_scan(path, **kwargs), desc="smart-trigger scan",
+                          unit="chunk"):
+        rec_chunks.append(recs)
+        ev_chunks.append(evs)
+    records, events = _concat_tables(rec_chunks, ev_chunks)
+    return records, events, event_rates(records)
 
 
 # ======================================================================================
@@ -478,6 +784,32 @@ def _print_table(records):
     print("=" * 92)
 
 
+def _print_rates(rates, n_records):
+    """Print the full-scan per-position event rates (events per scanned shot)."""
+    print("=" * 92)
+    print("SMART-TRIGGER FULL SCAN  (per-position event rate = flagged events / shot)")
+    print(f"math={MATH}   holdoff={HOLDOFF_US:g} us   "
+          f"median={MED_SIZE:g} samples   gauss_sigma={GAUSS_SIGMA:g} samples   "
+          f"records={n_records}")
+    print("-" * 92)
+    if len(rates) == 0:
+        print("(no traces scanned)")
+        print("=" * 92)
+        return
+    print(f"{'scope':<8} {'ch':<4} {'x':>7} {'y':>6} {'kind':<9} "
+          f"{'shots':>6} {'#events':>8} {'rate':>9}")
+    for r in rates:
+        print(f"{r['scope'].decode():<8} {r['channel'].decode():<4} "
+              f"{r['x']:>7.1f} {r['y']:>6.1f} {r['kind'].decode():<9} "
+              f"{r['n_shots']:>6d} {r['n_events']:>8d} {r['rate']:>9.3f}")
+    print("-" * 92)
+    summary = "   ".join(
+        f"{k}={int(rates['n_events'][rates['kind'] == k.encode()].sum())}"
+        for k in DETECTORS)
+    print(f"TOTAL flagged events:   {summary}")
+    print("=" * 92)
+
+
 # ======================================================================================
 # Plotting
 # ======================================================================================
@@ -618,9 +950,29 @@ def plot_smart_triggers(path, scope=None, channels=None, shots=None, kinds=None,
     return saved
 
 
+def _save_tables(data_file, tables):
+    """Write the scan tables to ``/analysis/smart_trigger`` with the run-wide settings."""
+    where = write_analysis_tables(
+        data_file, "smart_trigger", tables,
+        attrs={"math": MATH, "holdoff_us": float(HOLDOFF_US), "med_size": MED_SIZE,
+               "gauss_sigma": GAUSS_SIGMA, "full_scan": bool(FULL_SCAN)})
+    print(f"Saved tables: {where}")
+
+
 def main():
     data_file = resolve_data_file()
-    records = analyze_smart_triggers(data_file)
+    if FULL_SCAN:
+        records, events, rates = full_scan_smart_triggers(data_file)
+        _print_rates(rates, len(records))
+        if SAVE_TABLES:
+            _save_tables(data_file, {"records": records, "events": events, "rates": rates})
+        return
+    if SAVE_TABLES:
+        records, events = analyze_smart_triggers(data_file, as_table=True)
+        _save_tables(data_file, {"records": records, "events": events})
+        records = smart_table_to_dicts(records, events, MATH, HOLDOFF_US)
+    else:
+        records = analyze_smart_triggers(data_file)
     _print_table(records)
     if SHOW_PLOT or SAVE_PLOT:
         plot_smart_triggers(data_file)
@@ -26,18 +26,19 @@ Created May.2026
 import numpy as np
 try:  # works as a package (python -m read_and_analyze.smart_trigger_analysis)
     from read_and_analyze.analysis_config import (
-        DATA_FILE, MED_SIZE, GAUSS_SIGMA,
+        DATA_FILE, MED_SIZE, GAUSS_SIGMA, SAVE_TABLES,
         SELECT_SCOPE as SCOPE, SELECT_CHAN as CHANNELS,
     )
 except ImportError:  # fallback when run directly from inside the folder
     from analysis_config import (
-        DATA_FILE, MED_SIZE, GAUSS_SIGMA,
+        DATA_FILE, MED_SIZE, GAUSS_SIGMA, SAVE_TABLES,
         SELECT_SCOPE as SCOPE, SELECT_CHAN as CHANNELS,
     )
 
 # ======================================================================================
 # General -- output and preprocessing
-# (DATA_FILE / SCOPE / CHANNELS / MED_SIZE / GAUSS_SIGMA come from analysis_config above)
+# (DATA_FILE / SCOPE / CHANNELS / MED_SIZE / GAUSS_SIGMA / SAVE_TABLES come from
+#  analysis_config above)
 # ======================================================================================
 SHOW_PLOT  = False   # display the figure interactively
 SAVE_PLOT  = True    # write a PNG to a "plots/" subdir next to the data file
@@ -45,6 +46,11 @@ SHOTS      = np.arange(0, 10)    # shots to scan: a list/array e.g. [12, 57] or
 HOLDOFF_US = 3000    # ignore the record before this time (us from t=0); mimics trigger holdoff
 MATH       = None    # None = filtered trace as-is; or "derivative" / "integral" / "abs"
 
+FULL_SCAN         = False  # True = scan EVERY shot of every selected channel (SHOTS ignored) and
+                           # report per-position event rates instead of the per-shot table
+SCAN_WORKERS      = None   # process-pool size for FULL_SCAN; None = all CPUs, 1 = in-process
+SCAN_CHUNK_SHOTS  = 32     # shots read + shipped to a worker per task in FULL_SCAN
+
 # ======================================================================================
 # Glitch / Width trigger -- flag pulses whose width is OUTSIDE [min, max]
 #   A pulse is the span between a rising and the next falling crossing of
@@ -2,7 +2,12 @@
 """Standalone readers for LAPD_DAQ scope HDF5 archives (no lab_scopes needed).
 
 Re-exports the HDF5 reader helpers so callers can do
-``from scope_io import read_hdf5_scope_data``. Depends only on numpy and h5py.
+``from scope_io import read_hdf5_scope_data``, ``open_run`` -- the lazy,
+chunk-aware whole-run view (:mod:`scope_io.run`) -- the min/max preview
+helpers (:mod:`scope_io.preview`), the per-position statistics written at
+offload (:mod:`scope_io.position_stats`) and the live analysis tap the offload
+announces committed shots on (:mod:`scope_io.live`). Depends only on numpy and
+h5py.
 """
 
 from .hdf5 import (
@@ -10,21 +15,61 @@ from .hdf5 import (
     channel_descriptions_from_attrs,
     open_hdf5_readonly,
     read_hdf5_scope_channel_descriptions,
+    read_hdf5_scope_channel_headers,
     read_hdf5_scope_channel_shots,
     read_hdf5_scope_data,
     read_hdf5_scope_tarr,
     scope_shot_numbers,
+    time_window_indices,
+)
+from .live import LiveShot, LiveTapPublisher, LiveTapSubscriber, LiveTrace
+from .preview import (
+    envelope_polyline,
+    minmax_decimate,
+    minmax_pyramid,
+    preview_key,
+    read_hdf5_scope_channel_preview,
+)
+from .position_stats import PositionStatsAccumulator, read_position_stats
+from .run import ChannelView, RunView, open_run
+from .wavedesc import (
+    WAVEDESC_DTYPE,
+    WAVEDESC_SIZE,
+    decode_wavedescs,
+    wavedesc_num_samples,
+    wavedesc_time_arrays,
+    wavedesc_trigger_epochs,
 )
-from .wavedesc import WAVEDESC_SIZE
 
 __all__ = [
     "CHANNEL_DESCRIPTION_SUFFIX",
+    "ChannelView",
+    "LiveShot",
+    "LiveTapPublisher",
+    "LiveTapSubscriber",
+    "LiveTrace",
+    "PositionStatsAccumulator",
+    "RunView",
+    "WAVEDESC_DTYPE",
     "WAVEDESC_SIZE",
     "channel_descriptions_from_attrs",
+    "decode_wavedescs",
+    "envelope_polyline",
+    "minmax_decimate",
+    "minmax_pyramid",
     "open_hdf5_readonly",
+    "open_run",
+    "preview_key",
     "read_hdf5_scope_channel_descriptions",
+    "read_hdf5_scope_channel_headers",
+    "read_hdf5_scope_channel_preview",
     "read_hdf5_scope_channel_shots",
     "read_hdf5_scope_data",
     "read_hdf5_scope_tarr",
+    "read_position_stats",
     "scope_shot_numbers",
+    "time_window_indices",
+    "wavedesc_num_samples",
+    "wavedesc_time_arrays",
+    "wavedesc_trigger_epochs",
 ]
@@ -12,7 +12,7 @@ without ``lab_scopes`` installed; depends only on numpy and h5py.
 
 import numpy as np
 
-from .wavedesc import LeCroyWavedesc
+from .wavedesc import LeCroyWavedesc, WAVEDESC_DTYPE, WAVEDESC_SIZE, decode_wavedescs
 
 
 def _h5py():
@@ -162,10 +162,40 @@ def read_hdf5_scope_tarr(f, scope_name):
     return scope_group['time_array'][:]
 
 
-def read_hdf5_scope_data(f, scope_name, channel_name, shot_number):
+def time_window_indices(tarr, t_start=None, t_end=None):
+    """Translate a time window to a sample range ``(i0, i1)`` of ``tarr``.
+
+    Keeps the samples with ``t_start <= t <= t_end`` (seconds; either end may be
+    None = open), as the half-open index range ``[i0, i1)`` -- empty (``i0 ==
+    i1``) when the window misses the record. Pass the result as ``samples=`` to
+    the readers so only the chunks overlapping the window are read.
+    """
+    n = len(tarr)
+    i0 = 0 if t_start is None else int(np.searchsorted(tarr, t_start, side='left'))
+    i1 = n if t_end is None else int(np.searchsorted(tarr, t_end, side='right'))
+    i0 = min(max(i0, 0), n)
+    return i0, max(i0, min(i1, n))
+
+
+def _resolve_samples(f, scope_name, samples, t_window):
+    """``samples`` as given, or ``t_window`` mapped through the scope's time array."""
+    if t_window is None:
+        return samples
+    if samples is not None:
+        raise ValueError("pass either samples or t_window, not both")
+    return time_window_indices(read_hdf5_scope_tarr(f, scope_name), *t_window)
+
+
+def read_hdf5_scope_data(f, scope_name, channel_name, shot_number,
+                         samples=None, t_window=None):
     """Read and scale one shot of one channel to volts.
 
-    Returns ``(voltage_data, dt, t0)``.
+    Returns ``(voltage_data, dt, t0)``. ``samples=(i0, i1)`` or
+    ``t_window=(t_start, t_end)`` (seconds, see :func:`time_window_indices`)
+    reads only that part of the trace (of every segment, for a 2-D
+    sequence-mode dataset) -- on a time-chunked dataset only the chunks
+    overlapping it are decompressed. ``dt``/``t0`` always describe the
+    full record; the window's time axis is ``time_array[i0:i1]``.
 
     Raises
     ------
@@ -185,10 +215,13 @@ def read_hdf5_scope_data(f, scope_name, channel_name, shot_number):
         raise ValueError(f"Shot {shot_number} was skipped. Reason: {attrs.get('skip_reason', 'Unknown reason')}")
 
     data_key = f'{channel_name}_data'
+    samples = _resolve_samples(f, scope_name, samples, t_window)
     try:
-        raw_data = shot_group[data_key][:]
+        ds = shot_group[data_key]
     except KeyError as e:
         raise KeyError(f"Missing dataset: {e}")
+    # The sample axis is the last one (sequence mode: one row per segment).
+    raw_data = ds[:] if samples is None else ds[..., samples[0]:samples[1]]
 
     gain, offset, dt, t0 = _scope_channel_scaling(f, scope_name, channel_name, shot_number)
 
@@ -215,12 +248,55 @@ def _scope_channel_scaling(f, scope_name, channel_name, shot_number):
     return wavedesc.wd.vertical_gain, wavedesc.wd.vertical_offset, wavedesc.dt, wavedesc.t0
 
 
-def _read_shot_raw(f, scope_name, channel_name, shot_number):
+def read_hdf5_scope_channel_headers(f, scope_name, channel_name, shot_numbers):
+    """Decode one channel's WAVEDESC for many shots in a single vectorized pass.
+
+    Reads each shot's ``<channel>_header`` bytes (one small dataset read per
+    shot) and decodes them all at once with
+    :func:`scope_io.wavedesc.decode_wavedescs`, for callers that need
+    per-shot header fields -- trigger times
+    (:func:`~scope_io.wavedesc.wavedesc_trigger_epochs`), scaling, record
+    length -- across a whole run.
+
+    Returns
+    -------
+    tuple
+        ``(headers, present)``: a ``(len(shot_numbers),)`` ``WAVEDESC_DTYPE``
+        array in ``shot_numbers`` order and a bool mask of the shots that had a
+        decodable 346-byte header. Rows where ``present`` is False are all-zero
+        (missing, skipped, or malformed shots).
+    """
+    shot_numbers = list(shot_numbers)
+    buf = np.zeros((len(shot_numbers), WAVEDESC_SIZE), dtype=np.uint8)
+    present = np.zeros(len(shot_numbers), dtype=bool)
+    scope_group = f[scope_name] if scope_name in f else None
+    for i, s in enumerate(shot_numbers):
+        shot_group = scope_group.get(f'shot_{s}') if scope_group is not None else None
+        if shot_group is None or shot_group.attrs.get('skipped', False):
+            continue
+        key = f'{channel_name}_header'
+        if key not in shot_group:
+            continue
+        raw = bytes(shot_group[key][()])
+        if len(raw) == WAVEDESC_SIZE:
+            buf[i] = np.frombuffer(raw, dtype=np.uint8)
+            present[i] = True
+    headers = decode_wavedescs(buf) if len(shot_numbers) else np.zeros(0, WAVEDESC_DTYPE)
+    return headers, present
+
+
+def _read_shot_raw(f, scope_name, channel_name, shot_number, samples=None,
+                   expected_len=None):
     """Return one shot's raw int16 ``_data`` array, or ``None`` if unreadable.
 
     Unreadable means the shot group is missing, marked ``skipped``, or has no
     ``<channel>_data`` dataset. Never raises -- a bad shot is just ``None`` so
     the caller can emit a NaN row in its place.
+
+    With ``samples=(i0, i1)`` only that slice is read (a partial read touches
+    only the overlapping chunks). The full-record length check against
+    ``expected_len`` is then made on the dataset shape, before reading, and a
+    mismatching shot is ``None``.
     """
     try:
         shot_group = f[scope_name][f'shot_{shot_number}']
@@ -230,11 +306,16 @@ def _read_shot_raw(f, scope_name, channel_name, shot_number):
         return None
     if f'{channel_name}_data' not in shot_group:
         return None
-    return shot_group[f'{channel_name}_data'][:]
+    ds = shot_group[f'{channel_name}_data']
+    if samples is None:
+        return ds[:]
+    if ds.ndim != 1 or (expected_len is not None and ds.shape[0] != expected_len):
+        return None
+    return ds[samples[0]:samples[1]]
 
 
 def read_hdf5_scope_channel_shots(f, scope_name, channel_name, shot_numbers,
-                                  expected_len=None):
+                                  expected_len=None, samples=None, t_window=None):
     """Read many shots of one channel into a ``(nshot, nsamples)`` float64 array.
 
     Fast path for analysis code scanning many shots of the same channel: the
@@ -247,24 +328,38 @@ def read_hdf5_scope_channel_shots(f, scope_name, channel_name, shot_numbers,
     given -- not of that length becomes a row of ``NaN`` so the returned stack
     stays rectangular and row order matches ``shot_numbers``.
 
+    ``samples=(i0, i1)`` or ``t_window=(t_start, t_end)`` (seconds, mapped via
+    :func:`time_window_indices`) reads only that part of every trace, so a
+    short analysis window over long records never decompresses the rest. The
+    full-record length check (``expected_len``, defaulting to the scope's
+    ``time_array`` length) is then made on the dataset shape before reading.
+
     Returns
     -------
     tuple
         ``(stack, dt, t0)`` where ``stack`` is a ``(len(shot_numbers), nsamples)``
         float64 array (NaN rows for unreadable shots), or ``None`` if no shot in
         ``shot_numbers`` could be read; ``dt``/``t0`` are ``None`` when
-        ``stack`` is ``None``.
+        ``stack`` is ``None``. ``dt``/``t0`` describe the full record even for a
+        windowed read.
     """
     shot_numbers = list(shot_numbers)
+    samples = _resolve_samples(f, scope_name, samples, t_window)
+    if samples is not None:
+        full_len = (len(read_hdf5_scope_tarr(f, scope_name))
+                    if expected_len is None else expected_len)
+        i0 = min(max(int(samples[0]), 0), full_len)
+        samples = (i0, max(i0, min(int(samples[1]), full_len)))
+        expected_len = full_len
 
     # One pass: collect raw int16 per shot (None if unreadable) and decode the
     # channel scaling once, on the first shot that actually yields data. That
     # same shot fixes the row width when the caller gave no expected_len.
     raws = []
     gain = offset = dt = t0 = None
-    nsamples = expected_len
+    nsamples = expected_len if samples is None else samples[1] - samples[0]
     for s in shot_numbers:
-        raw = _read_shot_raw(f, scope_name, channel_name, s)
+        raw = _read_shot_raw(f, scope_name, channel_name, s, samples, expected_len)
         if raw is not None and gain is None:
             try:
                 gain, offset, dt, t0 = _scope_channel_scaling(
@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+"""Live analysis tap: the offload announces each committed shot over a socket.
+
+HDF5 cannot be followed safely while the offload appends to it (SWMR would
+forbid the per-shot groups this layout creates), so live monitoring does not
+open the file at all. When the run metadata carries ``live_tap`` settings
+(``[live_tap]`` in the experiment config), the offload runs a
+:class:`LiveTapPublisher`: a small TCP server that, after every shot is written
+and verified, sends each connected viewer a compact summary of it -- shot
+number, acquisition time, probe position, skip state, and a min/max envelope of
+every 1-D trace in volts (at most ``max_points`` bins, see
+:func:`scope_io.preview.minmax_decimate`). A :class:`LiveTapSubscriber`
+receives them; ``read_and_analyze/live_monitor.py`` plots the last N shots.
+
+Wire format, one message per shot: an 8-byte big-endian length, then an
+``.npz`` archive (loaded with ``allow_pickle=False``) holding a JSON ``_meta``
+record plus ``lo_<k>``/``hi_<k>`` float32 arrays for the ``k``-th trace listed
+in it. The first message to a new viewer describes the run instead of a shot;
+the viewer is already registered when it is sent, so a connected
+:class:`LiveTapSubscriber` misses no shot published after it was constructed.
+
+The tap never slows the offload: with no viewer connected nothing is encoded,
+and each viewer has its own sender thread and a short queue that drops the
+oldest shot when the viewer falls behind. Depends only on numpy.
+"""
+
+import io
+import json
+import socket
+import struct
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .preview import minmax_decimate
+from .wavedesc import LeCroyWavedesc
+
+DEFAULT_MAX_POINTS = 4096
+DEFAULT_QUEUE_DEPTH = 8
+
+_LEN = struct.Struct(">Q")
+
+
+@dataclass
+class LiveTrace:
+    """Min/max envelope of one channel of a live shot.
+
+    ``t`` is the start time of each bin (seconds; sample index if the header
+    could not be decoded), ``lo``/``hi`` the bin minima/maxima in ``units``
+    (``"V"``, or ``"counts"`` without a decodable header), and ``factor`` the
+    number of raw samples per bin.
+    """
+
+    t: np.ndarray
+    lo: np.ndarray
+    hi: np.ndarray
+    factor: int
+    units: str = "V"
+
+
+@dataclass
+class LiveShot:
+    """One committed shot as announced by the offload."""
+
+    shot_num: int
+    acquisition_time: Optional[str] = None
+    coordinates: Optional[object] = None
+    skipped: bool = False
+    skip_reason: str = ""
+    traces: Dict[Tuple[str, str], LiveTrace] = field(default_factory=dict)
+
+
+def _json_default(obj):
+    # numpy scalars/arrays in coordinates or run info; anything else as text.
+    return obj.tolist() if hasattr(obj, "tolist") else str(obj)
+
+
+def _encode(meta, arrays=None):
+    buf = io.BytesIO()
+    record = json.dumps(meta, default=_json_default).encode()
+    np.savez(buf, _meta=np.frombuffer(record, dtype=np.uint8), **(arrays or {}))
+    body = buf.getvalue()
+    return _LEN.pack(len(body)) + body
+
+
+def _recv_exact(sock, n):
+    chunks = []
+    while n:
+        chunk = sock.recv(min(n, 1 << 20))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        n -= len(chunk)
+    return b"".join(chunks)
+
+
+class _Viewer:
+    """One connected viewer: a bounded drop-oldest queue drained by its own thread,
+    which first sends ``hello`` (never dropped)."""
+
+    def __init__(self, sock, depth, hello):
+        self.sock = sock
+        self._hello = hello
+        self.dropped = 0
+        self.closed = False
+        self._draining = False
+        self._queue = deque(maxlen=depth)
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="live-tap-viewer",
+                                        daemon=True)
+        self._thread.start()
+
+    def offer(self, message):
+        with self._cond:
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+            self._queue.append(message)
+            self._cond.notify()
+
+    def close(self, drain_timeout=0.0):
+        """Close the connection, first giving queued shots up to
+        ``drain_timeout`` seconds to go out."""
+        with self._cond:
+            self._draining = True
+            self._cond.notify()
+        if drain_timeout > 0:
+            self._thread.join(drain_timeout)
+        with self._cond:
+            self.closed = True
+            self._cond.notify()
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)    # wakes a sendall blocked on a stuck viewer
+        except OSError:
+            pass
+        self.sock.close()
+
+    def _run(self):
+        try:
+            self.sock.sendall(self._hello)
+        except OSError:
+            self.closed = True
+            return
+        while True:
+            with self._cond:
+                while not self._queue and not self.closed and not self._draining:
+                    self._cond.wait()
+                if self.closed or not self._queue:
+                    return
+                message = self._queue.popleft()
+            try:
+                self.sock.sendall(message)
+            except OSError:
+                self.closed = True
+                return
+
+
+class LiveTapPublisher:
+    """TCP server the offload announces committed shots on.
+
+    ``port=0`` binds a free port (read it back from :attr:`port`). ``run_info``
+    (e.g. the HDF5 path and planned shot count) is sent to every viewer when it
+    connects. Use :meth:`publish` once per committed shot and :meth:`close`
+    at the end of the run.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, max_points=DEFAULT_MAX_POINTS,
+                 queue_depth=DEFAULT_QUEUE_DEPTH, run_info=None):
+        self.max_points = int(max_points)
+        self.queue_depth = int(queue_depth)
+        self._hello = _encode({"type": "run", **(run_info or {})})
+        self._viewers = []
+        self._lock = threading.Lock()
+        self._scaling = {}          # (scope, ch) -> (gain, offset, dt, t0), or None
+        self._closing = False
+        self._server = socket.create_server((host, port))
+        # accept() polls so close() can stop the accept thread on every platform.
+        self._server.settimeout(0.2)
+        self.host, self.port = self._server.getsockname()[:2]
+        threading.Thread(target=self._accept_loop, name="live-tap-accept",
+                         daemon=True).start()
+
+    @property
+    def viewer_count(self):
+        with self._lock:
+            return sum(not v.closed for v in self._viewers)
+
+    def publish(self, payload):
+        """Announce one committed shot (a :class:`spooling.ShotPayload`).
+
+        Encoded only if a viewer is connected; never raises, so a broken viewer
+        or an odd trace cannot fail the offload.
+        """
+        with self._lock:
+            self._viewers = [v for v in self._viewers if not v.closed]
+            viewers = list(self._viewers)
+        if not viewers:
+            return
+        try:
+            message = self._encode_shot(payload)
+        except Exception as e:
+            print(f"Warning: live tap could not encode shot {payload.shot_num}: {e}")
+            return
+        for v in viewers:
+            v.offer(message)
+
+    def close(self, drain_timeout=2.0):
+        """Stop accepting viewers and disconnect them, after giving each up to
+        ``drain_timeout`` seconds to receive the shots still queued for it."""
+        self._closing = True
+        self._server.close()
+        with self._lock:
+            viewers, self._viewers = self._viewers, []
+        for v in viewers:
+            v.close(drain_timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _accept_loop(self):
+        while not self._closing:
+            try:
+                sock, _addr = self._server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return              # server closed
+            sock.settimeout(None)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            # Registered under the lock before its thread sends the hello, so
+            # every shot published after the viewer sees the hello reaches it.
+            with self._lock:
+                self._viewers.append(_Viewer(sock, self.queue_depth, self._hello))
+
+    def _channel_scaling(self, scope, ch, header):
+        key = (scope, ch)
+        if key not in self._scaling:
+            try:
+                wavedesc = LeCroyWavedesc(bytes(header))
+                self._scaling[key] = (float(wavedesc.wd.vertical_gain),
+                                      float(wavedesc.wd.vertical_offset),
+                                      float(wavedesc.dt), float(wavedesc.t0))
+            except Exception:
+                self._scaling[key] = None
+        return self._scaling[key]
+
+    def _encode_shot(self, payload):
+        meta = {
+            "type": "shot",
+            "shot_num": int(payload.shot_num),
+            "acquisition_time": payload.acquisition_time,
+            "coordinates": payload.coordinates,
+            "skipped": bool(payload.skipped),
+            "skip_reason": payload.skip_reason,
+            "traces": [],
+        }
+        arrays = {}
+        for scope, traces in payload.traces.items():
+            for tr in traces:
+                data = np.asarray(tr.data)
+                if data.ndim != 1 or not len(data):
+                    continue
+                factor = max(1, -(-len(data) // self.max_points))
+                mm = minmax_decimate(data, factor).astype(np.float64)
+                scaling = self._channel_scaling(scope, tr.channel, tr.header)
+                if scaling is None:
+                    gain, offset, dt, t0, units = 1.0, 0.0, 1.0, 0.0, "counts"
+                else:
+                    (gain, offset, dt, t0), units = scaling, "V"
+                lo, hi = mm[:, 0] * gain - offset, mm[:, 1] * gain - offset
+                k = len(meta["traces"])
+                # volts = raw*gain - offset flips min/max for a negative gain.
+                arrays[f"lo_{k}"] = np.minimum(lo, hi).astype(np.float32)
+                arrays[f"hi_{k}"] = np.maximum(lo, hi).astype(np.float32)
+                meta["traces"].append({"scope": scope, "channel": tr.channel,
+                                       "factor": factor, "t0": t0, "dt": dt * factor,
+                                       "units": units})
+        return _encode(meta, arrays)
+
+
+class LiveTapSubscriber:
+    """Viewer side of the live tap: connect, then :meth:`recv` shots.
+
+    The constructor waits for the run description the offload sends on
+    connect and stores it in :attr:`run_info`; every shot committed after it
+    returns is then received. Iterating yields shots until the offload closes
+    the tap.
+    """
+
+    def __init__(self, host="127.0.0.1", port=None, timeout=None):
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        try:
+            hello = self._read()
+        except BaseException:
+            self._sock.close()
+            raise
+        if hello is None or hello[0].pop("type") != "run":
+            self._sock.close()
+            raise ConnectionError(f"{host}:{port} is not a live tap")
+        self.run_info = hello[0]
+
+    def recv(self):
+        """Next :class:`LiveShot`, or ``None`` once the offload has closed the tap.
+
+        Raises ``socket.timeout`` if ``timeout`` was given and nothing arrived.
+        """
+        message = self._read()
+        if message is None:
+            return None
+        meta, arrays = message
+        meta.pop("type")
+        traces = {}
+        for k, tr in enumerate(meta.pop("traces")):
+            lo, hi = arrays[f"lo_{k}"], arrays[f"hi_{k}"]
+            t = tr["t0"] + tr["dt"] * np.arange(len(lo))
+            traces[(tr["scope"], tr["channel"])] = LiveTrace(
+                t, lo, hi, tr["factor"], tr["units"])
+        return LiveShot(traces=traces, **meta)
+
+    def _read(self):
+        """One message as ``(meta, {name: array})``, or ``None`` at end of stream."""
+        header = _recv_exact(self._sock, _LEN.size)
+        if header is None:
+            return None
+        body = _recv_exact(self._sock, _LEN.unpack(header)[0])
+        if body is None:
+            return None
+        with np.load(io.BytesIO(body), allow_pickle=False) as npz:
+            arrays = {name: npz[name] for name in npz.files}
+        return json.loads(arrays.pop("_meta").tobytes().decode()), arrays
+
+    def __iter__(self):
+        while True:
+            shot = self.recv()
+            if shot is None:
+                return
+            yield shot
+
+    def close(self):
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
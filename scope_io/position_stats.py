@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""Per-position mean/std over repeat shots, accumulated while the run is written.
+
+The most common product of a probe scan -- the mean and spread of the repeat
+shots at every grid position -- normally needs a full re-read of the run. The
+offload adapters (:mod:`acquisition.spool_adapter`,
+:mod:`acquisition.grid_spool_adapter`) instead feed every shot they write into a
+:class:`PositionStatsAccumulator`, which keeps a running Welford ``(count, mean,
+M2)`` per (scope, channel) for the position being shot and stores it when the
+probe moves on::
+
+    /analysis/position_mean/positions          (npos, ndim) planned positions
+    /analysis/position_mean/<scope>/<ch>       (npos, nsamples) float32 volts
+    /analysis/position_mean/<scope>/<ch>_count (npos,) shots averaged
+    /analysis/position_std/<scope>/<ch>        (npos, nsamples) float32 volts
+
+Rows follow the plan order of ``positions_setup_array`` (each shot is assigned
+to its nearest planned position), so an XY plane is ``reshape((ny, nx))`` away.
+Only the current position is held in memory; a position revisited later is
+merged into its stored row. The std is the population std (``ddof`` 0, stored
+as an attr). Statistics are of the raw traces (no filtering). Sequence-mode
+(2-D) traces are not accumulated.
+
+The ``complete`` attr is written only at finalize, and only true if this
+accumulator saw the run from its first shot; :func:`read_position_stats`
+ignores anything else (an offload resumed mid-run), and readers then compute
+the statistics from the traces. Depends only on numpy and h5py.
+"""
+
+import time
+
+import numpy as np
+
+from .wavedesc import LeCroyWavedesc
+
+ANALYSIS_GROUP = "analysis"
+POSITION_MEAN = "position_mean"
+POSITION_STD = "position_std"
+
+# Stored rows are chunked one position by up to this many samples, so a
+# time-window read across all positions touches only the window.
+_STATS_CHUNK_SAMPLES = 1 << 20
+
+
+def nearest_position(planned, point):
+    """Index of the planned position (row of ``planned``) nearest ``point``."""
+    d2 = ((np.asarray(planned, dtype=float) - np.asarray(point, dtype=float)) ** 2).sum(axis=1)
+    return int(np.argmin(d2))
+
+
+class PositionStatsAccumulator:
+    """Running per-position mean/std of every (scope, channel) of a run.
+
+    ``planned`` is the ``(npos, ndim)`` plan the rows are laid out in. Call
+    :meth:`add_shot` with an open, writable ``h5py.File`` for each recorded shot
+    and :meth:`finish` once at finalize.
+    """
+
+    def __init__(self, planned, complete=True):
+        self.planned = np.atleast_2d(np.asarray(planned, dtype=float))
+        self.complete = complete
+        self.shots = 0
+        self._pos = None            # plan index of the position being accumulated
+        self._acc = {}              # (scope, ch) -> [count, mean, m2]
+        self._scaling = {}          # (scope, ch) -> (gain, offset), or None if undecodable
+
+    def position_index(self, point):
+        """Plan index for a recorded probe position (nearest planned point)."""
+        return nearest_position(self.planned, point)
+
+    def add_shot(self, f, pos_idx, traces):
+        """Fold one shot into the running statistics of position ``pos_idx``.
+
+        ``traces`` yields ``(scope, channel, raw, header)``: the int16 samples
+        and WAVEDESC bytes as written to the shot group. Arriving at a new
+        position first stores the previous one into ``f``.
+        """
+        if pos_idx != self._pos:
+            self._flush(f)
+            self._pos = pos_idx
+        for scope, ch, raw, header in traces:
+            raw = np.asarray(raw)
+            if raw.ndim != 1:
+                continue
+            scaling = self._channel_scaling(scope, ch, header)
+            if scaling is None:
+                continue
+            x = raw.astype(np.float64) * scaling[0] - scaling[1]
+            acc = self._acc.get((scope, ch))
+            if acc is None or acc[1].shape != x.shape:
+                acc = self._acc[(scope, ch)] = [0, np.zeros_like(x), np.zeros_like(x)]
+            acc[0] += 1
+            delta = x - acc[1]
+            acc[1] += delta / acc[0]
+            acc[2] += delta * (x - acc[1])
+        self.shots += 1
+
+    def finish(self, f):
+        """Store the last position and stamp both groups with the run summary."""
+        self._flush(f)
+        for name in (POSITION_MEAN, POSITION_STD):
+            key = f"{ANALYSIS_GROUP}/{name}"
+            if key not in f:
+                continue
+            g = f[key]
+            g.attrs["ddof"] = 0
+            g.attrs["shots"] = self.shots
+            g.attrs["complete"] = bool(self.complete)
+            g.attrs["created"] = time.ctime()
+
+    def _channel_scaling(self, scope, ch, header):
+        key = (scope, ch)
+        if key not in self._scaling:
+            try:
+                wd = LeCroyWavedesc(bytes(header)).wd
+                self._scaling[key] = (float(wd.vertical_gain), float(wd.vertical_offset))
+            except Exception:
+                self._scaling[key] = None   # not a WAVEDESC: channel gets no statistics
+        return self._scaling[key]
+
+    def _flush(self, f):
+        """Merge the pending position's statistics into its stored rows."""
+        if self._pos is None:
+            return
+        for (scope, ch), (count, mean, m2) in self._acc.items():
+            if count:
+                self._store(f, scope, ch, self._pos, count, mean, m2)
+        self._acc = {}
+
+    def _datasets(self, f, scope, ch, n_samples):
+        root = f.require_group(ANALYSIS_GROUP)
+        mean_grp = root.require_group(POSITION_MEAN)
+        std_grp = root.require_group(POSITION_STD)
+        if "positions" not in mean_grp:
+            mean_grp.create_dataset("positions", data=self.planned)
+        npos = len(self.planned)
+        out = []
+        for grp in (mean_grp.require_group(scope), std_grp.require_group(scope)):
+            if ch not in grp:
+                grp.create_dataset(ch, shape=(npos, n_samples), dtype=np.float32,
+                                   chunks=(1, min(n_samples, _STATS_CHUNK_SAMPLES)),
+                                   fillvalue=np.nan)
+            out.append(grp[ch])
+        counts_key = f"{ch}_count"
+        if counts_key not in mean_grp[scope]:
+            mean_grp[scope].create_dataset(counts_key, data=np.zeros(npos, dtype=np.int64))
+        out.append(mean_grp[scope][counts_key])
+        return out
+
+    def _store(self, f, scope, ch, pos, count, mean, m2):
+        mean_ds, std_ds, count_ds = self._datasets(f, scope, ch, len(mean))
+        if mean_ds.shape[1] != len(mean):
+            return                  # record length changed mid-run; keep the first
+        stored = int(count_ds[pos])
+        if stored:
+            # Revisited position: merge with the stored row (Chan et al.).
+            mean_s = mean_ds[pos].astype(np.float64)
+            m2_s = std_ds[pos].astype(np.float64) ** 2 * stored
+            total = stored + count
+            delta = mean - mean_s
+            mean = mean_s + delta * (count / total)
+            m2 = m2_s + m2 + delta ** 2 * (stored * count / total)
+            count = total
+        mean_ds[pos] = mean
+        std_ds[pos] = np.sqrt(m2 / count)
+        count_ds[pos] = count
+
+
+def read_position_stats(f, scope_name, channel_name, samples=None):
+    """Read the stored per-position statistics of one channel.
+
+    ``samples=(i0, i1)`` reads only that slice of every row. Returns
+    ``(positions, mean, std, counts)`` -- ``(npos, ndim)`` planned positions,
+    ``(npos, nsamples)`` float64 volts (NaN rows for positions with no shot),
+    and shots per position -- or ``None`` if the run has no complete statistics
+    for this channel.
+    """
+    mean_key = f"{ANALYSIS_GROUP}/{POSITION_MEAN}"
+    std_key = f"{ANALYSIS_GROUP}/{POSITION_STD}"
+    if mean_key not in f or std_key not in f:
+        return None
+    mean_grp, std_grp = f[mean_key], f[std_key]
+    if not mean_grp.attrs.get("complete", False):
+        return None
+    ds_key = f"{scope_name}/{channel_name}"
+    if ds_key not in mean_grp or ds_key not in std_grp:
+        return None
+    sel = np.s_[:, samples[0]:samples[1]] if samples is not None else np.s_[:, :]
+    return (mean_grp["positions"][()],
+            mean_grp[ds_key][sel].astype(np.float64),
+            std_grp[ds_key][sel].astype(np.float64),
+            mean_grp[f"{ds_key}_count"][()])
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""Min/max decimation previews of long scope traces.
+
+A preview level of factor ``k`` stores, for every ``k`` consecutive raw samples
+of a 1-D trace, their minimum and maximum -- an ``(ceil(n / k), 2)`` int16
+dataset ``<channel>_preview_<k>`` next to ``<channel>_data`` in the shot group
+(raw ADC counts, scaled to volts with the channel's WAVEDESC like the data).
+Drawn as a vertical line per bin, a min/max envelope is indistinguishable from
+the full trace once a bin is no wider than a pixel, so a plot of a 10 M-sample
+trace only needs the coarsest level with at least one bin per pixel column.
+
+The writer (:mod:`acquisition.hdf5_writer`, ``[storage] preview_levels``)
+builds the pyramid with :func:`minmax_pyramid`; plotting code reads it with
+:func:`read_hdf5_scope_channel_preview` and draws it with
+:func:`envelope_polyline`. Sequence-mode (2-D) traces get no preview.
+Depends only on numpy (and h5py for the reader).
+"""
+
+import numpy as np
+
+from .hdf5 import _scope_channel_scaling
+
+PREVIEW_INFIX = "_preview_"
+
+
+def preview_key(channel_name, factor):
+    """Dataset name of ``channel_name``'s preview at decimation ``factor``."""
+    return f"{channel_name}{PREVIEW_INFIX}{int(factor)}"
+
+
+def _reduce_minmax(lo, hi, factor):
+    """Min of ``lo`` and max of ``hi`` over consecutive groups of ``factor``
+    (the last group may be shorter)."""
+    n = len(lo)
+    nfull = n // factor
+    out = np.empty((nfull + (n % factor > 0), 2), dtype=lo.dtype)
+    if nfull:
+        out[:nfull, 0] = lo[:nfull * factor].reshape(nfull, factor).min(axis=1)
+        out[:nfull, 1] = hi[:nfull * factor].reshape(nfull, factor).max(axis=1)
+    if n % factor:
+        out[nfull, 0] = lo[nfull * factor:].min()
+        out[nfull, 1] = hi[nfull * factor:].max()
+    return out
+
+
+def minmax_decimate(data, factor):
+    """``(ceil(len(data) / factor), 2)`` array of per-bin ``[min, max]``.
+
+    Bin ``j`` covers samples ``[j*factor, (j+1)*factor)``; a trailing partial
+    bin covers the remainder. Keeps ``data``'s dtype.
+    """
+    data = np.asarray(data)
+    if data.ndim != 1:
+        raise ValueError(f"min/max decimation needs a 1-D trace, got shape {data.shape}")
+    factor = int(factor)
+    if factor < 1:
+        raise ValueError(f"decimation factor must be >= 1, got {factor}")
+    return _reduce_minmax(data, data, factor)
+
+
+def minmax_pyramid(data, factors):
+    """``{factor: minmax_decimate(data, factor)}`` for every factor, ascending.
+
+    A level whose factor is a multiple of the previous one is reduced from that
+    level instead of from the raw trace -- the bins nest exactly, so the result
+    is identical and each extra level costs a fraction of the first.
+    """
+    data = np.asarray(data)
+    levels = {}
+    prev_factor, prev = 1, None
+    for factor in sorted({int(k) for k in factors}):
+        if prev is not None and factor % prev_factor == 0:
+            levels[factor] = _reduce_minmax(prev[:, 0], prev[:, 1], factor // prev_factor)
+        else:
+            levels[factor] = minmax_decimate(data, factor)
+        prev_factor, prev = factor, levels[factor]
+    return levels
+
+
+def preview_factors(shot_group, channel_name):
+    """Decimation factors stored for ``channel_name`` in one shot group, ascending."""
+    prefix = f"{channel_name}{PREVIEW_INFIX}"
+    factors = []
+    for key in shot_group.keys():
+        if key.startswith(prefix) and key[len(prefix):].isdigit():
+            factors.append(int(key[len(prefix):]))
+    return sorted(factors)
+
+
+def choose_preview_factor(n_samples, factors, max_points):
+    """Coarsest factor in ``factors`` that still gives at least ``max_points``
+    bins for an ``n_samples`` trace, or ``None`` if none does (read the data)."""
+    usable = [k for k in factors if -(-n_samples // k) >= max_points]
+    return max(usable) if usable else None
+
+
+def read_hdf5_scope_channel_preview(f, scope_name, channel_name, shot_numbers,
+                                    max_points):
+    """Read the coarsest stored preview adequate for ``max_points`` bins.
+
+    ``max_points`` is the number of pixel columns the trace will span. The
+    stored factors are taken from the first readable shot; a level is
+    adequate if it still has at least ``max_points`` bins.
+
+    Returns
+    -------
+    tuple or None
+        ``(t, lo, hi, factor)``: ``t`` is the start time of each bin (from the
+        scope's ``time_array``), ``lo``/``hi`` are ``(len(shot_numbers), nbins)``
+        volts (NaN rows for shots without that preview, skipped or missing), and
+        ``factor`` the level used. ``None`` if the run has no previews, the
+        traces are short enough to plot in full, or nothing is readable --
+        callers then read the data as usual.
+    """
+    scope_group = f[scope_name]
+    if 'time_array' not in scope_group:
+        return None
+    tarr = scope_group['time_array'][()]
+    shot_numbers = list(shot_numbers)
+
+    factor = gain = offset = None
+    rows = []
+    for s in shot_numbers:
+        shot = scope_group.get(f'shot_{s}')
+        if shot is None or shot.attrs.get('skipped', False):
+            rows.append(None)
+            continue
+        if factor is None:
+            factor = choose_preview_factor(len(tarr), preview_factors(shot, channel_name),
+                                           max_points)
+            if factor is None:
+                return None
+            try:
+                gain, offset, _dt, _t0 = _scope_channel_scaling(f, scope_name, channel_name, s)
+            except (KeyError, ValueError):
+                return None
+        key = preview_key(channel_name, factor)
+        rows.append(shot[key][()] if key in shot else None)
+    if factor is None:
+        return None
+
+    nbins = -(-len(tarr) // factor)
+    lo = np.full((len(shot_numbers), nbins), np.nan)
+    hi = np.full((len(shot_numbers), nbins), np.nan)
+    for i, mm in enumerate(rows):
+        if mm is None or mm.shape != (nbins, 2):
+            continue
+        lo[i] = mm[:, 0].astype(np.float64) * gain - offset
+        hi[i] = mm[:, 1].astype(np.float64) * gain - offset
+    # volts = raw*gain - offset flips min/max for a negative gain.
+    lo, hi = np.fmin(lo, hi), np.fmax(lo, hi)
+    return tarr[::factor], lo, hi, factor
+
+
+def envelope_polyline(t, lo, hi):
+    """Interleave a min/max envelope into one ``(t, v)`` polyline that draws a
+    vertical stroke per bin (``t0, t0, t1, t1, ...`` / ``lo0, hi0, lo1, hi1``)."""
+    return np.repeat(np.asarray(t), 2), np.column_stack((lo, hi)).ravel()
@@ -0,0 +1,376 @@
+# -*- coding: utf-8 -*-
+"""Lazy, chunk-aware view over a whole LAPD_DAQ run file.
+
+``open_run(path)`` returns a :class:`RunView`; indexing it by scope and
+channel gives a :class:`ChannelView` -- a ``(shot, time)`` array that holds no
+data. Selecting shots (by index, shot number, or probe position) and time
+windows only narrows the view; samples are read when the view is indexed,
+iterated, or reduced, and then only the requested sample range of each
+requested shot is read from disk and scaled to volts (``raw*gain - offset``,
+the channel's WAVEDESC decoded once). Skipped, missing, and wrong-length shots
+read as NaN rows, exactly like :func:`scope_io.read_hdf5_scope_channel_shots`.
+
+Reductions over shots (:meth:`ChannelView.mean`, :meth:`ChannelView.std`,
+:meth:`ChannelView.position_mean_std`) stream ``chunk_shots`` rows at a time,
+so memory stays bounded by one chunk regardless of the run length::
+
+    from scope_io import open_run
+
+    with open_run("myrun.hdf5") as run:
+        c1 = run["bdotscope", "C1"]                 # lazy (nshot, nsamples)
+        early = c1.sel(t=(0.0, 2e-3))               # still lazy
+        v = early[10:20]                            # reads 10 shots x window
+        mean, std = early.mean_std()                # streamed over all shots
+        pos_mean = c1.at_position(0.0, 5.0).mean()  # one grid position
+
+Only 1-D (non-sequence-mode) traces are viewed; a shot stored as a 2-D
+sequence reads as a NaN row. Depends only on numpy and h5py.
+"""
+
+import numpy as np
+
+from .hdf5 import (
+    _scope_channel_scaling,
+    open_hdf5_readonly,
+    scope_shot_numbers,
+    time_window_indices,
+)
+
+# Root groups that never hold scope data.
+_NON_SCOPE_GROUPS = {"Configuration", "Control", "diagnostics", "analysis"}
+
+
+def open_run(path):
+    """Open a run file read-only as a lazy :class:`RunView` (close it, or use
+    it as a context manager)."""
+    return RunView(path)
+
+
+def _positions_index(f):
+    """``{shot_num: (x, y)}`` from every ``/Control/Positions/<mg>/positions_array``.
+
+    Shot 0 (unset padding) is skipped and earlier motion groups win on a
+    duplicate shot number, matching ``read_and_analyze``'s positions index.
+    Empty for runs without position data (e.g. stationary runs).
+    """
+    index = {}
+    control = f.get("Control/Positions")
+    if control is None:
+        return index
+    for mg in control.values():
+        arr = mg.get("positions_array") if hasattr(mg, "get") else None
+        if arr is None:
+            continue
+        arr = arr[()]
+        for sn, x, y in zip(arr["shot_num"].tolist(), arr["x"].tolist(), arr["y"].tolist()):
+            if sn and sn not in index:
+                index[sn] = (float(x), float(y))
+    return index
+
+
+class RunView:
+    """A run file opened for lazy reading; index with ``[scope, channel]``."""
+
+    def __init__(self, path):
+        self.path = path
+        self._f = open_hdf5_readonly(path)
+        self._positions = None
+        self._cache = {}    # per-scope time arrays / per-channel scaling, shared by views
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Close the underlying file; views made from this run stop working."""
+        self._f.close()
+
+    @property
+    def file(self):
+        """The open ``h5py.File``."""
+        return self._f
+
+    @property
+    def scopes(self):
+        """Scope group names (root groups holding ``shot_*`` groups)."""
+        return [name for name, g in self._f.items()
+                if name not in _NON_SCOPE_GROUPS and hasattr(g, "keys")
+                and any(k.startswith("shot_") for k in g.keys())]
+
+    @property
+    def positions(self):
+        """``{shot_num: (x, y)}`` for the run (built once, on first use)."""
+        if self._positions is None:
+            self._positions = _positions_index(self._f)
+        return self._positions
+
+    def channels(self, scope):
+        """Channel names recorded for ``scope`` (from its first shot with data)."""
+        sg = self._f[scope]
+        for s in scope_shot_numbers(sg):
+            shot = sg[f"shot_{s}"]
+            names = sorted(k[:-len("_data")] for k in shot.keys() if k.endswith("_data"))
+            if names:
+                return names
+        return []
+
+    def channel(self, scope, channel):
+        """Lazy :class:`ChannelView` over every shot of ``scope``/``channel``."""
+        if scope not in self._f:
+            raise KeyError(f"Scope group '{scope}' not found in {self.path}")
+        return ChannelView(self, scope, channel)
+
+    def __getitem__(self, key):
+        scope, channel = key
+        return self.channel(scope, channel)
+
+    def __repr__(self):
+        return f"<RunView {self.path!r} scopes={self.scopes}>"
+
+
+class ChannelView:
+    """Lazy ``(shot, time)`` volts array for one scope channel.
+
+    Not built directly -- get one from ``run[scope, channel]``. Narrowing
+    methods (:meth:`isel`, :meth:`sel`, :meth:`at_position`) return new views
+    and read nothing; indexing (``view[i]``, ``view[i0:i1, s0:s1]``),
+    :meth:`read`, :meth:`iter_chunks` and the reductions read just the selected
+    shots and sample range.
+    """
+
+    def __init__(self, run, scope, channel, shots=None, samples=None):
+        self._run = run
+        self.scope = scope
+        self.channel = channel
+        sg = run.file[scope]
+        self._sg = sg
+        self.shots = (np.asarray(scope_shot_numbers(sg), dtype=np.int64)
+                      if shots is None else np.asarray(shots, dtype=np.int64))
+        self._samples = samples     # (start, stop) into the full record, or None
+
+    # -- shape and axes --------------------------------------------------------
+
+    def _full_time(self):
+        key = ("time", self.scope)
+        if key not in self._run._cache:
+            if "time_array" not in self._sg:
+                raise KeyError(f"Time array not found for scope '{self.scope}'")
+            self._run._cache[key] = self._sg["time_array"][()]
+        return self._run._cache[key]
+
+    def _sample_range(self):
+        if self._samples is None:
+            return 0, len(self._full_time())
+        return self._samples
+
+    @property
+    def time(self):
+        """Time axis (s) of the view -- only the selected window."""
+        s0, s1 = self._sample_range()
+        return self._full_time()[s0:s1]
+
+    @property
+    def shape(self):
+        s0, s1 = self._sample_range()
+        return (len(self.shots), s1 - s0)
+
+    def __len__(self):
+        return len(self.shots)
+
+    @property
+    def positions(self):
+        """``(nshot, 2)`` recorded (x, y) per shot of the view (NaN if unknown)."""
+        index = self._run.positions
+        return np.array([index.get(int(s), (np.nan, np.nan)) for s in self.shots],
+                        dtype=float).reshape(-1, 2)
+
+    def __repr__(self):
+        return (f"<ChannelView {self.scope}/{self.channel} shape={self.shape} "
+                f"(lazy)>")
+
+    # -- narrowing (lazy) ------------------------------------------------------
+
+    def _derive(self, shots=None, samples=None):
+        return ChannelView(self._run, self.scope, self.channel,
+                           shots=self.shots if shots is None else shots,
+                           samples=self._samples if samples is None else samples)
+
+    def isel(self, shots=None, samples=None):
+        """Narrow by position in the view: ``shots`` indexes the shot axis (int,
+        slice, or index array) and ``samples`` (a step-1 slice) the time axis."""
+        new_shots = self.shots if shots is None else np.atleast_1d(self.shots[shots])
+        new_samples = None
+        if samples is not None:
+            s0, s1 = self._sample_range()
+            start, stop, step = samples.indices(s1 - s0)
+            if step != 1:
+                raise ValueError("time-axis selections must be contiguous (step 1)")
+            new_samples = (s0 + start, s0 + max(start, stop))
+        return self._derive(shots=new_shots, samples=new_samples)
+
+    def sel(self, t=None, shots=None):
+        """Narrow by value: ``t=(t_start, t_end)`` keeps samples with
+        ``t_start <= t <= t_end`` (either end may be None = open), ``shots`` keeps
+        the listed shot numbers (in the given order)."""
+        view = self
+        if shots is not None:
+            view = view._derive(shots=np.asarray(shots, dtype=np.int64))
+        if t is not None:
+            lo, hi = time_window_indices(view._full_time(), *t)
+            s0, s1 = view._sample_range()
+            lo = min(max(lo, s0), s1)
+            view = view._derive(samples=(lo, max(lo, min(hi, s1))))
+        return view
+
+    def at_position(self, x, y, tol=0.5):
+        """Narrow to the shots recorded within ``tol`` (mm) of ``(x, y)``."""
+        pos = self.positions
+        keep = (np.abs(pos[:, 0] - x) <= tol) & (np.abs(pos[:, 1] - y) <= tol)
+        return self._derive(shots=self.shots[keep])
+
+    def by_position(self, tol=0.5):
+        """``[((x, y), view), ...]`` -- one lazy view per grid position, with
+        positions rounded to ``tol`` and listed in order of first appearance.
+        Shots without a recorded position are left out."""
+        groups = {}
+        for s, (x, y) in zip(self.shots.tolist(), self.positions.tolist()):
+            if x != x or y != y:
+                continue
+            key = (round(x / tol) * tol, round(y / tol) * tol)
+            groups.setdefault(key, []).append(s)
+        return [(key, self._derive(shots=np.asarray(shots, dtype=np.int64)))
+                for key, shots in groups.items()]
+
+    # -- reading ---------------------------------------------------------------
+
+    def _channel_scaling(self):
+        """``(gain, offset)`` decoded once from the channel's first readable shot."""
+        key = ("scaling", self.scope, self.channel)
+        if key not in self._run._cache:
+            for s in scope_shot_numbers(self._sg):
+                shot = self._sg[f"shot_{s}"]
+                if shot.attrs.get("skipped", False) or f"{self.channel}_data" not in shot:
+                    continue
+                try:
+                    gain, offset, _dt, _t0 = _scope_channel_scaling(
+                        self._run.file, self.scope, self.channel, s)
+                except (KeyError, ValueError):
+                    continue
+                self._run._cache[key] = (gain, offset)
+                break
+            else:
+                raise ValueError(f"No readable shot for {self.scope}/{self.channel}")
+        return self._run._cache[key]
+
+    def _read_rows(self, shots):
+        """Volts for ``shots`` over the view's sample window; NaN rows for gaps."""
+        s0, s1 = self._sample_range()
+        nfull = len(self._full_time())
+        out = np.full((len(shots), s1 - s0), np.nan)
+        if s1 <= s0 or not len(shots):
+            return out
+        gain, offset = self._channel_scaling()
+        key = f"{self.channel}_data"
+        for i, s in enumerate(np.asarray(shots).tolist()):
+            shot = self._sg.get(f"shot_{s}")
+            if shot is None or shot.attrs.get("skipped", False) or key not in shot:
+                continue
+            ds = shot[key]
+            if ds.ndim != 1 or ds.shape[0] != nfull:
+                continue
+            out[i] = ds[s0:s1].astype(np.float64) * gain - offset
+        return out
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        if len(key) > 2:
+            raise IndexError("ChannelView takes at most (shots, samples) indices")
+        shot_key = key[0]
+        view = self.isel(shots=shot_key,
+                         samples=key[1] if len(key) > 1 else None)
+        data = view._read_rows(view.shots)
+        if isinstance(shot_key, (int, np.integer)):
+            return data[0]
+        return data
+
+    def read(self):
+        """Read the whole view into a ``(nshot, nsamples)`` float64 array."""
+        return self._read_rows(self.shots)
+
+    def iter_chunks(self, chunk_shots=32):
+        """Yield ``(shot_numbers, volts)`` blocks of up to ``chunk_shots`` rows."""
+        for k in range(0, len(self.shots), chunk_shots):
+            shots = self.shots[k:k + chunk_shots]
+            yield shots, self._read_rows(shots)
+
+    # -- streaming reductions --------------------------------------------------
+
+    def _accumulate(self, chunk_shots):
+        """Streamed ``(count, mean, m2)`` over the view's readable shots.
+
+        Chunks are merged with the parallel (Chan et al.) form of Welford's
+        update, so memory holds one chunk plus the accumulator rows. NaN rows
+        (skipped/missing shots) are not counted.
+        """
+        n_samples = self.shape[1]
+        count = 0
+        mean = np.zeros(n_samples)
+        m2 = np.zeros(n_samples)
+        for _shots, block in self.iter_chunks(chunk_shots):
+            block = block[~np.isnan(block).all(axis=1)]
+            nb = block.shape[0]
+            if nb == 0:
+                continue
+            mean_b = block.mean(axis=0)
+            m2_b = ((block - mean_b) ** 2).sum(axis=0)
+            delta = mean_b - mean
+            total = count + nb
+            mean = mean + delta * (nb / total)
+            m2 = m2 + m2_b + delta ** 2 * (count * nb / total)
+            count = total
+        return count, mean, m2
+
+    @staticmethod
+    def _finish(count, mean, m2, ddof):
+        nan = np.full(mean.shape, np.nan)
+        if count == 0:
+            return nan, nan.copy()
+        return mean, (np.sqrt(m2 / (count - ddof)) if count > ddof else nan)
+
+    def mean_std(self, ddof=0, chunk_shots=32):
+        """Per-sample mean and std over the view's shots, streamed in chunks of
+        ``chunk_shots`` (bounded memory). NaN rows (skipped/missing shots) are
+        ignored. Returns ``(mean, std)``; samples with no usable shot (or
+        <= ``ddof`` of them, for std) are NaN.
+        """
+        count, mean, m2 = self._accumulate(chunk_shots)
+        return self._finish(count, mean, m2, ddof)
+
+    def mean(self, chunk_shots=32):
+        """Per-sample mean over shots (streamed; NaN rows ignored)."""
+        return self.mean_std(chunk_shots=chunk_shots)[0]
+
+    def std(self, ddof=0, chunk_shots=32):
+        """Per-sample std over shots (streamed; NaN rows ignored)."""
+        return self.mean_std(ddof=ddof, chunk_shots=chunk_shots)[1]
+
+    def position_mean_std(self, tol=0.5, ddof=0, chunk_shots=32):
+        """Per-position streamed mean/std over repeat shots.
+
+        Returns ``(xy, mean, std, counts)``: ``xy`` is ``(P, 2)`` positions (in
+        :meth:`by_position` order), ``mean``/``std`` are ``(P, nsamples)`` and
+        ``counts`` the number of readable shots per position.
+        """
+        groups = self.by_position(tol)
+        n_samples = self.shape[1]
+        xy = np.array([key for key, _ in groups], dtype=float).reshape(-1, 2)
+        mean = np.full((len(groups), n_samples), np.nan)
+        std = np.full((len(groups), n_samples), np.nan)
+        counts = np.zeros(len(groups), dtype=np.int64)
+        for p, (_key, view) in enumerate(groups):
+            counts[p], m, m2 = view._accumulate(chunk_shots)
+            mean[p], std[p] = self._finish(counts[p], m, m2, ddof)
+        return xy, mean, std, counts
@@ -13,10 +13,17 @@ here so ``read_and_analyze`` can read archives without importing ``lab_scopes``
 readers use are retained. The full parser still lives in ``lab_scopes`` for the
 live-scope and ``.trc`` paths; the HDF5 readers will be removed from there in a
 follow-up.
+
+For many headers at once, :func:`decode_wavedescs` views a stack of raw headers
+through ``WAVEDESC_DTYPE`` (the same layout as ``WAVEDESC_FMT``) and the
+``wavedesc_*`` helpers derive sample counts, time arrays and trigger epochs for
+all of them in one vectorized step.
 """
 
 import collections
+import re
 import struct
+import time
 
 import numpy as np
 
@@ -42,6 +49,27 @@ WAVEDESC_SIZE = 346
 WAVEDESC_FMT = '=16s16shhllllllllll16sl16shhlllllllllhhffffhhfdd48s48sfdBBBBhhfhhhhhhfhhffh'
 
 
+def _wavedesc_dtype():
+    """Structured dtype equivalent of ``WAVEDESC_FMT``: same field names, same
+    packed byte layout (``=`` is native order, standard sizes, no padding), so a
+    stack of stored headers can be viewed as records without a per-header
+    ``struct.unpack``."""
+    codes = {'h': '=i2', 'l': '=i4', 'f': '=f4', 'd': '=f8', 'B': 'u1'}
+    formats = []
+    for count, code in re.findall(r'(\d*)([a-zA-Z])', WAVEDESC_FMT[1:]):
+        if code == 's':
+            formats.append(f'S{count}')
+        else:
+            formats.extend([codes[code]] * int(count or 1))
+    dtype = np.dtype(list(zip(WAVEDESC._fields, formats)))
+    assert dtype.itemsize == struct.calcsize(WAVEDESC_FMT) == WAVEDESC_SIZE
+    return dtype
+
+
+# One WAVEDESC as a numpy record (see decode_wavedescs).
+WAVEDESC_DTYPE = _wavedesc_dtype()
+
+
 class LeCroyWavedesc:
     """LeCroy X-Stream scope WAVEDESC interpretation (scaling/time subset)."""
 
@@ -91,3 +119,100 @@ class LeCroyWavedesc:
             vertical_gain=0.1,
             vertical_offset=0.2)
         return struct.pack(WAVEDESC_FMT, *list(self.wd))
+
+
+# --------------------------------------------------------------------------
+# Bulk (vectorized) decoding
+# --------------------------------------------------------------------------
+
+def decode_wavedescs(headers):
+    """Decode many WAVEDESCs at once into a ``WAVEDESC_DTYPE`` structured array.
+
+    ``headers`` is an ``(N, 346)`` uint8 array, a sequence of 346-byte
+    ``bytes``/``np.void`` headers (as stored under ``<channel>_header``), or the
+    concatenated bytes of N headers. Returns an ``(N,)`` record array with the
+    same field names -- and, field by field, the same values -- as
+    ``LeCroyWavedesc(h).wd`` for each header (the fixed-width text fields read
+    back without their trailing NULs, as numpy ``S`` fields do), without a
+    per-header ``struct.unpack``. Raises ``ValueError`` if any header is not
+    346 bytes.
+    """
+    if isinstance(headers, (bytes, bytearray, memoryview)):
+        buf = np.frombuffer(headers, dtype=np.uint8)
+    elif isinstance(headers, np.ndarray) and headers.dtype == np.uint8:
+        buf = headers
+    else:
+        raws = [bytes(h) for h in headers]
+        bad = [len(r) for r in raws if len(r) != WAVEDESC_SIZE]
+        if bad:
+            raise ValueError(f'WAVEDESC headers must be {WAVEDESC_SIZE} bytes, got {bad[0]}')
+        buf = np.frombuffer(b''.join(raws), dtype=np.uint8)
+    if buf.size % WAVEDESC_SIZE or (buf.ndim == 2 and buf.shape[1] != WAVEDESC_SIZE):
+        raise ValueError(f'header buffer of shape {buf.shape} is not a stack of '
+                         f'{WAVEDESC_SIZE}-byte WAVEDESCs')
+    return np.ascontiguousarray(buf).reshape(-1).view(WAVEDESC_DTYPE)
+
+
+def wavedesc_num_samples(wd):
+    """Per-header sample count (``LeCroyWavedesc.num_samples``, vectorized)."""
+    comm_type = np.asarray(wd['comm_type'])
+    if np.any((comm_type != 0) & (comm_type != 1)):
+        raise RuntimeError(f'**** wd.comm_type = {comm_type}; expected 0 or 1')
+    wave_array_1 = np.asarray(wd['wave_array_1']).astype(np.int64)
+    return np.where(comm_type == 0, wave_array_1, wave_array_1 // 2)
+
+
+def wavedesc_time_arrays(wd):
+    """``(N, nsamples)`` sample times for N decoded headers of equal length.
+
+    Row ``i`` equals ``LeCroyWavedesc(h_i).time_array`` exactly. Raises
+    ``ValueError`` if the headers describe different record lengths.
+    """
+    n = wavedesc_num_samples(wd)
+    if len(n) == 0:
+        return np.empty((0, 0))
+    if np.any(n != n[0]):
+        raise ValueError(f'headers describe different record lengths: {sorted(set(n.tolist()))}')
+    n = int(n[0])
+    t0 = np.asarray(wd['horiz_offset'], dtype=np.float64)
+    dt = np.asarray(wd['horiz_interval'], dtype=np.float64)
+    # Same arithmetic as np.linspace(t0, t0 + n*dt, n, endpoint=False).
+    step = ((t0 + n * dt) - t0) / n
+    return np.arange(n, dtype=np.float64)[None, :] * step[:, None] + t0[:, None]
+
+
+def wavedesc_trigger_epochs(wd, local=True):
+    """Trigger time of each decoded header as epoch seconds (float array).
+
+    The scope RTC fields (``tt_year`` .. ``tt_second``) are wall-clock time.
+    ``local=True`` interprets them in the local timezone (``time.mktime``, DST
+    resolved automatically) -- comparable to other machines' epoch clocks;
+    ``local=False`` treats them as UTC (``calendar.timegm``), which is only
+    meaningful for differences between scopes. Headers whose fields are unset
+    (``tt_year <= 0``) or invalid give NaN. The conversion runs once per
+    distinct trigger minute (a run spans a handful), with whole seconds and the
+    fraction added after -- the same value as a per-header
+    ``mktime((..., int(sec), ...)) + frac``.
+    """
+    import calendar
+
+    out = np.full(len(wd), np.nan)
+    valid = np.asarray(wd['tt_year']) > 0
+    if not valid.any():
+        return out
+    keys = np.stack([wd['tt_year'], wd['tt_months'], wd['tt_days'],
+                     wd['tt_hours'], wd['tt_minute']], axis=1).astype(np.int64)[valid]
+    uniq, inverse = np.unique(keys, axis=0, return_inverse=True)
+    minute_epoch = np.empty(len(uniq))
+    for k, (y, mo, d, h, mi) in enumerate(uniq.tolist()):
+        try:
+            if local:
+                minute_epoch[k] = time.mktime((y, mo, d, h, mi, 0, 0, 0, -1))
+            else:
+                minute_epoch[k] = calendar.timegm((y, mo, d, h, mi, 0, 0, 0, 0))
+        except (OverflowError, ValueError):
+            minute_epoch[k] = np.nan
+    sec = np.asarray(wd['tt_second'], dtype=np.float64)[valid]
+    whole = np.trunc(sec)
+    out[valid] = (minute_epoch[inverse.ravel()] + whole) + (sec - whole)
+    return out
@@ -96,6 +96,9 @@ class ShotPayload:
     missing scope as its own ``skipped`` shot group so a single misbehaving
     scope yields a partial shot rather than aborting the run. Distinct from
     ``skipped``, which marks the WHOLE shot as not taken.
+
+    ``trigger`` is the Pi trigger server's timestamp of the edge the shot was
+    taken on (see :mod:`acquisition.trigger_timestamps`), or ``None``.
     """
 
     shot_num: int
@@ -105,6 +108,7 @@ class ShotPayload:
     skipped: bool = False
     skip_reason: str = ""
     missing: Dict[str, str] = field(default_factory=dict)
+    trigger: Optional[Dict[str, object]] = None
 
 
 def _shot_dirname(shot_num: int) -> str:
@@ -249,6 +253,7 @@ def write_shot(spool_dir: str, payload: ShotPayload, parallel: bool = False) ->
         "skipped": payload.skipped,
         "skip_reason": payload.skip_reason,
         "missing": dict(payload.missing),
+        "trigger": payload.trigger,
         "scopes": {},
     }
 
@@ -379,6 +384,7 @@ def read_shot(spool_dir: str, shot_num: int) -> ShotPayload:
         skipped=sidecar.get("skipped", False),
         skip_reason=sidecar.get("skip_reason", ""),
         missing=dict(sidecar.get("missing", {})),
+        trigger=sidecar.get("trigger"),
     )
 
     if not payload.skipped:
@@ -0,0 +1,81 @@
+"""Synthetic bmotion run files for the read_and_analyze / scope_io tests.
+
+``write_synthetic_run`` builds a small HDF5 file with the same layout
+``Data_Run_bmotion.py`` + the offload produce -- a scope group with a
+``time_array`` and one ``shot_<n>`` group per shot (int16 ``<CH>_data`` plus a
+real 346-byte ``<CH>_header``), and ``/Control/Positions/<mg>`` with the
+planned ``positions_setup_array`` (``xpos``/``ypos`` attrs) and the recorded
+``positions_array``. The motion list is x-fastest with y descending, and shots
+are contiguous per position, matching the acquisition order the plane/line
+builders assume.
+
+Sample values are deterministic per (shot, channel) so tests can compare a
+parallel/vectorized path against the serial reference bit-for-bit.
+"""
+
+import numpy as np
+
+from scope_io.wavedesc import LeCroyWavedesc
+
+POSITION_DTYPE = [('shot_num', '>u4'), ('x', '>f4'), ('y', '>f4')]
+
+# generate_test_data() scaling: volts = raw * 0.1 - 0.2, dt = 1 ms, t0 = 2 ms
+GAIN, OFFSET, DT, T0 = 0.1, 0.2, 0.001, 0.002
+
+
+def synthetic_raw(shot_num, channel, nsamples, seed=0):
+    """Deterministic int16 trace for one (shot, channel)."""
+    ch_seed = sum(ord(c) for c in channel)
+    rng = np.random.default_rng(seed * 1_000_003 + shot_num * 101 + ch_seed)
+    base = 200 * np.sin(np.linspace(0, 6 * np.pi, nsamples) + 0.1 * shot_num)
+    return (base + rng.normal(0, 20, nsamples)).astype(np.int16)
+
+
+def write_synthetic_run(path, nx=3, ny=2, nshot=2, nsamples=64,
+                        scope="lpscope", channels=("C1",), mg_name="probe1",
+                        skipped=(), seed=0):
+    """Write a synthetic plane run to ``path``; return ``(xpos, ypos)``.
+
+    ``skipped`` lists shot numbers to write as marked-skipped groups (no data),
+    like the acquisition does for a failed shot.
+    """
+    import h5py
+
+    header = LeCroyWavedesc().generate_test_data(NTimes=nsamples)
+    xpos = np.linspace(-10.0, 10.0, nx)
+    ypos = np.linspace(-5.0, 5.0, ny)
+    planned = [(x, y) for y in ypos[::-1] for x in xpos]     # x-fastest, y descending
+
+    setup = np.zeros(len(planned), dtype=POSITION_DTYPE)
+    setup['shot_num'] = np.arange(1, len(planned) + 1)
+    setup['x'] = [p[0] for p in planned]
+    setup['y'] = [p[1] for p in planned]
+
+    total = len(planned) * nshot
+    recorded = np.zeros(total, dtype=POSITION_DTYPE)
+    recorded['shot_num'] = np.arange(1, total + 1)
+    recorded['x'] = np.repeat(setup['x'], nshot)
+    recorded['y'] = np.repeat(setup['y'], nshot)
+
+    with h5py.File(path, "w") as f:
+        sg = f.create_group(scope)
+        sg.create_dataset("time_array", data=np.arange(nsamples) * DT + T0)
+        for s in range(1, total + 1):
+            shot = sg.create_group(f"shot_{s}")
+            if s in skipped:
+                shot.attrs["skipped"] = True
+                shot.attrs["skip_reason"] = "synthetic skip"
+                continue
+            for ch in channels:
+                shot.create_dataset(f"{ch}_data",
+                                    data=synthetic_raw(s, ch, nsamples, seed))
+                shot.create_dataset(f"{ch}_header", data=np.void(header))
+
+        mg = f.create_group("Control").create_group("Positions").create_group(mg_name)
+        mg.attrs["name"] = mg_name
+        mg.attrs["key"] = "0"
+        ds = mg.create_dataset("positions_setup_array", data=setup)
+        ds.attrs["xpos"] = xpos
+        ds.attrs["ypos"] = ypos
+        mg.create_dataset("positions_array", data=recorded)
+    return xpos, ypos
@@ -431,6 +431,30 @@ class SpoolSinkTests(unittest.TestCase):
             self.assertFalse(name.endswith(".hdf5"),
                              f"per-shot path unexpectedly wrote {name}")
 
+    def test_spool_sink_carries_matched_trigger(self):
+        from spooling import spool_format
+
+        class _Matcher:
+            def __init__(self):
+                self.windows = []
+
+            def match(self, start, end, warn=print):
+                self.windows.append((start, end))
+                return {"seq": 7, "gpio": 25, "t_us": 123456, "time": 1.5, "pi_time": 1.25}
+
+        matcher = _Matcher()
+        sink = bmotion_module._SpoolShotSink(
+            _FakeMSA(), active_scopes={"lpscope": 0}, spool_dir=self.spool,
+            run_manager=self.rm, trigger_matcher=matcher,
+        )
+        sink.take_shot(1, record_keys=["a"])
+
+        # One match per shot, over the arm -> read window.
+        self.assertEqual(len(matcher.windows), 1)
+        start, end = matcher.windows[0]
+        self.assertLessEqual(start, end)
+        self.assertEqual(spool_format.read_shot(self.spool, 1).trigger["seq"], 7)
+
     def test_spool_sink_marks_skip_without_hdf5(self):
         from spooling import spool_format
 
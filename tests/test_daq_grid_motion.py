@@ -0,0 +1,159 @@
+"""Tests for probe motion in the spooled grid loop (acquisition.scope_runner.
+run_acquisition_spooled): the move to the next position overlaps the spool
+write, and Motor_Control_2D.wait_for_motion_complete's adaptive status poll.
+No hardware: simulated LeCroy scopes and a 2D drive whose axes take a fixed
+time per move.
+
+Run:
+
+    python -m unittest tests.test_daq_grid_motion
+"""
+
+import importlib
+import io
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import mock
+
+import numpy as np
+
+from acquisition import scope_runner
+from motion.Motor_Control import Motor_Control_2D
+from motion.obstacle_avoidance import BoundaryChecker
+from motion.position_manager import PositionManager
+from spooling import spool_format
+
+# motion.Motor_Control the module (the package re-exports the 1D class under that name).
+motor_control_module = importlib.import_module("motion.Motor_Control")
+
+MOVE_S = 0.08
+WRITE_S = 0.08
+
+
+class _FakeAxis:
+    """One motor axis: a position command takes MOVE_S; status shows 'M' meanwhile."""
+
+    def __init__(self, cm_per_turn, events, name, move_s=MOVE_S):
+        self.cm_per_turn = cm_per_turn
+        self.motor_speed = 1.0
+        self._position = 0.0
+        self._moving_until = 0.0
+        self._events = events
+        self._name = name
+        self._move_s = move_s
+        self.status_polls = 0
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    @property
+    def motor_position(self):
+        return self._position
+
+    @motor_position.setter
+    def motor_position(self, pos):
+        now = time.monotonic()
+        self._events.append(("move", self._name, now))
+        self._position = pos
+        self._moving_until = now + self._move_s
+
+    @property
+    def motor_status(self):
+        self.status_polls += 1
+        return "M" if time.monotonic() < self._moving_until else "R"
+
+    enable = disable = stop_now = clear_alarm = property(lambda self: None)
+    check_alarm = property(lambda self: False)
+
+
+def _drive(events, move_s=MOVE_S):
+    mc = Motor_Control_2D.__new__(Motor_Control_2D)
+    mc.probe_in, mc.poi, mc.ph = 58.771, 120.5, 20
+    mc.x_mc = _FakeAxis(0.254, events, "x", move_s)
+    mc.y_mc = _FakeAxis(0.508, events, "y", move_s)
+    mc.boundary_checker = BoundaryChecker()
+    return mc
+
+
+class GridMotionOverlapTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix="grid_motion_")
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+
+    def _run(self, overlap):
+        cfg = os.path.join(self.tmp, f"grid_{overlap}.ini")
+        with open(cfg, "w") as fh:
+            fh.write("[experiment]\nname = grid\ndescription = t\n"
+                     "[nshots]\nnum_duplicate_shots = 1\n"
+                     f"[acquisition]\noverlap_motion = {overlap}\n"
+                     "[scope_ips]\nscope1 = sim:rate_hz=200,samples=200,channels=1,"
+                     f"seed=1,bus=grid{overlap}\n"
+                     "[motor_ips]\nx = 0.0.0.0\ny = 0.0.0.0\n"
+                     "[position]\nnx = 3\nny = 2\nxmin = -10\nxmax = 10\nymin = -5\n"
+                     "ymax = 5\nnz = None\n")
+        events, written = [], []
+        mc = _drive(events)
+        real_write = spool_format.write_shot_with_disk_full_retry
+
+        def slow_write(spool_dir, payload, **kwargs):
+            start = time.monotonic()
+            time.sleep(WRITE_S)
+            real_write(spool_dir, payload, **kwargs)
+            written.append(payload)
+            events.append(("write", payload.shot_num, start, time.monotonic()))
+
+        spool = os.path.join(self.tmp, f"spool_{overlap}")
+        with mock.patch.object(PositionManager, "initialize_motor", return_value=mc), \
+                mock.patch.object(spool_format, "write_shot_with_disk_full_retry", slow_write), \
+                mock.patch.object(motor_control_module, "_SETTLE_S", 0.01), \
+                redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+            scope_runner.run_acquisition_spooled(
+                spool, os.path.join(self.tmp, f"grid_{overlap}.hdf5"), cfg)
+        # The run tears the drive down: axis threads stopped, connections closed.
+        self.assertNotIn("_axis_pool", mc.__dict__)
+        self.assertTrue(mc.x_mc.closed and mc.y_mc.closed)
+        return events, written
+
+    def test_next_move_starts_while_the_shot_is_spooled(self):
+        events, written = self._run(overlap=True)
+        self.assertEqual([p.shot_num for p in written], list(range(1, 7)))
+        writes = {e[1]: e for e in events if e[0] == "write"}
+        moves = [e[2] for e in events if e[0] == "move" and e[1] == "x"]
+        self.assertEqual(len(moves), 6)
+        for shot in range(1, 6):
+            # Shot n+1's move starts before shot n's write has finished.
+            self.assertLess(moves[shot], writes[shot][3])
+        # Each shot records its own position: read before the next move starts.
+        achieved = [(p.coordinates["x"], p.coordinates["y"]) for p in written]
+        np.testing.assert_allclose(achieved, [(x, y) for y in (-5, 5) for x in (-10, 0, 10)],
+                                   atol=1e-3)
+
+    def test_overlap_can_be_disabled(self):
+        events, written = self._run(overlap=False)
+        self.assertEqual(len(written), 6)
+        writes = {e[1]: e for e in events if e[0] == "write"}
+        moves = [e[2] for e in events if e[0] == "move" and e[1] == "x"]
+        for shot in range(1, 6):
+            self.assertGreaterEqual(moves[shot], writes[shot][3])
+
+
+class AdaptivePollTests(unittest.TestCase):
+    def test_completion_is_seen_promptly_without_flooding_status(self):
+        mc = _drive([], move_s=0.3)
+        mc.x_mc.motor_position = 1.0
+        mc.y_mc.motor_position = 1.0
+        start = time.monotonic()
+        with mock.patch.object(motor_control_module, "_SETTLE_S", 0.0):
+            mc.wait_for_motion_complete()
+        late = time.monotonic() - start - 0.3
+        self.assertLess(late, motor_control_module._STATUS_POLL_MAX_S + 0.03)
+        self.assertLess(mc.x_mc.status_polls, 0.3 / motor_control_module._STATUS_POLL_MIN_S)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -25,8 +25,10 @@ import io
 import os
 import errno
 import shutil
+import socket
 import tempfile
 import threading
+import time
 import unittest
 from contextlib import redirect_stdout
 from unittest import mock
@@ -37,6 +39,8 @@ import numpy as np
 from spooling import ShotPayload, TracePayload, spool_format
 from acquisition import bmotion, hdf5_writer, scope_runner, spool_adapter
 import offload_engine
+from scope_io import LiveTapSubscriber, read_position_stats
+from scope_io.wavedesc import LeCroyWavedesc
 from _hdf5_assertions import (
     assert_channel_description_attrs,
     assert_dataset_filters,
@@ -491,6 +495,155 @@ class OffloadEquivalenceTests(unittest.TestCase):
                                    shuffle=True, fletcher32=True)
             self.assertEqual(ds.chunks, ds.shape)
 
+    def test_trace_chunk_samples_from_run_metadata(self):
+        """``trace_chunk_samples`` in the run metadata chunks 1-D traces in time;
+        sequence traces keep one row per chunk."""
+        _build_bmotion_skeleton(self.off_h5, total_shots=2)
+        meta = _make_meta(hdf5_path=self.off_h5)
+        meta["trace_chunk_samples"] = 32
+        spool_format.write_run_metadata(self.spool, meta)
+        for shot_num, seq in ((1, False), (2, True)):
+            payload = spool_adapter.all_data_to_payload(
+                _make_all_data(seq), shot_num, {"MG_A": (1.0, 2.0)})
+            spool_format.write_shot(self.spool, payload)
+        spool_format.write_run_complete(self.spool, 2)
+        offload_engine.run_offload(self.spool, poll_seconds=0.01)
+
+        with h5py.File(self.off_h5, "r") as f:
+            self.assertEqual(f["lpscope/shot_1/C1_data"].chunks, (32,))
+            self.assertEqual(f["lpscope/shot_2/C1_data"].chunks, (1, 32))
+            np.testing.assert_array_equal(f["lpscope/shot_1/C2_data"][()],
+                                          _make_all_data(False)["lpscope"][1]["C2"])
+
+    def test_preview_levels_from_run_metadata(self):
+        """``preview_levels`` in the run metadata writes a min/max preview per
+        1-D trace; sequence traces and too-short levels get none."""
+        _build_bmotion_skeleton(self.off_h5, total_shots=2)
+        meta = _make_meta(hdf5_path=self.off_h5)
+        meta["preview_levels"] = (4, 16, 256)
+        spool_format.write_run_metadata(self.spool, meta)
+        for shot_num, seq in ((1, False), (2, True)):
+            payload = spool_adapter.all_data_to_payload(
+                _make_all_data(seq), shot_num, {"MG_A": (1.0, 2.0)})
+            spool_format.write_shot(self.spool, payload)
+        spool_format.write_run_complete(self.spool, 2)
+        offload_engine.run_offload(self.spool, poll_seconds=0.01)
+
+        c1 = _make_all_data(False)["lpscope"][1]["C1"]
+        with h5py.File(self.off_h5, "r") as f:
+            shot1 = f["lpscope/shot_1"]
+            self.assertIn("C1_preview_4", shot1)
+            self.assertIn("C2_preview_16", shot1)
+            self.assertNotIn("C1_preview_256", shot1)     # 128 samples: no shrink
+            pv = shot1["C1_preview_16"]
+            self.assertEqual(pv.shape, (8, 2))
+            self.assertEqual(pv.attrs["decimation"], 16)
+            np.testing.assert_array_equal(pv[:, 0], c1.reshape(8, 16).min(axis=1))
+            np.testing.assert_array_equal(pv[:, 1], c1.reshape(8, 16).max(axis=1))
+            self.assertFalse(any("_preview_" in k for k in f["lpscope/shot_2"]))
+
+    def _spool_position_run(self, shots):
+        """Spool ``{shot_num: (x, y) or None}`` with real WAVEDESC headers
+        (``None`` = skipped shot); return the raw C1 trace per data shot."""
+        header = LeCroyWavedesc().generate_test_data(NTimes=128)
+        rng = np.random.default_rng(7)
+        raw = {}
+        for shot_num, xy in shots.items():
+            if xy is None:
+                payload = spool_adapter.skipped_payload(shot_num, "no trigger")
+            else:
+                raw[shot_num] = rng.integers(-3000, 3000, size=128, dtype=np.int16)
+                all_data = {"lpscope": (["C1"], {"C1": raw[shot_num]}, {"C1": header})}
+                payload = spool_adapter.all_data_to_payload(
+                    all_data, shot_num, {"MG_A": xy})
+            spool_format.write_shot(self.spool, payload)
+        spool_format.write_run_complete(self.spool, len(shots))
+        return raw
+
+    def test_position_stats_accumulated_at_offload(self):
+        """The offload writes per-position mean/std of the repeat shots, snapping
+        recorded (jittered) positions to the plan and merging a revisit."""
+        _build_bmotion_skeleton(self.off_h5, total_shots=7)
+        spool_format.write_run_metadata(
+            self.spool, _make_meta(hdf5_path=self.off_h5, total_shots=7))
+        raw = self._spool_position_run({
+            1: (-1.02, 2.01), 2: (-0.99, 1.98), 3: (-1.0, 2.0),   # planned (-1, 2)
+            4: (0.01, 2.0), 5: (-0.02, 2.02),                     # planned (0, 2)
+            6: None,                                              # skipped
+            7: (-0.97, 2.0),                                      # back at (-1, 2)
+        })
+        offload_engine.run_offload(self.spool, poll_seconds=0.01)
+
+        with h5py.File(self.off_h5, "r") as f:
+            positions, mean, std, counts = read_position_stats(f, "lpscope", "C1")
+            self.assertEqual(f["analysis/position_mean"].attrs["shots"], 6)
+        np.testing.assert_array_equal(positions, [[-1.0, 2.0], [0.0, 2.0]])
+        np.testing.assert_array_equal(counts, [4, 2])
+        wd = LeCroyWavedesc(LeCroyWavedesc().generate_test_data(NTimes=128)).wd
+        for row, shots in ((0, (1, 2, 3, 7)), (1, (4, 5))):
+            volts = (np.array([raw[s] for s in shots], dtype=np.float64)
+                     * wd.vertical_gain - wd.vertical_offset)
+            # Stored as float32.
+            np.testing.assert_allclose(mean[row], volts.mean(axis=0), rtol=1e-6, atol=1e-5)
+            np.testing.assert_allclose(std[row], volts.std(axis=0), rtol=1e-6, atol=1e-5)
+
+    def test_position_stats_ignored_after_resumed_offload(self):
+        """An offload that starts after shots were already written cannot have
+        seen them, so its statistics are marked incomplete and not read."""
+        _build_bmotion_skeleton(self.off_h5, total_shots=2)
+        spool_format.write_run_metadata(
+            self.spool, _make_meta(hdf5_path=self.off_h5, total_shots=2))
+        self._spool_position_run({1: (-1.0, 2.0), 2: (0.0, 2.0)})
+        spool_adapter.write_shot(self.off_h5, spool_format.read_shot(self.spool, 1),
+                                 _make_meta(hdf5_path=self.off_h5))
+        spool_adapter._position_stats.pop(self.off_h5)        # the earlier process died
+        offload_engine.run_offload(self.spool, poll_seconds=0.01)
+
+        with h5py.File(self.off_h5, "r") as f:
+            self.assertFalse(f["analysis/position_mean"].attrs["complete"])
+            self.assertIsNone(read_position_stats(f, "lpscope", "C1"))
+
+    def test_live_tap_announces_committed_shots(self):
+        """With ``live_tap`` in the run metadata the offload announces every
+        committed shot, in order, and closes the tap when the run is done."""
+        _build_bmotion_skeleton(self.off_h5, total_shots=3)
+        meta = _make_meta(hdf5_path=self.off_h5, total_shots=3)
+        with socket.create_server(("127.0.0.1", 0)) as probe:
+            port = probe.getsockname()[1]                    # a free port
+        meta["live_tap"] = {"host": "127.0.0.1", "port": port, "max_points": 32}
+        spool_format.write_run_metadata(self.spool, meta)
+        offload = threading.Thread(
+            target=offload_engine.run_offload, args=(self.spool,),
+            kwargs={"poll_seconds": 0.01}, daemon=True)
+        with redirect_stdout(io.StringIO()):
+            offload.start()
+            for _ in range(500):                             # until the tap is up
+                try:
+                    sub = LiveTapSubscriber("127.0.0.1", port, timeout=10)
+                    break
+                except OSError:
+                    time.sleep(0.01)
+            else:
+                self.fail("offload never opened the live tap")
+            with sub:
+                self.assertEqual(sub.run_info["hdf5_path"], self.off_h5)
+                self.assertEqual(sub.run_info["total_shots"], 3)
+                raw = self._spool_position_run(
+                    {1: (-1.0, 2.0), 2: None, 3: (0.0, 2.0)})
+                shots = list(sub)
+            offload.join(10)
+        self.assertFalse(offload.is_alive())
+
+        self.assertEqual([s.shot_num for s in shots], [1, 2, 3])
+        self.assertTrue(shots[1].skipped)
+        self.assertEqual(shots[2].coordinates, {"MG_A": [0.0, 2.0]})
+        trace = shots[0].traces[("lpscope", "C1")]
+        self.assertEqual((trace.factor, trace.units, len(trace.lo)), (4, "V", 32))
+        wd = LeCroyWavedesc(LeCroyWavedesc().generate_test_data(NTimes=128)).wd
+        volts = raw[1].astype(np.float64) * wd.vertical_gain - wd.vertical_offset
+        np.testing.assert_allclose(trace.hi, volts.reshape(32, 4).max(axis=1),
+                                   rtol=1e-6, atol=1e-6)
+
     def test_offload_preserves_acquire_time_stamp(self):
         """acquisition_time must be the acquire-side stamp, not offload time.
 
@@ -853,8 +1006,11 @@ class OffloadMissingTargetTests(unittest.TestCase):
 
 
 def _build_grid_skeleton(hdf5_path, scope_name="lpscope", n_samples=128,
-                         total_shots=2, nz=None):
-    """Create the grid (PositionManager) HDF5 skeleton like acquire now does."""
+                         total_shots=2, nz=None, plan_xy=None):
+    """Create the grid (PositionManager) HDF5 skeleton like acquire now does.
+
+    ``plan_xy`` (2-D only) gives the setup array's (x, y) row for every shot,
+    duplicates included; by default shot n sits at (n - 1, 2)."""
     time_array = np.linspace(0, 1e-3, n_samples, dtype=np.float64)
     hdf5_writer.write_experiment_metadata(
         hdf5_path, description="grid unit-test", source_code={"unit": "test"},
@@ -873,6 +1029,8 @@ def _build_grid_skeleton(hdf5_path, scope_name="lpscope", n_samples=128,
         setup['shot_num'] = np.arange(1, total_shots + 1)
         setup['x'] = np.arange(total_shots, dtype=float)
         setup['y'] = 2.0
+        if plan_xy is not None:
+            setup['x'], setup['y'] = np.asarray(plan_xy, dtype=float).T
     else:
         dtype = [('shot_num', '>u4'), ('x', '>f4'), ('y', '>f4'), ('z', '>f4')]
         setup = np.zeros(total_shots, dtype=dtype)
@@ -904,7 +1062,7 @@ class GridOffloadTests(unittest.TestCase):
         self.spool = _temp_spool_dir(self, "spool_grid_")
         self.off_h5 = _temp_path(self, "grid.hdf5")
 
-    def _run(self, nz, coords_for):
+    def _run(self, nz, coords_for, trigger_for=lambda s: None):
         _build_grid_skeleton(self.off_h5, total_shots=2, nz=nz)
         spool_format.write_run_metadata(self.spool, {
             "writer": "grid",
@@ -915,7 +1073,7 @@ class GridOffloadTests(unittest.TestCase):
         })
         for shot in (1, 2):
             payload = self.grid_spool_adapter.all_data_to_payload(
-                _make_all_data(False), shot, coords_for(shot))
+                _make_all_data(False), shot, coords_for(shot), trigger=trigger_for(shot))
             spool_format.write_shot(self.spool, payload)
         spool_format.write_run_complete(self.spool, 2)
         offload_engine.run_offload(self.spool, poll_seconds=0.01)
@@ -938,6 +1096,52 @@ class GridOffloadTests(unittest.TestCase):
             self.assertEqual(arr.dtype.names, ("shot_num", "x", "y", "z"))
             self.assertEqual(list(arr["z"]), [3.0, 3.0])
 
+    def test_position_stats_with_duplicate_shots(self):
+        """The setup array has a row per shot; the statistics get one row per
+        grid position (raster order) holding all of its duplicates."""
+        grid = [(x, y) for y in (-5.0, 5.0) for x in (-10.0, 0.0, 10.0)]
+        plan_xy = [xy for xy in grid for _dup in range(2)]            # num_duplicate_shots = 2
+        _build_grid_skeleton(self.off_h5, total_shots=len(plan_xy), plan_xy=plan_xy)
+        spool_format.write_run_metadata(self.spool, {
+            "writer": "grid", "hdf5_path": self.off_h5, "config_scope_names": ["lpscope"],
+            "nz": None, "total_shots": len(plan_xy),
+        })
+        header = LeCroyWavedesc().generate_test_data(NTimes=128)
+        rng = np.random.default_rng(3)
+        raw = {}
+        for shot, (x, y) in enumerate(plan_xy, start=1):
+            raw[shot] = rng.integers(-3000, 3000, size=128, dtype=np.int16)
+            payload = self.grid_spool_adapter.all_data_to_payload(
+                {"lpscope": (["C1"], {"C1": raw[shot]}, {"C1": header})}, shot,
+                {"x": x + 0.01, "y": y - 0.01, "z": None})
+            spool_format.write_shot(self.spool, payload)
+        spool_format.write_run_complete(self.spool, len(plan_xy))
+        offload_engine.run_offload(self.spool, poll_seconds=0.01)
+
+        with h5py.File(self.off_h5, "r") as f:
+            positions, mean, std, counts = read_position_stats(f, "lpscope", "C1")
+        np.testing.assert_array_equal(positions, grid)
+        np.testing.assert_array_equal(counts, [2] * 6)
+        self.assertEqual(mean.shape, (6, 128))
+        wd = LeCroyWavedesc(header).wd
+        for row in range(6):
+            volts = (np.array([raw[2 * row + 1], raw[2 * row + 2]], dtype=np.float64)
+                     * wd.vertical_gain - wd.vertical_offset)
+            np.testing.assert_allclose(mean[row], volts.mean(axis=0), rtol=1e-6, atol=1e-5)
+
+    def test_trigger_timestamp_lands_on_the_shot_group(self):
+        trigger = {"seq": 41, "gpio": 25, "t_us": 2**32 + 123456, "time": 1779321947.250125,
+                   "pi_time": 1779321947.2503, "interval_us": 400021}
+        self._run(nz=None, coords_for=lambda s: {"x": float(s), "y": 2.0, "z": None},
+                  trigger_for=lambda s: trigger if s == 1 else None)
+        with h5py.File(self.off_h5, "r") as f:
+            attrs = f["lpscope/shot_1"].attrs
+            self.assertEqual(attrs["trigger_t_us"], 2**32 + 123456)
+            self.assertEqual(attrs["trigger_seq"], 41)
+            self.assertEqual(attrs["trigger_interval_us"], 400021)
+            self.assertAlmostEqual(attrs["trigger_time"], 1779321947.250125, places=6)
+            self.assertFalse([k for k in f["lpscope/shot_2"].attrs if k.startswith("trigger_")])
+
 
 class CrashSafetyTests(unittest.TestCase):
     def setUp(self):
@@ -0,0 +1,115 @@
+"""Tests for the concurrent per-axis queries of Motor_Control_2D / Motor_Control_3D
+(motion/Motor_Control.py): read_all(), motor_positions, motor_alarm and the
+status poll of wait_for_motion_complete. No hardware: each axis answers after a
+fixed round-trip latency.
+
+Run:
+
+    python -m unittest tests.test_motion_axis_polling
+"""
+
+import importlib
+import threading
+import time
+import unittest
+from unittest import mock
+
+from motion.Motor_Control import Motor_Control_2D, Motor_Control_3D
+
+# motion.Motor_Control the module (the package re-exports the 1D class under that name).
+motor_control_module = importlib.import_module("motion.Motor_Control")
+
+ROUND_TRIP_S = 0.05
+
+
+class _SlowAxis:
+    """One motor axis whose every query takes ROUND_TRIP_S; records when each ran."""
+
+    def __init__(self, name, position, status="R"):
+        self.name = name
+        self._position = position
+        self._status = status
+        self.queries = []
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    def _query(self, value):
+        start = time.monotonic()
+        time.sleep(ROUND_TRIP_S)
+        self.queries.append((start, time.monotonic(), threading.current_thread().name))
+        return value
+
+    @property
+    def motor_position(self):
+        return self._query(self._position)
+
+    @property
+    def motor_status(self):
+        return self._query(self._status)
+
+    @property
+    def check_alarm(self):
+        return self._query(False)
+
+
+def _drive(cls, statuses):
+    mc = cls.__new__(cls)
+    for i, (name, status) in enumerate(zip(cls.AXES, statuses)):
+        setattr(mc, f"{name}_mc", _SlowAxis(name, 1.5 * (i + 1), status))
+    return mc
+
+
+def _axes(mc):
+    return [getattr(mc, f"{name}_mc") for name in mc.AXES]
+
+
+class ConcurrentQueryTests(unittest.TestCase):
+    def test_read_all_costs_one_axis_round_trip(self):
+        for cls in (Motor_Control_2D, Motor_Control_3D):
+            mc = _drive(cls, ["RP", "M", "R"])
+            start = time.monotonic()
+            positions, statuses = mc.read_all()
+            elapsed = time.monotonic() - start
+            n = len(cls.AXES)
+            self.assertEqual(positions, tuple(1.5 * (i + 1) for i in range(n)))
+            self.assertEqual(statuses, ("RP", "M", "R")[:n])
+            # Position + status per axis, axes side by side: 2 round trips, not 2n.
+            self.assertLess(elapsed, 2 * ROUND_TRIP_S * 1.8, cls.__name__)
+            first_ends = [axis.queries[0][1] for axis in _axes(mc)]
+            for axis in _axes(mc):
+                self.assertLess(axis.queries[0][0], min(first_ends))
+            self.assertEqual(len({axis.queries[0][2] for axis in _axes(mc)}), n)
+
+    def test_getters_query_axes_concurrently(self):
+        mc = _drive(Motor_Control_3D, ["R", "R", "R"])
+        start = time.monotonic()
+        self.assertEqual(mc.motor_positions, (1.5, 3.0, 4.5))
+        self.assertEqual(mc._current_pos, (1.5, 3.0, 4.5))
+        self.assertEqual(mc.motor_alarm, (False, False, False))
+        self.assertLess(time.monotonic() - start, 2 * ROUND_TRIP_S * 1.8)
+
+    def test_wait_polls_all_axes_at_once(self):
+        mc = _drive(Motor_Control_3D, ["R", "R", "M"])
+        threading.Timer(0.3, lambda: setattr(mc.z_mc, "_status", "R")).start()
+        with mock.patch.object(motor_control_module, "_SETTLE_S", 0.0):
+            mc.wait_for_motion_complete()
+        polls = [len(axis.queries) for axis in _axes(mc)]
+        self.assertEqual(len(set(polls)), 1)
+        # Each poll is one round trip for all three axes, so ~0.3 s fits several.
+        self.assertGreaterEqual(polls[0], 3)
+
+    def test_close_stops_axis_threads_and_closes_axes(self):
+        for cls in (Motor_Control_2D, Motor_Control_3D):
+            with _drive(cls, ["R", "R", "R"]) as mc:
+                mc.read_all()
+                workers = list(mc._axis_pool._threads)
+                self.assertTrue(workers)
+            self.assertNotIn("_axis_pool", mc.__dict__)
+            self.assertFalse(any(t.is_alive() for t in workers), cls.__name__)
+            self.assertTrue(all(axis.closed for axis in _axes(mc)), cls.__name__)
+
+
+if __name__ == "__main__":
+    unittest.main()
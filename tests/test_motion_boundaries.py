@@ -0,0 +1,149 @@
+"""Unit tests for the boundary primitives, exact path checks and route planner
+in motion/obstacle_avoidance.py. No hardware.
+
+Run:
+
+    python -m unittest tests.test_motion_boundaries
+"""
+
+import unittest
+
+import numpy as np
+
+from motion.obstacle_avoidance import (
+    BoundaryChecker,
+    Box,
+    Cylinder,
+    HalfSpace,
+    KeepIn,
+    KeepOut,
+    boundary_mask,
+)
+
+# The LAPD demo obstacle (with its 0.2 cm buffer) inside the probe workspace.
+_OBSTACLE_LO, _OBSTACLE_HI = (-60.2, -3.2, -5.7), (-0.3, 3.2, 5.7)
+_WORKSPACE_LO, _WORKSPACE_HI = (-40, -20, -15), (60, 20, 15)
+
+
+def _lapd_checker(primitives):
+    checker = BoundaryChecker()
+    if primitives:
+        checker.add_probe_boundary(Box(_WORKSPACE_LO, _WORKSPACE_HI), is_outer_boundary=True)
+        checker.add_probe_boundary(Box(_OBSTACLE_LO, _OBSTACLE_HI))
+    else:
+        checker.add_probe_boundary(lambda x, y, z: -40 <= x <= 60 and -20 <= y <= 20
+                                   and -15 <= z <= 15, is_outer_boundary=True)
+        checker.add_probe_boundary(lambda x, y, z: not (-60.2 <= x <= -0.3 and -3.2 <= y <= 3.2
+                                                       and -5.7 <= z <= 5.7))
+    return checker
+
+
+def _route_length(start, waypoints):
+    route = np.array([start] + list(waypoints), dtype=float)
+    return float(np.linalg.norm(np.diff(route, axis=0), axis=1).sum())
+
+
+class PrimitiveTests(unittest.TestCase):
+    def test_primitives_match_equivalent_predicates(self):
+        points = np.random.default_rng(0).uniform(-10, 10, (2000, 3))
+        cases = [
+            (KeepOut(Box((-2, -3, -4), (5, 1, 2))),
+             lambda x, y, z: not (-2 <= x <= 5 and -3 <= y <= 1 and -4 <= z <= 2)),
+            (KeepOut(Cylinder('x', (1, -2), 3, span=(-5, 4))),
+             lambda x, y, z: not ((y - 1) ** 2 + (z + 2) ** 2 <= 9 and -5 <= x <= 4)),
+            (KeepIn(HalfSpace((1, 1, 0), 3)), lambda x, y, z: x + y <= 3),
+        ]
+        for primitive, predicate in cases:
+            expected = np.array([predicate(*p) for p in points])
+            np.testing.assert_array_equal(boundary_mask(primitive, points), expected)
+            np.testing.assert_array_equal(boundary_mask(predicate, points), expected)
+            self.assertEqual([primitive(*p) for p in points[:50]], list(expected[:50]))
+
+    def test_segment_checks_are_exact(self):
+        thin = KeepOut(Box((0, -1, -1), (0.01, 1, 1)))          # 0.1 mm plate
+        self.assertFalse(thin.segment_valid((-20, 0.3, 0), (20, -0.2, 0.1)))
+        self.assertTrue(thin.segment_valid((-20, 1.001, 0), (20, 1.001, 0)))
+        rod = KeepOut(Cylinder('z', (0, 0), 2))
+        self.assertTrue(rod.segment_valid((-5, 2 + 1e-6, 3), (5, 2 + 1e-6, -3)))
+        self.assertFalse(rod.segment_valid((-5, 2 - 1e-6, 3), (5, 2 - 1e-6, -3)))
+        floor = KeepIn(HalfSpace((0, 0, -1), 5))                 # z >= -5
+        self.assertTrue(floor.segment_valid((0, 0, -5), (3, 3, 10)))
+        self.assertFalse(floor.segment_valid((0, 0, 0), (0, 0, -5.001)))
+        checker = BoundaryChecker()
+        checker.add_probe_boundary(Box((0, -1, -1), (0.01, 1, 1)))
+        self.assertIsInstance(checker.obstacle_boundaries[0], KeepOut)
+        self.assertFalse(checker.is_path_valid((-20, 0.3, 0), (20, -0.2, 0.1)))
+
+    def test_callables_are_sampled_at_check_resolution(self):
+        checker = BoundaryChecker()
+        checker.add_probe_boundary(lambda x, y, z: not (0.2 <= x <= 0.45))
+        self.assertFalse(checker.is_path_valid((-20, 0, 0), (20, 0, 0)))
+
+    def test_array_capable_predicates_are_called_once(self):
+        calls = []
+
+        def numpy_pred(x, y, z):
+            calls.append(np.shape(x))
+            return np.hypot(x, y) <= 5
+
+        points = np.random.default_rng(1).uniform(-8, 8, (500, 3))
+        mask = boundary_mask(numpy_pred, points)
+        self.assertEqual(calls, [(500,)])
+        scalar = boundary_mask(lambda x, y, z: -5 <= x <= 5 and -5 <= y <= 5, points)
+        np.testing.assert_array_equal(scalar, np.all(np.abs(points[:, :2]) <= 5, axis=1))
+        np.testing.assert_array_equal(mask, np.hypot(points[:, 0], points[:, 1]) <= 5)
+
+
+class PlannerTests(unittest.TestCase):
+    def test_route_around_obstacle_is_valid_and_near_shortest(self):
+        # Over the top of the box: up to its edge, across, and down again. Plain
+        # callables are passed min_clearance further out.
+        for primitives in (True, False):
+            checker = _lapd_checker(primitives)
+            grow = 0 if primitives else checker.min_clearance
+            shortest = 2 * np.hypot(abs(4 - 3.2 - grow), 5.7 + grow) + 2 * (3.2 + grow)
+            start, end = (-10, 4, 0), (-10, -4, 0)
+            self.assertFalse(checker.is_path_valid(start, end))
+            waypoints = checker.find_path(start, end)
+            self.assertEqual(waypoints[-1], end)
+            route = [start] + waypoints
+            for a, b in zip(route[:-1], route[1:]):
+                self.assertTrue(checker.is_path_valid(a, b), (a, b))
+            self.assertLess(_route_length(start, waypoints), shortest * 1.01, primitives)
+
+    def test_route_does_not_cut_corners_of_sampled_obstacle(self):
+        # position_manager.obstacle_boundary: only sampled every check_resolution.
+        def in_obstacle(x, y, z):
+            return -60 <= x <= -17 and -2.5 <= y <= 5 and -6.5 <= z <= 9
+
+        checker = BoundaryChecker()
+        checker.add_probe_boundary(lambda x, y, z: -40 <= x <= 60 and -20 <= y <= 20
+                                   and -15 <= z <= 15, is_outer_boundary=True)
+        checker.add_probe_boundary(lambda x, y, z: not in_obstacle(x, y, z))
+        for start, end in (((-30, -10, 0), (-10, 10, 5)), ((-20, 6, 0), (-20, -4, 0))):
+            route = np.array([start] + checker.find_path(start, end), dtype=float)
+            for a, b in zip(route[:-1], route[1:]):
+                for p in a + np.linspace(0, 1, 20001)[:, None] * (b - a):
+                    self.assertFalse(in_obstacle(*p), (start, end, tuple(p)))
+
+    def test_direct_move_and_unreachable_target(self):
+        checker = _lapd_checker(primitives=True)
+        self.assertEqual(checker.find_path((10, 0, 0), (20, 5, 1)), [(20, 5, 1)])
+        checker.add_probe_boundary(Box((-25, -25, -20), (-20, 25, 20)))     # wall across x
+        with self.assertRaisesRegex(ValueError, "No safe path"):
+            checker.find_path((-30, 10, 0), (10, 10, 0))
+        with self.assertRaisesRegex(ValueError, "not valid"):
+            checker.find_path((10, 0, 0), (-10, 0, 0))                     # inside the obstacle
+
+    def test_lattice_is_built_once_per_boundary_set(self):
+        checker = _lapd_checker(primitives=True)
+        checker.find_path((-10, 4, 0), (-10, -4, 0))
+        checker.find_path((-20, 4, 3), (-25, -4, -3))
+        self.assertEqual(len(checker._lattices), 1)
+        checker.add_probe_boundary(Cylinder('z', (20, 0), 2))
+        checker.find_path((15, 0, 0), (25, 0, 0))
+        self.assertEqual(len(checker._lattices), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+"""Tests for the persistent motor-server connection of Motor_Control_1D
+(motion/Motor_Control_1D.py): one socket reused across commands, pipelined
+commands matched to their replies, transparent reconnects and the per-command
+latency histograms. No hardware: a local TCP server speaks the drive's eSCL
+framing (0x00 0x07 <text> CR).
+
+Run:
+
+    python -m unittest tests.test_motion_connection
+"""
+
+import socket
+import threading
+import time
+import unittest
+
+from motion.Motor_Control_1D import LatencyHistogram, Motor_Control
+
+STEPS_PER_REV = 20000
+
+
+class _FakeDriveServer:
+    """Answers eSCL commands like an Applied Motion drive: queries reply
+    ``XX=<value>``, settings reply ``%``. ``drop_after`` closes each connection
+    after that many commands without answering the last one."""
+
+    def __init__(self, reply_delay=0.0, drop_after=None):
+        self.reply_delay = reply_delay
+        self.drop_after = drop_after
+        self.accepts = 0
+        self.commands = []
+        self.recv_calls = 0
+        self.registers = {"EP": 0, "SP": 0, "RS": "R", "VE": 1.0}
+        self._listener = socket.create_server(("127.0.0.1", 0))
+        self.port = self._listener.getsockname()[1]
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def close(self):
+        self._listener.close()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self._listener.accept()
+            except OSError:
+                return
+            self.accepts += 1
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _reply(self, text):
+        code, arg = text[:2], text[2:]
+        if code == "DI":
+            self.registers["target"] = int(arg)
+        elif code == "FP":
+            self.registers["EP"] = self.registers["SP"] = self.registers["target"]
+        elif arg:
+            self.registers[code] = arg
+            return "%"
+        if code in self.registers and not arg:
+            return f"{code}={self.registers[code]}"
+        return "%"
+
+    def _handle(self, conn):
+        buf, handled = b"", 0
+        with conn:
+            while True:
+                data = conn.recv(2048)
+                self.recv_calls += 1
+                if not data:
+                    return
+                buf += data
+                while b"\r" in buf:
+                    frame, buf = buf.split(b"\r", 1)
+                    text = frame[2:].decode("ASCII")
+                    handled += 1
+                    if self.drop_after is not None and handled > self.drop_after:
+                        return
+                    self.commands.append(text)
+                    time.sleep(self.reply_delay)
+                    conn.sendall(b"\x00\x07" + self._reply(text).encode("ASCII") + b"\r")
+
+
+def _motor(server):
+    mc = Motor_Control.__new__(Motor_Control)
+    mc.server_ip_addr = "127.0.0.1"
+    mc.MOTOR_SERVER_PORT = server.port
+    mc.name = "x"
+    mc.cm_per_turn = 0.254
+    mc._Motor_Control__stepsPerRev = STEPS_PER_REV
+    return mc
+
+
+class ConnectionTests(unittest.TestCase):
+    def _server(self, **kwargs):
+        server = _FakeDriveServer(**kwargs)
+        self.addCleanup(server.close)
+        return server
+
+    def test_one_socket_serves_every_command(self):
+        server = self._server()
+        mc = _motor(server)
+        for _ in range(20):
+            self.assertEqual(mc.motor_status, "\x00\x07RS=R\r")
+        mc.motor_position = 1.27
+        self.assertAlmostEqual(mc.motor_position, 1.27, places=4)
+        self.assertEqual(server.accepts, 1)
+
+    def test_pipelined_replies_match_their_commands(self):
+        server = self._server(reply_delay=0.02)
+        mc = _motor(server)
+        start = time.monotonic()
+        replies = mc.send_commands("VE2.5", "VE", "DI4000", "FP", "EP", "RS")
+        self.assertEqual([r[2:-1] for r in replies], ["%", "VE=2.5", "%", "%", "EP=4000", "RS=R"])
+        self.assertEqual(server.commands, ["VE2.5", "VE", "DI4000", "FP", "EP", "RS"])
+        # One write: the server reads the whole batch at once.
+        self.assertEqual(server.recv_calls, 1)
+        self.assertLess(time.monotonic() - start, 6 * 0.02 + 0.1)
+
+    def test_dropped_connection_is_reopened_and_unanswered_commands_resent(self):
+        server = self._server(drop_after=3)
+        mc = _motor(server)
+        replies = mc.send_commands("VE3", "EP", "SP", "RS", "VE")
+        self.assertEqual([r[2:-1] for r in replies], ["%", "EP=0", "SP=0", "RS=R", "VE=3"])
+        self.assertEqual(server.accepts, 2)
+        self.assertEqual(mc.connection().reconnects, 1)
+        self.assertEqual(mc.motor_speed, 3.0)
+
+    def test_latency_histograms_per_command(self):
+        server = self._server(reply_delay=0.005)
+        mc = _motor(server)
+        for _ in range(10):
+            mc.motor_status
+        mc.motor_speed = 2
+        latency = mc.connection().latency
+        self.assertEqual(sorted(latency), ["RS", "VE"])
+        self.assertEqual(latency["RS"].count, 10)
+        self.assertGreaterEqual(latency["RS"].percentile(50), 0.005)
+        report = mc.latency_report()
+        self.assertIn("RS   n=10", report)
+        self.assertIn("0 reconnect(s)", report)
+
+
+class LatencyHistogramTests(unittest.TestCase):
+    def test_percentiles_fall_in_the_right_bucket(self):
+        h = LatencyHistogram()
+        for seconds in [0.001] * 90 + [0.1] * 9 + [2.0]:
+            h.add(seconds)
+        self.assertEqual(h.count, 100)
+        self.assertLessEqual(h.percentile(50) / 0.001, 1.0001 * 10 ** (1 / h.BUCKETS_PER_DECADE))
+        self.assertGreaterEqual(h.percentile(50), 0.001)
+        self.assertGreaterEqual(h.percentile(95), 0.1)
+        self.assertLess(h.percentile(95), 0.2)
+        self.assertEqual(h.percentile(100), 2.0)
+        self.assertAlmostEqual(h.mean, (0.09 + 0.9 + 2.0) / 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+"""Unit tests for the probe <-> motor kinematics of the LAPD probe drives
+(motion/Motor_Control.py). No hardware: the drives are built without their
+Motor_Control_1D axes, only the geometry is set.
+
+Run:
+
+    python -m unittest tests.test_motion_kinematics
+"""
+
+import itertools
+import unittest
+
+import numpy as np
+
+from motion.Motor_Control import Motor_Control_2D, Motor_Control_3D
+
+
+def _drive(cls, probe_in, poi, ph):
+    drive = cls.__new__(cls)
+    drive.probe_in, drive.poi, drive.ph = probe_in, poi, ph
+    return drive
+
+
+class MotorToProbeTests(unittest.TestCase):
+    def setUp(self):
+        self.d2 = _drive(Motor_Control_2D, 58.771, 120.5, 20)
+        self.d3 = _drive(Motor_Control_3D, 58, 118, 30)
+        grid = np.linspace(-38, 38, 9)
+        self.xy = list(itertools.product(grid, grid))
+        self.xyz = list(itertools.product(grid, grid, np.linspace(-10, 10, 5)))
+
+    def test_2d_inverts_probe_to_motor_to_3_decimals(self):
+        for x, y in self.xy:
+            px, py = self.d2.motor_to_probe(*self.d2.probe_to_motor_LAPD(x, y))
+            self.assertEqual((px, py), (round(x, 3), round(y, 3)))
+
+    def test_3d_inverts_probe_to_motor_to_3_decimals(self):
+        for x, y, z in self.xyz:
+            p = self.d3.motor_to_probe(*self.d3.probe_to_motor_LAPD(x, y, z))
+            self.assertEqual(p, (round(x, 3), round(y, 3), round(z, 3)))
+
+    def test_batch_matches_per_point(self):
+        motors = np.array([self.d3.probe_to_motor_LAPD(*p) for p in self.xyz])
+        batch = np.column_stack(self.d3.motor_to_probe(*motors.T))
+        single = np.array([self.d3.motor_to_probe(*m) for m in motors])
+        np.testing.assert_array_equal(batch, single)
+
+    def test_home_position_is_chamber_axis(self):
+        self.assertEqual(self.d2.motor_to_probe(0.0, 0.0), (0.0, 0.0))
+        self.assertEqual(self.d3.motor_to_probe(0.0, 0.0, 0.0), (0.0, 0.0, 0.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
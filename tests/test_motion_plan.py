@@ -0,0 +1,135 @@
+"""Unit tests for the whole-plan motion precomputation in
+motion/position_manager.py (PositionManager.plan_motor_targets /
+move_to_planned). No hardware: the drives are Motor_Control_2D/3D with their
+geometry set and the motor I/O replaced by recorders.
+
+Run:
+
+    python -m unittest tests.test_motion_plan
+"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from motion.Motor_Control import Motor_Control_2D, Motor_Control_3D
+from motion.obstacle_avoidance import BoundaryChecker
+from motion.position_manager import PositionManager
+
+
+class _Recorder:
+    """Motor I/O of a drive: records velocity/position commands and live moves."""
+
+    def __init__(self):
+        self.moves = []
+
+    @property
+    def motor_velocity(self):
+        return None
+
+    @motor_velocity.setter
+    def motor_velocity(self, v):
+        self.moves.append(("velocity", v))
+
+    @property
+    def motor_positions(self):
+        return None
+
+    @motor_positions.setter
+    def motor_positions(self, mpos):
+        self.moves.append(("motor", mpos))
+
+    @property
+    def probe_positions(self):
+        return None
+
+    @probe_positions.setter
+    def probe_positions(self, pos):
+        self.moves.append(("probe", pos))
+
+
+class _Drive2D(_Recorder, Motor_Control_2D):
+    def __init__(self):
+        _Recorder.__init__(self)
+        self.probe_in, self.poi, self.ph = 58.771, 120.5, 20
+        self.boundary_checker = BoundaryChecker()
+
+
+class _Drive3D(_Recorder, Motor_Control_3D):
+    def __init__(self):
+        _Recorder.__init__(self)
+        self.probe_in, self.poi, self.ph = 58, 118, 30
+        self.boundary_checker = BoundaryChecker()
+
+
+def _manager(position_ini, duplicates=1):
+    fd, path = tempfile.mkstemp(suffix=".ini")
+    with os.fdopen(fd, "w") as fh:
+        fh.write("[position]\n" + position_ini)
+    try:
+        return PositionManager(None, path, num_duplicate_shots=duplicates)
+    finally:
+        os.remove(path)
+
+
+XY = "nx = 3\nny = 2\nxmin = -10\nxmax = 10\nymin = -5\nymax = 5\nnz = None\n"
+XYZ = XY.replace("nz = None\n", "nz = 2\nzmin = -4\nzmax = 4\n")
+
+
+class PlanMotorTargetsTests(unittest.TestCase):
+    def test_targets_match_per_point_transform(self):
+        pm, mc = _manager(XYZ), _Drive3D()
+        targets = pm.plan_motor_targets(mc)
+        coords = pm.plan_coordinates()
+        self.assertEqual(targets.shape, (12, 3))
+        for c, t in zip(coords, targets):
+            np.testing.assert_allclose(t, mc.probe_to_motor_LAPD(*c), rtol=0, atol=1e-12)
+
+    def test_velocities_follow_consecutive_moves(self):
+        pm, mc = _manager(XY, duplicates=2), _Drive2D()
+        targets = pm.plan_motor_targets(mc)
+        self.assertTrue(np.isnan(pm.motor_velocities[0]).all())
+        # Duplicate shot: no travel, zero velocity.
+        np.testing.assert_array_equal(pm.motor_velocities[1], [0.0, 0.0])
+        dx, dy = np.abs(targets[2] - targets[1])
+        np.testing.assert_allclose(pm.motor_velocities[2], mc.calculate_velocity(dx, dy))
+
+    def test_unreachable_points_are_all_listed(self):
+        pm = _manager(XY.replace("xmax = 10", "xmax = 45") + "ym_limits = -1,1\n")
+        with self.assertRaises(ValueError) as ctx:
+            pm.plan_motor_targets(_Drive2D())
+        message = str(ctx.exception)
+        self.assertIn("too close to the chamber wall", message)   # x = 45
+        self.assertIn("outside motor limits", message)            # y = +-5
+        self.assertTrue(message.startswith("6 of 6 planned positions"))
+        self.assertIsNone(pm.motor_targets)
+
+    def test_obstacle_boundary_rejects_3d_points(self):
+        pm, mc = _manager(XYZ), _Drive3D()
+        mc.boundary_checker.obstacle_boundaries.append(
+            lambda x, y, z: not (x > 5 and z > 0))
+        with self.assertRaises(ValueError) as ctx:
+            pm.plan_motor_targets(mc)
+        self.assertIn("collides with obstacle", str(ctx.exception))
+        self.assertTrue(str(ctx.exception).startswith("2 of 12"))
+
+
+class MoveToPlannedTests(unittest.TestCase):
+    def test_cached_moves_after_first_and_after_failure(self):
+        pm, mc = _manager(XY), _Drive2D()
+        targets = pm.plan_motor_targets(mc)
+        pm.move_to_planned(mc, 0)                       # first move: live
+        pm.move_to_planned(mc, 1)                       # cached
+        self.assertEqual(mc.moves[0][0], "probe")
+        self.assertEqual(mc.moves[1], ("velocity", tuple(pm.motor_velocities[1])))
+        self.assertEqual(mc.moves[2], ("motor", tuple(targets[1])))
+
+        mc.moves.clear()
+        pm.move_to_planned(mc, 3)                       # skipped row 2: live again
+        self.assertEqual([kind for kind, _ in mc.moves], ["probe"])
+
+
+if __name__ == "__main__":
+    unittest.main()
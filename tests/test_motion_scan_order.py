@@ -0,0 +1,142 @@
+"""Unit tests for travel-time-aware scan ordering (motion/scan_order.py) and
+PositionManager.apply_scan_order. No hardware: drives are Motor_Control_2D/3D
+with their geometry set and stand-in axes carrying only ``cm_per_turn``.
+
+Run:
+
+    python -m unittest tests.test_motion_scan_order
+"""
+
+import itertools
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+import h5py
+import numpy as np
+
+from motion import scan_order
+from motion.Motor_Control import Motor_Control_2D, Motor_Control_3D
+from motion.obstacle_avoidance import BoundaryChecker
+from motion.position_manager import PositionManager
+
+
+def _drive2d():
+    mc = Motor_Control_2D.__new__(Motor_Control_2D)
+    mc.probe_in, mc.poi, mc.ph = 58.771, 120.5, 20
+    mc.x_mc, mc.y_mc = SimpleNamespace(cm_per_turn=0.254), SimpleNamespace(cm_per_turn=0.508)
+    mc.boundary_checker = BoundaryChecker()
+    return mc
+
+
+def _drive3d():
+    mc = Motor_Control_3D.__new__(Motor_Control_3D)
+    mc.probe_in, mc.poi, mc.ph = 58, 118, 30
+    mc.x_mc, mc.y_mc, mc.z_mc = (SimpleNamespace(cm_per_turn=0.254) for _ in range(3))
+    mc.boundary_checker = BoundaryChecker()
+    return mc
+
+
+def _raster(xs, ys, zs=None):
+    if zs is None:
+        return np.array([(x, y) for y in ys for x in xs], dtype=float)
+    return np.array([(x, y, z) for z in zs for y in ys for x in xs], dtype=float)
+
+
+def _is_permutation(order, n):
+    return sorted(np.asarray(order).tolist()) == list(range(n))
+
+
+class SerpentineTests(unittest.TestCase):
+    def test_2d_moves_one_grid_step_at_a_time(self):
+        coords = _raster(np.arange(5.0), np.arange(4.0))
+        order = scan_order.serpentine_order(coords)
+        self.assertTrue(_is_permutation(order, 20))
+        steps = np.abs(np.diff(coords[order], axis=0)).sum(axis=1)
+        np.testing.assert_array_equal(steps, 1.0)
+
+    def test_3d_snakes_through_layers(self):
+        coords = _raster(np.arange(3.0), np.arange(3.0), np.arange(3.0))
+        order = scan_order.serpentine_order(coords)
+        self.assertTrue(_is_permutation(order, 27))
+        steps = np.abs(np.diff(coords[order], axis=0)).sum(axis=1)
+        np.testing.assert_array_equal(steps, 1.0)
+
+
+class TspTests(unittest.TestCase):
+    def test_tsp_beats_serpentine_beats_raster(self):
+        mc = _drive2d()
+        coords = _raster(np.linspace(-20, 20, 9), np.linspace(-20, 20, 7))
+        times = {name: scan_order.plan_travel_time(mc, coords, order) for name, order in (
+            ("raster", None),
+            ("serpentine", scan_order.serpentine_order(coords)),
+            ("tsp", scan_order.tsp_order(mc, coords, two_opt_seconds=2.0)))}
+        self.assertLess(times["serpentine"], times["raster"])
+        self.assertLessEqual(times["tsp"], times["serpentine"] * 1.001)
+
+    def test_blocked_moves_cost_their_detour(self):
+        mc = _drive3d()
+        checker = mc.boundary_checker
+        checker.add_probe_boundary(lambda x, y, z: -30 <= x <= 30 and -30 <= y <= 30
+                                   and -10 <= z <= 10, is_outer_boundary=True)
+        checker.add_probe_boundary(lambda x, y, z: not (-10 <= x <= 0 and -2 <= y <= 2
+                                                       and -10 <= z <= 10))
+        coords = _raster(np.linspace(-20, 10, 4), np.linspace(-8, 8, 3), [0.0])
+        order = scan_order.tsp_order(mc, coords, two_opt_seconds=1.0)
+        self.assertTrue(_is_permutation(order, len(coords)))
+        motor = np.column_stack(mc.probe_to_motor_LAPD(*coords.T))
+        cost = scan_order._EdgeCost(mc, coords, motor, obstacles=True)
+        a, b = 1, 9                     # (-10, -8) -> (-10, 8): straight through the box
+        self.assertGreater(cost(a, b), cost.direct(a, [b])[0])
+
+
+class ReorderPlanTests(unittest.TestCase):
+    def test_duplicates_stay_together_and_repeats_reverse(self):
+        dtype = [('shot_num', '>u4'), ('x', '>f4'), ('y', '>f4')]
+        raster = np.array([(0, x, 0.0) for _ in range(2) for x in (1.0, 2.0, 3.0)
+                           for _ in range(2)], dtype=dtype)
+        out = scan_order.reorder_plan(raster, [2, 0, 1], num_duplicate_shots=2,
+                                      num_run_repeats=2)
+        np.testing.assert_array_equal(out['x'], [3, 3, 1, 1, 2, 2, 2, 2, 1, 1, 3, 3])
+        np.testing.assert_array_equal(out['shot_num'], np.arange(1, 13))
+
+
+class ApplyScanOrderTests(unittest.TestCase):
+    def _manager(self, order, hdf5_path):
+        fd, path = tempfile.mkstemp(suffix=".ini")
+        with os.fdopen(fd, "w") as fh:
+            fh.write("[position]\nnx = 4\nny = 3\nxmin = -10\nxmax = 10\nymin = -5\n"
+                     f"ymax = 5\nnz = None\nscan_order = {order}\n")
+        try:
+            return PositionManager(hdf5_path, path, num_duplicate_shots=2)
+        finally:
+            os.remove(path)
+
+    def test_setup_array_records_executed_order(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            hdf5_path = os.path.join(tmp, "run.hdf5")
+            pm = self._manager("serpentine", hdf5_path)
+            raster_xy = set(itertools.product(pm.xpos, pm.ypos))
+            self.assertEqual(pm.apply_scan_order(), "serpentine")
+            pm.initialize_position_hdf5(append_mode=True)
+            with h5py.File(hdf5_path, "r") as f:
+                setup = f["/Control/Positions/positions_setup_array"]
+                self.assertEqual(setup.attrs["scan_order"], "serpentine")
+                rows = setup[()]
+        np.testing.assert_array_equal(rows['shot_num'], np.arange(1, 25))
+        np.testing.assert_allclose(rows['x'][:8], [-10, -10] + [-10 / 3] * 2
+                                   + [10 / 3] * 2 + [10, 10], rtol=1e-6)
+        np.testing.assert_array_equal(rows['x'][8:10], [10, 10])    # row 2 runs back
+        self.assertEqual(set(zip(rows['x'].astype(float).round(4),
+                                 rows['y'].astype(float))),
+                         {(round(float(x), 4), float(y)) for x, y in raster_xy})
+
+    def test_unknown_order_raises(self):
+        pm = self._manager("spiral", None)
+        with self.assertRaises(ValueError):
+            pm.apply_scan_order()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,350 @@
+"""Tests for the Raspberry Pi trigger link (pi_gpio/pi_client.py TriggerClient
+against pi_gpio/pi_server.py TriggerServer): line framing, concurrent clients
+and edge-callback waits on the server, the persistent client connection with
+its heartbeat, reconnect and one-shot fallback, the latency report, the
+server's timestamped edge record (GET_EDGES, CLOCK) and matching shots to
+their trigger edge (acquisition.trigger_timestamps). No hardware: the server
+runs on localhost with pi_gpio.fake_gpio.FakeGPIOLib in place of
+gpio_detect.so.
+
+Run:
+
+    python -m unittest tests.test_pi_trigger
+"""
+
+import asyncio
+import collections
+import contextlib
+import io
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+from acquisition.trigger_timestamps import ShotTriggerMatcher
+from pi_gpio.fake_gpio import FakeGPIOLib
+from pi_gpio.pi_client import CommandLostError, TriggerClient
+from pi_gpio.pi_server import TriggerServer
+
+OUT, IN = 23, 25
+
+
+def _silence_stdout(tc):
+    ctx = contextlib.redirect_stdout(io.StringIO())
+    ctx.__enter__()
+    tc.addCleanup(ctx.__exit__, None, None, None)
+
+
+class _ServerTestCase(unittest.TestCase):
+    gpio_kwargs = {}
+
+    def setUp(self):
+        _silence_stdout(self)
+        self.gpio = FakeGPIOLib(**self.gpio_kwargs)
+        server = TriggerServer(OUT, IN, host="127.0.0.1", port=0, gpio_lib=self.gpio)
+        self.commands = []
+        handle_command = server.handle_command
+
+        async def recording(command):
+            self.commands.append(command)
+            return await handle_command(command)
+
+        server.handle_command = recording
+        self.server = server
+        thread = threading.Thread(target=server.start, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join, 2)
+        self.addCleanup(server.stop)
+        while server._loop is None:
+            time.sleep(0.005)
+
+    def _client(self, **kwargs):
+        client = TriggerClient("127.0.0.1", self.server.port, **kwargs)
+        self.addCleanup(client.close)
+        return client
+
+
+class ServerFramingTests(_ServerTestCase):
+    def test_each_line_gets_its_own_reply(self):
+        with socket.create_connection(("127.0.0.1", self.server.port)) as s:
+            s.sendall(b"STATUS\nPING\nTR")
+            time.sleep(0.05)
+            s.sendall(b"IG\n")
+            replies = b""
+            while replies.count(b"\n") < 3:
+                replies += s.recv(1024)
+        self.assertEqual(replies.decode("ascii").split(), ["READY", "PONG", "OK"])
+        self.assertEqual(self.gpio.pulses, {OUT: 1})
+
+    def test_one_shot_client_still_works(self):
+        client = self._client()
+        self.assertTrue(client.get_status())
+        self.assertTrue(client.send_trigger())
+        threading.Timer(0.05, self.gpio.pulse, args=(IN,)).start()
+        self.assertTrue(client.wait_for_trigger(timeout=1))
+        self.assertFalse(client.wait_for_trigger(timeout=0.05))
+        self.assertEqual(self.gpio.pulses, {OUT: 1})
+
+
+class PersistentClientTests(_ServerTestCase):
+    def test_triggers_share_one_connection(self):
+        client = self._client(persistent=True)
+        client.get_status()
+        sock = client._sock
+        for _ in range(50):
+            client.send_trigger()
+        self.assertIs(client._sock, sock)
+        self.assertEqual(self.gpio.pulses, {OUT: 50})
+        self.assertEqual((client.reconnects, client.fallbacks), (0, 0))
+        self.assertEqual(client.latency["TRIG"].count, 50)
+        report = client.latency_report()
+        self.assertIn("(persistent): 0 reconnect(s), 0 one-shot fallback(s)", report)
+        self.assertIn("TRIG       n=50", report)
+
+    def test_dropped_connection_reconnects_and_resends(self):
+        client = self._client(persistent=True)
+        client.send_trigger()
+        client._sock.shutdown(socket.SHUT_RDWR)
+        client.send_trigger()
+        self.assertEqual(self.gpio.pulses, {OUT: 2})
+        self.assertEqual((client.reconnects, client.fallbacks), (1, 0))
+
+    def test_falls_back_to_one_shot_when_it_cannot_connect(self):
+        client = self._client(persistent=True)
+        with mock.patch.object(client, "_connect", side_effect=ConnectionError("refused")):
+            self.assertTrue(client.send_trigger())
+        self.assertEqual((self.gpio.pulses, client.fallbacks), ({OUT: 1}, 1))
+
+    def test_heartbeat_pings_idle_connection_and_replaces_a_dead_one(self):
+        client = self._client(persistent=True, heartbeat=0.1)
+        client.get_status()
+        time.sleep(0.35)
+        self.assertIn("PING", self.commands)
+        dead = client._sock
+        dead.shutdown(socket.SHUT_RDWR)
+        time.sleep(0.5)
+        self.assertIsNotNone(client._sock)
+        self.assertIsNot(client._sock, dead)
+        self.assertTrue(client.send_trigger())
+        self.assertEqual(client.reconnects, 0)
+
+    def test_connection_lost_after_sending_is_not_resent(self):
+        handle_command = self.server.handle_command
+
+        async def drop_after_trigger(command):
+            response = await handle_command(command)
+            if command == "TRIG":
+                raise asyncio.CancelledError        # server side closes, no reply
+            return response
+
+        client = self._client(persistent=True)
+        client.get_status()
+        self.server.handle_command = drop_after_trigger
+        with self.assertRaises(CommandLostError):
+            client.send_trigger()
+        self.assertEqual(self.gpio.pulses, {OUT: 1})
+        self.assertEqual((client.reconnects, client.fallbacks), (0, 0))
+        self.server.handle_command = handle_command
+        self.assertTrue(client.send_trigger())             # reconnects for the next one
+        self.assertEqual(self.gpio.pulses, {OUT: 2})
+
+    def test_late_reply_is_not_resent(self):
+        self.gpio.pulse_width_s = 0.6
+        client = self._client(persistent=True, timeout=0.2)
+        with self.assertRaises(TimeoutError):
+            client.send_trigger()
+        time.sleep(0.6)
+        self.assertEqual(self.gpio.pulses, {OUT: 1})
+        self.assertEqual(client.fallbacks, 0)
+
+
+class ClientImportTests(unittest.TestCase):
+    def test_client_does_not_import_the_motion_package(self):
+        # motion/__init__ loads h5py and matplotlib; the trigger client needs neither.
+        code = ("import sys, pi_gpio.pi_client; "
+                "print(sorted(m for m in ('motion', 'h5py', 'matplotlib') if m in sys.modules))")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True,
+                             text=True, check=True).stdout
+        self.assertEqual(out.strip(), "[]")
+
+
+class ConcurrentServerTests(_ServerTestCase):
+    def test_long_wait_does_not_stall_other_clients(self):
+        waiter = self._client(persistent=True)
+        other = self._client(persistent=True)
+        result = {}
+        thread = threading.Thread(target=lambda: result.setdefault("got", waiter.wait_for_trigger(timeout=2)))
+        thread.start()
+        time.sleep(0.1)
+        start = time.monotonic()
+        self.assertTrue(other.get_status())
+        self.assertTrue(other.send_trigger())
+        self.assertLess(time.monotonic() - start, 0.2)
+        self.gpio.pulse(IN)
+        thread.join(1)
+        self.assertTrue(result["got"])
+        # The wait was served by the edge callback, not the polling C wait.
+        self.assertEqual(self.gpio.waits, 0)
+
+    def test_one_edge_releases_every_waiter_promptly(self):
+        clients = [self._client(persistent=True) for _ in range(3)]
+        results, done = [], []
+        threads = [threading.Thread(target=lambda c=c: (results.append(c.wait_for_trigger(timeout=2)),
+                                                        done.append(time.monotonic())))
+                   for c in clients]
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        edge = time.monotonic()
+        self.gpio.pulse(IN)
+        for t in threads:
+            t.join(1)
+        self.assertEqual(results, [True] * 3)
+        self.assertLess(max(done) - edge, 0.1)
+
+    def test_looped_back_trigger_is_seen_by_a_waiting_client(self):
+        self.gpio.loopback = {OUT: IN}
+        waiter, trigger = self._client(persistent=True), self._client(persistent=True)
+        result = []
+        thread = threading.Thread(target=lambda: result.append(waiter.wait_for_trigger(timeout=2)))
+        thread.start()
+        time.sleep(0.1)
+        trigger.send_trigger()
+        thread.join(1)
+        self.assertEqual(result, [True])
+
+
+class EdgeRecordTests(_ServerTestCase):
+    def test_every_edge_on_both_pins_is_recorded_in_order(self):
+        self.gpio.loopback = {OUT: IN}
+        client = self._client(persistent=True)
+        client.send_trigger()
+        edges, next_seq, dropped = client.get_edges(since=0)
+        # Inverted output pulse (fall, rise), then the looped-back input pulse.
+        self.assertEqual([(e.seq, e.gpio, e.level) for e in edges],
+                         [(0, OUT, 0), (1, OUT, 1), (2, IN, 1), (3, IN, 0)])
+        self.assertEqual((next_seq, dropped), (4, 0))
+        t_us = [e.t_us for e in edges]
+        self.assertEqual(t_us, sorted(t_us))
+        self.assertGreaterEqual(t_us[1] - t_us[0], 1000)     # 1 ms output pulse
+        self.assertEqual(client.get_edges(since=next_seq), ([], 4, 0))
+
+    def test_overwritten_edges_are_reported_and_batches_are_joined(self):
+        self.server.edges = collections.deque(maxlen=400)
+        for _ in range(300):
+            self.gpio.pulse(IN, width_s=0)
+        client = self._client(persistent=True)
+        edges, next_seq, dropped = client.get_edges(since=0)
+        self.assertEqual((len(edges), next_seq, dropped), (400, 600, 200))
+        self.assertEqual([e.seq for e in edges], list(range(200, 600)))
+        self.assertEqual(client.latency["GET_EDGES"].count, 2)
+        # A cursor from before a server restart continues from the newest edge.
+        self.assertEqual(client.get_edges(since=10_000), ([], 600, 0))
+
+    def test_clock_offset_maps_edges_onto_the_local_clock(self):
+        client = self._client(persistent=True)
+        offset, rtt = client.clock_offset()
+        before = time.perf_counter()
+        self.gpio.pulse(IN)
+        after = time.perf_counter()
+        edge = client.get_edges(since=0)[0][0]
+        self.assertLess(rtt, 0.05)
+        self.assertGreaterEqual(edge.t_us * 1e-6 + offset, before - rtt)
+        self.assertLessEqual(edge.t_us * 1e-6 + offset, after + rtt)
+
+    def test_bad_arguments(self):
+        client = self._client(persistent=True)
+        for command in ("GET_EDGES since=x", "GET_EDGES since=-1", "GET_EDGES bogus=1"):
+            self.assertEqual(client.send_command(command), "ERR INVALID_PARAMETERS")
+        self.assertTrue(client.send_command("GET_EDGES 0").startswith("EDGES next=0 "))
+
+
+class TickWrapTests(_ServerTestCase):
+    gpio_kwargs = {"tick_start_us": (1 << 32) - 30_000}       # pigpio tick wraps in 30 ms
+
+    def test_edge_times_run_on_past_the_tick_wrap(self):
+        client = self._client(persistent=True)
+        self.gpio.pulse(IN)
+        time.sleep(0.06)
+        self.gpio.pulse(IN)
+        t_us, _ = self.server.read_clock()
+        first, second = [e.t_us for e in client.get_edges(since=0)[0] if e.level == 1]
+        self.assertLess(first, 1 << 32)
+        self.assertGreater(second, 1 << 32)
+        self.assertAlmostEqual((second - first) * 1e-6, 0.061, delta=0.02)
+        self.assertGreater(t_us, second)
+
+
+class ShotTriggerMatcherTests(_ServerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.warnings = []
+        self.matcher = ShotTriggerMatcher(self._client(persistent=True), gpio=IN)
+
+    def _shot(self, edge_after_s=0.01, window_s=0.05):
+        start = time.perf_counter()
+        if edge_after_s is not None:
+            threading.Timer(edge_after_s, self.gpio.pulse, args=(IN,)).start()
+        time.sleep(window_s)
+        return self.matcher.match(start, time.perf_counter(), warn=self.warnings.append)
+
+    def test_each_shot_gets_its_own_edge(self):
+        self.gpio.pulse(IN)                         # before the run: never matched
+        self.matcher.sync()
+        self.gpio.pulse(OUT)                        # output edges are not triggers
+        first, missed, second = self._shot(), self._shot(edge_after_s=None), self._shot()
+        self.assertIsNone(missed)
+        self.assertEqual((first["gpio"], first["seq"]), (IN, 3))
+        self.assertNotIn("interval_us", first)
+        self.assertEqual(second["seq"], 5)
+        self.assertAlmostEqual(second["interval_us"] * 1e-6, 0.1, delta=0.03)
+        self.assertAlmostEqual(second["time"], time.time(), delta=0.1)
+        self.assertEqual(self.warnings, [])
+
+    def test_edge_outside_the_window_is_not_matched(self):
+        self.matcher.sync()
+        early = time.perf_counter()
+        self.gpio.pulse(IN)
+        time.sleep(0.02)
+        self.assertIsNone(self.matcher.match(early + 0.01, time.perf_counter()))
+
+    def test_unreachable_server_is_reported_and_not_retried_every_shot(self):
+        self.matcher.sync()
+        with mock.patch.object(self.matcher.client, "get_edges", side_effect=OSError("down")) as get:
+            self.assertIsNone(self._shot())
+            self.assertIsNone(self._shot())
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(len(self.warnings), 1)
+
+
+class PollingFallbackTests(_ServerTestCase):
+    gpio_kwargs = {"edge_callbacks": False}
+
+    def test_old_library_polls_in_a_worker_thread(self):
+        self.assertFalse(self.server.edge_callbacks)
+        waiter, other = self._client(persistent=True), self._client(persistent=True)
+        result = []
+        thread = threading.Thread(target=lambda: result.append(waiter.wait_for_trigger(timeout=2)))
+        thread.start()
+        time.sleep(0.1)
+        start = time.monotonic()
+        self.assertTrue(other.get_status())
+        self.assertLess(time.monotonic() - start, 0.2)
+        self.gpio.pulse(IN, width_s=0.05)
+        thread.join(1)
+        self.assertEqual(result, [True])
+        self.assertEqual(self.gpio.waits, 1)
+
+    def test_no_edge_record_without_edge_callbacks(self):
+        client = self._client(persistent=True)
+        with self.assertRaisesRegex(RuntimeError, "NO_EDGE_CALLBACKS"):
+            client.get_edges()
+
+
+if __name__ == "__main__":
+    unittest.main()
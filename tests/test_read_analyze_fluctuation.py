@@ -0,0 +1,61 @@
+"""Tests for the vectorized sliding-window CV in fluctuation_analysis.
+
+``_cv_curve`` evaluates every window at once on a strided view; it must match
+the original per-window loop exactly (same starts, centers, and CV values,
+including the NaN for a zero-mean window) and handle a record shorter than one
+window.
+"""
+
+import unittest
+
+import numpy as np
+
+from read_and_analyze.fluctuation_analysis import _cv_curve
+
+
+def _cv_curve_loop(traces, mean_trace, tarr, w):
+    """The original per-window loop (reference implementation)."""
+    n = mean_trace.size
+    stride = max(1, w // 2)
+    starts = np.arange(0, n - w + 1, stride)
+    t_centers = np.array([tarr[s + w // 2] for s in starts], dtype=float)
+    cv = np.empty(starts.size, dtype=float)
+    for j, start in enumerate(starts):
+        m_i = traces[:, start:start + w].mean(axis=1)
+        window_mean = float(mean_trace[start:start + w].mean())
+        cv[j] = float(np.std(m_i)) / abs(window_mean) if window_mean != 0 else np.nan
+    return starts, t_centers, cv
+
+
+class CvCurveTests(unittest.TestCase):
+    def test_matches_loop_bit_for_bit(self):
+        rng = np.random.default_rng(7)
+        traces = 1.0 + rng.normal(0, 0.1, (9, 2_001))
+        tarr = np.arange(traces.shape[1]) * 1e-6
+        mean_trace = traces.mean(axis=0)
+        for w in (2, 3, 13, 64, 2_001):
+            with self.subTest(w=w):
+                ref = _cv_curve_loop(traces, mean_trace, tarr, w)
+                got = _cv_curve(traces, mean_trace, tarr, w)
+                for a, b in zip(ref, got):
+                    np.testing.assert_array_equal(a, b)
+
+    def test_zero_mean_window_is_nan(self):
+        traces = np.array([[1.0, -1.0, 0.0, 0.0, 2.0, 2.0],
+                           [-1.0, 1.0, 0.0, 0.0, 2.0, 4.0]])
+        tarr = np.arange(6, dtype=float)
+        ref = _cv_curve_loop(traces, traces.mean(axis=0), tarr, 2)
+        got = _cv_curve(traces, traces.mean(axis=0), tarr, 2)
+        self.assertTrue(np.isnan(got[2][0]))
+        for a, b in zip(ref, got):
+            np.testing.assert_array_equal(a, b)
+
+    def test_record_shorter_than_window(self):
+        traces = np.ones((3, 5))
+        starts, t_centers, cv = _cv_curve(traces, traces.mean(axis=0),
+                                          np.arange(5.0), 8)
+        self.assertEqual((starts.size, t_centers.size, cv.size), (0, 0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,265 @@
+"""Tests for the bulk interferometer merge engine.
+
+Shot trigger times are decoded for a whole scope at once (a structured-dtype
+view of the WAVEDESC tt_* fields) and must equal the per-shot struct decode,
+including shots that fall back to other headers or to ``acquisition_time``.
+Traces are matched with one ``searchsorted`` pass (same picks, same tie-breaks
+as the old ``min`` scan), and the merge writes everything in a single append
+open of the datarun.
+
+Per-shot matching must recover the clock offset (modulo the shot period) by
+phase folding, despite jitter, dropped traces and stray traces, and pair each
+shot with at most one trace.
+"""
+
+import os
+import shutil
+import struct
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import h5py
+
+from read_and_analyze import interferometer_merge as im
+from scope_io.wavedesc import LeCroyWavedesc, WAVEDESC_FMT
+
+# Mid-day, mid-month local time: clear of any DST transition.
+T_RUN0 = time.mktime((2026, 6, 8, 12, 0, 0, 0, 0, -1))
+SHOT_PERIOD = 1.0 / 3.0
+
+
+def _stamped_header(t):
+    """346-byte WAVEDESC whose trigger time is local epoch ``t``."""
+    lt = time.localtime(t)
+    wd = LeCroyWavedesc()
+    wd.generate_test_data(NTimes=8)
+    fields = wd.wd._replace(tt_year=lt.tm_year, tt_months=lt.tm_mon, tt_days=lt.tm_mday,
+                            tt_hours=lt.tm_hour, tt_minute=lt.tm_min,
+                            tt_second=lt.tm_sec + (t - int(t)))
+    return struct.pack(WAVEDESC_FMT, *fields)
+
+
+def _write_datarun(path, nshot=200):
+    """One scope; shot 7 skipped, shot 11 has an unset first header (C1) but a
+    stamped C2, shot 13 has no header at all (acquisition_time fallback)."""
+    blank = LeCroyWavedesc().generate_test_data(NTimes=8)
+    with h5py.File(path, "w") as f:
+        sg = f.create_group("lpscope")
+        sg.create_dataset("time_array", data=np.arange(8) * 0.001)
+        for n in range(1, nshot + 1):
+            t = T_RUN0 + (n - 1) * SHOT_PERIOD
+            shot = sg.create_group(f"shot_{n}")
+            shot.attrs["acquisition_time"] = time.ctime(t)
+            if n == 7:
+                shot.attrs["skipped"] = True
+                continue
+            shot.create_dataset("C1_data", data=np.zeros(8, dtype=np.int16))
+            if n == 13:
+                continue
+            shot.create_dataset("C1_header", data=np.void(blank if n == 11 else _stamped_header(t)))
+            if n == 11:
+                shot.create_dataset("C2_header", data=np.void(_stamped_header(t)))
+    return [T_RUN0 + (n - 1) * SHOT_PERIOD for n in range(1, nshot + 1)]
+
+
+def _write_interf(path, stamps):
+    with h5py.File(path, "w") as f:
+        f.attrs["description"] = "synthetic interferometer"
+        for g in ("phase_p20", "phase_p29", "time_array"):
+            grp = f.create_group(g)
+            grp.attrs["unit"] = "rad"
+            for k, t in enumerate(stamps):
+                ds = grp.create_dataset(repr(float(t)), data=np.full(4, k, dtype=float))
+                ds.attrs["source"] = g
+
+
+class BulkTimestampTests(unittest.TestCase):
+    def setUp(self):
+        d = tempfile.mkdtemp(prefix="interf_")
+        self.addCleanup(shutil.rmtree, d, ignore_errors=True)
+        self.dir = d
+        self.datarun = os.path.join(d, "run_2026-06-08.hdf5")
+        self.shot_times = _write_datarun(self.datarun)
+
+    def test_bulk_decode_matches_per_shot(self):
+        with h5py.File(self.datarun, "r") as f:
+            sg = f["lpscope"]
+            shots, stamps, sources = im._scope_shot_timestamps(sg)
+            ref = [(n, *im._shot_trigger_timestamp(sg[f"shot_{n}"]))
+                   for n in im._shot_numbers(sg) if not sg[f"shot_{n}"].attrs.get("skipped")]
+        self.assertEqual(shots, [r[0] for r in ref])
+        self.assertEqual(stamps, [r[1] for r in ref])          # bit-identical floats
+        self.assertEqual(sources, [r[2] for r in ref])
+        self.assertNotIn(7, shots)
+        self.assertEqual(sources[shots.index(11)], "wavedesc")
+        self.assertEqual(sources[shots.index(13)], "acquisition_time")
+        self.assertAlmostEqual(stamps[shots.index(100)], self.shot_times[99], places=6)
+
+    def test_nearest_index_matches_min_scan(self):
+        rng = np.random.default_rng(0)
+        sorted_floats = np.sort(np.round(rng.uniform(0, 50, 300), 1))  # with duplicates
+        targets = np.concatenate([rng.uniform(-5, 55, 500), sorted_floats[:20],
+                                  (sorted_floats[:-1] + sorted_floats[1:]) / 2])
+        got = im._nearest_index(sorted_floats, targets)
+        ref = [min(range(len(sorted_floats)), key=lambda j: abs(sorted_floats[j] - t))
+               for t in targets]
+        np.testing.assert_array_equal(got, ref)
+
+
+class BulkMergeTests(unittest.TestCase):
+    def setUp(self):
+        d = tempfile.mkdtemp(prefix="interf_")
+        self.addCleanup(shutil.rmtree, d, ignore_errors=True)
+        self.datarun = os.path.join(d, "run_2026-06-08.hdf5")
+        self.interf = os.path.join(d, "interferometer_data_2026-06-08.hdf5")
+        shot_times = _write_datarun(self.datarun, nshot=60)
+        # Traces every 2 s, starting before the run, offset by 0.3 s.
+        self.traces = np.arange(shot_times[0] - 5, shot_times[-1] + 5, 2.0) + 0.3
+        _write_interf(self.interf, self.traces)
+        im.init_datarun_groups(self.datarun, self.interf, verbose=False)
+
+    def test_first_last_merge_in_one_append_open(self):
+        opened = []
+        real_file = h5py.File
+
+        def counting_file(path, mode="r", *args, **kwargs):
+            opened.append((os.path.basename(str(path)), mode))
+            return real_file(path, mode, *args, **kwargs)
+
+        with mock.patch.object(im.h5py, "File", side_effect=counting_file):
+            n = im.merge_interferometer_data(self.datarun, self.interf,
+                                             interactive=False, verbose=False)
+        self.assertEqual(n, 2)
+        appends = [o for o in opened if o[0].startswith("run_") and o[1] != "r"]
+        self.assertEqual(len(appends), 1)
+
+        with h5py.File(self.datarun, "r") as f:
+            parent = f["diagnostics/interferometer"]
+            np.testing.assert_array_equal(parent.attrs["merged shot numbers"], [1, 60])
+            for g in ("phase_p20", "phase_p29", "time_array"):
+                self.assertEqual(sorted(parent[g].keys()), ["1", "60"])
+            ds = parent["phase_p20/1"]
+            self.assertEqual(ds.attrs["source"], "phase_p20")
+            first_in_run = self.traces[self.traces >= self._t_first()][0]
+            self.assertEqual(ds.attrs["interferometer timestamp (s since epoch)"],
+                             first_in_run)
+
+        # Re-running is idempotent: nothing new written.
+        self.assertEqual(im.merge_interferometer_data(self.datarun, self.interf,
+                                                      interactive=False, verbose=False), 0)
+
+    def _t_first(self):
+        _shots, stamps, _src, _scope = im.get_shot_timestamps(self.datarun, verbose=False)
+        return stamps[0]
+
+
+class PerShotMatchTests(unittest.TestCase):
+    PERIOD = 1.0
+
+    def _series(self, offset, seed=0):
+        rng = np.random.default_rng(seed)
+        shots = 1000.0 + np.arange(300) * self.PERIOD + rng.normal(0, 1e-4, 300)
+        keep = rng.random(300) > 0.1                             # 10% of traces dropped
+        traces = shots[keep] + offset + rng.normal(0, 2e-3, keep.sum())
+        stray = rng.uniform(shots[0], shots[-1], 20)             # unrelated traces
+        return shots, np.sort(np.concatenate([traces, stray])), keep
+
+    def test_offset_recovered_modulo_period(self):
+        for true in (0.0, 0.137, -0.31, 0.49, -0.49, 2.25):
+            with self.subTest(offset=true):
+                shots, traces, _ = self._series(true)
+                off, period, conf = im.estimate_clock_offset(shots, traces)
+                self.assertAlmostEqual(period, self.PERIOD, places=3)
+                expected = (true + 0.5) % 1.0 - 0.5
+                self.assertLess(abs(im._wrap(off - expected, period)), 2e-3)
+                self.assertGreater(conf, 0.8)
+
+    def test_match_shots_pairs_each_trace_once(self):
+        shots, traces, keep = self._series(0.2, seed=1)
+        idx, residual = im.match_shots(shots, traces, 0.2, tolerance=0.05)
+        matched = idx >= 0
+        np.testing.assert_array_equal(matched, keep)             # dropped -> unmatched
+        self.assertEqual(len(np.unique(idx[matched])), int(matched.sum()))
+        self.assertTrue(np.all(np.abs(residual[matched]) <= 0.05))
+        self.assertTrue(np.all(np.isnan(residual[~matched])))
+        # Two shots on one trace: only the closer keeps it.
+        idx2, _ = im.match_shots([10.0, 10.02], [10.03], 0.0, tolerance=0.1)
+        np.testing.assert_array_equal(idx2, [-1, 0])
+
+    def test_per_shot_index_table(self):
+        d = tempfile.mkdtemp(prefix="interf_")
+        self.addCleanup(shutil.rmtree, d, ignore_errors=True)
+        datarun = os.path.join(d, "run_2026-06-08.hdf5")
+        interf = os.path.join(d, "interferometer_data_2026-06-08.hdf5")
+        shot_times = np.array(_write_datarun(datarun, nshot=90))
+        offset = 0.08
+        traces = np.delete(shot_times + offset, [20, 21])        # two traces missing
+        _write_interf(interf, traces)
+        im.init_datarun_groups(datarun, interf, verbose=False)
+
+        table = im.merge_interferometer_per_shot(datarun, interf, copy_data=True,
+                                                 verbose=False)
+        self.assertEqual(table.dtype, im.SHOT_INDEX_DTYPE)
+        self.assertNotIn(7, table["shot_num"])                   # skipped shot
+        unmatched = table["shot_num"][table["file_idx"] < 0].tolist()
+        self.assertEqual(unmatched, [21, 22])
+        ok = table["file_idx"] >= 0
+        np.testing.assert_allclose(table["interf_time"][ok] - table["shot_time"][ok],
+                                   offset, atol=1e-3)
+
+        stored, attrs = im.read_shot_index(datarun)
+        np.testing.assert_array_equal(stored["trace"], table["trace"])
+        self.assertAlmostEqual(attrs["clock offset (s)"], offset, places=3)
+        self.assertEqual(attrs["source files"].tolist(), [os.path.basename(interf).encode()])
+        with h5py.File(datarun, "r") as f:
+            copied = f["diagnostics/interferometer/phase_p20"]
+            self.assertEqual(len(copied), int(ok.sum()))
+            self.assertNotIn("21", copied)
+
+    def test_single_shot_run_needs_an_explicit_offset(self):
+        d = tempfile.mkdtemp(prefix="interf_")
+        self.addCleanup(shutil.rmtree, d, ignore_errors=True)
+        datarun = os.path.join(d, "run_2026-06-08.hdf5")
+        interf = os.path.join(d, "interferometer_data_2026-06-08.hdf5")
+        shot_times = np.array(_write_datarun(datarun, nshot=1))
+        _write_interf(interf, shot_times + 0.08)
+        im.init_datarun_groups(datarun, interf, verbose=False)
+        with self.assertRaisesRegex(ValueError, "1 shot timestamp.*pass offset"):
+            im.merge_interferometer_per_shot(datarun, interf, verbose=False)
+        table = im.merge_interferometer_per_shot(datarun, interf, offset=0.08,
+                                                 tolerance=0.01, verbose=False)
+        self.assertEqual(table["file_idx"].tolist(), [0])
+        with self.assertRaisesRegex(ValueError, "period must be positive"):
+            im.estimate_clock_offset(shot_times, shot_times, period=float("nan"))
+
+    def _offload_merge(self, trace_shift):
+        d = tempfile.mkdtemp(prefix="interf_")
+        self.addCleanup(shutil.rmtree, d, ignore_errors=True)
+        datarun = os.path.join(d, "run_2026-06-08.hdf5")
+        shot_times = np.array(_write_datarun(datarun, nshot=30))
+        _write_interf(os.path.join(d, "interferometer_data_2026-06-08.hdf5"),
+                      shot_times + trace_shift)
+        with mock.patch.object(im, "INTERFEROMETER_DATA_DIR", d), \
+                mock.patch.object(im, "PER_SHOT_INDEX", True), \
+                mock.patch("builtins.print"):
+            return im.run_interferometer_merge(datarun)
+
+    def test_offload_status_without_traces_in_window(self):
+        msg = self._offload_merge(trace_shift=-3600.0)           # all an hour early
+        self.assertTrue(msg.startswith("Interferometer merge: NO traces"), msg)
+        self.assertNotIn("Per-shot", msg)
+
+    def test_offload_status_keeps_merge_result_when_per_shot_index_fails(self):
+        with mock.patch.object(im, "merge_interferometer_per_shot",
+                               side_effect=ValueError("no lock")):
+            msg = self._offload_merge(trace_shift=0.08)
+        self.assertTrue(msg.startswith("Interferometer merge OK"), msg)
+        self.assertIn("Per-shot index FAILED: ValueError: no lock", msg)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,218 @@
+"""Tests for the vectorized SmartTrigger edge detection and the full-run scan.
+
+``_edges``, ``detect_runt`` and ``detect_slew`` resolve crossings with
+whole-array NumPy operations; they must reproduce the original per-sample
+Python state machines exactly. The originals are kept below as reference
+implementations and compared on randomized traces -- noisy sines, random walks,
+and coarsely quantized traces that land exactly on the levels (the tie cases
+the strict/non-strict comparisons care about).
+
+The full-run scan (``full_scan_smart_triggers``) must find exactly what the
+per-shot ``analyze_smart_triggers`` finds over the same shots, whether it runs
+in-process or on a process pool.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from _analysis_fixtures import write_synthetic_run
+from read_and_analyze import smart_trigger_analysis as sta
+
+
+# --------------------------------------------------------------------------------------
+# Reference (original pure-Python) implementations
+# --------------------------------------------------------------------------------------
+
+def _interp_cross_ref(tarr, volts, i, level):
+    v0, v1 = volts[i], volts[i + 1]
+    if v1 == v0:
+        return float(tarr[i])
+    frac = (level - v0) / (v1 - v0)
+    return float(tarr[i] + frac * (tarr[i + 1] - tarr[i]))
+
+
+def _edges_ref(volts, tarr, lo, hi):
+    v = np.asarray(volts, dtype=float)
+    rising, falling = [], []
+    state = None
+    if v[0] >= hi:
+        state = "high"
+    elif v[0] <= lo:
+        state = "low"
+    for i in range(len(v) - 1):
+        if state != "high" and v[i] < hi <= v[i + 1]:
+            rising.append(_interp_cross_ref(tarr, v, i, hi))
+            state = "high"
+        elif state != "low" and v[i] > lo >= v[i + 1]:
+            falling.append(_interp_cross_ref(tarr, v, i, lo))
+            state = "low"
+    return np.array(rising, dtype=float), np.array(falling, dtype=float)
+
+
+def _runt_events_ref(volts, tarr, lo, hi):
+    v = np.asarray(volts, dtype=float)
+    events = []
+    i, n = 0, len(v)
+    while i < n - 1:
+        if v[i] < lo <= v[i + 1]:
+            t_up = _interp_cross_ref(tarr, v, i, lo)
+            reached_hi = False
+            j = i + 1
+            while j < n - 1 and not (v[j] > lo >= v[j + 1]):
+                if v[j] >= hi:
+                    reached_hi = True
+                j += 1
+            if j < n - 1:
+                t_dn = _interp_cross_ref(tarr, v, j, lo)
+            else:
+                t_dn = float(tarr[-1])
+            if not reached_hi:
+                events.append({"t_start": t_up, "t_end": t_dn,
+                               "value": float(t_dn - t_up), "kind": "runt"})
+            i = j + 1
+        else:
+            i += 1
+    return events
+
+
+def _slew_transitions_ref(volts, tarr, lo, hi):
+    v = np.asarray(volts, dtype=float)
+    transitions = []
+    last_lo = last_hi = None
+    for i in range(len(v) - 1):
+        if v[i] < lo <= v[i + 1]:
+            last_lo = _interp_cross_ref(tarr, v, i, lo)
+        if v[i] < hi <= v[i + 1] and last_lo is not None:
+            t_hi = _interp_cross_ref(tarr, v, i, hi)
+            transitions.append((last_lo, t_hi, t_hi - last_lo))
+            last_lo = None
+        if v[i] > hi >= v[i + 1]:
+            last_hi = _interp_cross_ref(tarr, v, i, hi)
+        if v[i] > lo >= v[i + 1] and last_hi is not None:
+            t_lo = _interp_cross_ref(tarr, v, i, lo)
+            transitions.append((last_hi, t_lo, t_lo - last_hi))
+            last_hi = None
+    return transitions
+
+
+# --------------------------------------------------------------------------------------
+
+def _random_traces(seed=0, n=2_000, count=40):
+    """Yield (volts, tarr) pairs covering smooth, rough and quantized shapes."""
+    rng = np.random.default_rng(seed)
+    tarr = np.arange(n) * 8e-7 + 1e-4
+    for k in range(count):
+        shape = k % 4
+        if shape == 0:    # noisy multi-cycle sine
+            v = 0.4 * np.sin(np.linspace(0, rng.uniform(5, 60), n)) + rng.normal(0, 0.05, n)
+        elif shape == 1:  # random walk
+            v = np.cumsum(rng.normal(0, 0.02, n))
+        elif shape == 2:  # quantized to the 0.05 V grid the levels sit on
+            v = np.round(rng.normal(0.2, 0.3, n) / 0.05) * 0.05
+        else:             # quantized random walk with flat runs
+            v = np.round(np.cumsum(rng.normal(0, 0.03, n)) / 0.05) * 0.05
+        yield v + 0.2, tarr
+
+
+class EdgeDetectionEquivalenceTests(unittest.TestCase):
+    LEVEL_PAIRS = ((0.15, 0.25), (0.2, 0.2), (0.1, 0.5), (0.3, 0.2))  # last: lo > hi
+
+    def test_edges_match_reference(self):
+        for volts, tarr in _random_traces(seed=1):
+            for lo, hi in self.LEVEL_PAIRS:
+                ref = _edges_ref(volts, tarr, lo, hi)
+                got = sta._edges(volts, tarr, lo, hi)
+                np.testing.assert_array_equal(ref[0], got[0])
+                np.testing.assert_array_equal(ref[1], got[1])
+
+    def test_runt_matches_reference(self):
+        for volts, tarr in _random_traces(seed=2):
+            for lo, hi in ((0.15, 0.2), (0.1, 0.45), (0.25, 0.3)):
+                ref = _runt_events_ref(volts, tarr, lo, hi)
+                got = sta.detect_runt(volts, tarr, lo=lo, hi=hi)
+                self.assertEqual(got["events"], ref)
+                self.assertEqual(got["n"], len(ref))
+
+    def test_slew_matches_reference(self):
+        for volts, tarr in _random_traces(seed=3):
+            for lo, hi in ((0.2, 0.6), (0.1, 0.3), (0.25, 0.25)):
+                ref = _slew_transitions_ref(volts, tarr, lo, hi)
+                got = sta.detect_slew(volts, tarr, lo=lo, hi=hi, min_ns=None, max_ns=0.0)
+                # max_ns=0 flags every positive-duration transition: compare the
+                # event list to the reference transitions directly.
+                expected = [{"t_start": float(ts), "t_end": float(te), "value": float(d),
+                             "kind": "slew"} for ts, te, d in ref if d > 0]
+                self.assertEqual(got["events"], expected)
+                if ref:
+                    self.assertEqual(got["nominal"],
+                                     float(np.median([d for _, _, d in ref])))
+                else:
+                    self.assertTrue(np.isnan(got["nominal"]))
+
+    def test_runt_open_at_record_end(self):
+        tarr = np.arange(6, dtype=float)
+        volts = np.array([0.0, 0.0, 1.0, 1.0, 1.0, 1.0])   # rises past LO, never HI, never returns
+        got = sta.detect_runt(volts, tarr, lo=0.5, hi=2.0)
+        self.assertEqual(got["n"], 1)
+        self.assertEqual(got["events"][0]["t_end"], 5.0)
+        self.assertEqual(got["events"], _runt_events_ref(volts, tarr, 0.5, 2.0))
+
+
+class FullScanTests(unittest.TestCase):
+    KW = dict(holdoff_us=0, math=None, med_size=1, gauss_sigma=2)
+
+    def setUp(self):
+        d = tempfile.mkdtemp(prefix="smartscan_")
+        self.addCleanup(shutil.rmtree, d, ignore_errors=True)
+        self.path = os.path.join(d, "run.hdf5")
+        # 3x2 plane, 3 shots/position, two channels; shot 4 skipped.
+        write_synthetic_run(self.path, nx=3, ny=2, nshot=3, nsamples=400,
+                            channels=("C1", "C2"), skipped=(4,))
+
+    def _scan(self, workers):
+        return sta.full_scan_smart_triggers(self.path, workers=workers,
+                                            chunk_shots=5, **self.KW)
+
+    def test_matches_per_shot_analysis(self):
+        records, events, _rates = self._scan(1)
+        ref = sta.analyze_smart_triggers(self.path, shots=list(range(1, 19)), **self.KW)
+        self.assertEqual(len(records), len(ref))
+        self.assertEqual(len(records), 2 * 17 * 4)        # 2 ch x 17 shots x 4 kinds
+        np.testing.assert_array_equal(records["record"], np.arange(len(records)))
+        ref_sorted = sorted(ref, key=lambda r: (r["channel"], r["shot"], r["kind"]))
+        got_sorted = sorted(records.tolist(), key=lambda r: (r[2], r[3], r[6]))
+        for r, g in zip(ref_sorted, got_sorted):
+            self.assertEqual((r["scope"], r["channel"], r["shot"], r["kind"], r["n_events"]),
+                             (g[1].decode(), g[2].decode(), g[3], g[6].decode(), g[7]))
+            self.assertEqual(r["x"], g[4])
+            np.testing.assert_equal(r["nominal"], g[8])
+            got_ev = events[events["record"] == g[0]]
+            self.assertEqual([(e["t_start"], e["t_end"], e["value"]) for e in r["events"]],
+                             [tuple(e)[1:] for e in got_ev.tolist()])
+        self.assertGreater(len(events), 0)
+
+    def test_process_pool_matches_in_process(self):
+        serial = self._scan(1)
+        pooled = self._scan(2)
+        for a, b in zip(serial, pooled):
+            self.assertEqual(a.dtype, b.dtype)
+            for name in a.dtype.names:      # per field: NaN nominals compare equal
+                np.testing.assert_array_equal(a[name], b[name])
+
+    def test_event_rates_per_position(self):
+        records, _events, rates = self._scan(1)
+        # 6 positions x 2 channels x 4 kinds
+        self.assertEqual(len(rates), 6 * 2 * 4)
+        self.assertEqual(int(rates["n_shots"].sum()), len(records))
+        self.assertEqual(int(rates["n_events"].sum()), int(records["n_events"].sum()))
+        # the skipped shot leaves its position with 2 scanned shots, others 3
+        self.assertEqual(sorted(set(rates["n_shots"].tolist())), [2, 3])
+        np.testing.assert_allclose(rates["rate"], rates["n_events"] / rates["n_shots"])
+
+
+if __name__ == "__main__":
+    unittest.main()
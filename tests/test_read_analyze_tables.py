@@ -0,0 +1,133 @@
+"""Tests for the compact result tables and their /analysis store.
+
+``analyze_smart_triggers(as_table=True)`` and ``find_quiet_window(as_table=True)``
+must carry exactly what the list-of-dicts form carries, and
+``write_analysis_tables`` / ``read_analysis_tables`` must round-trip those tables
+through the run file without disturbing the readers (``/analysis`` is not a
+scope group).
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+import h5py
+
+from _analysis_fixtures import write_synthetic_run
+from read_and_analyze import analysis_tables
+from read_and_analyze import fluctuation_analysis as fa
+from read_and_analyze import smart_trigger_analysis as sta
+from read_and_analyze.read_bmotion_data import _position_for_shot, _scope_groups, read_positions
+from scope_io import read_hdf5_scope_data, read_hdf5_scope_tarr
+
+
+class ResultTableTests(unittest.TestCase):
+    SMART_KW = dict(holdoff_us=0, math=None, med_size=1, gauss_sigma=2)
+
+    def setUp(self):
+        d = tempfile.mkdtemp(prefix="tables_")
+        self.addCleanup(shutil.rmtree, d, ignore_errors=True)
+        self.path = os.path.join(d, "run.hdf5")
+        write_synthetic_run(self.path, nx=3, ny=2, nshot=3, nsamples=400,
+                            channels=("C1", "C2"), skipped=(4,))
+
+    def _smart_reference(self, shots):
+        """The per-shot dict records, built one trace at a time straight from the
+        detectors (as analyze_smart_triggers did before the tables existed)."""
+        kw = self.SMART_KW
+        ref = []
+        with h5py.File(self.path, "r") as f:
+            positions = read_positions(f)
+            tarr = read_hdf5_scope_tarr(f, "lpscope")
+            for ch in ("C1", "C2"):
+                for s in shots:
+                    if f[f"lpscope/shot_{s}"].attrs.get("skipped", False):
+                        continue
+                    volts, _, _ = read_hdf5_scope_data(f, "lpscope", ch, s)
+                    sig = sta._apply_math(sta._filter_trace(volts, kw["med_size"],
+                                                            kw["gauss_sigma"]), tarr, None)
+                    sig, t = sta._holdoff_slice(sig, tarr, kw["holdoff_us"])
+                    x, y = _position_for_shot(positions, s)
+                    for kind, detect in sta.DETECTORS.items():
+                        res = detect(sig, t)
+                        ref.append({"scope": "lpscope", "channel": ch, "shot": s,
+                                    "x": float(x), "y": float(y), "kind": kind,
+                                    "math": None, "holdoff_us": 0.0,
+                                    "n_events": res["n"], "nominal": res["nominal"],
+                                    "events": res["events"]})
+        return ref
+
+    def test_smart_table_matches_dicts(self):
+        shots = list(range(1, 19))
+        ref = self._smart_reference(shots)
+        self.assertGreater(sum(r["n_events"] for r in ref), 0)
+        got = sta.analyze_smart_triggers(self.path, shots=shots, **self.SMART_KW)
+        self.assertEqual(len(got), len(ref))
+        for r, g in zip(ref, got):
+            np.testing.assert_equal(g["nominal"], r["nominal"])    # NaN for runt
+            self.assertEqual({k: v for k, v in g.items() if k != "nominal"},
+                             {k: v for k, v in r.items() if k != "nominal"})
+        records, events = sta.analyze_smart_triggers(self.path, shots=shots,
+                                                     as_table=True, **self.SMART_KW)
+        self.assertEqual(records.dtype, sta.SMART_RECORD_DTYPE)
+        np.testing.assert_array_equal(records["record"], np.arange(len(records)))
+        self.assertEqual(int(records["n_events"].sum()), len(events))
+        back = sta.smart_table_to_dicts(records, events, None, 0)
+        self.assertEqual(len(back), len(ref))
+        for r, b in zip(ref, back):
+            nominal_r, nominal_b = r.pop("nominal"), b.pop("nominal")
+            np.testing.assert_equal(nominal_r, nominal_b)    # NaN for runt
+            self.assertEqual(r, b)
+
+    def test_quiet_window_table_matches_dicts(self):
+        kw = dict(window_us=20_000, med_size=1, gauss_sigma=2, signal_frac=0)
+        ref = fa.find_quiet_window(self.path, **kw)
+        table = fa.find_quiet_window(self.path, as_table=True, **kw)
+        self.assertGreater(len(ref), 0)
+        self.assertEqual(len(table), len(ref))
+        for r, row in zip(ref, table):
+            for name in fa.QUIET_RECORD_DTYPE.names:
+                got = row[name].decode() if isinstance(row[name], bytes) else row[name]
+                np.testing.assert_equal(got, r[name])
+
+    def test_round_trip_through_run_file(self):
+        records, events, rates = sta.full_scan_smart_triggers(
+            self.path, workers=1, **self.SMART_KW)
+        where = analysis_tables.write_analysis_tables(
+            self.path, "smart_trigger",
+            {"records": records, "events": events, "rates": rates},
+            attrs={"math": None, "holdoff_us": 0.0})
+        self.assertEqual(where, "/analysis/smart_trigger")
+
+        tables, attrs = analysis_tables.read_analysis_tables(self.path, "smart_trigger")
+        self.assertEqual(sorted(tables), ["events", "rates", "records"])
+        for name, arr in (("records", records), ("events", events), ("rates", rates)):
+            self.assertEqual(tables[name].dtype, arr.dtype)
+            for field in arr.dtype.names:
+                np.testing.assert_array_equal(tables[name][field], arr[field])
+        self.assertEqual(attrs["holdoff_us"], 0.0)
+        self.assertNotIn("math", attrs)                  # None is omitted
+        self.assertEqual(analysis_tables.list_analysis_tables(self.path),
+                         ["smart_trigger"])
+        with h5py.File(self.path, "r") as f:
+            self.assertEqual(_scope_groups(f), ["lpscope"])
+
+    def test_rewrite_replaces_and_empty_tables(self):
+        empty = np.zeros(0, dtype=sta.SMART_EVENT_DTYPE)
+        analysis_tables.write_analysis_tables(
+            self.path, "smart_trigger", {"events": np.ones(3, dtype=sta.SMART_EVENT_DTYPE)})
+        analysis_tables.write_analysis_tables(self.path, "smart_trigger", {"events": empty})
+        tables, _attrs = analysis_tables.read_analysis_tables(self.path, "smart_trigger")
+        self.assertEqual(len(tables["events"]), 0)
+        self.assertEqual(tables["events"].dtype, sta.SMART_EVENT_DTYPE)
+        with self.assertRaises(ValueError):
+            analysis_tables.write_analysis_tables(self.path, "bad", {"x": np.arange(3)})
+        with self.assertRaises(KeyError):
+            analysis_tables.read_analysis_tables(self.path, "missing")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+"""Tests for the parallel per-position plane builder in plot_xy_map.
+
+The thread/process pools must be a pure speed-up: for the same synthetic run,
+``build_plane`` / ``build_planes_step`` with ``workers > 1`` must return
+bit-identical planes, in the same position order, as the serial path --
+including NaN cells for skipped shots. Windowed reads (only the samples the
+reducer needs, plus the filter margin) must not change a single value.
+
+Repeat-shot ``mean``/``std`` maps read from the offload's stored per-position
+statistics must match the same maps computed from the traces.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+import h5py
+
+from _analysis_fixtures import GAIN, OFFSET, synthetic_raw, write_synthetic_run
+from read_and_analyze import plot_xy_map
+from read_and_analyze.read_bmotion_data import read_positions
+from scope_io import PositionStatsAccumulator, read_position_stats
+
+
+class ParallelPlaneBuildTests(unittest.TestCase):
+    def setUp(self):
+        d = tempfile.mkdtemp(prefix="xymap_")
+        self.addCleanup(shutil.rmtree, d, ignore_errors=True)
+        self.path = os.path.join(d, "run.hdf5")
+        # 4x3 plane, 2 shots/position; shot 5 (position 2, shot_index 0) skipped.
+        write_synthetic_run(self.path, nx=4, ny=3, nshot=2, nsamples=256,
+                            skipped=(5,))
+
+    def _plane(self, workers, pool):
+        reduce_fn = plot_xy_map.make_single_shot_reduce(0, "range", 50.0, 150.0, None)
+        with h5py.File(self.path, "r") as f:
+            return plot_xy_map.build_plane(
+                f, "lpscope", "C1", read_positions(f), reduce_fn,
+                med_size=5, gauss_sigma=3, workers=workers, pool=pool)
+
+    def _step(self, workers, pool):
+        with h5py.File(self.path, "r") as f:
+            return plot_xy_map.build_planes_step(
+                f, "lpscope", "C1", read_positions(f), [20.0, 100.0, 200.0], 1,
+                med_size=5, gauss_sigma=3, workers=workers, pool=pool)
+
+    def test_thread_pool_matches_serial(self):
+        Z0, xp, yp = self._plane(1, "thread")
+        Z1, xp1, yp1 = self._plane(3, "thread")
+        self.assertEqual(Z0.shape, (3, 4))
+        np.testing.assert_array_equal(Z0, Z1)
+        np.testing.assert_array_equal(xp, xp1)
+        np.testing.assert_array_equal(yp, yp1)
+        # The skipped shot is position 2's shot_index 0 -> row 0, col 2 is NaN.
+        self.assertTrue(np.isnan(Z0[0, 2]))
+        self.assertEqual(int(np.isnan(Z0).sum()), 1)
+
+    def test_process_pool_matches_serial(self):
+        Z0, _, _ = self._plane(1, "thread")
+        Z1, _, _ = self._plane(2, "process")
+        np.testing.assert_array_equal(Z0, Z1)
+
+    def test_step_planes_match_serial(self):
+        Zs0, _, _, t0 = self._step(1, "thread")
+        Zs1, _, _, t1 = self._step(4, "thread")
+        self.assertEqual(t0, t1)
+        self.assertEqual(len(Zs0), 3)
+        for a, b in zip(Zs0, Zs1):
+            np.testing.assert_array_equal(a, b)
+
+    def test_unknown_pool_rejected(self):
+        with self.assertRaises(ValueError):
+            self._plane(2, "gpu")
+
+
+class WindowedReadTests(unittest.TestCase):
+    """Reading only the reduction window (plus the filter margin) must give the
+    same planes as filtering the full traces."""
+
+    def setUp(self):
+        d = tempfile.mkdtemp(prefix="xymap_")
+        self.addCleanup(shutil.rmtree, d, ignore_errors=True)
+        self.path = os.path.join(d, "run.hdf5")
+        write_synthetic_run(self.path, nx=3, ny=2, nshot=2, nsamples=400,
+                            skipped=(3,))
+
+    def test_range_window_matches_full_read(self):
+        for t_start, t_end in ((50.0, 90.0), (2.0, 10.0), (380.0, 500.0)):
+            reduce_fn = plot_xy_map.make_single_shot_reduce(0, "range", t_start, t_end, None)
+            with h5py.File(self.path, "r") as f:
+                pos = read_positions(f)
+                full, _, _ = plot_xy_map.build_plane(
+                    f, "lpscope", "C1", pos, reduce_fn, med_size=7, gauss_sigma=4,
+                    workers=1)
+                win, _, _ = plot_xy_map.build_plane(
+                    f, "lpscope", "C1", pos, reduce_fn, med_size=7, gauss_sigma=4,
+                    workers=1, t_window_ms=(t_start, t_end))
+            np.testing.assert_array_equal(win, full)
+            self.assertEqual(int(np.isnan(win).sum()), 1)
+
+    def test_step_window_matches_full_stack(self):
+        t_steps = [30.0, 120.0]
+        with h5py.File(self.path, "r") as f:
+            pos = read_positions(f)
+            Zs, _, _, _ = plot_xy_map.build_planes_step(
+                f, "lpscope", "C1", pos, t_steps, 1, med_size=5, gauss_sigma=3,
+                workers=1)
+            tarr = f["lpscope/time_array"][()]
+            idxs, _ = plot_xy_map._step_indices(tarr, t_steps)
+            ref = []
+            for i in range(6):
+                stack = plot_xy_map._load_stack(f, "lpscope", "C1", [2 * i + 1, 2 * i + 2],
+                                                tarr, 5, 3)
+                ref.append(stack[1, idxs])
+        ref = np.array(ref).T
+        for k in range(len(t_steps)):
+            np.testing.assert_array_equal(Zs[k].ravel(), ref[k])
+
+    def test_step_without_snapshot_times_rejected(self):
+        with h5py.File(self.path, "r") as f:
+            pos = read_positions(f)
+            with self.assertRaisesRegex(ValueError, "empty t_steps_ms"):
+                plot_xy_map.build_planes_step(f, "lpscope", "C1", pos, [], 1,
+                                              med_size=5, gauss_sigma=3, workers=1)
+
+
+class PositionStatPlaneTests(unittest.TestCase):
+    def setUp(self):
+        d = tempfile.mkdtemp(prefix="xymap_")
+        self.addCleanup(shutil.rmtree, d, ignore_errors=True)
+        self.path = os.path.join(d, "run.hdf5")
+        # 3x2 plane, 3 shots/position; shot 4 (position 1) skipped.
+        write_synthetic_run(self.path, nx=3, ny=2, nshot=3, nsamples=300,
+                            skipped=(4,))
+
+    def _store_stats(self):
+        """Feed every shot through the accumulator, as the offload does."""
+        with h5py.File(self.path, "a") as f:
+            mg = f["Control/Positions/probe1"]
+            setup = mg["positions_setup_array"][()]
+            stats = PositionStatsAccumulator(np.column_stack((setup["x"], setup["y"])))
+            for row in mg["positions_array"][()]:
+                shot = f[f"lpscope/shot_{row['shot_num']}"]
+                if shot.attrs.get("skipped", False):
+                    continue
+                stats.add_shot(f, stats.position_index((row["x"], row["y"])),
+                               [("lpscope", "C1", shot["C1_data"][()],
+                                 shot["C1_header"][()].tobytes())])
+            stats.finish(f)
+
+    def _planes(self, stat, mode):
+        with h5py.File(self.path, "r") as f:
+            return plot_xy_map.build_planes_stat(
+                f, "lpscope", "C1", read_positions(f), stat, mode,
+                40.0, 120.0, [30.0, 150.0])
+
+    def test_stored_stats_match_traces(self):
+        from_traces = {(st, m): self._planes(st, m)
+                       for st in ("mean", "std") for m in ("range", "step")}
+        self._store_stats()
+        with h5py.File(self.path, "r") as f:
+            self.assertIsNotNone(read_position_stats(f, "lpscope", "C1"))
+        for (stat, mode), (Zs_ref, xp, yp, t_ref) in from_traces.items():
+            Zs, xp1, yp1, t1 = self._planes(stat, mode)
+            self.assertEqual(len(Zs), 1 if mode == "range" else 2)
+            self.assertEqual(t1, t_ref)
+            np.testing.assert_array_equal(xp, xp1)
+            for a, b in zip(Zs, Zs_ref):
+                self.assertEqual(a.shape, (2, 3))
+                np.testing.assert_allclose(a, b, rtol=1e-6, atol=1e-6)   # float32 rows
+
+        # Position 1 (row 0, col 1) averages shots 5 and 6 (shot 4 skipped).
+        tarr = np.arange(300) * 0.001 + 0.002
+        i0, i1 = plot_xy_map._reduction_indices(tarr, "range", 40.0, 120.0, None)
+        volts = np.array([synthetic_raw(s, "C1", 300) for s in (5, 6)]) * GAIN - OFFSET
+        Z = self._planes("mean", "range")[0][0]
+        self.assertAlmostEqual(Z[0, 1], volts.mean(axis=0)[i0:i1].mean(), places=5)
+
+    def test_unknown_stat_rejected(self):
+        with self.assertRaises(ValueError):
+            self._planes("median", "range")
+
+
+if __name__ == "__main__":
+    unittest.main()
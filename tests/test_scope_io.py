@@ -2,20 +2,40 @@
 
 Mirrors lab_scopes' reader tests against the ported scope_io package: round-trip
 a synthesized WAVEDESC + int16 data and assert the volts/dt/t0 scaling and the
-NaN-row behavior of read_hdf5_scope_channel_shots.
+NaN-row behavior of read_hdf5_scope_channel_shots. The bulk WAVEDESC decoder
+must agree field-for-field with the per-header struct parser. Min/max preview
+levels must equal the per-bin extremes of the full trace.
 """
 
+import struct
+import time
+
 import numpy as np
 import pytest
 
-from scope_io.wavedesc import LeCroyWavedesc
+from scope_io.preview import (
+    choose_preview_factor,
+    minmax_decimate,
+    minmax_pyramid,
+    preview_key,
+)
+from scope_io.wavedesc import (
+    WAVEDESC_FMT,
+    LeCroyWavedesc,
+    decode_wavedescs,
+    wavedesc_time_arrays,
+    wavedesc_trigger_epochs,
+)
 
 h5py = pytest.importorskip("h5py")
 
 from scope_io import (  # noqa: E402  (after importorskip)
+    read_hdf5_scope_channel_headers,
+    read_hdf5_scope_channel_preview,
     read_hdf5_scope_channel_shots,
     read_hdf5_scope_data,
     read_hdf5_scope_tarr,
+    time_window_indices,
 )
 
 
@@ -113,3 +133,197 @@ def test_channel_shots_width_from_later_shot_when_first_skipped(tmp_path):
     np.testing.assert_array_equal(stack[1], single2)
     assert dt == pytest.approx(0.001, rel=1e-5)
     assert t0 == pytest.approx(0.002, rel=1e-5)
+
+
+def test_time_window_reads_match_sliced_full_reads(tmp_path):
+    # Time-chunked traces (as the writer's trace_chunk_samples produces): a
+    # windowed read must equal the slice of a full read, and the full-record
+    # length check still applies (shot 3 is short -> NaN row).
+    n = 1000
+    header_bytes = LeCroyWavedesc().generate_test_data(NTimes=n)
+    tarr = np.arange(n) * 0.001 + 0.002
+    path = tmp_path / "scope.h5"
+    with h5py.File(path, "w") as f:
+        scope = f.create_group("bdotscope")
+        scope.create_dataset("time_array", data=tarr)
+        for s, length in ((1, n), (2, n), (3, n - 10)):
+            shot = scope.create_group(f"shot_{s}")
+            shot.create_dataset("C1_data", data=np.arange(length, dtype=np.int16) * s,
+                                chunks=(64,), compression="gzip")
+            shot.create_dataset("C1_header", data=np.void(header_bytes))
+
+    t_window = (tarr[100], tarr[299])
+    assert time_window_indices(tarr, *t_window) == (100, 300)
+    assert time_window_indices(tarr, None, tarr[9]) == (0, 10)
+    assert time_window_indices(tarr, tarr[-1] + 1, None) == (n, n)
+    with h5py.File(path, "r") as f:
+        full, dt, t0 = read_hdf5_scope_channel_shots(f, "bdotscope", "C1", [1, 2, 3],
+                                                     expected_len=n)
+        win, dt_w, t0_w = read_hdf5_scope_channel_shots(f, "bdotscope", "C1", [1, 2, 3],
+                                                        t_window=t_window)
+        one, _, _ = read_hdf5_scope_data(f, "bdotscope", "C1", 2, samples=(100, 300))
+        with pytest.raises(ValueError):
+            read_hdf5_scope_channel_shots(f, "bdotscope", "C1", [1],
+                                          samples=(0, 1), t_window=t_window)
+    assert win.shape == (3, 200)
+    np.testing.assert_array_equal(win, full[:, 100:300])
+    np.testing.assert_array_equal(one, full[1, 100:300])
+    assert np.isnan(win[2]).all()
+    assert (dt_w, t0_w) == (dt, t0)
+
+
+def test_windowed_read_of_sequence_mode_slices_the_sample_axis(tmp_path):
+    # Sequence mode stores (segments, samples): the window applies per segment.
+    nseg, n = 5, 100
+    header_bytes = LeCroyWavedesc().generate_test_data(NTimes=n)
+    tarr = np.arange(n) * 0.001 + 0.002
+    raw = np.arange(nseg * n, dtype=np.int16).reshape(nseg, n)
+    path = tmp_path / "scope.h5"
+    with h5py.File(path, "w") as f:
+        scope = f.create_group("bdotscope")
+        scope.create_dataset("time_array", data=tarr)
+        shot = scope.create_group("shot_1")
+        shot.create_dataset("C1_data", data=raw)
+        shot.create_dataset("C1_header", data=np.void(header_bytes))
+
+    with h5py.File(path, "r") as f:
+        full, _, _ = read_hdf5_scope_data(f, "bdotscope", "C1", 1)
+        by_samples, _, _ = read_hdf5_scope_data(f, "bdotscope", "C1", 1, samples=(10, 20))
+        by_time, _, _ = read_hdf5_scope_data(f, "bdotscope", "C1", 1,
+                                             t_window=(tarr[10], tarr[19]))
+    assert full.shape == (nseg, n)
+    assert by_samples.shape == (nseg, 10)
+    np.testing.assert_array_equal(by_samples, full[:, 10:20])
+    np.testing.assert_array_equal(by_time, full[:, 10:20])
+
+
+def test_minmax_pyramid_matches_direct_decimation():
+    rng = np.random.default_rng(5)
+    for n in (1, 15, 16, 257, 4099):
+        trace = rng.integers(-30000, 30000, n).astype(np.int16)
+        levels = minmax_pyramid(trace, (256, 16, 4, 48))
+        assert list(levels) == [4, 16, 48, 256]
+        for factor, mm in levels.items():
+            assert mm.dtype == np.int16
+            np.testing.assert_array_equal(mm, minmax_decimate(trace, factor))
+            nbins = -(-n // factor)
+            ref = [(trace[j * factor:(j + 1) * factor].min(),
+                    trace[j * factor:(j + 1) * factor].max()) for j in range(nbins)]
+            np.testing.assert_array_equal(mm, np.array(ref, dtype=np.int16).reshape(-1, 2))
+    assert choose_preview_factor(10_000, [16, 256], 500) == 16
+    assert choose_preview_factor(10_000, [16, 256], 30) == 256
+    assert choose_preview_factor(10_000, [16, 256], 1000) is None
+
+
+def test_read_preview_picks_coarsest_adequate_level(tmp_path):
+    n = 4000
+    header_bytes = LeCroyWavedesc().generate_test_data(NTimes=n)
+    path = tmp_path / "scope.h5"
+    rng = np.random.default_rng(6)
+    traces = {s: rng.integers(-2000, 2000, n).astype(np.int16) for s in (1, 3)}
+    with h5py.File(path, "w") as f:
+        scope = f.create_group("bdotscope")
+        scope.create_dataset("time_array", data=np.arange(n) * 0.001 + 0.002)
+        for s, raw in traces.items():
+            shot = scope.create_group(f"shot_{s}")
+            shot.create_dataset("C1_data", data=raw)
+            shot.create_dataset("C1_header", data=np.void(header_bytes))
+            for factor, mm in minmax_pyramid(raw, (16, 256)).items():
+                shot.create_dataset(preview_key("C1", factor), data=mm)
+        scope.create_group("shot_2").attrs["skipped"] = True
+
+    with h5py.File(path, "r") as f:
+        full, _dt, _t0 = read_hdf5_scope_channel_shots(f, "bdotscope", "C1", [1, 2, 3])
+        tarr = read_hdf5_scope_tarr(f, "bdotscope")
+        t, lo, hi, factor = read_hdf5_scope_channel_preview(
+            f, "bdotscope", "C1", [1, 2, 3], max_points=200)
+        assert factor == 16                           # 4000/256 = 16 bins < 200
+        assert read_hdf5_scope_channel_preview(
+            f, "bdotscope", "C1", [1, 3], max_points=10)[3] == 256
+        assert read_hdf5_scope_channel_preview(
+            f, "bdotscope", "C1", [1, 3], max_points=1000) is None
+
+    nbins = n // 16
+    np.testing.assert_array_equal(t, tarr[::16])
+    assert lo.shape == hi.shape == (3, nbins)
+    assert np.isnan(lo[1]).all() and np.isnan(hi[1]).all()
+    for row in (0, 2):
+        bins = full[row].reshape(nbins, 16)
+        np.testing.assert_allclose(lo[row], bins.min(axis=1), rtol=1e-12)
+        np.testing.assert_allclose(hi[row], bins.max(axis=1), rtol=1e-12)
+
+
+def _varied_headers(n, ntimes=8):
+    """n distinct headers: different scaling, time base and trigger times."""
+    base = LeCroyWavedesc()
+    base.generate_test_data(NTimes=ntimes)
+    t_start = time.mktime((2026, 6, 8, 11, 58, 0, 0, 0, -1))
+    out = []
+    for i in range(n):
+        lt = time.localtime(t_start + 7.3 * i)
+        wd = base.wd._replace(
+            vertical_gain=0.1 + 0.01 * i, vertical_offset=-0.2 * i,
+            horiz_interval=1e-6 * (i + 1), horiz_offset=-1e-4 * i + 1e-9,
+            instrument_number=i, tt_year=lt.tm_year if i != 3 else 0,
+            tt_months=lt.tm_mon, tt_days=lt.tm_mday, tt_hours=lt.tm_hour,
+            tt_minute=lt.tm_min, tt_second=lt.tm_sec + 0.123456789 * (i % 5))
+        out.append(struct.pack(WAVEDESC_FMT, *wd))
+    return out
+
+
+def _epoch_local_ref(wd):
+    """The per-header conversion interferometer_merge uses (mktime + fraction)."""
+    if int(wd.tt_year) <= 0:
+        return np.nan
+    sec = float(wd.tt_second)
+    whole = int(sec)
+    t = time.mktime((int(wd.tt_year), int(wd.tt_months), int(wd.tt_days),
+                     int(wd.tt_hours), int(wd.tt_minute), whole, 0, 0, -1))
+    return float(t) + (sec - whole)
+
+
+def test_decode_wavedescs_matches_struct_parser():
+    headers = _varied_headers(12)
+    stacked = np.frombuffer(b"".join(headers), dtype=np.uint8).reshape(12, -1)
+    for records in (decode_wavedescs(headers), decode_wavedescs(stacked),
+                    decode_wavedescs(b"".join(headers))):
+        assert records.shape == (12,)
+        for rec, raw in zip(records, headers):
+            ref = LeCroyWavedesc(raw).wd
+            for name in ref._fields:
+                want = getattr(ref, name)
+                if isinstance(want, bytes):
+                    want = want.rstrip(b"\0")   # numpy S fields drop trailing NULs
+                assert rec[name] == want, name
+
+    times = wavedesc_time_arrays(decode_wavedescs(headers))
+    for row, raw in zip(times, headers):
+        np.testing.assert_array_equal(row, LeCroyWavedesc(raw).time_array)
+
+    epochs = wavedesc_trigger_epochs(decode_wavedescs(headers))
+    ref = [_epoch_local_ref(LeCroyWavedesc(raw).wd) for raw in headers]
+    np.testing.assert_array_equal(epochs, ref)               # NaN for the unset one
+    assert np.isnan(epochs[3])
+
+    with pytest.raises(ValueError):
+        decode_wavedescs([headers[0], headers[1][:-1]])
+
+
+def test_read_hdf5_scope_channel_headers(tmp_path):
+    headers = _varied_headers(3)
+    path = tmp_path / "scope.h5"
+    with h5py.File(path, "w") as f:
+        scope = f.create_group("bdotscope")
+        for s, raw in ((1, headers[0]), (2, headers[1]), (4, headers[2])):
+            shot = scope.create_group(f"shot_{s}")
+            shot.create_dataset("C1_data", data=np.zeros(8, dtype=np.int16))
+            shot.create_dataset("C1_header", data=np.void(raw))
+        scope.create_group("shot_3").attrs["skipped"] = True
+
+    with h5py.File(path, "r") as f:
+        records, present = read_hdf5_scope_channel_headers(
+            f, "bdotscope", "C1", [1, 2, 3, 4, 5])
+
+    np.testing.assert_array_equal(present, [True, True, False, True, False])
+    assert records["instrument_number"].tolist() == [0, 1, 0, 2, 0]
+    assert records["horiz_interval"][3] == LeCroyWavedesc(headers[2]).dt
@@ -0,0 +1,70 @@
+"""Tests for the offload's live analysis tap (``scope_io.live``).
+
+A subscriber must receive each published shot as the same min/max envelope,
+in volts, that :func:`scope_io.minmax_decimate` gives on the raw trace, plus
+the run description on connect. A viewer that stops reading must never block
+the publisher.
+"""
+
+import time
+
+import numpy as np
+
+from scope_io import LiveTapPublisher, LiveTapSubscriber, minmax_decimate
+from scope_io.wavedesc import LeCroyWavedesc
+from spooling.spool_format import ShotPayload, TracePayload
+
+NSAMPLES = 1000
+
+
+def _payload(shot_num, raw, header, skipped=False):
+    if skipped:
+        return ShotPayload(shot_num=shot_num, skipped=True, skip_reason="no trigger")
+    return ShotPayload(
+        shot_num=shot_num, coordinates={"MG_A": (np.float64(-1.0), 2.0)},
+        acquisition_time="Mon Oct 19 12:00:00 2026",
+        traces={"lpscope": [TracePayload("C1", raw, header)]})
+
+
+def test_published_shot_roundtrip():
+    header = LeCroyWavedesc().generate_test_data(NTimes=NSAMPLES)
+    wd = LeCroyWavedesc(header)
+    gain, offset = float(wd.wd.vertical_gain), float(wd.wd.vertical_offset)
+    raw = np.random.default_rng(3).integers(-3000, 3000, NSAMPLES, dtype=np.int16)
+
+    with LiveTapPublisher(max_points=100, run_info={"total_shots": 2}) as tap:
+        tap.publish(_payload(1, raw, header))           # no viewer yet: dropped
+        with LiveTapSubscriber(tap.host, tap.port, timeout=5) as sub:
+            tap.publish(_payload(2, raw, header))
+            tap.publish(_payload(3, None, None, skipped=True))
+            assert sub.run_info == {"total_shots": 2}
+            shot = sub.recv()
+            skipped = sub.recv()
+
+    assert shot.shot_num == 2
+    assert shot.coordinates == {"MG_A": [-1.0, 2.0]}
+    trace = shot.traces[("lpscope", "C1")]
+    assert trace.factor == 10 and trace.units == "V"
+    mm = minmax_decimate(raw, 10).astype(np.float64) * gain - offset
+    np.testing.assert_allclose(trace.lo, mm.min(axis=1), rtol=1e-6)
+    np.testing.assert_allclose(trace.hi, mm.max(axis=1), rtol=1e-6)
+    np.testing.assert_allclose(trace.t, wd.t0 + wd.dt * 10 * np.arange(100))
+    assert skipped.shot_num == 3 and skipped.skipped and not skipped.traces
+    assert skipped.skip_reason == "no trigger"
+
+
+def test_stalled_viewer_does_not_block_publish():
+    raw = np.arange(200_000, dtype=np.int16)
+    header = b"not-a-wavedesc"                          # published as raw counts
+    with LiveTapPublisher(max_points=200_000, queue_depth=2) as tap:
+        stalled = LiveTapSubscriber(tap.host, tap.port, timeout=5)  # never reads
+        start = time.monotonic()
+        for n in range(1, 51):
+            tap.publish(_payload(n, raw, header))
+        assert time.monotonic() - start < 5.0
+        with LiveTapSubscriber(tap.host, tap.port, timeout=5) as sub:
+            tap.publish(_payload(51, raw, header))
+            shot = sub.recv()
+        stalled.close()
+    assert shot.shot_num == 51
+    assert shot.traces[("lpscope", "C1")].units == "counts"
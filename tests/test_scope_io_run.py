@@ -0,0 +1,97 @@
+"""Tests for the lazy whole-run view (``scope_io.open_run``).
+
+Views must read exactly what :func:`read_hdf5_scope_channel_shots` reads
+(including NaN rows for skipped shots) while only touching the selected shots
+and sample window, and the streamed reductions must equal the in-memory
+NaN-aware mean/std regardless of the chunk size.
+"""
+
+import numpy as np
+import pytest
+
+h5py = pytest.importorskip("h5py")
+
+from _analysis_fixtures import write_synthetic_run  # noqa: E402
+from scope_io import open_run, read_hdf5_scope_channel_shots  # noqa: E402
+
+NSAMPLES = 200
+
+
+@pytest.fixture
+def run_path(tmp_path):
+    path = tmp_path / "run.hdf5"
+    # 3x2 plane, 4 shots per position (24 shots); shots 5 and 6 skipped.
+    write_synthetic_run(path, nx=3, ny=2, nshot=4, nsamples=NSAMPLES,
+                        channels=("C1", "C2"), skipped=(5, 6))
+    return path
+
+
+def _reference(path, channel="C1", shots=range(1, 25)):
+    with h5py.File(path, "r") as f:
+        stack, _dt, _t0 = read_hdf5_scope_channel_shots(f, "lpscope", channel, list(shots))
+        tarr = f["lpscope/time_array"][()]
+    return stack, tarr
+
+
+def test_view_reads_match_channel_shots(run_path):
+    ref, tarr = _reference(run_path, "C2")
+    with open_run(run_path) as run:
+        assert run.scopes == ["lpscope"]
+        assert run.channels("lpscope") == ["C1", "C2"]
+        view = run["lpscope", "C2"]
+        assert view.shape == (24, NSAMPLES)
+        np.testing.assert_array_equal(view.time, tarr)
+        np.testing.assert_array_equal(view.read(), ref)
+        np.testing.assert_array_equal(view[3], ref[3])
+        np.testing.assert_array_equal(view[2:8, 10:50], ref[2:8, 10:50])
+        assert np.isnan(view[4]).all() and np.isnan(view[5]).all()
+        chunks = list(view.iter_chunks(chunk_shots=5))
+        assert [len(s) for s, _ in chunks] == [5, 5, 5, 5, 4]
+        np.testing.assert_array_equal(np.vstack([b for _, b in chunks]), ref)
+
+
+def test_time_window_reads_only_the_window(run_path):
+    ref, tarr = _reference(run_path)
+    t_start, t_end = tarr[40], tarr[120]
+    with open_run(run_path) as run:
+        window = run["lpscope", "C1"].sel(t=(t_start, t_end))
+        assert window.shape == (24, 81)                   # inclusive at both ends
+        np.testing.assert_array_equal(window.time, tarr[40:121])
+        np.testing.assert_array_equal(window.read(), ref[:, 40:121])
+        # Narrowing a window again is relative to the window.
+        inner = window.isel(shots=slice(0, 3), samples=slice(10, 20))
+        np.testing.assert_array_equal(inner.read(), ref[0:3, 50:60])
+        # Open-ended and out-of-range windows clip to the record.
+        assert run["lpscope", "C1"].sel(t=(None, tarr[9])).shape == (24, 10)
+        assert run["lpscope", "C1"].sel(t=(tarr[-1] + 1, None)).shape == (24, 0)
+
+
+def test_streamed_mean_std_matches_in_memory(run_path):
+    ref, _tarr = _reference(run_path)
+    valid = ref[~np.isnan(ref).all(axis=1)]
+    with open_run(run_path) as run:
+        view = run["lpscope", "C1"]
+        for chunk_shots in (1, 4, 7, 100):
+            mean, std = view.mean_std(ddof=1, chunk_shots=chunk_shots)
+            np.testing.assert_allclose(mean, valid.mean(axis=0), rtol=1e-12, atol=1e-12)
+            np.testing.assert_allclose(std, valid.std(axis=0, ddof=1), rtol=1e-10, atol=1e-12)
+        empty = view.sel(shots=[5, 6])                    # only skipped shots
+        assert np.isnan(empty.mean()).all()
+
+
+def test_position_selection_and_means(run_path):
+    ref, _tarr = _reference(run_path)
+    with open_run(run_path) as run:
+        view = run["lpscope", "C1"]
+        # Second position in the x-fastest, y-descending motion list is (0, 5):
+        # shots 5-8, two of them skipped.
+        at = view.at_position(0.0, 5.0)
+        np.testing.assert_array_equal(at.shots, [5, 6, 7, 8])
+        np.testing.assert_array_equal(at.mean(), ref[6:8].mean(axis=0))
+
+        xy, mean, std, counts = view.position_mean_std()
+        assert xy.shape == (6, 2)
+        np.testing.assert_array_equal(xy[:3], [[-10, 5], [0, 5], [10, 5]])
+        np.testing.assert_array_equal(counts, [4, 2, 4, 4, 4, 4])
+        np.testing.assert_allclose(mean[2], ref[8:12].mean(axis=0), rtol=1e-12)
+        np.testing.assert_allclose(std[2], ref[8:12].std(axis=0), rtol=1e-10, atol=1e-12)
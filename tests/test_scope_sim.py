@@ -0,0 +1,150 @@
+"""Tests for the simulated LeCroy scope (lapd_daq/devices/lecroy_sim.py) and
+its ``sim:`` hook in acquisition.scope_runner. No hardware; each test runs in
+well under a second of real time.
+
+Run:
+
+    python -m unittest tests.test_scope_sim
+"""
+
+import configparser
+import io
+import os
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from acquisition import scope_runner
+from lapd_daq.devices.lab_scopes import LabScopesLeCroyScopeAdapter
+from lapd_daq.devices.lecroy_sim import (
+    SimulatedLeCroyScope,
+    is_sim_address,
+    parse_sim_address,
+)
+from scope_io.wavedesc import LeCroyWavedesc
+
+
+class SimAddressTests(unittest.TestCase):
+    def test_recognised_and_parsed(self):
+        self.assertTrue(is_sim_address("sim"))
+        self.assertTrue(is_sim_address(" SIM:rate_hz=5"))
+        self.assertFalse(is_sim_address("192.168.7.63"))
+        params = parse_sim_address("sim:rate_hz=5, samples=200,bus=b1")
+        self.assertEqual((params["rate_hz"], params["samples"], params["bus"]),
+                         (5.0, 200, "b1"))
+        self.assertEqual(params["channels"], 4)         # default kept
+
+    def test_bad_parameters_raise(self):
+        for address in ("sim:rate=5", "sim:samples=many", "sim:rate_hz=0",
+                        "sim:channels"):
+            with self.assertRaises(ValueError, msg=address):
+                parse_sim_address(address)
+
+    def test_runner_and_adapter_pick_the_simulator(self):
+        self.assertIs(scope_runner._lecroy_scope_class("sim:seed=1"),
+                      SimulatedLeCroyScope)
+        adapter = LabScopesLeCroyScopeAdapter("s", "sim:samples=100,channels=1")
+        adapter.connect()
+        self.assertIsInstance(adapter.scope, SimulatedLeCroyScope)
+
+
+class SimulatedScopeDataTests(unittest.TestCase):
+    def _triggered(self, address):
+        scope = SimulatedLeCroyScope(address)
+        scope.arm_master_single("C1")
+        self.assertTrue(scope.wait_for_stop_then_complete("C1", timeout=2))
+        return scope
+
+    def test_header_decodes_and_scales_raw_counts(self):
+        scope = self._triggered("sim:rate_hz=500,samples=1000,channels=2,seed=3,bus=data")
+        raw, header = scope.acquire("C2", raw=True)
+        wd = LeCroyWavedesc(header)
+        self.assertEqual(raw.dtype, np.int16)
+        self.assertEqual(raw.shape, (1000,))
+        self.assertEqual(int(wd.wd.wave_array_1), raw.nbytes)
+        self.assertEqual(int(wd.wd.subarray_count), 1)
+        np.testing.assert_allclose(scope.time_array("C2"),
+                                   wd.t0 + wd.dt * np.arange(1000))
+        self.assertGreater(int(wd.wd.tt_year), 2000)     # trigger time stamped
+        volts, _ = scope.acquire("C2", raw=False)
+        gain, offset = float(wd.wd.vertical_gain), float(wd.wd.vertical_offset)
+        self.assertLess(np.abs(volts).max(), 10.0)
+        self.assertEqual(scope.translate_header_bytes(header).subarray_count, 1)
+        # Same noiseless record plus fresh noise: close to, not equal to, raw.
+        self.assertLess(np.abs(volts - (raw * gain - offset)).max(), 0.1)
+
+    def test_sequence_mode_returns_one_array_per_segment(self):
+        scope = self._triggered("sim:rate_hz=1000,samples=300,segments=4,channels=1,"
+                                "seed=3,bus=seq")
+        segments, header = scope.acquire_sequence_data("C1", raw=True)
+        self.assertEqual(len(segments), 4)
+        self.assertEqual({seg.shape for seg in segments}, {(300,)})
+        self.assertEqual(scope.translate_header_bytes(header).subarray_count, 4)
+
+    def test_read_time_follows_bandwidth_and_latency(self):
+        # 2 MB at 100 MB/s + 5 ms latency >= 25 ms per trace.
+        scope = self._triggered("sim:rate_hz=500,samples=1000000,channels=1,"
+                                "bandwidth_mbps=100,latency_ms=5,seed=3,bus=bw")
+        start = time.monotonic()
+        scope.acquire("C1")
+        self.assertGreaterEqual(time.monotonic() - start, 0.025)
+        self.assertGreaterEqual(scope.stats["bytes"], 2_000_000)
+
+    def test_read_timeout_raises(self):
+        scope = self._triggered("sim:rate_hz=500,samples=100,channels=1,"
+                                "read_timeout_prob=1,timeout_s=0.01,bus=rto")
+        with self.assertRaises(TimeoutError):
+            scope.acquire("C1")
+        self.assertEqual(scope.stats["read_timeouts"], 1)
+
+
+def _run_shots(scope_ips, shots):
+    """Initialize a MultiScopeAcquisition over ``scope_ips`` and run ``shots``
+    arm/read cycles; returns (per-shot data, per-shot missing, scopes)."""
+    config = configparser.ConfigParser()
+    config.read_dict({"scope_ips": scope_ips})
+    results, missing = [], []
+    with tempfile.TemporaryDirectory() as tmp, redirect_stdout(io.StringIO()):
+        with scope_runner.MultiScopeAcquisition(
+                os.path.join(tmp, "sim.hdf5"), config, "") as msa:
+            msa.initialize_hdf5_base()
+            active = msa.initialize_scopes()
+            for shot in range(1, shots + 1):
+                msa.arm_scopes_for_trigger(active, verbose=False)
+                data = msa.acquire_shot_dispatch(active, shot, verbose=False)
+                results.append({name: msa.scopes[name]._edge for name in data})
+                missing.append(msa.last_missing_scopes)
+            scopes = dict(msa.scopes)
+    return results, missing, scopes
+
+
+class SimulatedAcquisitionLoopTests(unittest.TestCase):
+    def test_master_and_slave_capture_the_same_edge(self):
+        results, missing, scopes = _run_shots({
+            "slave": "sim:rate_hz=200,samples=2000,channels=2,seed=1,bus=loop",
+            "master": "sim:rate_hz=200,samples=2000,channels=3,seed=1,bus=loop",
+        }, shots=5)
+        for edges, miss in zip(results, missing):
+            self.assertEqual(set(edges), {"slave", "master"})
+            self.assertEqual(edges["slave"], edges["master"])
+            self.assertEqual(miss, {})
+        edges = [e["master"] for e in results]
+        self.assertEqual(len(set(edges)), 5)               # a fresh edge every shot
+        self.assertEqual(scopes["master"].stats["captured"], 5)
+
+    def test_missed_trigger_records_every_scope_missing(self):
+        results, missing, _ = _run_shots({
+            "slave": "sim:rate_hz=200,samples=100,channels=1,timeout_s=0.05,bus=miss",
+            "master": "sim:rate_hz=200,samples=100,channels=1,miss_prob=1,"
+                      "timeout_s=0.05,bus=miss",
+        }, shots=2)
+        self.assertEqual(results, [{}, {}])
+        for miss in missing:
+            self.assertEqual(set(miss), {"slave", "master"})
+
+
+if __name__ == "__main__":
+    unittest.main()